@@ -13,9 +13,10 @@ from __future__ import annotations
 import hashlib
 import logging
 import os
+import re
 import sqlite3
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Iterator
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +104,10 @@ class TursoConnection:
     def commit(self):
         pass  # Turso HTTP auto-commits
 
+    def batch(self, statements):
+        """Run [(sql, params), ...] as one transaction (a single Turso batch request)."""
+        self._client.batch([(sql, list(params)) for sql, params in statements])
+
     def close(self):
         pass  # Persistent client, reused across calls
 
@@ -220,6 +225,10 @@ def init_db() -> None:
     # Existing (pre-embedding) tables won't get the column from CREATE IF NOT EXISTS —
     # add it in-place. Idempotent: skipped when already present.
     _add_column_if_missing(conn, "score_history", "embedding", "BLOB")
+    # Which provider produced the vector. NULL on legacy rows = LEGACY_EMBED_MODEL; never
+    # backfilled with an UPDATE here (no large synchronous writes at init over Turso).
+    _add_column_if_missing(conn, "score_history", "embedding_model", "TEXT")
+    _add_column_if_missing(conn, "score_history", "embedding_dim", "INTEGER")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS query_log (
             id INTEGER PRIMARY KEY,
@@ -284,9 +293,29 @@ def init_db() -> None:
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_fe_created ON funnel_events(created_at)"
     )
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            cache_key TEXT PRIMARY KEY,
+            call TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at TEXT DEFAULT (datetime('now'))
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)"
+    )
     conn.commit()
+    _init_keyword_index(conn)
+    _init_keyword_counts(conn)
+    _init_score_histogram(conn)
     _sync_after_write(conn)
     conn.close()
+    if not _use_turso:
+        # Local DBs are small: cover pre-existing rows right away. On Turso the backfills
+        # run in chunks from scripts/build_keyword_index.py (no big writes at startup).
+        backfill_keyword_index()
+        backfill_keyword_counts()
+        backfill_score_histogram()
     logger.info("[DB] All tables initialized.")
 
 
@@ -311,6 +340,305 @@ def init_page_views_table() -> None:
     init_db()
 
 
+# ---------------------------------------------------------------------------
+# Derived indexes over score_history — FTS5 keyword index + keyword_counts
+#
+# Both are kept current on the write path (triggers / save_score) and cover rows that
+# predate them via a chunked id backfill, tracked per index in `search_index_state`:
+#
+#   covered(id)  <=>  id <= backfilled_to  OR  id > cutoff
+#
+# The state row is written in the same transaction that creates the index's triggers,
+# so no other worker's insert can land between the two: every row is handled by exactly
+# one of backfill (id <= cutoff) or the write path (id > cutoff). Until the
+# backfill reaches `cutoff` (or when the index is unavailable) readers keep using the
+# original full scan, so results are never silently partial.
+# ---------------------------------------------------------------------------
+
+_FTS_TABLE = "score_fts"
+_FTS_INDEXED = (
+    "(SELECT 1 FROM search_index_state WHERE name = 'score_fts' "
+    "AND (old.id <= backfilled_to OR old.id > cutoff))"
+)
+_KWC_COUNTED = (
+    "(SELECT 1 FROM search_index_state WHERE name = 'keyword_counts' "
+    "AND (old.id <= backfilled_to OR old.id > cutoff))"
+)
+# Deleted row's keywords, normalised like _normalized_keywords (strip + lower; SQLite's
+# lower() only folds ASCII, so a non-ASCII uppercase keyword is left uncounted-down).
+_KWC_OLD_KEYWORDS = (
+    "SELECT lower(trim(value, ' ' || char(9, 10, 11, 12, 13))) AS kw FROM json_each(old.keywords) "
+    "WHERE type = 'text' AND trim(value, ' ' || char(9, 10, 11, 12, 13)) != ''"
+)
+_index_ready: dict[tuple[str, str], bool] = {}  # (db location, index) -> complete; only True cached
+
+
+def _db_key() -> str:
+    return _turso_url() if _use_turso else DB_PATH
+
+
+def _in_transaction(conn, statements: list[tuple[str, tuple]]) -> None:
+    """Run (sql, params) statements atomically: one Turso batch, or one SQLite write
+    transaction (BEGIN IMMEDIATE — other writers wait until it commits)."""
+    if isinstance(conn, TursoConnection):
+        conn.batch(statements)
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for sql, params in statements:
+            conn.execute(sql, params)
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _register_derived_index(conn, name: str, triggers: tuple[str, ...] = ()) -> None:
+    """Create `name`'s maintenance `triggers` and record its backfill cutoff, in one
+    transaction (cutoff: first call only; idempotent afterwards)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_index_state (
+            name TEXT PRIMARY KEY,
+            backfilled_to INTEGER NOT NULL DEFAULT 0,
+            cutoff INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.commit()
+    _in_transaction(conn, [
+        *((sql, ()) for sql in triggers),
+        (
+            "INSERT OR IGNORE INTO search_index_state (name, backfilled_to, cutoff) "
+            "SELECT ?, 0, COALESCE(MAX(id), 0) FROM score_history",
+            (name,),
+        ),
+    ])
+
+
+def _init_keyword_index(conn) -> None:
+    """Create the FTS5 table, its state row and sync triggers (cheap DDL, idempotent).
+
+    A contentless FTS5 table (`score_fts`, rowid = score_history.id) replaces the
+    `idea_text LIKE '%w%'` full scans: a lookup touches only the postings of the query
+    terms and is ranked with BM25.
+    """
+    try:
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {_FTS_TABLE} USING fts5("
+            "idea_text, content='', tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        conn.commit()
+        _register_derived_index(conn, _FTS_TABLE, (
+            f"""
+            CREATE TRIGGER IF NOT EXISTS score_fts_ai AFTER INSERT ON score_history BEGIN
+                INSERT INTO {_FTS_TABLE} (rowid, idea_text) VALUES (new.id, new.idea_text);
+            END
+            """,
+            # Contentless FTS5 deletes need the original text, and must skip rows the
+            # backfill hasn't reached yet (deleting an unindexed row corrupts the stats).
+            f"""
+            CREATE TRIGGER IF NOT EXISTS score_fts_ad AFTER DELETE ON score_history
+            WHEN EXISTS {_FTS_INDEXED} BEGIN
+                INSERT INTO {_FTS_TABLE} ({_FTS_TABLE}, rowid, idea_text)
+                VALUES ('delete', old.id, old.idea_text);
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS score_fts_au AFTER UPDATE OF idea_text ON score_history
+            WHEN EXISTS {_FTS_INDEXED} BEGIN
+                INSERT INTO {_FTS_TABLE} ({_FTS_TABLE}, rowid, idea_text)
+                VALUES ('delete', old.id, old.idea_text);
+                INSERT INTO {_FTS_TABLE} (rowid, idea_text) VALUES (new.id, new.idea_text);
+            END
+            """,
+        ))
+    except Exception:  # noqa: BLE001 — no FTS5 in this build -> LIKE fallback
+        logger.exception("[DB] keyword index init failed; keyword search stays on LIKE")
+
+
+def _init_keyword_counts(conn) -> None:
+    """Create the keyword_counts aggregate (keyword -> occurrences across score_history).
+
+    Maintained by save_score (same normalisation as the old full-scan counters:
+    stripped, lowercased, non-empty strings, every occurrence counted); an AFTER DELETE
+    trigger takes a removed row's keywords back out, so deletes don't leave counts high.
+    """
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS keyword_counts (
+                keyword TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_kwc_count ON keyword_counts(count DESC)"
+        )
+        conn.commit()
+        _register_derived_index(conn, "keyword_counts", (
+            f"""
+            CREATE TRIGGER IF NOT EXISTS keyword_counts_ad AFTER DELETE ON score_history
+            WHEN json_valid(old.keywords) AND json_type(old.keywords) = 'array'
+                AND EXISTS {_KWC_COUNTED} BEGIN
+                UPDATE keyword_counts SET count = count - (
+                    SELECT COUNT(*) FROM ({_KWC_OLD_KEYWORDS}) WHERE kw = keyword_counts.keyword
+                ) WHERE keyword IN ({_KWC_OLD_KEYWORDS});
+                DELETE FROM keyword_counts WHERE count <= 0 AND keyword IN ({_KWC_OLD_KEYWORDS});
+            END
+            """,
+        ))
+    except Exception:  # noqa: BLE001
+        logger.exception("[DB] keyword_counts init failed; keyword stats stay on full scan")
+
+
+def _init_score_histogram(conn) -> None:
+    """Create the 101-bucket score histogram (score 0..100 -> rows), maintained by save_score."""
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS score_histogram (
+                score INTEGER PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        _register_derived_index(conn, "score_histogram")
+    except Exception:  # noqa: BLE001
+        logger.exception("[DB] score_histogram init failed; percentiles use a GROUP BY scan")
+
+
+def _backfill_index(name: str, apply_chunk, batch: int, max_batches: int | None) -> int:
+    """Drive `apply_chunk(conn, lo, hi)` over (backfilled_to, cutoff] in id chunks.
+
+    Progress is committed per chunk, so this is resumable. Returns the number of rows
+    still waiting (0 = complete), or -1 if the index doesn't exist / the chunk failed.
+    """
+    conn = _get_conn()
+    try:
+        done = 0
+        while True:
+            state = conn.execute(
+                "SELECT backfilled_to, cutoff FROM search_index_state WHERE name = ?", (name,)
+            ).fetchone()
+            if state is None:
+                return -1
+            lo, cutoff = int(state[0]), int(state[1])
+            if lo >= cutoff:
+                return 0
+            if max_batches is not None and done >= max_batches:
+                return int(conn.execute(
+                    "SELECT COUNT(*) FROM score_history WHERE id > ? AND id <= ?", (lo, cutoff)
+                ).fetchone()[0])
+            hi = conn.execute(
+                "SELECT MAX(id) FROM (SELECT id FROM score_history "
+                "WHERE id > ? AND id <= ? ORDER BY id LIMIT ?)",
+                (lo, cutoff, batch),
+            ).fetchone()[0]
+            hi = cutoff if hi is None else int(hi)
+            apply_chunk(conn, lo, hi)
+            conn.execute(
+                "UPDATE search_index_state SET backfilled_to = ? WHERE name = ?", (hi, name)
+            )
+            conn.commit()
+            done += 1
+    except Exception:  # noqa: BLE001
+        logger.exception("[DB] %s backfill failed", name)
+        return -1
+    finally:
+        _sync_after_write(conn)
+        conn.close()
+
+
+def backfill_keyword_index(batch: int = 2000, max_batches: int | None = None) -> int:
+    """Index pre-existing score_history rows into score_fts, `batch` ids at a time."""
+
+    def _apply(conn, lo: int, hi: int) -> None:
+        conn.execute(
+            f"INSERT INTO {_FTS_TABLE} (rowid, idea_text) "
+            "SELECT id, idea_text FROM score_history WHERE id > ? AND id <= ?",
+            (lo, hi),
+        )
+
+    return _backfill_index(_FTS_TABLE, _apply, batch, max_batches)
+
+
+def backfill_keyword_counts(batch: int = 2000, max_batches: int | None = None) -> int:
+    """Fold pre-existing score_history rows into keyword_counts, `batch` ids at a time."""
+
+    def _apply(conn, lo: int, hi: int) -> None:
+        cur = conn.execute(
+            "SELECT keywords FROM score_history WHERE id > ? AND id <= ?", (lo, hi)
+        )
+        freq: dict[str, int] = {}
+        for row in cur.fetchall():
+            for kw in _normalized_keywords(row[0]):
+                freq[kw] = freq.get(kw, 0) + 1
+        _bump_keyword_counts(conn, freq)
+
+    return _backfill_index("keyword_counts", _apply, batch, max_batches)
+
+
+def backfill_score_histogram(batch: int = 2000, max_batches: int | None = None) -> int:
+    """Fold pre-existing score_history rows into score_histogram, `batch` ids at a time."""
+
+    def _apply(conn, lo: int, hi: int) -> None:
+        cur = conn.execute(
+            "SELECT score, COUNT(*) FROM score_history WHERE id > ? AND id <= ? GROUP BY score",
+            (lo, hi),
+        )
+        for score, n in cur.fetchall():
+            _bump_score_histogram(conn, score, int(n))
+
+    return _backfill_index("score_histogram", _apply, batch, max_batches)
+
+
+def _derived_index_ready(conn, name: str) -> bool:
+    """True once `name` covers every row. Cached per DB once it turns True."""
+    key = (_db_key(), name)
+    if _index_ready.get(key):
+        return True
+    try:
+        state = conn.execute(
+            "SELECT backfilled_to, cutoff FROM search_index_state WHERE name = ?", (name,)
+        ).fetchone()
+    except Exception:  # noqa: BLE001 — table missing (init never ran / no FTS5)
+        return False
+    ready = state is not None and int(state[0]) >= int(state[1])
+    if ready:
+        _index_ready[key] = True
+    return ready
+
+
+def _normalized_keywords(raw: Any) -> list[str]:
+    """Keywords JSON -> stripped, lowercased, non-empty strings ([] on anything malformed)."""
+    import json as _json
+
+    try:
+        kws = _json.loads(raw) if isinstance(raw, str) else []
+    except Exception:
+        return []
+    if not isinstance(kws, list):
+        return []
+    return [kw.strip().lower() for kw in kws if isinstance(kw, str) and kw.strip()]
+
+
+def _score_bucket(score: Any) -> int:
+    return min(100, max(0, int(score)))
+
+
+def _bump_score_histogram(conn, score: Any, n: int = 1) -> None:
+    conn.execute(
+        "INSERT INTO score_histogram (score, count) VALUES (?, ?) "
+        "ON CONFLICT(score) DO UPDATE SET count = count + excluded.count",
+        (_score_bucket(score), n),
+    )
+
+
+def _bump_keyword_counts(conn, freq: dict[str, int]) -> None:
+    for kw, n in freq.items():
+        conn.execute(
+            "INSERT INTO keyword_counts (keyword, count) VALUES (?, ?) "
+            "ON CONFLICT(keyword) DO UPDATE SET count = count + excluded.count",
+            (kw, n),
+        )
+
+
 # ---------------------------------------------------------------------------
 # Score history
 # ---------------------------------------------------------------------------
@@ -330,60 +658,107 @@ def save_score(
     lang: str = "en",
     keyword_source: str = "dictionary",
     embedding: bytes | None = None,
+    embedding_model: str | None = None,
 ) -> int:
     """Insert a score record and return the row id.
 
-    `embedding` is an optional packed float32 BLOB (see api/embeddings.pack_embedding).
+    `embedding` is an optional packed float32 BLOB (see api/embeddings.pack_embedding),
+    tagged with `embedding_model` (default LEGACY_EMBED_MODEL) and its dimension.
     When omitted the row is stored without a vector and can be backfilled later.
     """
     h = idea_hash(idea_text)
+    model, dim = _embedding_tags(embedding, embedding_model)
     conn = _get_conn()
     cur = conn.execute(
         "INSERT INTO score_history "
-        "(idea_hash, idea_text, score, breakdown, keywords, depth, lang, keyword_source, embedding) "
-        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        (h, idea_text, score, breakdown, keywords, depth, lang, keyword_source, embedding),
+        "(idea_hash, idea_text, score, breakdown, keywords, depth, lang, keyword_source, "
+        "embedding, embedding_model, embedding_dim) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (h, idea_text, score, breakdown, keywords, depth, lang, keyword_source,
+         embedding, model, dim),
     )
+    row_id = cur.lastrowid
+    freq: dict[str, int] = {}
+    for kw in _normalized_keywords(keywords):
+        freq[kw] = freq.get(kw, 0) + 1
+    # An aggregate miss must never lose the score row.
+    try:
+        _bump_keyword_counts(conn, freq)
+    except Exception:  # noqa: BLE001
+        logger.exception("[DB] keyword_counts update failed")
+    hist_written = False
+    try:
+        _bump_score_histogram(conn, score)
+        hist_written = True
+    except Exception:  # noqa: BLE001
+        logger.exception("[DB] score_histogram update failed")
     conn.commit()
     _sync_after_write(conn)
-    row_id = cur.lastrowid
     conn.close()
+    if hist_written:  # keep the in-memory copy in step with what the DB holds
+        _score_hist_add(score)
     return row_id
 
 
-def set_embedding(row_id: int, embedding: bytes) -> None:
-    """Attach/replace the embedding BLOB on an existing score_history row."""
+def set_embedding(row_id: int, embedding: bytes, model: str | None = None) -> None:
+    """Attach/replace the embedding BLOB (and its model/dim tags) on a score_history row."""
+    model, dim = _embedding_tags(embedding, model)
     conn = _get_conn()
-    conn.execute("UPDATE score_history SET embedding = ? WHERE id = ?", (embedding, row_id))
+    conn.execute(
+        "UPDATE score_history SET embedding = ?, embedding_model = ?, embedding_dim = ? "
+        "WHERE id = ?",
+        (embedding, model, dim, row_id),
+    )
     conn.commit()
     _sync_after_write(conn)
     conn.close()
 
 
-def rows_missing_embedding(limit: int = 1000) -> list[dict[str, Any]]:
+# Rows written before per-row model tagging were all embedded with this model.
+LEGACY_EMBED_MODEL = "text-embedding-3-small"
+_EMB_MODEL_SQL = f"COALESCE(embedding_model, '{LEGACY_EMBED_MODEL}')"
+
+
+def _embedding_tags(embedding: bytes | None, model: str | None) -> tuple[str | None, int | None]:
+    """(model, dim) to store next to a packed float32 BLOB; (None, None) without a vector."""
+    if not embedding:
+        return None, None
+    return model or LEGACY_EMBED_MODEL, len(embedding) // 4
+
+
+def _missing_embedding_where(model: str | None) -> tuple[str, tuple]:
+    """WHERE clause for rows the backfill should (re-)embed.
+
+    With `model`, rows embedded by a *different* model count as missing too, so switching
+    EMBED_MODEL and re-running the backfill migrates the corpus row by row.
+    """
+    base = "idea_text IS NOT NULL AND length(idea_text) > 0"
+    if model is None:
+        return f"embedding IS NULL AND {base}", ()
+    return f"(embedding IS NULL OR {_EMB_MODEL_SQL} != ?) AND {base}", (model,)
+
+
+def rows_missing_embedding(limit: int = 1000, model: str | None = None) -> list[dict[str, Any]]:
     """Return score_history rows that have no embedding yet (id + idea_text), oldest first.
 
     Used by the one-time / incremental backfill (scripts/backfill_embeddings.py).
     """
+    where, params = _missing_embedding_where(model)
     conn = _get_conn()
     cur = conn.execute(
-        "SELECT id, idea_text FROM score_history "
-        "WHERE embedding IS NULL AND idea_text IS NOT NULL AND length(idea_text) > 0 "
-        "ORDER BY id ASC LIMIT ?",
-        (limit,),
+        f"SELECT id, idea_text FROM score_history WHERE {where} ORDER BY id ASC LIMIT ?",
+        (*params, limit),
     )
     result = _rows_to_dicts(cur)
     conn.close()
     return result
 
 
-def count_missing_embedding() -> int:
+def count_missing_embedding(model: str | None = None) -> int:
     """Number of embeddable rows still lacking an embedding (for backfill progress/dry-run)."""
+    where, params = _missing_embedding_where(model)
     conn = _get_conn()
-    n = conn.execute(
-        "SELECT COUNT(*) FROM score_history "
-        "WHERE embedding IS NULL AND idea_text IS NOT NULL AND length(idea_text) > 0"
-    ).fetchone()[0]
+    n = conn.execute(f"SELECT COUNT(*) FROM score_history WHERE {where}", params).fetchone()[0]
     conn.close()
     return int(n)
 
@@ -394,7 +769,8 @@ def count_missing_embedding() -> int:
 import time as _time
 
 _EMB_CACHE_TTL = float(os.environ.get("EMB_CACHE_TTL", "600"))  # seconds
-_emb_cache: dict[str, Any] = {"loaded_at": 0.0, "mat": None, "meta": []}
+_emb_cache: dict[str, Any] = {"loaded_at": 0.0, "mat": None, "meta": [], "key": None}
+_emb_cache_stats = {"hit": 0, "miss": 0}  # lookups served from / reloading the cache
 
 
 def invalidate_embedding_cache() -> None:
@@ -403,20 +779,43 @@ def invalidate_embedding_cache() -> None:
     _emb_cache["mat"] = None
 
 
-def _load_embedding_matrix(force: bool = False):
+def _embedding_filter(model: str | None, dim: int) -> tuple[str, tuple]:
+    """WHERE clause restricting a vector search to rows comparable with the query:
+    same dimension always (a cosine across dims is meaningless / errors in libSQL),
+    same producing model when known (two 384-d models still live in different spaces)."""
+    where = "embedding IS NOT NULL AND length(embedding) = ?"
+    params: tuple = (dim * 4,)
+    if model is not None:
+        where += f" AND {_EMB_MODEL_SQL} = ?"
+        params += (model,)
+    return where, params
+
+
+def _load_embedding_matrix(force: bool = False, model: str | None = None, dim: int = 1536):
     """(Re)load the normalized embedding matrix into the process cache. Returns numpy
-    module or None when numpy/embeddings are unavailable (callers then fall back)."""
+    module or None when numpy/embeddings are unavailable (callers then fall back).
+    The cache holds one (model, dim) slice at a time — a process only queries one model."""
     try:
         import numpy as np
     except ImportError:
         return None
     now = _time.time()
-    if not force and _emb_cache["mat"] is not None and (now - _emb_cache["loaded_at"]) < _EMB_CACHE_TTL:
+    key = (model, dim)
+    if (
+        not force
+        and _emb_cache["mat"] is not None
+        and _emb_cache["key"] == key
+        and (now - _emb_cache["loaded_at"]) < _EMB_CACHE_TTL
+    ):
+        _emb_cache_stats["hit"] += 1
         return np
+    _emb_cache_stats["miss"] += 1
+    where, params = _embedding_filter(model, dim)
     conn = _get_conn()
     cur = conn.execute(
         "SELECT idea_hash, idea_text, score, depth, lang, created_at, embedding "
-        "FROM score_history WHERE embedding IS NOT NULL"
+        f"FROM score_history WHERE {where}",
+        params,
     )
     rows = _rows_to_dicts(cur)
     conn.close()
@@ -434,6 +833,7 @@ def _load_embedding_matrix(force: bool = False):
         meta.append({k: r.get(k) for k in ("idea_hash", "idea_text", "score", "depth", "lang", "created_at")})
     _emb_cache["mat"] = np.vstack(vecs) if vecs else None
     _emb_cache["meta"] = meta
+    _emb_cache["key"] = key
     _emb_cache["loaded_at"] = now
     return np
 
@@ -443,6 +843,7 @@ def search_similar_by_embedding(
     exclude_hash: str | None = None,
     limit: int = 10,
     min_score: float = 0.0,
+    model: str | None = None,
 ) -> list[dict[str, Any]]:
     """Semantic nearest-neighbours over score_history by cosine similarity.
 
@@ -456,28 +857,32 @@ def search_similar_by_embedding(
       matrix into memory — this is what keeps the 512 MB instance from OOM-ing.
     - **local SQLite (dev/tests)**: no vector functions, so fall back to the in-memory numpy
       matrix. The dev DB is tiny, so the memory cost is irrelevant there.
+
+    Only rows with the query's dimension (and `model`, when given) are compared, so a
+    corpus holding vectors from several providers is safe to search.
     """
     if not any(query_embedding):  # zero vector -> cosine undefined
         return []
     if _use_turso:
-        return _search_by_embedding_turso(query_embedding, exclude_hash, limit, min_score)
-    return _search_by_embedding_numpy(query_embedding, exclude_hash, limit, min_score)
+        return _search_by_embedding_turso(query_embedding, exclude_hash, limit, min_score, model)
+    return _search_by_embedding_numpy(query_embedding, exclude_hash, limit, min_score, model)
 
 
-def _search_by_embedding_turso(query_embedding, exclude_hash, limit, min_score):
+def _search_by_embedding_turso(query_embedding, exclude_hash, limit, min_score, model=None):
     """Native Turso/libSQL vector search — zero app-side matrix, cosine done in the DB."""
     import struct
 
     qblob = struct.pack(f"<{len(query_embedding)}f", *query_embedding)
     fetch_n = limit + (1 if exclude_hash else 0)
+    where, params = _embedding_filter(model, len(query_embedding))
     conn = _get_conn()
     try:
         cur = conn.execute(
             "SELECT idea_hash, idea_text, score, depth, lang, created_at, "
             "vector_distance_cos(embedding, ?) AS dist "
-            "FROM score_history WHERE embedding IS NOT NULL "
+            f"FROM score_history WHERE {where} "
             "ORDER BY dist ASC LIMIT ?",
-            (qblob, fetch_n),
+            (qblob, *params, fetch_n),
         )
         rows = _rows_to_dicts(cur)
     except Exception:
@@ -513,9 +918,9 @@ def _search_by_embedding_turso(query_embedding, exclude_hash, limit, min_score):
     return out
 
 
-def _search_by_embedding_numpy(query_embedding, exclude_hash, limit, min_score):
+def _search_by_embedding_numpy(query_embedding, exclude_hash, limit, min_score, model=None):
     """In-memory matrix cosine search — dev/test fallback (local SQLite has no vector fns)."""
-    np = _load_embedding_matrix()
+    np = _load_embedding_matrix(model=model, dim=len(query_embedding))
     mat = _emb_cache["mat"]
     meta = _emb_cache["meta"]
     if np is None or mat is None or not meta:
@@ -554,21 +959,65 @@ def get_history(hash_val: str) -> list[dict[str, Any]]:
     return result
 
 
+_EXPORT_COLUMNS = (
+    "id, idea_hash, idea_text, score, keywords, depth, lang, keyword_source, created_at"
+)
+
+
 def get_all_scores() -> list[dict[str, Any]]:
     """Return all score records (for export), newest first.
 
-    Excludes 'breakdown' column to keep payload small.
+    Excludes 'breakdown' column to keep payload small. Loads the whole table — prefer
+    iter_scores for anything that can stream.
     """
     conn = _get_conn()
     cur = conn.execute(
-        "SELECT id, idea_hash, idea_text, score, keywords, depth, lang, "
-        "keyword_source, created_at FROM score_history ORDER BY created_at DESC"
+        f"SELECT {_EXPORT_COLUMNS} FROM score_history ORDER BY created_at DESC"
     )
     result = _rows_to_dicts(cur)
     conn.close()
     return result
 
 
+def get_max_score_id() -> int:
+    """Highest score_history id (0 when empty) — the snapshot bound for an export."""
+    conn = _get_conn()
+    n = conn.execute("SELECT COALESCE(MAX(id), 0) FROM score_history").fetchone()[0]
+    conn.close()
+    return int(n)
+
+
+def iter_scores(
+    since_id: int = 0, until_id: int | None = None, batch: int = 1000
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield pages of export rows with since_id < id <= until_id, in id order.
+
+    Keyset-paginated on the primary key (`WHERE id > last ORDER BY id LIMIT batch`), so
+    each page is an index range read and memory stays at one page regardless of table
+    size. Same columns as get_all_scores.
+    """
+    last = since_id
+    while True:
+        sql = f"SELECT {_EXPORT_COLUMNS} FROM score_history WHERE id > ?"
+        params: list = [last]
+        if until_id is not None:
+            sql += " AND id <= ?"
+            params.append(until_id)
+        sql += " ORDER BY id ASC LIMIT ?"
+        params.append(batch)
+        conn = _get_conn()
+        try:
+            page = _rows_to_dicts(conn.execute(sql, params))
+        finally:
+            conn.close()
+        if not page:
+            return
+        yield page
+        if len(page) < batch:
+            return
+        last = page[-1]["id"]
+
+
 # ---------------------------------------------------------------------------
 # Subscribers — email collection for report unlock (v0.4.0)
 # ---------------------------------------------------------------------------
@@ -617,6 +1066,25 @@ def save_query_log(ip_hash: str, idea_hash: str, depth: str, score: int, country
     return row_id
 
 
+def save_query_logs_batch(rows: list[tuple[str, str, str, int, str | None]]) -> int:
+    """Insert many query log records in one transaction.
+
+    Each tuple: (ip_hash, idea_hash, depth, score, country). Returns count inserted.
+    """
+    if not rows:
+        return 0
+    conn = _get_conn()
+    for row in rows:
+        conn.execute(
+            "INSERT INTO query_log (ip_hash, idea_hash, depth, score, country) VALUES (?, ?, ?, ?, ?)",
+            row,
+        )
+    conn.commit()
+    _sync_after_write(conn)
+    conn.close()
+    return len(rows)
+
+
 def get_unique_countries() -> int:
     """Return number of unique countries in query_log."""
     conn = _get_conn()
@@ -735,6 +1203,47 @@ def update_report_data(report_id: str, report_data: str, language: str) -> None:
     conn.close()
 
 
+# ---------------------------------------------------------------------------
+# LLM response cache (see api/llm.py)
+# ---------------------------------------------------------------------------
+
+
+def get_llm_cache(cache_key: str, max_age_s: float) -> str | None:
+    """Cached LLM response JSON for `cache_key`, or None if absent / older than max_age_s."""
+    conn = _get_conn()
+    cur = conn.execute(
+        "SELECT response FROM llm_cache WHERE cache_key = ? AND created_at >= datetime('now', ?)",
+        (cache_key, f"-{int(max_age_s)} seconds"),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def put_llm_cache(
+    cache_key: str, call: str, response: str, max_rows: int | None = None, max_age_s: float | None = None,
+) -> None:
+    """Upsert one cached response; with max_rows / max_age_s also prune the table
+    (expired entries, then the oldest beyond max_rows)."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO llm_cache (cache_key, call, response, created_at) "
+        "VALUES (?, ?, ?, datetime('now'))",
+        (cache_key, call, response),
+    )
+    if max_age_s is not None:
+        conn.execute("DELETE FROM llm_cache WHERE created_at < datetime('now', ?)", (f"-{int(max_age_s)} seconds",))
+    if max_rows is not None:
+        conn.execute(
+            "DELETE FROM llm_cache WHERE cache_key IN "
+            "(SELECT cache_key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (max_rows,),
+        )
+    conn.commit()
+    _sync_after_write(conn)
+    conn.close()
+
+
 # ---------------------------------------------------------------------------
 # Page views — lightweight visit tracking (v0.5.0)
 # ---------------------------------------------------------------------------
@@ -812,12 +1321,31 @@ def get_demand_radar(limit: int = 24) -> list[dict[str, Any]]:
 # ---------------------------------------------------------------------------
 
 
+_FTS_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts_match_query(words: list[str]) -> str:
+    """OR of quoted prefix terms ("bill"* also hits "bills"/"billing"), like the old
+    substring LIKE, but answered from the postings lists."""
+    terms: list[str] = []
+    for w in words:
+        for tok in _FTS_TOKEN_RE.findall(w.lower()):
+            if len(tok) >= 3:
+                terms.append(f'"{tok}"*')
+    return " OR ".join(dict.fromkeys(terms))
+
+
 def search_similar_ideas(
     keywords: list[str],
     exclude_hash: str | None = None,
     limit: int = 50,
 ) -> list[dict[str, Any]]:
-    """Search score_history for ideas matching any keyword (LIKE).
+    """Search score_history for ideas matching any keyword.
+
+    Uses the FTS5 keyword index (BM25-ranked, best match first) once it is complete;
+    otherwise falls back to a LIKE scan ordered by recency. Queries with a non-ASCII
+    word also use the LIKE scan: unicode61 keeps an unspaced CJK idea as one token, so
+    a prefix MATCH would only find ideas that *begin* with the term.
 
     Returns list of dicts with keys: idea_text, score, depth, lang, created_at.
     """
@@ -825,6 +1353,34 @@ def search_similar_ideas(
     if not words:
         return []
 
+    conn = _get_conn()
+    try:
+        match = _fts_match_query(words) if all(w.isascii() for w in words) else ""
+        if match and _derived_index_ready(conn, _FTS_TABLE):
+            sql = (
+                "SELECT s.idea_text, s.score, s.depth, s.lang, s.created_at "
+                f"FROM {_FTS_TABLE} f JOIN score_history s ON s.id = f.rowid "
+                f"WHERE {_FTS_TABLE} MATCH ?"
+            )
+            params: list = [match]
+            if exclude_hash:
+                sql += " AND s.idea_hash != ?"
+                params.append(exclude_hash)
+            sql += " ORDER BY f.rank LIMIT ?"
+            params.append(limit)
+            try:
+                return _rows_to_dicts(conn.execute(sql, params))
+            except Exception:  # noqa: BLE001 — malformed MATCH etc. -> LIKE below
+                logger.exception("[DB] FTS keyword search failed; using LIKE")
+    finally:
+        conn.close()
+    return _search_similar_ideas_like(words, exclude_hash, limit)
+
+
+def _search_similar_ideas_like(
+    words: list[str], exclude_hash: str | None, limit: int
+) -> list[dict[str, Any]]:
+    """Full-scan LIKE search — fallback while the keyword index is missing/incomplete."""
     conditions = " OR ".join(["idea_text LIKE ?"] * len(words))
     params: list = [f"%{w}%" for w in words]
 
@@ -868,17 +1424,77 @@ def get_idea_by_hash(idea_hash: str) -> dict[str, Any] | None:
     return result
 
 
-def get_score_percentile(score: int) -> float:
-    """Return the percentile rank of a score (0-100)."""
+# Score distribution — 101 buckets (scores are integers 0..100) held in-process as a
+# prefix-sum array, so a percentile is two list lookups with no DB round trip. Loaded
+# from the score_histogram aggregate (101 rows) and refreshed on a TTL to pick up other
+# instances' writes; this process's own save_score calls are applied immediately.
+_SCORE_HIST_TTL = float(os.environ.get("SCORE_HIST_TTL", "300"))  # seconds
+_score_hist: dict[str, Any] = {"loaded_at": 0.0, "key": None, "prefix": None}
+
+
+def invalidate_score_histogram() -> None:
+    """Force the next percentile lookup to reload the histogram from the DB."""
+    _score_hist["loaded_at"] = 0.0
+    _score_hist["prefix"] = None
+
+
+def _load_score_histogram() -> list[int]:
+    """Return the cached prefix sums (prefix[i] = rows with score <= i), reloading on TTL."""
+    now = _time.time()
+    key = _db_key()
+    prefix = _score_hist["prefix"]
+    if (
+        prefix is not None
+        and _score_hist["key"] == key
+        and (now - _score_hist["loaded_at"]) < _SCORE_HIST_TTL
+    ):
+        return prefix
+
+    hist = [0] * 101
     conn = _get_conn()
-    total = conn.execute("SELECT COUNT(*) FROM score_history").fetchone()[0]
-    if total == 0:
+    try:
+        if _derived_index_ready(conn, "score_histogram"):
+            rows = conn.execute("SELECT score, count FROM score_histogram").fetchall()
+        else:  # aggregate still backfilling -> one GROUP BY scan per TTL instead
+            rows = conn.execute(
+                "SELECT score, COUNT(*) FROM score_history GROUP BY score"
+            ).fetchall()
+    finally:
         conn.close()
+    for score, n in rows:
+        if score is not None:
+            hist[_score_bucket(score)] += int(n)
+
+    prefix, running = [], 0
+    for n in hist:
+        running += n
+        prefix.append(running)
+    _score_hist.update(loaded_at=now, key=key, prefix=prefix)
+    return prefix
+
+
+def _score_hist_add(score: Any) -> None:
+    """Apply one new row to the in-memory histogram (if loaded for this DB)."""
+    prefix = _score_hist["prefix"]
+    if prefix is None or _score_hist["key"] != _db_key():
+        return
+    try:
+        b = _score_bucket(score)
+    except (TypeError, ValueError):
+        return
+    for i in range(b, 101):
+        prefix[i] += 1
+
+
+def get_score_percentile(score: int) -> float:
+    """Return the percentile rank of a score (0-100): share of checks scoring <= it."""
+    prefix = _load_score_histogram()
+    total = prefix[100]
+    if total == 0:
         return 0.0
-    lte = conn.execute(
-        "SELECT COUNT(*) FROM score_history WHERE score <= ?", (score,)
-    ).fetchone()[0]
-    conn.close()
+    if score < 0:
+        return 0.0
+    lte = prefix[min(100, int(score))]
     return round(lte / total * 100, 1)
 
 
@@ -895,9 +1511,32 @@ def get_weekly_volume(weeks: int = 12) -> list[dict[str, Any]]:
 
 
 def get_top_keywords(limit: int = 20) -> list[dict[str, Any]]:
-    """Parse all keywords JSON from score_history, return top N by frequency."""
-    import json as _json
+    """Top N keywords across score_history by frequency (from the keyword_counts aggregate)."""
+    return _keyword_frequencies(limit)
+
 
+def _keyword_frequencies(limit: int) -> list[dict[str, Any]]:
+    """Top N of keyword_counts — one indexed read. Falls back to the full JSON scan while
+    the aggregate is still being backfilled (or missing)."""
+    conn = _get_conn()
+    try:
+        if _derived_index_ready(conn, "keyword_counts"):
+            try:
+                cur = conn.execute(
+                    "SELECT keyword, count FROM keyword_counts "
+                    "ORDER BY count DESC, keyword ASC LIMIT ?",
+                    (limit,),
+                )
+                return [{"keyword": r[0], "count": int(r[1])} for r in cur.fetchall()]
+            except Exception:  # noqa: BLE001
+                logger.exception("[DB] keyword_counts read failed; scanning score_history")
+    finally:
+        conn.close()
+    return _keyword_frequencies_scan(limit)
+
+
+def _keyword_frequencies_scan(limit: int) -> list[dict[str, Any]]:
+    """Parse all keywords JSON from score_history, return top N by frequency."""
     conn = _get_conn()
     cur = conn.execute("SELECT keywords FROM score_history")
     rows = cur.fetchall()
@@ -906,16 +1545,10 @@ def get_top_keywords(limit: int = 20) -> list[dict[str, Any]]:
     freq: dict[str, int] = {}
     for row in rows:
         raw = row[0] if isinstance(row, (list, tuple)) else list(row)[0]
-        try:
-            kws = _json.loads(raw) if isinstance(raw, str) else []
-            if isinstance(kws, list):
-                for kw in kws:
-                    if isinstance(kw, str) and kw.strip():
-                        freq[kw.strip().lower()] = freq.get(kw.strip().lower(), 0) + 1
-        except Exception:
-            pass
+        for kw in _normalized_keywords(raw):
+            freq[kw] = freq.get(kw, 0) + 1
 
-    sorted_kws = sorted(freq.items(), key=lambda x: x[1], reverse=True)[:limit]
+    sorted_kws = sorted(freq.items(), key=lambda x: (-x[1], x[0]))[:limit]
     return [{"keyword": k, "count": c} for k, c in sorted_kws]
 
 
@@ -948,28 +1581,8 @@ def get_recent_high_scores(limit: int = 10, min_score: int = 60) -> list[dict[st
 
 
 def get_category_distribution(limit: int = 10) -> list[dict[str, Any]]:
-    """Parse all keywords JSON from score_history, count frequency, return top N."""
-    import json as _json
-
-    conn = _get_conn()
-    cur = conn.execute("SELECT keywords FROM score_history")
-    rows = cur.fetchall()
-    conn.close()
-
-    freq: dict[str, int] = {}
-    for row in rows:
-        raw = row[0] if isinstance(row, (list, tuple)) else list(row)[0]
-        try:
-            kws = _json.loads(raw) if isinstance(raw, str) else []
-            if isinstance(kws, list):
-                for kw in kws:
-                    if isinstance(kw, str) and kw.strip():
-                        freq[kw.strip().lower()] = freq.get(kw.strip().lower(), 0) + 1
-        except Exception:
-            pass
-
-    sorted_kws = sorted(freq.items(), key=lambda x: x[1], reverse=True)[:limit]
-    return [{"keyword": k, "count": c} for k, c in sorted_kws]
+    """Keyword frequency distribution, top N (same aggregate as get_top_keywords)."""
+    return _keyword_frequencies(limit)
 
 
 def save_funnel_event(
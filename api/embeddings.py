@@ -6,33 +6,60 @@ vs "expense sharing tool"). This module adds semantic embeddings so similarity i
 computed in vector space instead.
 
 Design (kept deliberately simple for the ~10k-row scale):
-- Provider: OpenAI `text-embedding-3-small` (1536-d, ~$0.02 / 1M tokens). Called
-  over plain httpx — no SDK — to match the rest of the codebase.
+- Provider: pluggable, picked by EMBED_MODEL (see get_provider):
+  * OpenAI `text-embedding-3-small` (default; 1536-d, ~$0.02 / 1M tokens). Called
+    over plain httpx — no SDK — to match the rest of the codebase.
+  * `local-ngram` — CPU-only hashed character n-gram projection (384-d). No network,
+    no model download, no extra dependency; for dev, tests and air-gapped deploys.
+    Lexical rather than semantic ("split bills" ~ "bill splitter", but not ~ "expense
+    sharing"), yet far better than the LIKE fallback. Throughput: run
+    `python scripts/bench_embeddings.py` (~5k embeddings/s on one core, ~0.2 ms/idea).
 - Storage: a packed float32 BLOB per row (1536 * 4 = 6 KB). Portable across Turso
   (libSQL) and the local SQLite fallback; no dependency on a vector extension.
+  Each row also records `embedding_model` + `embedding_dim`, and searches only compare
+  vectors from the active model, so a corpus mixing providers is safe.
 - Search: brute-force cosine over all stored vectors in NumPy. At 10k rows this is
   a single ~10k x 1536 matmul (< ~50 ms). If the corpus ever reaches 6 figures,
   swap this for Turso's native F32_BLOB + vector_distance_cos index — the storage
   format is already a float32 blob, so that migration is additive.
+- Async path: request handlers go through `embed_one_async`, which hands the text to a
+  per-event-loop `EmbeddingBatcher`. Concurrent callers arriving within a few ms are
+  coalesced into ONE provider call (up to _MAX_BATCH inputs) and the vectors are fanned
+  back out, so N concurrent crowd-intel requests cost one HTTP round-trip instead of N
+  and the event loop never blocks on a sync httpx call.
 
 Env:
-- OPENAI_API_KEY   (required to compute embeddings; absent -> functions raise/skip)
-- EMBED_MODEL      (optional, default 'text-embedding-3-small')
+- OPENAI_API_KEY   (required for OpenAI models; absent -> functions raise/skip)
+- EMBED_MODEL      (optional, default 'text-embedding-3-small'; 'local-ngram' = offline)
+- EMBED_BATCH_WAIT_MS (optional, default 5) — how long the batcher collects requests
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+import math
 import os
+import random
+import re
 import struct
-from typing import Sequence
+import zlib
+from typing import Awaitable, Callable, Sequence
 
 import httpx
 
 EMBED_MODEL = os.environ.get("EMBED_MODEL", "text-embedding-3-small")
 EMBED_DIM = 1536  # text-embedding-3-small native dimension
+LOCAL_MODEL = "local-ngram-v1"  # bump the suffix if the featurisation below ever changes
+LOCAL_DIM = 384
 _OPENAI_URL = "https://api.openai.com/v1/embeddings"
 _MAX_BATCH = 2048  # OpenAI hard cap on inputs per request
 _TIMEOUT = 60.0
+_BATCH_WAIT = float(os.environ.get("EMBED_BATCH_WAIT_MS", "5")) / 1000.0
+_RETRY_DELAYS = (0.5, 1.0, 2.0)  # backoff between attempts on 429 / 5xx / transport errors
+
+logger = logging.getLogger(__name__)
 
 
 class EmbeddingError(RuntimeError):
@@ -40,16 +67,171 @@ class EmbeddingError(RuntimeError):
 
 
 def embeddings_enabled() -> bool:
-    """True if an API key is configured. Callers should degrade gracefully when False."""
-    return bool(os.environ.get("OPENAI_API_KEY"))
+    """True if the active provider can embed. Callers should degrade gracefully when False."""
+    return get_provider().available()
 
 
 def embed_texts(texts: Sequence[str], *, timeout: float = _TIMEOUT) -> list[list[float]]:
-    """Embed a batch of texts. Returns one vector per input, in order.
+    """Embed a batch of texts with the active provider. One vector per input, in order.
+
+    Raises EmbeddingError on any failure so the caller decides whether to retry or
+    skip (we never want a silent partial batch).
+    """
+    return get_provider().embed(texts, timeout=timeout)
+
+
+def embed_one(text: str, *, timeout: float = _TIMEOUT) -> list[float]:
+    """Embed a single text -> one vector."""
+    return embed_texts([text], timeout=timeout)[0]
+
+
+async def embed_texts_async(
+    texts: Sequence[str], *, timeout: float = _TIMEOUT
+) -> list[list[float]]:
+    """Async twin of embed_texts (the batcher's default provider call)."""
+    return await get_provider().embed_async(texts, timeout=timeout)
+
+
+# ---------------------------------------------------------------------------
+# Providers
+# ---------------------------------------------------------------------------
+
 
-    Splits into <=2048-input requests. Raises EmbeddingError on any failure so the
-    caller decides whether to retry or skip (we never want a silent partial batch).
+class OpenAIProvider:
+    """OpenAI embeddings over plain httpx, always EMBED_DIM-d.
+
+    `text-embedding-3-*` models are asked for EMBED_DIM dimensions (the API shortens
+    -large's 3072-d vectors); ada-002 is natively 1536-d. Any other name is unsupported:
+    the provider reports unavailable instead of failing every call on a shape mismatch.
     """
+
+    def __init__(self, model: str = "text-embedding-3-small") -> None:
+        self.model = model
+        self.dim = EMBED_DIM
+        self.supported = model.startswith("text-embedding-3-") or model == "text-embedding-ada-002"
+        if not self.supported:
+            logger.warning("[embeddings] EMBED_MODEL=%r is not a supported OpenAI model; embeddings disabled", model)
+
+    def available(self) -> bool:
+        return self.supported and bool(os.environ.get("OPENAI_API_KEY"))
+
+    def embed(self, texts: Sequence[str], *, timeout: float = _TIMEOUT) -> list[list[float]]:
+        if not self.supported:
+            raise EmbeddingError(f"unsupported embedding model {self.model!r}")
+        return _openai_embed_texts(texts, self.model, timeout=timeout)
+
+    async def embed_async(
+        self, texts: Sequence[str], *, timeout: float = _TIMEOUT
+    ) -> list[list[float]]:
+        if not self.supported:
+            raise EmbeddingError(f"unsupported embedding model {self.model!r}")
+        return await _openai_embed_texts_async(texts, self.model, timeout=timeout)
+
+
+class HashedNgramProvider:
+    """Offline embeddings: signed feature hashing of word + character n-grams.
+
+    Each text is lowercased and tokenised; every word contributes itself plus its
+    character 3- and 4-grams (with boundary markers, so "bill" and "bills" share most
+    features). Features are hashed with CRC32 into `dim` buckets with a hash-derived
+    sign, weighted by sublinear term frequency, then L2-normalised.
+
+    Deliberately corpus-free (no fitted IDF): a stored vector must never change when
+    the corpus grows, or old rows would silently drift out of the query space.
+    Generic words are damped instead with a small fixed stop list.
+    """
+
+    _TOKEN_RE = re.compile(r"[a-z0-9]+|[^\sa-z0-9]")
+    _STOP = frozenset({
+        "a", "an", "the", "to", "for", "of", "and", "or", "with", "that", "this", "in",
+        "on", "it", "is", "are", "be", "my", "we", "i", "you", "your", "app", "tool",
+        "using", "based", "build", "want", "like",
+    })
+
+    def __init__(self, dim: int = LOCAL_DIM, model: str = LOCAL_MODEL) -> None:
+        self.model = model
+        self.dim = dim
+
+    def available(self) -> bool:
+        return True
+
+    def _features(self, text: str) -> dict[str, float]:
+        feats: dict[str, float] = {}
+        for tok in self._TOKEN_RE.findall((text or "").lower()):
+            word_w = 0.25 if tok in self._STOP else 1.0
+            feats["w:" + tok] = feats.get("w:" + tok, 0.0) + word_w
+            if len(tok) < 3 or not tok.isascii():
+                continue  # CJK etc. are single-char tokens: the word feature is the gram
+            padded = f"<{tok}>"
+            gram_w = 0.5 * word_w
+            for n in (3, 4):
+                for i in range(len(padded) - n + 1):
+                    g = padded[i : i + n]
+                    feats[g] = feats.get(g, 0.0) + gram_w
+        return feats
+
+    def _vector(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        for feat, tf in self._features(text).items():
+            h = zlib.crc32(feat.encode())
+            w = 1.0 + math.log(tf) if tf >= 1.0 else tf  # sublinear tf
+            vec[h % self.dim] += w if (h >> 31) & 1 else -w
+        n = math.sqrt(sum(x * x for x in vec))
+        if n == 0:
+            return vec
+        return [x / n for x in vec]
+
+    def embed(self, texts: Sequence[str], *, timeout: float = _TIMEOUT) -> list[list[float]]:
+        return [self._vector(t) for t in texts]
+
+    async def embed_async(
+        self, texts: Sequence[str], *, timeout: float = _TIMEOUT
+    ) -> list[list[float]]:
+        # Pure CPU at ~0.1 ms/text — cheaper to run inline than to hop to a thread.
+        return self.embed(texts)
+
+
+_providers: dict[str, OpenAIProvider | HashedNgramProvider] = {}
+
+
+def get_provider() -> OpenAIProvider | HashedNgramProvider:
+    """Provider for the current EMBED_MODEL (read per call so tests can flip it).
+
+    `local`, `local-ngram` or anything starting with `local-ngram` -> HashedNgramProvider;
+    any other value is treated as an OpenAI model name.
+    """
+    name = os.environ.get("EMBED_MODEL", EMBED_MODEL).strip() or "text-embedding-3-small"
+    prov = _providers.get(name)
+    if prov is None:
+        if name == "local" or name.startswith("local-ngram"):
+            prov = HashedNgramProvider()
+        else:
+            prov = OpenAIProvider(name)
+        _providers[name] = prov
+    return prov
+
+
+def active_model() -> str:
+    """Model id stored alongside (and used to filter) embeddings for the active provider."""
+    return get_provider().model
+
+
+def active_dim() -> int:
+    """Vector dimension of the active provider."""
+    return get_provider().dim
+
+
+def _openai_payload(model: str, chunk: list[str]) -> dict:
+    payload: dict = {"model": model, "input": chunk}
+    if model.startswith("text-embedding-3-"):
+        payload["dimensions"] = EMBED_DIM  # -large is 3072-d natively
+    return payload
+
+
+def _openai_embed_texts(
+    texts: Sequence[str], model: str, *, timeout: float = _TIMEOUT
+) -> list[list[float]]:
+    """Embed via the OpenAI HTTP API. Splits into <=2048-input requests."""
     key = os.environ.get("OPENAI_API_KEY")
     if not key:
         raise EmbeddingError("OPENAI_API_KEY not set")
@@ -63,7 +245,7 @@ def embed_texts(texts: Sequence[str], *, timeout: float = _TIMEOUT) -> list[list
             resp = client.post(
                 _OPENAI_URL,
                 headers={"Authorization": f"Bearer {key}"},
-                json={"model": EMBED_MODEL, "input": chunk},
+                json=_openai_payload(model, chunk),
             )
             if resp.status_code != 200:
                 raise EmbeddingError(f"embeddings HTTP {resp.status_code}: {resp.text[:200]}")
@@ -79,9 +261,201 @@ def embed_texts(texts: Sequence[str], *, timeout: float = _TIMEOUT) -> list[list
     return out
 
 
-def embed_one(text: str, *, timeout: float = _TIMEOUT) -> list[float]:
-    """Embed a single text -> one vector."""
-    return embed_texts([text], timeout=timeout)[0]
+async def _openai_embed_texts_async(
+    texts: Sequence[str], model: str, *, timeout: float = _TIMEOUT
+) -> list[list[float]]:
+    """Async twin of _openai_embed_texts, with retry/backoff on transient failures.
+
+    Retries 429 / 5xx / transport errors with the delays in _RETRY_DELAYS; any other
+    non-200 (bad key, bad request) fails immediately. Same all-or-nothing contract as
+    embed_texts: raises EmbeddingError rather than returning a partial batch.
+    """
+    key = os.environ.get("OPENAI_API_KEY")
+    if not key:
+        raise EmbeddingError("OPENAI_API_KEY not set")
+    cleaned = [(t if t and t.strip() else " ") for t in texts]
+
+    out: list[list[float]] = []
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        for start in range(0, len(cleaned), _MAX_BATCH):
+            chunk = cleaned[start : start + _MAX_BATCH]
+            data = await _post_with_retry(client, key, model, chunk)
+            if not isinstance(data, list) or len(data) != len(chunk):
+                raise EmbeddingError("embeddings response shape mismatch")
+            for item in sorted(data, key=lambda d: d.get("index", 0)):
+                vec = item.get("embedding")
+                if not isinstance(vec, list) or len(vec) != EMBED_DIM:
+                    raise EmbeddingError("embedding vector shape mismatch")
+                out.append(vec)
+    return out
+
+
+async def _post_with_retry(client: httpx.AsyncClient, key: str, model: str, chunk: list[str]):
+    """POST one chunk to the provider, retrying transient failures. Returns `data`."""
+    for attempt in range(1 + len(_RETRY_DELAYS)):
+        retryable = False
+        try:
+            resp = await client.post(
+                _OPENAI_URL,
+                headers={"Authorization": f"Bearer {key}"},
+                json=_openai_payload(model, chunk),
+            )
+            if resp.status_code == 200:
+                return resp.json().get("data")
+            retryable = resp.status_code == 429 or resp.status_code >= 500
+            err = EmbeddingError(f"embeddings HTTP {resp.status_code}: {resp.text[:200]}")
+        except httpx.TransportError as exc:
+            retryable = True
+            err = EmbeddingError(f"embeddings transport error: {exc}")
+        if not retryable or attempt >= len(_RETRY_DELAYS):
+            raise err
+        delay = _RETRY_DELAYS[attempt]
+        logger.warning("[embeddings] %s (attempt %d) — retrying in %.1fs", err, attempt + 1, delay)
+        await asyncio.sleep(delay)
+    raise EmbeddingError("embeddings retries exhausted")  # unreachable, keeps mypy happy
+
+
+def fake_embed_texts(texts: Sequence[str], dim: int = EMBED_DIM) -> list[list[float]]:
+    """Deterministic, network-free stand-in provider (tests / local dev).
+
+    Each text maps to a fixed unit vector seeded from its SHA-256, so identical texts
+    always embed identically and different texts are near-orthogonal. Carries no
+    semantics — use it to exercise plumbing, not similarity quality.
+    """
+    out: list[list[float]] = []
+    for t in texts:
+        seed = int.from_bytes(hashlib.sha256((t or " ").encode()).digest()[:8], "little")
+        rng = random.Random(seed)
+        v = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+        n = sum(x * x for x in v) ** 0.5 or 1.0
+        out.append([x / n for x in v])
+    return out
+
+
+async def fake_embed_texts_async(texts: Sequence[str]) -> list[list[float]]:
+    """Async wrapper over fake_embed_texts, pluggable into EmbeddingBatcher."""
+    return fake_embed_texts(texts)
+
+
+# ---------------------------------------------------------------------------
+# Micro-batching across concurrent requests
+# ---------------------------------------------------------------------------
+
+BatchProvider = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text embedding requests into batched provider calls.
+
+    The first `embed()` after an idle period opens a window of `max_wait` seconds;
+    everything enqueued during the window (or until `max_batch` texts are pending, which
+    flushes early) goes out as one provider call. Each caller awaits its own future, so a
+    provider failure surfaces as EmbeddingError on every waiter of that batch only.
+
+    Futures are bound to the event loop, so one batcher serves one loop — use
+    `get_batcher()` rather than sharing an instance across loops.
+    """
+
+    def __init__(
+        self,
+        provider: BatchProvider | None = None,
+        *,
+        max_batch: int = _MAX_BATCH,
+        max_wait: float = _BATCH_WAIT,
+    ) -> None:
+        self._provider = provider or embed_texts_async
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()  # strong refs so flushes aren't GC'd
+        self.batches_sent = 0
+        self.texts_sent = 0
+
+    async def embed(self, text: str) -> list[float]:
+        """Embed one text, sharing a provider call with any concurrent callers."""
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        self._pending.append((text, fut))
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        return await fut
+
+    async def embed_many(self, texts: Sequence[str]) -> list[list[float]]:
+        """Embed several texts; they join the current window like any other caller."""
+        return list(await asyncio.gather(*(self.embed(t) for t in texts)))
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[: self._max_batch]
+            del self._pending[: self._max_batch]
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        texts = [t for t, _ in batch]
+        self.batches_sent += 1
+        self.texts_sent += len(texts)
+        try:
+            vectors = await self._provider(texts)
+            if len(vectors) != len(texts):
+                raise EmbeddingError("provider returned wrong number of vectors")
+        except Exception as exc:  # noqa: BLE001 — every waiter must be released
+            err = exc if isinstance(exc, EmbeddingError) else EmbeddingError(str(exc))
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(err)
+            return
+        for (_, fut), vec in zip(batch, vectors):
+            if not fut.done():
+                fut.set_result(vec)
+
+    async def drain(self) -> None:
+        """Flush anything pending and wait for in-flight batches (shutdown / tests)."""
+        if self._pending:
+            self._flush()
+        if self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+
+_batcher: EmbeddingBatcher | None = None
+_batcher_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_batcher() -> EmbeddingBatcher:
+    """Process-wide batcher for the running event loop.
+
+    If the loop changed since the batcher was created (e.g. a test client spinning a new
+    loop per request), a fresh batcher with the same provider/settings replaces it.
+    """
+    global _batcher, _batcher_loop
+    loop = asyncio.get_running_loop()
+    if _batcher is None:
+        _batcher = EmbeddingBatcher()
+    elif _batcher_loop is not None and _batcher_loop is not loop:
+        _batcher = EmbeddingBatcher(
+            _batcher._provider, max_batch=_batcher._max_batch, max_wait=_batcher._max_wait
+        )
+    _batcher_loop = loop
+    return _batcher
+
+
+def set_batcher(batcher: EmbeddingBatcher | None) -> None:
+    """Install a specific batcher (e.g. one backed by fake_embed_texts_async in tests)."""
+    global _batcher, _batcher_loop
+    _batcher = batcher
+    _batcher_loop = None
+
+
+async def embed_one_async(text: str) -> list[float]:
+    """Embed a single text without blocking the loop, micro-batched with concurrent callers."""
+    return await get_batcher().embed(text)
 
 
 def pack_embedding(vec: Sequence[float]) -> bytes:
@@ -0,0 +1,129 @@
+"""Shared Anthropic client + persistent LLM response cache.
+
+Every Haiku call used to build its own `anthropic.AsyncAnthropic` (a fresh connection
+pool, TLS handshake included) and nothing was remembered: the same idea text sent the
+same prompt and paid ~3-5s every time.
+
+- client(): one AsyncAnthropic per event loop, on the shared upstream transport
+  (metrics, cassette record / replay) so connections are reused across calls. Rebuilt
+  when the API key or the running loop changes.
+- Response cache: parsed results of successful calls, stored in the score DB
+  (`llm_cache` table — Turso in production, so it survives deploys). Keyed by
+  (call, prompt template version, model, normalized input, evidence digest); the
+  template version is a digest of the system prompt, so editing a prompt invalidates
+  its entries. Failures are never cached. Cache errors fail open (treated as a miss).
+
+    key = llm.cache_key("pivot_hints", _PIVOT_SYSTEM_PROMPT, MODEL, idea_text, evidence=data)
+    hints = await llm.cache_get(key)
+
+Env:
+- LLM_CACHE_TTL       (seconds, default 604800 = 7 days; 0 disables the cache)
+- LLM_CACHE_MAX_ROWS  (default 20000; oldest entries are pruned beyond it)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any
+
+import httpx
+
+import db as score_db
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(7 * 86400)))
+LLM_CACHE_MAX_ROWS = int(os.environ.get("LLM_CACHE_MAX_ROWS", "20000"))
+_PRUNE_EVERY = 100  # puts between size / TTL prunes
+
+_cache_stats = {"hit": 0, "miss": 0}
+_puts = 0
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+# (event loop, api key, AsyncAnthropic) — httpx pools are bound to the loop they were
+# opened on, so a later asyncio.run() (scripts, load tests) gets a fresh client
+_client: tuple[asyncio.AbstractEventLoop, str, Any] | None = None
+
+
+def client(api_key: str):
+    """The shared AsyncAnthropic for `api_key` on the running loop (created on first use)."""
+    global _client
+    import anthropic
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client[0] is not loop or _client[1] != api_key:
+        from idea_reality_mcp.upstream import transport as upstream_transport
+
+        http = httpx.AsyncClient(timeout=30.0, transport=upstream_transport("anthropic"))
+        _client = (loop, api_key, anthropic.AsyncAnthropic(api_key=api_key, timeout=30.0, http_client=http))
+    return _client[2]
+
+
+async def aclose() -> None:
+    """Close the shared client's connections (app shutdown)."""
+    global _client
+    entry, _client = _client, None
+    if entry is not None and entry[0] is asyncio.get_running_loop():
+        try:
+            await entry[2].close()
+        except Exception:  # noqa: BLE001 — shutdown must not fail on a stale client
+            logger.debug("[LLM] client close failed", exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(call: str, system_prompt: str, model: str, text: str, *, evidence: Any = None) -> str:
+    """Stable key for one LLM call. `evidence` (any JSON-serialisable value) covers the
+    prompt inputs beyond the idea text, e.g. the search data behind pivot hints."""
+    template = hashlib.sha256(system_prompt.encode()).hexdigest()[:12]
+    digest = ""
+    if evidence is not None:
+        digest = hashlib.sha256(json.dumps(evidence, sort_keys=True, default=str).encode()).hexdigest()
+    raw = "\x1f".join((call, template, model, _normalize(text), digest))
+    return f"{call}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+async def cache_get(key: str) -> Any | None:
+    """Cached result for `key`, or None (miss, expired, disabled or unavailable)."""
+    if LLM_CACHE_TTL <= 0:
+        return None
+    try:
+        raw = await asyncio.to_thread(score_db.get_llm_cache, key, LLM_CACHE_TTL)
+    except Exception:  # noqa: BLE001 — the cache is an optimisation, never an outage
+        logger.warning("[LLM] cache read failed", exc_info=True)
+        raw = None
+    if raw is None:
+        _cache_stats["miss"] += 1
+        return None
+    _cache_stats["hit"] += 1
+    return json.loads(raw)
+
+
+async def cache_put(key: str, call: str, value: Any) -> None:
+    """Store a successful call's parsed result."""
+    global _puts
+    if LLM_CACHE_TTL <= 0:
+        return
+    _puts += 1
+    prune = _puts % _PRUNE_EVERY == 1
+    try:
+        await asyncio.to_thread(
+            score_db.put_llm_cache, key, call, json.dumps(value, ensure_ascii=False),
+            max_rows=LLM_CACHE_MAX_ROWS if prune else None, max_age_s=LLM_CACHE_TTL if prune else None,
+        )
+    except Exception:  # noqa: BLE001
+        logger.warning("[LLM] cache write failed", exc_info=True)
@@ -10,22 +10,31 @@ Exposes:
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import csv
 import hashlib
+import io
 import json
 import logging
 import os
 import re
 import time as _time
 import uuid
-from collections import defaultdict
+import zlib
 from datetime import datetime, timezone
-from typing import Literal
+from typing import Iterator, Literal
 
 import httpx
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import (
+    HTMLResponse,
+    JSONResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
@@ -34,6 +43,7 @@ from html import escape as html_escape
 from idea_reality_mcp.scoring.engine import compute_signal, extract_keywords
 from idea_reality_mcp.cta import angelrun_next_step
 from idea_reality_mcp.server import mcp  # registers all tools via server.py
+from idea_reality_mcp import metrics, timeouts, timing
 from idea_reality_mcp.sources.github import search_github_repos
 from idea_reality_mcp.sources.hn import search_hn
 from idea_reality_mcp.sources.npm import search_npm
@@ -44,7 +54,11 @@ from idea_reality_mcp.sources.stackoverflow import search_stackoverflow
 import sys
 sys.path.insert(0, os.path.dirname(__file__))
 import db as score_db
+import llm
+import rate_limit
 import report as report_mod
+import side_effects as side_effects_mod
+import stats_snapshot
 ## Payment utils removed — modules deleted (lemon_utils, paypal_utils)
 
 logger = logging.getLogger(__name__)
@@ -53,13 +67,16 @@ logger = logging.getLogger(__name__)
 # GitHub stars — cached fetch (1-hour TTL)
 # ---------------------------------------------------------------------------
 _github_stars_cache = {"value": 290, "fetched_at": 0}
+_github_stars_stats = {"hit": 0, "miss": 0}
 
 
 async def _get_github_stars():
     """Fetch GitHub stars with 1-hour cache."""
     now = _time.time()
     if now - _github_stars_cache["fetched_at"] < 3600:
+        _github_stars_stats["hit"] += 1
         return _github_stars_cache["value"]
+    _github_stars_stats["miss"] += 1
     try:
         async with httpx.AsyncClient(timeout=5) as client:
             resp = await client.get(
@@ -79,11 +96,19 @@ async def _get_github_stars():
 _VALID_LANGS = {"en", "zh"}
 
 
+# Reverse proxies in front of the app (Render's edge = 1). Each appends the address it
+# saw to X-Forwarded-For, so only the right-most TRUSTED_PROXY_HOPS entries are real;
+# anything left of them is whatever the client sent.
+TRUSTED_PROXY_HOPS = int(os.environ.get("TRUSTED_PROXY_HOPS", "1"))
+
+
 def _get_client_ip(request: Request) -> str:
-    """Extract real client IP, handling reverse proxy headers."""
+    """Extract real client IP: the entry our right-most trusted proxy added."""
     forwarded = request.headers.get("x-forwarded-for")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
+    if forwarded and TRUSTED_PROXY_HOPS > 0:
+        hops = [h.strip() for h in forwarded.split(",")]
+        if len(hops) >= TRUSTED_PROXY_HOPS and hops[-TRUSTED_PROXY_HOPS]:
+            return hops[-TRUSTED_PROXY_HOPS]
     return request.client.host if request.client else "unknown"
 
 
@@ -93,10 +118,95 @@ def _sanitize_lang(value: str) -> str:
 
 
 # ---------------------------------------------------------------------------
-# Discord webhook — passive query intelligence (fire-and-forget, no PII)
+# Side effects — Discord webhook + analytics writes, off the request path
 # ---------------------------------------------------------------------------
+# Handlers only enqueue; side_effects.py batches and runs them in the background.
+
+DISCORD_MAX_EMBEDS = 10  # Discord's per-message embed limit
+DISCORD_MAX_CHARS = 6000  # Discord's limit on the total text of a message's embeds
+DISCORD_MAX_RETRY_AFTER = 5.0  # longest 429 Retry-After we wait out (seconds)
+
+side_effects = side_effects_mod.SideEffectDispatcher()
+
+
+def _embed_chars(embed: dict) -> int:
+    """Characters Discord counts towards DISCORD_MAX_CHARS for one embed."""
+    n = len(embed.get("title") or "") + len(embed.get("description") or "")
+    n += len((embed.get("footer") or {}).get("text") or "") + len((embed.get("author") or {}).get("name") or "")
+    for f in embed.get("fields") or []:
+        n += len(f.get("name") or "") + len(f.get("value") or "")
+    return n
+
+
+def _discord_batches(embeds: list[dict]) -> list[list[dict]]:
+    """Split embeds into messages within both the count and the total-text limit."""
+    batches: list[list[dict]] = []
+    chars = 0
+    for embed in embeds:
+        size = _embed_chars(embed)
+        if not batches or len(batches[-1]) >= DISCORD_MAX_EMBEDS or chars + size > DISCORD_MAX_CHARS:
+            batches.append([])
+            chars = 0
+        batches[-1].append(embed)
+        chars += size
+    return batches
+
+
+async def _post_discord(client: httpx.AsyncClient, webhook_url: str, embeds: list[dict]) -> bool:
+    """One webhook message; retried once after Retry-After on 429. True if delivered."""
+    for attempt in range(2):
+        resp = await client.post(webhook_url, json={"embeds": embeds})
+        if resp.status_code == 429 and attempt == 0:
+            try:
+                delay = float(resp.headers.get("retry-after") or 1.0)
+            except ValueError:
+                delay = 1.0
+            await asyncio.sleep(min(max(delay, 0.0), DISCORD_MAX_RETRY_AFTER))
+            continue
+        if 200 <= resp.status_code < 300:
+            logger.info("[DISCORD] sent %d embeds — status %d", len(embeds), resp.status_code)
+            return True
+        logger.warning("[DISCORD] %d embeds rejected — status %d: %s",
+                       len(embeds), resp.status_code, resp.text[:200])
+        return False
+    return False
+
+
+async def _send_discord_embeds(embeds: list[dict]) -> None:
+    """Post queued embeds, batched within Discord's per-message limits."""
+    webhook_url = (os.environ.get("DISCORD_WEBHOOK_URL") or "").strip()
+    if not webhook_url:
+        logger.info("[DISCORD] skipped %d — no DISCORD_WEBHOOK_URL", len(embeds))
+        return
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        for chunk in _discord_batches(embeds):
+            try:
+                await _post_discord(client, webhook_url, chunk)
+            except Exception:
+                logger.warning("[DISCORD] webhook failed (non-fatal)", exc_info=True)
+
 
-async def _notify_discord(
+async def _write_query_logs(rows: list[tuple]) -> None:
+    await asyncio.to_thread(score_db.save_query_logs_batch, rows)
+
+
+async def _write_funnel_events(events: list[tuple[str, str, str, str]]) -> None:
+    await asyncio.to_thread(score_db.save_funnel_events_batch, events)
+
+
+# Discord is a slow external call: its own lane, so it never delays the DB writes.
+side_effects.register("discord", _send_discord_embeds, lane="discord")
+side_effects.register("query_log", _write_query_logs)
+side_effects.register("funnel_event", _write_funnel_events, lossless=True)
+
+
+def _track_funnel_event(session_id: str, event_name: str, ip_hash: str, metadata: dict) -> None:
+    """Queue a server-side funnel event (ignored for malformed session ids)."""
+    if session_id and 20 <= len(session_id) <= 50:
+        side_effects.submit("funnel_event", (session_id, event_name, ip_hash, json.dumps(metadata)))
+
+
+def _notify_discord(
     idea_text: str,
     keywords: list[str],
     score: int,
@@ -106,38 +216,29 @@ async def _notify_discord(
     pivot_source: str,
     top_similar: str | None = None,
 ) -> None:
-    """Fire-and-forget Discord webhook notification. Never raises."""
-    webhook_url = (os.environ.get("DISCORD_WEBHOOK_URL") or "").strip()
-    if not webhook_url:
-        logger.info("[DISCORD] skipped — no DISCORD_WEBHOOK_URL")
+    """Queue a passive query-intelligence embed (no PII). Never blocks, never raises."""
+    if not (os.environ.get("DISCORD_WEBHOOK_URL") or "").strip():
         return
-    try:
-        ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-        # Truncate idea for readability
-        idea_short = idea_text[:120] + ("..." if len(idea_text) > 120 else "")
-
-        embed = {
-            "title": f"{'🔴' if score >= 80 else '🟡' if score >= 40 else '🟢'} Signal {score}/100",
-            "description": idea_short,
-            "color": 0xFF4444 if score >= 80 else 0xFFAA00 if score >= 40 else 0x00CC66,
-            "fields": [
-                {"name": "Keywords", "value": ", ".join(keywords[:6]), "inline": False},
-                {"name": "Depth", "value": depth, "inline": True},
-                {"name": "Lang", "value": lang, "inline": True},
-                {"name": "KW Source", "value": keyword_source, "inline": True},
-                {"name": "Pivot Source", "value": pivot_source, "inline": True},
-            ],
-            "footer": {"text": ts},
-        }
-        if top_similar:
-            embed["fields"].insert(1, {"name": "Top Competitor", "value": top_similar, "inline": False})
-
-        payload = {"embeds": [embed]}
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.post(webhook_url, json=payload)
-            logger.info("[DISCORD] sent — status %d, idea: %s", resp.status_code, idea_short[:50])
-    except Exception:
-        logger.warning("[DISCORD] webhook failed (non-fatal)", exc_info=True)
+    ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    # Truncate idea for readability
+    idea_short = idea_text[:120] + ("..." if len(idea_text) > 120 else "")
+
+    embed = {
+        "title": f"{'🔴' if score >= 80 else '🟡' if score >= 40 else '🟢'} Signal {score}/100",
+        "description": idea_short,
+        "color": 0xFF4444 if score >= 80 else 0xFFAA00 if score >= 40 else 0x00CC66,
+        "fields": [
+            {"name": "Keywords", "value": ", ".join(keywords[:6]), "inline": False},
+            {"name": "Depth", "value": depth, "inline": True},
+            {"name": "Lang", "value": lang, "inline": True},
+            {"name": "KW Source", "value": keyword_source, "inline": True},
+            {"name": "Pivot Source", "value": pivot_source, "inline": True},
+        ],
+        "footer": {"text": ts},
+    }
+    if top_similar:
+        embed["fields"].insert(1, {"name": "Top Competitor", "value": top_similar, "inline": False})
+    side_effects.submit("discord", embed)
 
 
 # ---------------------------------------------------------------------------
@@ -150,15 +251,37 @@ mcp_http = mcp.http_app(path="/mcp", transport="streamable-http", stateless_http
 # (site, MCP, AngelRun) reads meta.engine_version to know it's on the latest engine.
 ENGINE_VERSION = "2026-07-06-demand"
 
+# Public aggregates served from background-refreshed snapshots (see stats_snapshot.py).
+stats_snapshots = stats_snapshot.StatsSnapshotter()
+# Event-loop lag sampler (exported on /metrics).
+loop_lag = metrics.LoopLagMonitor()
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(app_: FastAPI):
+    async with mcp_http.lifespan(app_):
+        stats_snapshots.start()
+        side_effects.start()
+        loop_lag.start()
+        try:
+            yield
+        finally:
+            await loop_lag.stop()
+            await stats_snapshots.stop()
+            await side_effects.drain()
+            await llm.aclose()
+
+
 # ---------------------------------------------------------------------------
-# App — lifespan=mcp_http.lifespan initialises the MCP task group on startup
+# App — lifespan wraps mcp_http.lifespan (MCP task group), the stats snapshotter
+# and the side-effect workers (drained on shutdown)
 # ---------------------------------------------------------------------------
 
 app = FastAPI(
     title="idea-reality-mcp API",
     description="Pre-build reality check for AI coding agents.",
     version="0.5.0",
-    lifespan=mcp_http.lifespan,
+    lifespan=_lifespan,
 )
 
 # Initialize DB tables (idempotent — CREATE TABLE IF NOT EXISTS)
@@ -184,6 +307,107 @@ app.add_middleware(
 )
 
 
+# ---------------------------------------------------------------------------
+# Metrics — Prometheus text exposition at GET /metrics (see idea_reality_mcp.metrics)
+# ---------------------------------------------------------------------------
+# Request latency per route (the mounted /mcp app included) and upstream latency per
+# source are recorded inline; everything below is read only when /metrics is scraped.
+
+app.add_middleware(metrics.MetricsMiddleware)
+
+_LLM_CALLS = metrics.counter("llm_calls_total", "LLM calls by outcome", ("call", "outcome"))
+_LLM_LATENCY = metrics.histogram("llm_call_duration_seconds", "LLM call latency", ("call",))
+_CHECKS = metrics.counter(
+    "checks_total", "Reality checks by keyword / pivot source", ("depth", "keyword_source", "pivot_source")
+)
+
+
+async def _metered_llm(call: str, aw):
+    """Await an LLM helper that returns None on failure; record latency + ok/fallback."""
+    started = _time.perf_counter()
+    try:
+        out = await aw
+    except Exception:
+        _LLM_CALLS.inc(call, "error")
+        raise
+    finally:
+        _LLM_LATENCY.observe(_time.perf_counter() - started, call)
+    _LLM_CALLS.inc(call, "ok" if out is not None else "fallback")
+    return out
+
+
+def _cache_lookups() -> dict:
+    out = {}
+    for name, stats in (
+        ("embedding_matrix", score_db._emb_cache_stats),
+        ("topic_centroids", report_mod._topic_cache_stats),
+        ("github_stars", _github_stars_stats),
+        ("llm_response", llm._cache_stats),
+    ):
+        for result, n in stats.items():
+            out[(name, result)] = n
+    return out
+
+
+def _cache_entries() -> dict:
+    emb = score_db._emb_cache["mat"]
+    topics = report_mod._topic_cache["mat"]
+    return {
+        ("embedding_matrix",): 0 if emb is None else len(emb),
+        ("topic_centroids",): 0 if topics is None else len(topics),
+        ("scan",): len(_scan_cache),
+    }
+
+
+def _rate_limit_hits() -> dict:
+    out = {}
+    for lim in (_rate_limits, _check_limits, _view_limits, _event_limits):
+        out[(lim.scope, "allowed")] = lim.allowed
+        out[(lim.scope, "limited")] = lim.limited
+    return out
+
+
+def _side_effect_counts() -> dict:
+    out = {}
+    for state in ("submitted", "processed", "failed", "dropped"):
+        for kind, n in getattr(side_effects, state).items():
+            out[(kind, state)] = n
+    return out
+
+
+metrics.register_callback(
+    "cache_lookups_total", "In-process cache lookups by result", _cache_lookups,
+    type="counter", labelnames=("cache", "result"),
+)
+metrics.register_callback("cache_entries", "In-process cache sizes", _cache_entries, labelnames=("cache",))
+metrics.register_callback(
+    "rate_limit_hits_total", "Rate-limit decisions per limiter", _rate_limit_hits,
+    type="counter", labelnames=("scope", "outcome"),
+)
+metrics.register_callback(
+    "side_effects_total", "Background side effects by state", _side_effect_counts,
+    type="counter", labelnames=("kind", "state"),
+)
+metrics.register_callback("side_effects_pending", "Queued side effects", lambda: side_effects.pending)
+metrics.register_callback(
+    "event_loop_lag_last_seconds", "Most recent event-loop lag sample", lambda: loop_lag.last_lag
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    """Prometheus scrape target (requires METRICS_KEY as ?key= or Bearer).
+
+    No key = endpoint disabled, like the EXPORT_KEY endpoints: traffic, upstream error
+    rates and route volumes are not public.
+    """
+    metrics_key = (os.environ.get("METRICS_KEY") or "").strip()
+    supplied = request.query_params.get("key") or request.headers.get("authorization", "").removeprefix("Bearer ")
+    if not metrics_key or supplied != metrics_key:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # ---------------------------------------------------------------------------
 # Models
 # ---------------------------------------------------------------------------
@@ -196,6 +420,8 @@ class CheckRequest(BaseModel):
     # same call. Default [] keeps the lean response unchanged for existing clients.
     # "crowd" / "demand" -> attach crowd_intelligence (+ demand_heat) from the query-log moat.
     include: list[Literal["crowd", "demand"]] = Field(default_factory=list)
+    # Debug: attach per-stage durations as meta.timings (always on with IDEA_REALITY_TIMINGS=1).
+    timings: bool = False
 
 
 class ExtractKeywordsRequest(BaseModel):
@@ -221,51 +447,26 @@ class CheckoutRequest(BaseModel):
 
 
 # ---------------------------------------------------------------------------
-# Rate limiter (in-memory, resets on deploy — acceptable for free tier)
+# Rate limiters — day-bucketed counters (see rate_limit.py). In-memory per process by
+# default (resets on deploy — acceptable for free tier); RATE_LIMIT_DB shares them.
 # ---------------------------------------------------------------------------
 
 DAILY_LIMIT = 50
-_MAX_RATE_LIMIT_ENTRIES = 10_000
-_rate_limits: dict[str, dict] = defaultdict(lambda: {"count": 0, "reset_date": ""})
+_rate_limits = rate_limit.DailyLimiter("extract", DAILY_LIMIT)
 
 
 def _check_rate_limit(client_ip: str) -> bool:
     """Return *True* if the request is within the daily limit."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-    # Evict stale entries to prevent unbounded memory growth
-    if len(_rate_limits) > _MAX_RATE_LIMIT_ENTRIES:
-        stale = [ip for ip, v in _rate_limits.items() if v["reset_date"] != today]
-        for ip in stale:
-            del _rate_limits[ip]
-
-    entry = _rate_limits[client_ip]
-    if entry["reset_date"] != today:
-        entry["count"] = 0
-        entry["reset_date"] = today
-    entry["count"] += 1
-    return entry["count"] <= DAILY_LIMIT
+    return _rate_limits.hit(client_ip)
 
 
 _CHECK_DAILY_LIMIT = 100
-_check_limits: dict[str, dict] = defaultdict(lambda: {"count": 0, "reset_date": ""})
+_check_limits = rate_limit.DailyLimiter("check", _CHECK_DAILY_LIMIT)
 
 
 def _check_rate_limit_check(client_ip: str) -> bool:
     """Return *True* if the /api/check request is within the daily limit."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-    if len(_check_limits) > _MAX_RATE_LIMIT_ENTRIES:
-        stale = [ip for ip, v in _check_limits.items() if v["reset_date"] != today]
-        for ip in stale:
-            del _check_limits[ip]
-
-    entry = _check_limits[client_ip]
-    if entry["reset_date"] != today:
-        entry["count"] = 0
-        entry["reset_date"] = today
-    entry["count"] += 1
-    return entry["count"] <= _CHECK_DAILY_LIMIT
+    return _check_limits.hit(client_ip)
 
 
 # ---------------------------------------------------------------------------
@@ -316,8 +517,11 @@ Rules:
 8. Think about what a developer would name their repo or package for this idea."""
 
 
+_HAIKU_MODEL = "claude-haiku-4-5"
+
+
 async def _extract_keywords_via_haiku(idea_text: str) -> list[str] | None:
-    """Call Claude Haiku 4.5 to extract search keywords.
+    """Call Claude Haiku 4.5 to extract search keywords (cached, see api/llm.py).
 
     Returns a list of keyword strings, or *None* on any failure.
     Requires ``ANTHROPIC_API_KEY`` environment variable.
@@ -326,12 +530,14 @@ async def _extract_keywords_via_haiku(idea_text: str) -> list[str] | None:
     if not api_key:
         return None
 
-    try:
-        import anthropic
+    cache_key = llm.cache_key("extract_keywords", _HAIKU_SYSTEM_PROMPT, _HAIKU_MODEL, idea_text)
+    cached = await llm.cache_get(cache_key)
+    if cached is not None:
+        return cached
 
-        client = anthropic.AsyncAnthropic(api_key=api_key, timeout=30.0)
-        message = await client.messages.create(
-            model="claude-haiku-4-5",
+    try:
+        message = await llm.client(api_key).messages.create(
+            model=_HAIKU_MODEL,
             max_tokens=200,
             system=_HAIKU_SYSTEM_PROMPT,
             messages=[{"role": "user", "content": idea_text}],
@@ -357,6 +563,7 @@ async def _extract_keywords_via_haiku(idea_text: str) -> list[str] | None:
         if len(cleaned) < 2:
             return None
 
+        await llm.cache_put(cache_key, "extract_keywords", cleaned[:8])
         return cleaned[:8]
 
     except Exception:
@@ -424,12 +631,19 @@ Top Competitors:
 Evidence:
 {evidence_text}"""
 
-    try:
-        import anthropic
+    # Keyed on everything the prompt carries besides the idea text.
+    cache_key = llm.cache_key(
+        "pivot_hints", _PIVOT_SYSTEM_PROMPT, _HAIKU_MODEL, idea_text,
+        evidence=[reality_signal, lang, competitors_text, evidence_text],
+    )
+    cached = await llm.cache_get(cache_key)
+    if cached is not None:
+        logger.info("[PIVOT] cache hit")
+        return cached
 
-        client = anthropic.AsyncAnthropic(api_key=api_key, timeout=30.0)
-        message = await client.messages.create(
-            model="claude-haiku-4-5",
+    try:
+        message = await llm.client(api_key).messages.create(
+            model=_HAIKU_MODEL,
             max_tokens=500,
             system=_PIVOT_SYSTEM_PROMPT,
             messages=[{"role": "user", "content": user_prompt}],
@@ -451,6 +665,7 @@ Evidence:
 
         result_hints = [str(h).strip() for h in hints[:3]]
         logger.info("[PIVOT] LLM success — %d hints generated", len(result_hints))
+        await llm.cache_put(cache_key, "pivot_hints", result_hints)
         return result_hints
 
     except json.JSONDecodeError:
@@ -471,9 +686,7 @@ async def health():
     return {"status": "ok"}
 
 
-@app.get("/api/stats")
-async def get_stats():
-    """Public stats for the /check hero section."""
+def _compute_stats() -> dict:
     total = score_db.get_total_checks()
     last_check = score_db.get_last_check_time()
     unique_countries = score_db.get_unique_countries()
@@ -485,9 +698,7 @@ async def get_stats():
     }
 
 
-@app.get("/api/pulse")
-async def get_pulse():
-    """Public trend aggregation endpoint — weekly volume, top keywords, countries, trending ideas."""
+def _compute_pulse() -> dict:
     weekly_volume = score_db.get_weekly_volume()
     top_keywords = score_db.get_top_keywords()
     countries = score_db.get_country_distribution()
@@ -503,6 +714,47 @@ async def get_pulse():
     }
 
 
+def _compute_social_proof() -> dict:
+    return {
+        "total_checks": score_db.get_total_checks(),
+        "last_check_ts": score_db.get_last_check_time(),
+    }
+
+
+stats_snapshots.register("stats", _compute_stats)
+stats_snapshots.register("pulse", _compute_pulse)
+stats_snapshots.register("social_proof", _compute_social_proof)
+stats_snapshots.register("query_stats", score_db.get_query_stats)
+
+
+def _snapshot_response(request: Request, data: dict, etag: str, *, public: bool = True) -> Response:
+    """JSON body + ETag; 304 when the client's If-None-Match still matches."""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={int(stats_snapshots.interval)}" if public else "private, no-cache"
+        ),
+    }
+    inm = request.headers.get("if-none-match") or ""
+    if inm.strip() == "*" or etag in {t.strip().removeprefix("W/") for t in inm.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(data, headers=headers)
+
+
+@app.get("/api/stats")
+async def get_stats(request: Request):
+    """Public stats for the /check hero section (served from the stats snapshot)."""
+    snap = await stats_snapshots.get("stats")
+    return _snapshot_response(request, snap.data, snap.etag)
+
+
+@app.get("/api/pulse")
+async def get_pulse(request: Request):
+    """Public trend aggregation endpoint — weekly volume, top keywords, countries, trending ideas."""
+    snap = await stats_snapshots.get("pulse")
+    return _snapshot_response(request, snap.data, snap.etag)
+
+
 @app.post("/api/extract-keywords")
 async def extract_keywords_endpoint(req: ExtractKeywordsRequest, request: Request):
     """LLM-powered keyword extraction via Claude Haiku 4.5.
@@ -558,12 +810,14 @@ async def expand_idea_endpoint(req: ExpandIdeaRequest, request: Request):
     if not _check_rate_limit(client_ip):
         raise HTTPException(status_code=429, detail="Daily rate limit exceeded (50/day)")
 
-    try:
-        import anthropic
+    cache_key = llm.cache_key("expand_idea", _EXPAND_SYSTEM_PROMPT, _HAIKU_MODEL, req.idea_text.strip())
+    cached = await llm.cache_get(cache_key)
+    if cached is not None:
+        return cached
 
-        client = anthropic.AsyncAnthropic(api_key=os.environ["ANTHROPIC_API_KEY"], timeout=30.0)
-        message = await client.messages.create(
-            model="claude-haiku-4-5",
+    try:
+        message = await llm.client(os.environ["ANTHROPIC_API_KEY"]).messages.create(
+            model=_HAIKU_MODEL,
             max_tokens=300,
             system=_EXPAND_SYSTEM_PROMPT,
             messages=[{"role": "user", "content": req.idea_text.strip()}],
@@ -582,7 +836,9 @@ async def expand_idea_endpoint(req: ExpandIdeaRequest, request: Request):
         if not isinstance(result, dict) or not _EXPAND_REQUIRED_KEYS.issubset(result):
             raise HTTPException(status_code=500, detail="LLM returned incomplete response")
 
-        return {k: result[k] for k in _EXPAND_REQUIRED_KEYS}
+        expanded = {k: result[k] for k in _EXPAND_REQUIRED_KEYS}
+        await llm.cache_put(cache_key, "expand_idea", expanded)
+        return expanded
 
     except HTTPException:
         raise
@@ -593,8 +849,29 @@ async def expand_idea_endpoint(req: ExpandIdeaRequest, request: Request):
         raise HTTPException(status_code=500, detail="LLM expansion failed")
 
 
+# Flash (first paint) upstream timeouts: a source slower than this is left out of the
+# quick layer — the deep upgrade re-runs it with the adaptive / configured timeouts.
+_FLASH_READ_TIMEOUT_S = 4.0
+_FLASH_CONNECT_TIMEOUT_S = 1.5
+
+
+def _search_sources(keywords: list[str], depth: str) -> asyncio.Future:
+    """Start every source search for `depth` now; results in the order github, hn
+    (+ npm, pypi, producthunt, stackoverflow for deep)."""
+    calls = [("source.github", search_github_repos), ("source.hn", search_hn)]
+    if depth == "deep":
+        calls += [
+            ("source.npm", search_npm),
+            ("source.pypi", search_pypi),
+            ("source.producthunt", search_producthunt),
+            ("source.stackoverflow", search_stackoverflow),
+        ]
+    return asyncio.gather(*(timing.timed(stage, fn(keywords)) for stage, fn in calls))
+
+
 async def _compute_report(
     idea_text: str, depth: str, lang: str, include: list[str], flash: bool = False,
+    timings: bool | None = None,
 ) -> tuple[dict, list, str, str]:
     """Core reality check: keyword extraction -> source scan -> signal -> pivots ->
     engine_version -> optional demand attach -> score-history save.
@@ -602,60 +879,76 @@ async def _compute_report(
     NO request-scoped side-effects (rate-limit / discord / query-log / funnel live in the
     endpoint) so this can be reused by /api/check AND the background deep upgrade of /api/scan.
 
+    Keywords: Haiku's when it answers, else the dictionary's — exactly one list is searched
+    (meta.keyword_paths records both).
+
     flash=True (progressive first layer): skip the two LLM round-trips — dictionary keywords
     (no Haiku ~3s) + template pivots (no LLM ~5s) — so first paint is just the source scan.
-    The deep upgrade re-runs full quality in the background.
+    The deep upgrade re-runs full quality in the background. Flash source requests also
+    run under tight fixed timeouts (_FLASH_READ_TIMEOUT_S / _FLASH_CONNECT_TIMEOUT_S).
+
+    timings=True (or IDEA_REALITY_TIMINGS=1) attaches per-stage durations as meta.timings;
+    stage histograms are recorded either way (see idea_reality_mcp.timing).
 
     Returns (result, keywords, keyword_source, pivot_source).
     """
-    if flash:
-        keyword_source = "dictionary"
-        keywords = extract_keywords(idea_text)
-    else:
-        keyword_source = "llm"
-        keywords = await _extract_keywords_via_haiku(idea_text)
-        if keywords is None:
-            keyword_source = "dictionary"
-            keywords = extract_keywords(idea_text)
+    trace = timing.start_trace(timings)
+    with timing.span("keywords"):
+        dictionary_keywords = extract_keywords(idea_text)
+    keywords, keyword_source, llm_keywords = dictionary_keywords, "dictionary", None
+
+    # Haiku first, then one search round. The dictionary round is started only when it is
+    # the answer (flash, no Haiku, Haiku failed): a speculative dictionary round racing
+    # Haiku was nearly always thrown away — Haiku rarely repeats the dictionary phrasing —
+    # yet still spent the GitHub search quota (2 requests per keyword, 30/min). Cached
+    # Haiku answers (api/llm.py) return at once, so repeat checks don't wait on the LLM.
+    if not flash:
+        llm_keywords = await timing.timed(
+            "keywords_llm", _metered_llm("extract_keywords", _extract_keywords_via_haiku(idea_text))
+        )
+    if llm_keywords is not None:
+        keywords, keyword_source = llm_keywords, "llm"
+    flash_timeouts = (
+        timeouts.override(read=_FLASH_READ_TIMEOUT_S, connect=_FLASH_CONNECT_TIMEOUT_S)
+        if flash else contextlib.nullcontext()
+    )
+    with flash_timeouts:
+        results = await _search_sources(keywords, depth)
 
+    github_results, hn_results = results[0], results[1]
+    extra = {}
     if depth == "deep":
-        (github_results, hn_results, npm_results, pypi_results, ph_results, so_results) = await asyncio.gather(
-            search_github_repos(keywords),
-            search_hn(keywords),
-            search_npm(keywords),
-            search_pypi(keywords),
-            search_producthunt(keywords),
-            search_stackoverflow(keywords),
-        )
-        result = compute_signal(
-            idea_text=idea_text, keywords=keywords, github_results=github_results, hn_results=hn_results,
-            depth=depth, npm_results=npm_results, pypi_results=pypi_results, ph_results=ph_results,
-            so_results=so_results, lang=lang,
-        )
-    else:
-        github_results, hn_results = await asyncio.gather(
-            search_github_repos(keywords), search_hn(keywords),
-        )
+        extra = dict(zip(("npm_results", "pypi_results", "ph_results", "so_results"), results[2:]))
+    with timing.span("compute_signal"):
         result = compute_signal(
             idea_text=idea_text, keywords=keywords, github_results=github_results, hn_results=hn_results,
-            depth=depth, lang=lang,
+            depth=depth, **extra, lang=lang,
         )
 
     result["meta"]["keyword_source"] = keyword_source
+    # Both keyword lists; only the one named by keyword_source is searched ("llm" is None
+    # when Haiku was skipped or failed).
+    result["meta"]["keyword_paths"] = {
+        "dictionary": dictionary_keywords,
+        "llm": llm_keywords,
+        "llm_only": [k for k in llm_keywords if k not in dictionary_keywords] if llm_keywords else [],
+    }
     result["meta"]["lang"] = lang
 
     # LLM pivot hints — replace template hints with data-driven suggestions.
     # Skipped in flash mode (keeps the template hints) so the first layer doesn't pay the ~5s.
     pivot_source = "template"
     if not flash:
-        llm_hints = await _generate_pivot_hints_llm(
-            idea_text=idea_text, reality_signal=result["reality_signal"],
-            top_similars=result.get("top_similars", []), evidence=result.get("evidence", []), lang=lang,
-        )
+        with timing.span("pivot_hints"):
+            llm_hints = await _metered_llm("pivot_hints", _generate_pivot_hints_llm(
+                idea_text=idea_text, reality_signal=result["reality_signal"],
+                top_similars=result.get("top_similars", []), evidence=result.get("evidence", []), lang=lang,
+            ))
         if llm_hints:
             result["pivot_hints"] = llm_hints
             pivot_source = "llm"
     result["meta"]["pivot_source"] = pivot_source
+    _CHECKS.inc(depth, keyword_source, pivot_source)
     result["meta"]["partial"] = flash  # flag so consumers know this is the fast first layer
 
     result["idea_hash"] = score_db.idea_hash(idea_text)
@@ -670,7 +963,8 @@ async def _compute_report(
     # Non-fatal: a demand hiccup must never fail the check.
     if include:
         try:
-            demand = report_mod.topic_demand(idea_text)
+            with timing.span("topic_demand"):
+                demand = await report_mod.topic_demand_async(idea_text)
             if demand:
                 result["crowd_intelligence"] = demand
         except Exception:
@@ -678,13 +972,17 @@ async def _compute_report(
 
     # Save to score history (the data flywheel). Non-fatal.
     try:
-        score_db.save_score(
-            idea_text=idea_text, score=result["reality_signal"], breakdown=json.dumps(result),
-            keywords=json.dumps(keywords), depth=depth, keyword_source=keyword_source,
-        )
+        with timing.span("save_score"):
+            score_db.save_score(
+                idea_text=idea_text, score=result["reality_signal"], breakdown=json.dumps(result),
+                keywords=json.dumps(keywords), depth=depth, keyword_source=keyword_source,
+            )
     except Exception:
         logger.exception("Failed to save score history")
 
+    # Attached after save_score so the stored breakdown never carries timings.
+    if trace.enabled:
+        result["meta"]["timings"] = trace.as_meta()
     return result, keywords, keyword_source, pivot_source
 
 
@@ -706,20 +1004,20 @@ async def check(req: CheckRequest, request: Request):
 
     try:
         result, keywords, keyword_source, pivot_source = await _compute_report(
-            idea_text, req.depth, req.lang, req.include
+            idea_text, req.depth, req.lang, req.include, timings=req.timings or None
         )
     except HTTPException:
         raise
     except Exception as exc:
         raise HTTPException(status_code=500, detail="An internal error occurred. Please try again.") from exc
 
-    # Discord webhook — query intelligence (no PII, 5s timeout, non-fatal)
+    # Telemetry is queued, never awaited: check latency excludes Discord + analytics I/O.
     top_sim_name = None
     if result.get("top_similars"):
         ts = result["top_similars"][0]
         stars_str = f" ({ts['stars']}★)" if ts.get("stars") else ""
         top_sim_name = f"{ts['name']}{stars_str}"
-    await _notify_discord(
+    _notify_discord(
         idea_text=idea_text,
         keywords=keywords,
         score=result["reality_signal"],
@@ -730,38 +1028,26 @@ async def check(req: CheckRequest, request: Request):
         top_similar=top_sim_name,
     )
 
-    # Save query log (SHA256 hashed IP, no PII)
+    # Query log (SHA256 hashed IP, no PII)
     client_ip = _get_client_ip(request)
     ip_hash = hashlib.sha256(client_ip.encode()).hexdigest()
-    try:
-        country = _extract_country(request)
-        score_db.save_query_log(
-            ip_hash=ip_hash,
-            idea_hash=result["idea_hash"],
-            depth=req.depth,
-            score=result["reality_signal"],
-            country=country,
-        )
-    except Exception:
-        logger.exception("Failed to save query log")
+    side_effects.submit(
+        "query_log",
+        (ip_hash, result["idea_hash"], req.depth, result["reality_signal"], _extract_country(request)),
+    )
 
-    # Funnel event: scan_complete (server-side, guaranteed)
-    session_id = request.headers.get("x-session-id", "")
-    if session_id and 20 <= len(session_id) <= 50:
-        try:
-            score_db.save_funnel_event(
-                session_id=session_id,
-                event_name="scan_complete",
-                ip_hash=ip_hash,
-                metadata=json.dumps({
-                    "depth": req.depth,
-                    "score": result["reality_signal"],
-                    "duplicate_likelihood": result.get("duplicate_likelihood", ""),
-                    "keyword_source": keyword_source,
-                }),
-            )
-        except Exception:
-            pass  # non-fatal
+    # Funnel event: scan_complete (server-side)
+    _track_funnel_event(
+        request.headers.get("x-session-id", ""),
+        "scan_complete",
+        ip_hash,
+        {
+            "depth": req.depth,
+            "score": result["reality_signal"],
+            "duplicate_likelihood": result.get("duplicate_likelihood", ""),
+            "keyword_source": keyword_source,
+        },
+    )
 
     return result
 
@@ -907,7 +1193,7 @@ async def crowd_intel(req: CrowdIntelRequest):
 
     # Semantic similar-idea lookup (keyword LIKE fallback) — same path as the report's
     # crowd_intelligence, keyed off the idea's stored text.
-    full, mode = report_mod._similar_ideas(row.get("idea_text", ""), req.idea_hash)
+    full, mode = await report_mod._similar_ideas_async(row.get("idea_text", ""), req.idea_hash)
     heat = report_mod._demand_heat(full) if mode == "semantic" else None  # over full match set
     similar = full[:20]
     similar_count = len(similar)
@@ -1060,12 +1346,12 @@ async def unlock_report(req: UnlockRequest, request: Request):
         )
     except Exception:
         logger.exception("[UNLOCK] Deep scan failed")
-        _sid = request.headers.get("x-session-id", "")
-        if _sid and 20 <= len(_sid) <= 50:
-            try:
-                score_db.save_funnel_event(_sid, "unlock_fail", hashlib.sha256(client_ip.encode()).hexdigest(), json.dumps({"error": "deep_scan_failed"}))
-            except Exception:
-                pass
+        _track_funnel_event(
+            request.headers.get("x-session-id", ""),
+            "unlock_fail",
+            hashlib.sha256(client_ip.encode()).hexdigest(),
+            {"error": "deep_scan_failed"},
+        )
         raise HTTPException(status_code=500, detail="An internal error occurred. Please try again.")
 
     # 2. Generate full report (sub-dimensions, competitors, strategic analysis)
@@ -1078,51 +1364,37 @@ async def unlock_report(req: UnlockRequest, request: Request):
         )
     except Exception:
         logger.exception("[UNLOCK] Report generation failed")
-        _sid = request.headers.get("x-session-id", "")
-        if _sid and 20 <= len(_sid) <= 50:
-            try:
-                score_db.save_funnel_event(_sid, "unlock_fail", hashlib.sha256(client_ip.encode()).hexdigest(), json.dumps({"error": "report_gen_failed"}))
-            except Exception:
-                pass
+        _track_funnel_event(
+            request.headers.get("x-session-id", ""),
+            "unlock_fail",
+            hashlib.sha256(client_ip.encode()).hexdigest(),
+            {"error": "report_gen_failed"},
+        )
         raise HTTPException(status_code=500, detail="An internal error occurred. Please try again.")
 
-    # 3. Discord notification for audit
-    webhook_url = (os.environ.get("DISCORD_WEBHOOK_URL") or "").strip()
-    if webhook_url:
-        try:
-            idea_short = idea_text[:150]
-            score = signal_result.get("reality_signal", 0)
-            embed = {
-                "title": f"💰 REPORT UNLOCKED — Signal {score}/100",
-                "description": idea_short,
-                "color": 0x00FF88,
-                "fields": [
-                    {"name": "IP", "value": hashlib.sha256(client_ip.encode()).hexdigest()[:12], "inline": True},
-                    {"name": "Competitors", "value": str(len(full_report.get("competitors", []))), "inline": True},
-                    {"name": "Lang", "value": req.lang, "inline": True},
-                ],
-            }
-            async with httpx.AsyncClient(timeout=5) as hc:
-                await hc.post(webhook_url, json={"embeds": [embed]})
-        except Exception:
-            logger.exception("[UNLOCK] Discord notification failed")
-
-    # 4. Funnel event: unlock_complete (server-side, guaranteed)
-    session_id = request.headers.get("x-session-id", "")
+    # 3. Discord notification for audit (queued)
     ip_hash = hashlib.sha256(client_ip.encode()).hexdigest()
-    if session_id and 20 <= len(session_id) <= 50:
-        try:
-            score_db.save_funnel_event(
-                session_id=session_id,
-                event_name="unlock_complete",
-                ip_hash=ip_hash,
-                metadata=json.dumps({
-                    "score": signal_result.get("reality_signal", 0),
-                    "competitor_count": len(full_report.get("competitors", [])),
-                }),
-            )
-        except Exception:
-            pass
+    score = signal_result.get("reality_signal", 0)
+    competitor_count = len(full_report.get("competitors", []))
+    if (os.environ.get("DISCORD_WEBHOOK_URL") or "").strip():
+        side_effects.submit("discord", {
+            "title": f"💰 REPORT UNLOCKED — Signal {score}/100",
+            "description": idea_text[:150],
+            "color": 0x00FF88,
+            "fields": [
+                {"name": "IP", "value": ip_hash[:12], "inline": True},
+                {"name": "Competitors", "value": str(competitor_count), "inline": True},
+                {"name": "Lang", "value": req.lang, "inline": True},
+            ],
+        })
+
+    # 4. Funnel event: unlock_complete (server-side, queued)
+    _track_funnel_event(
+        request.headers.get("x-session-id", ""),
+        "unlock_complete",
+        ip_hash,
+        {"score": score, "competitor_count": competitor_count},
+    )
 
     # 5. Return combined data for frontend renderPaidReport()
     idea_hash = score_db.idea_hash(idea_text)
@@ -1185,25 +1457,29 @@ async def claim_report(req: ClaimRequest, request: Request):
     except Exception:
         logger.exception("Failed to save claim subscriber")
 
-    # Discord notification for manual fulfillment
+    # Discord notification for manual fulfillment — awaited, not queued: it is how the
+    # claim gets fulfilled, so it must not be dropped with the passive embeds.
     webhook_url = (os.environ.get("DISCORD_WEBHOOK_URL") or "").strip()
     if webhook_url:
+        idea_short = (req.idea_text or "")[:200]
+        embed = {
+            "title": "💰 PAID REPORT CLAIM",
+            "color": 0x00FF88,
+            "fields": [
+                {"name": "Email", "value": req.email.strip(), "inline": True},
+                {"name": "Idea Hash", "value": req.idea_hash[:16] + "..." if req.idea_hash else "N/A", "inline": True},
+                {"name": "IP", "value": hashlib.sha256(client_ip.encode()).hexdigest()[:12], "inline": True},
+                {"name": "Idea", "value": idea_short or "N/A", "inline": False},
+            ],
+        }
         try:
-            idea_short = (req.idea_text or "")[:200]
-            embed = {
-                "title": "💰 PAID REPORT CLAIM",
-                "color": 0x00FF88,
-                "fields": [
-                    {"name": "Email", "value": req.email.strip(), "inline": True},
-                    {"name": "Idea Hash", "value": req.idea_hash[:16] + "..." if req.idea_hash else "N/A", "inline": True},
-                    {"name": "IP", "value": hashlib.sha256(client_ip.encode()).hexdigest()[:12], "inline": True},
-                    {"name": "Idea", "value": idea_short or "N/A", "inline": False},
-                ],
-            }
-            async with httpx.AsyncClient(timeout=5) as client:
-                await client.post(webhook_url, json={"embeds": [embed]})
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                delivered = await _post_discord(client, webhook_url, [embed])
         except Exception:
-            logger.exception("Discord claim notification failed")
+            logger.exception("[CLAIM] Discord claim notification failed (idea_hash=%s)", req.idea_hash or "N/A")
+        else:
+            if not delivered:
+                logger.error("[CLAIM] Discord claim notification not delivered (idea_hash=%s)", req.idea_hash or "N/A")
 
     return {"ok": True, "message": "Report claim received. We'll send it within 24 hours."}
 
@@ -1222,17 +1498,17 @@ async def subscribers_count(key: str = ""):
 
 
 @app.get("/api/query-stats")
-async def query_stats(key: str = ""):
-    """Return query usage stats (requires EXPORT_KEY)."""
+async def query_stats(request: Request, key: str = ""):
+    """Return query usage stats (requires EXPORT_KEY; served from the stats snapshot)."""
     export_key = (os.environ.get("EXPORT_KEY") or "").strip()
     if not export_key or key != export_key:
         raise HTTPException(status_code=403, detail="Forbidden")
     try:
-        stats = score_db.get_query_stats()
+        snap = await stats_snapshots.get("query_stats")
     except Exception:
         logger.exception("Failed to get query stats")
         raise HTTPException(status_code=500, detail="Stats unavailable")
-    return stats
+    return _snapshot_response(request, snap.data, snap.etag, public=False)
 
 
 class PageViewRequest(BaseModel):
@@ -1250,8 +1526,8 @@ class FunnelEventsRequest(BaseModel):
     events: list[FunnelEventItem]
 
 
-_view_limits: dict[str, dict] = defaultdict(lambda: {"count": 0, "reset_date": ""})
 _VIEW_DAILY_LIMIT = 200  # per IP per day — prevents DB flooding
+_view_limits = rate_limit.DailyLimiter("view", _VIEW_DAILY_LIMIT)
 
 
 @app.post("/api/view")
@@ -1261,13 +1537,7 @@ async def record_page_view(req: PageViewRequest, request: Request):
     Body: { "page": "report" }
     """
     client_ip = _get_client_ip(request)
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    entry = _view_limits[client_ip]
-    if entry["reset_date"] != today:
-        entry["count"] = 0
-        entry["reset_date"] = today
-    entry["count"] += 1
-    if entry["count"] > _VIEW_DAILY_LIMIT:
+    if not _view_limits.hit(client_ip):
         return {"ok": True}  # silently drop — don't reveal limit
 
     if not req.page or not req.page.strip():
@@ -1289,8 +1559,8 @@ _ALLOWED_EVENTS = {
     "unlock_complete", "unlock_fail", "claim_report", "results_scroll",
     "copy_to_ai", "reset_form",
 }
-_event_limits: dict[str, dict] = defaultdict(lambda: {"count": 0, "reset_date": ""})
 _EVENT_DAILY_LIMIT = 500  # per IP per day
+_event_limits = rate_limit.DailyLimiter("event", _EVENT_DAILY_LIMIT)
 
 
 @app.post("/api/event")
@@ -1323,13 +1593,7 @@ async def record_funnel_events(request: Request):
     ip_hash = hashlib.sha256(client_ip.encode()).hexdigest()
 
     # Rate limit
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    entry = _event_limits[client_ip]
-    if entry["reset_date"] != today:
-        entry["count"] = 0
-        entry["reset_date"] = today
-    entry["count"] += len(req.events)
-    if entry["count"] > _EVENT_DAILY_LIMIT:
+    if not _event_limits.hit(client_ip, len(req.events)):
         return {"ok": True}  # silently drop
 
     batch: list[tuple[str, str, str, str]] = []
@@ -1339,15 +1603,25 @@ async def record_funnel_events(request: Request):
         meta_str = json.dumps(evt.metadata)[:1000]
         batch.append((req.session_id, evt.event_name, ip_hash, meta_str))
 
-    if batch:
-        try:
-            score_db.save_funnel_events_batch(batch)
-        except Exception:
-            logger.exception("Failed to save funnel events")
+    # Queued: the workers coalesce events from concurrent requests into one transaction.
+    for event in batch:
+        side_effects.submit("funnel_event", event)
 
     return {"ok": True}
 
 
+@app.get("/api/timings")
+async def timings_dashboard(key: str = ""):
+    """Per-stage check latency histograms since process start (requires EXPORT_KEY).
+
+    Example: GET /api/timings?key=EXPORT_KEY
+    """
+    export_key = (os.environ.get("EXPORT_KEY") or "").strip()
+    if not export_key or key != export_key:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return {"stages": timing.summary()}
+
+
 @app.get("/api/funnel")
 async def funnel_dashboard(key: str = "", days: int = 7):
     """Funnel analytics dashboard (requires EXPORT_KEY).
@@ -1366,17 +1640,23 @@ async def funnel_dashboard(key: str = "", days: int = 7):
         logger.exception("Failed to get funnel stats")
         raise HTTPException(status_code=500, detail="Stats unavailable")
 
+    # Dispatcher counters: dropped > 0 means events were shed under load.
+    stats["side_effects"] = side_effects.stats()
     return stats
 
 
 @app.get("/api/social-proof")
 async def social_proof():
-    """Return social proof stats for the landing page."""
+    """Return social proof stats for the landing page.
+
+    Counts come from the stats snapshot; only the "Xm ago" rendering is per request.
+    """
     total_checks = 0
     last_check_ago = None
     try:
-        total_checks = score_db.get_total_checks()
-        last_check_ts = score_db.get_last_check_time()
+        snap = await stats_snapshots.get("social_proof")
+        total_checks = snap.data["total_checks"]
+        last_check_ts = snap.data["last_check_ts"]
         if last_check_ts:
             last_dt = datetime.fromisoformat(last_check_ts)
             if last_dt.tzinfo is None:
@@ -1401,12 +1681,87 @@ async def social_proof():
     }
 
 
-@app.get("/api/export")
-async def export_scores(key: str = ""):
-    """Export all score history as JSON (requires secret key).
+_EXPORT_FIELDS = (
+    "id", "idea_hash", "idea_text", "score", "keywords", "depth", "lang",
+    "keyword_source", "created_at",
+)
+_EXPORT_MEDIA = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _export_chunks(fmt: str, since: int, until: int) -> Iterator[str]:
+    """Render score_history pages as text chunks — one DB page in memory at a time.
 
-    Usage: GET /api/export?key=YOUR_SECRET
-    Returns: { "count": N, "records": [...] }
+    Sync on purpose: StreamingResponse iterates it in a threadpool, so the blocking DB
+    reads never stall the event loop.
+    """
+    pages = score_db.iter_scores(since_id=since, until_id=until)
+    count = 0
+    try:
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(_EXPORT_FIELDS)
+            for page in pages:
+                for row in page:
+                    writer.writerow([row.get(f) for f in _EXPORT_FIELDS])
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue()
+        elif fmt == "ndjson":
+            for page in pages:
+                yield "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in page)
+        else:  # legacy JSON document, streamed: {"records": [...], "count": N, ...}
+            yield '{"records": ['
+            for page in pages:
+                body = ", ".join(json.dumps(r, ensure_ascii=False) for r in page)
+                yield (", " if count else "") + body
+                count += len(page)
+            yield f'], "count": {count}, "next_since": {max(until, since)}}}'
+    except Exception:
+        # Headers (200, X-Export-Next-Since) are already sent. Ending the generator
+        # normally would make a cut-off NDJSON / CSV body (or a gzip stream with a valid
+        # trailer) look complete, so re-raise: the server aborts the connection, the
+        # client gets a transfer error and retries from its last cursor.
+        logger.exception("Export stream failed")
+        raise
+
+
+def _gzip_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+    """Incrementally gzip a text stream (constant memory, flushes per chunk).
+
+    Chunks are whole DB pages, so a Z_SYNC_FLUSH after each costs little ratio and the
+    client can decode every page as it arrives instead of waiting for zlib's buffer.
+    """
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = z.compress(chunk.encode("utf-8")) + z.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield z.flush()
+
+
+@app.get("/api/export")
+async def export_scores(
+    key: str = "",
+    fmt: Literal["json", "ndjson", "csv"] = Query("json", alias="format"),
+    since: int = 0,
+    gzip: bool = False,
+):
+    """Stream score history (requires secret key).
+
+    Usage: GET /api/export?key=YOUR_SECRET[&format=json|ndjson|csv][&since=ID][&gzip=1]
+    - json (default): { "records": [...], "count": N, "next_since": ID }
+    - ndjson: one record per line; csv: header row + one record per line
+    Records are ordered by id and keyset-paginated from the DB, so memory on the API
+    instance stays constant. Only rows with id > `since` are exported; the response
+    header X-Export-Next-Since carries the cursor for the next incremental pull.
+    gzip=1 compresses the body (Content-Encoding: gzip).
 
     Set EXPORT_KEY env var on Render. No key = endpoint disabled.
     """
@@ -1414,11 +1769,20 @@ async def export_scores(key: str = ""):
     if not export_key or key != export_key:
         raise HTTPException(status_code=403, detail="Invalid or missing export key")
     try:
-        records = score_db.get_all_scores()
+        # Snapshot bound: rows inserted mid-stream belong to the next pull, not this one.
+        until = score_db.get_max_score_id()
     except Exception:
         logger.exception("Export failed")
         raise HTTPException(status_code=500, detail="Export failed")
-    return {"count": len(records), "records": records}
+
+    headers = {"X-Export-Next-Since": str(max(until, since))}
+    if fmt == "csv":
+        headers["Content-Disposition"] = 'attachment; filename="score_history.csv"'
+    body: Iterator[str] | Iterator[bytes] = _export_chunks(fmt, since, until)
+    if gzip:
+        body = _gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=_EXPORT_MEDIA[fmt], headers=headers)
 
 
 _SOURCE_COLORS = {
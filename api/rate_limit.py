@@ -0,0 +1,243 @@
+"""Daily rate limiting — one fixed-window counter per (limiter, UTC day, client key).
+
+Replaces the per-endpoint `defaultdict(lambda: {"count", "reset_date"})` maps in main.py,
+whose eviction was an O(n) scan of up to 10k entries inside the request path.
+
+Design:
+- Day-bucketed: each limiter keeps only the *current* UTC day's counters. The first hit
+  after midnight swaps in an empty bucket, dropping yesterday's keys in O(1) — there is
+  no per-entry reset_date to compare and nothing to scan.
+- Compact: a bucket is a `__slots__` object holding one `dict[str, int]`; per client it
+  costs one dict slot + an int, not a nested dict.
+- Bounded: at most `max_keys` clients are tracked per day. Past the cap the least
+  recently seen key is evicted (counted in `evicted`) — a flood of spoofed keys pushes
+  out idle clients, never switches limiting off, and a client that keeps hitting the
+  limit stays tracked and blocked. The shared backend keeps the same cap.
+- No locks: every request runs on the event-loop thread and each operation is a couple
+  of dict reads/writes.
+
+Optional shared backend: set RATE_LIMIT_DB to a SQLite file path and every limiter keeps
+its counters there instead (UPSERT ... RETURNING, WAL mode), so limits hold across
+multiple workers / processes on the same host. It trims each limiter's day back to
+`max_keys` (least recently seen first) every TRIM_EVERY new keys. hit() runs on the event loop, so the
+backend waits at most SQLITE_BUSY_TIMEOUT_S for another worker's write lock — under
+contention a request is let through rather than stalling every request in the worker.
+Backend errors (a busy database included) fail open with a log line.
+
+Env:
+- RATE_LIMIT_DB   (optional SQLite path; unset = per-process memory)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_KEYS = 50_000
+SQLITE_BUSY_TIMEOUT_S = 0.05  # longest wait for the shared file's write lock (event loop!)
+TRIM_EVERY = 100  # new keys (per process) between shared-backend trims to max_keys
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+class _DayBucket:
+    __slots__ = ("day", "counts")
+
+    def __init__(self, day: str) -> None:
+        self.day = day
+        self.counts: dict[str, int] = {}
+
+
+class MemoryBackend:
+    """Per-process counters for one limiter — only today's bucket is ever held."""
+
+    __slots__ = ("max_keys", "evicted", "_bucket")
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        self.evicted = 0
+        self._bucket = _DayBucket("")
+
+    def incr(self, scope: str, day: str, key: str, n: int) -> int:
+        bucket = self._bucket
+        if bucket.day != day:
+            if day < bucket.day:
+                return n  # late call from before midnight: yesterday's window is gone
+            bucket = self._bucket = _DayBucket(day)  # rollover: drop all of yesterday
+        counts = bucket.counts
+        cur = counts.pop(key, None)  # re-inserted below: dict order = least recently seen first
+        if cur is None:
+            cur = 0
+            if len(counts) >= self.max_keys:
+                del counts[next(iter(counts))]
+                self.evicted += 1
+                if self.evicted == 1:
+                    logger.warning("[RATE] %s: %d keys tracked today — evicting idle keys", scope, len(counts) + 1)
+        cur += n
+        counts[key] = cur
+        return cur
+
+    def count(self, scope: str, day: str, key: str) -> int:
+        return self._bucket.counts.get(key, 0) if self._bucket.day == day else 0
+
+    def size(self) -> int:
+        return len(self._bucket.counts)
+
+    def clear(self, scope: str) -> None:
+        self._bucket = _DayBucket("")
+        self.evicted = 0
+
+
+class SQLiteBackend:
+    """Counters in a shared SQLite file, so several workers enforce one limit."""
+
+    __slots__ = ("path", "max_keys", "_conn", "_swept_day", "_new_keys")
+
+    def __init__(self, path: str, max_keys: int = DEFAULT_MAX_KEYS) -> None:
+        self.path = path
+        self.max_keys = max_keys
+        self._conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_S, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                scope TEXT NOT NULL,
+                day TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                seen INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (scope, day, key)
+            )
+        """)
+        try:  # files created before the key cap
+            self._conn.execute("ALTER TABLE rate_limits ADD COLUMN seen INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass  # duplicate column: already there
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_rl_day ON rate_limits(day)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_rl_seen ON rate_limits(scope, day, seen)")
+        self._swept_day = ""
+        self._new_keys = 0
+
+    def incr(self, scope: str, day: str, key: str, n: int) -> int:
+        if self._swept_day != day:
+            # Once per process per day; the day index makes it a range delete.
+            self._conn.execute("DELETE FROM rate_limits WHERE day < ?", (day,))
+            self._swept_day = day
+        row = self._conn.execute(
+            "INSERT INTO rate_limits (scope, day, key, count, seen) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(scope, day, key) DO UPDATE SET count = count + excluded.count, seen = excluded.seen "
+            "RETURNING count",
+            (scope, day, key, n, time.time_ns()),
+        ).fetchone()
+        total = int(row[0])
+        if total == n:  # a new key
+            self._new_keys += 1
+            if self._new_keys % TRIM_EVERY == 0:
+                self._trim(scope, day)
+        return total
+
+    def _trim(self, scope: str, day: str) -> None:
+        """Evict the least recently seen keys of (scope, day) beyond max_keys."""
+        cur = self._conn.execute(
+            "DELETE FROM rate_limits WHERE rowid IN ("
+            "  SELECT rowid FROM rate_limits WHERE scope = ? AND day = ? ORDER BY seen DESC LIMIT -1 OFFSET ?"
+            ")",
+            (scope, day, self.max_keys),
+        )
+        if cur.rowcount > 0:
+            logger.warning("[RATE] %s: evicted %d idle keys (cap %d)", scope, cur.rowcount, self.max_keys)
+
+    def count(self, scope: str, day: str, key: str) -> int:
+        row = self._conn.execute(
+            "SELECT count FROM rate_limits WHERE scope = ? AND day = ? AND key = ?",
+            (scope, day, key),
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def size(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0])
+
+    def clear(self, scope: str) -> None:
+        self._conn.execute("DELETE FROM rate_limits WHERE scope = ?", (scope,))
+
+
+_shared_backends: dict[str, SQLiteBackend] = {}
+
+
+def _default_backend(max_keys: int) -> MemoryBackend | SQLiteBackend:
+    path = (os.environ.get("RATE_LIMIT_DB") or "").strip()
+    if not path:
+        return MemoryBackend(max_keys)
+    try:
+        if path not in _shared_backends:
+            _shared_backends[path] = SQLiteBackend(path, max_keys)
+        return _shared_backends[path]
+    except Exception:
+        logger.exception("[RATE] shared backend %s unavailable — using memory", path)
+        return MemoryBackend(max_keys)
+
+
+# ---------------------------------------------------------------------------
+# Limiter
+# ---------------------------------------------------------------------------
+
+
+class DailyLimiter:
+    """`limit` units per client key per UTC day (fixed window, resets at 00:00 UTC)."""
+
+    __slots__ = ("scope", "limit", "backend", "allowed", "limited")
+
+    def __init__(
+        self,
+        scope: str,
+        limit: int,
+        *,
+        max_keys: int = DEFAULT_MAX_KEYS,
+        backend: MemoryBackend | SQLiteBackend | None = None,
+    ) -> None:
+        self.scope = scope
+        self.limit = limit
+        self.backend = backend if backend is not None else _default_backend(max_keys)
+        self.allowed = 0  # per-process hit outcomes (exported via /metrics)
+        self.limited = 0
+
+    def hit(self, key: str, n: int = 1, *, day: str | None = None) -> bool:
+        """Record `n` units for `key`; True while today's total stays within the limit.
+
+        Units are counted even when over the limit (same as the old counters), so a
+        client hammering past the cap stays blocked for the rest of the day.
+        """
+        try:
+            total = self.backend.incr(self.scope, day or _utc_day(), key, n)
+        except sqlite3.OperationalError as exc:  # locked by another worker past the busy timeout
+            logger.warning("[RATE] %s backend busy (%s) — failing open", self.scope, exc)
+            self.allowed += 1
+            return True
+        except Exception:
+            logger.exception("[RATE] %s backend error — failing open", self.scope)
+            self.allowed += 1
+            return True
+        if total <= self.limit:
+            self.allowed += 1
+            return True
+        self.limited += 1
+        return False
+
+    def count(self, key: str) -> int:
+        """Units recorded for `key` today."""
+        return self.backend.count(self.scope, _utc_day(), key)
+
+    def clear(self) -> None:
+        """Forget every counter for this limiter (tests / admin)."""
+        self.backend.clear(self.scope)
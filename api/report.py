@@ -20,16 +20,23 @@ import httpx
 
 sys.path.insert(0, os.path.dirname(__file__))
 import db as score_db  # noqa: E402
+import llm  # noqa: E402
 
 try:
-    from embeddings import embed_one, embeddings_enabled  # noqa: E402
+    from embeddings import active_model, embed_one, embed_one_async, embeddings_enabled  # noqa: E402
 except Exception:  # numpy/httpx/module missing -> semantic search simply disabled
     def embeddings_enabled() -> bool:  # type: ignore
         return False
 
+    def active_model() -> str | None:  # type: ignore
+        return None
+
     def embed_one(text: str):  # type: ignore
         raise RuntimeError("embeddings unavailable")
 
+    async def embed_one_async(text: str):  # type: ignore
+        raise RuntimeError("embeddings unavailable")
+
 logger = logging.getLogger(__name__)
 
 
@@ -105,26 +112,42 @@ def _build_score_breakdown(signal_result: dict) -> dict:
 
 
 def _keyword_similar(idea_text: str, idea_hash: str, limit: int = 50) -> list[dict]:
-    """Legacy keyword-LIKE similar search (fallback when semantic is unavailable)."""
+    """Keyword similar search over the FTS5 index (fallback when semantic is unavailable)."""
     words = [w.lower() for w in idea_text.split() if len(w) >= 4]
     if not words:
         words = [w.lower() for w in idea_text.split() if len(w) >= 3]
     return score_db.search_similar_ideas(keywords=words[:5], exclude_hash=idea_hash, limit=limit)
 
 
-def _similar_ideas(idea_text: str, idea_hash: str) -> tuple[list[dict], str]:
+async def _query_embedding(idea_text: str) -> list[float] | None:
+    """Embed an idea through the async micro-batcher. None when disabled or on failure,
+    so async callers can take the keyword path without a second (blocking) attempt."""
+    if not embeddings_enabled():
+        return None
+    try:
+        return await embed_one_async(idea_text)
+    except Exception:
+        logger.exception("[crowd] query embed failed")
+        return None
+
+
+def _similar_ideas(
+    idea_text: str, idea_hash: str, query_vec: list[float] | None = None
+) -> tuple[list[dict], str]:
     """Similar-idea lookup: semantic embeddings first, keyword LIKE as fallback.
 
     Returns (rows, mode). Semantic rows carry `similarity` + are deduped by idea_hash
     (the same idea searched repeatedly would otherwise dominate). Any failure in the
     semantic path (no key, provider error, numpy missing) degrades to keyword — the
     exact behaviour before P1, so there is no regression.
+
+    `query_vec` skips the (sync) embed call when the caller already has the vector.
     """
-    if embeddings_enabled():
+    if query_vec is not None or embeddings_enabled():
         try:
-            vec = embed_one(idea_text)
+            vec = query_vec if query_vec is not None else embed_one(idea_text)
             sem = score_db.search_similar_by_embedding(
-                vec, exclude_hash=idea_hash, limit=500, min_score=0.45
+                vec, exclude_hash=idea_hash, limit=500, min_score=0.45, model=active_model()
             )
             if sem:
                 seen: set = set()
@@ -141,6 +164,15 @@ def _similar_ideas(idea_text: str, idea_hash: str) -> tuple[list[dict], str]:
     return _keyword_similar(idea_text, idea_hash), "keyword"
 
 
+async def _similar_ideas_async(idea_text: str, idea_hash: str) -> tuple[list[dict], str]:
+    """Non-blocking _similar_ideas for request handlers: the embed goes through the
+    batcher, so concurrent crowd-intel lookups share one provider round-trip."""
+    vec = await _query_embedding(idea_text)
+    if vec is None:
+        return _keyword_similar(idea_text, idea_hash), "keyword"
+    return _similar_ideas(idea_text, idea_hash, query_vec=vec)
+
+
 def _demand_heat(semantic_rows: list[dict], heat_threshold: float = 0.55, window_days: int = 90) -> dict | None:
     """Demand signal from semantic matches: closely-related searches in the last
     `window_days`, and the trend vs the prior equal window. FACTS only — no causal
@@ -188,6 +220,7 @@ def _demand_heat(semantic_rows: list[dict], heat_threshold: float = 0.55, window
 # ---------------------------------------------------------------------------
 _TOPIC_TTL = float(os.environ.get("TOPIC_CACHE_TTL", "600"))
 _topic_cache: dict = {"loaded_at": 0.0, "mat": None, "meta": None}
+_topic_cache_stats = {"hit": 0, "miss": 0}
 
 
 def _load_topic_centroids():
@@ -199,7 +232,9 @@ def _load_topic_centroids():
         return None
     now = _t.time()
     if _topic_cache["mat"] is not None and (now - _topic_cache["loaded_at"]) < _TOPIC_TTL:
+        _topic_cache_stats["hit"] += 1
         return np
+    _topic_cache_stats["miss"] += 1
     try:
         rows = score_db.get_demand_topics()
     except Exception:
@@ -216,7 +251,9 @@ def _load_topic_centroids():
     return np
 
 
-def topic_demand(idea_text: str, min_sim: float = 0.35) -> dict | None:
+def topic_demand(
+    idea_text: str, min_sim: float = 0.35, query_vec: list[float] | None = None
+) -> dict | None:
     """Nearest offline demand-topic to an idea → its precomputed heat/trend. Fast (~1s, <1MB).
     Returns a crowd_intelligence-shaped dict (match_mode:'topic' + demand_heat), or None when
     topics aren't built, embeddings are off, or the idea is far from every topic (unique)."""
@@ -226,13 +263,14 @@ def topic_demand(idea_text: str, min_sim: float = 0.35) -> dict | None:
     if np is None or mat is None or not meta or not embeddings_enabled():
         return None
     try:
-        q = np.asarray(embed_one(idea_text), dtype=np.float32)
+        vec = query_vec if query_vec is not None else embed_one(idea_text)
+        q = np.asarray(vec, dtype=np.float32)
     except Exception:
         logger.exception("[demand] query embed failed")
         return None
     qn = float(np.linalg.norm(q))
-    if qn == 0:
-        return None
+    if qn == 0 or q.shape[0] != mat.shape[1]:
+        return None  # zero vector, or centroids were clustered from another embedding model
     sims = mat @ (q / qn)
     i = int(np.argmax(sims))
     if float(sims[i]) < min_sim:
@@ -258,13 +296,32 @@ def topic_demand(idea_text: str, min_sim: float = 0.35) -> dict | None:
     }
 
 
-def _build_crowd_intelligence(idea_text: str, idea_hash: str, score: int) -> dict:
+async def topic_demand_async(idea_text: str, min_sim: float = 0.35) -> dict | None:
+    """topic_demand for the request path — embeds via the async batcher, and only when
+    there are topics to match against (no provider call if the table isn't built)."""
+    if _load_topic_centroids() is None or _topic_cache["mat"] is None or not embeddings_enabled():
+        return None
+    vec = await _query_embedding(idea_text)
+    if vec is None:
+        return None
+    return topic_demand(idea_text, min_sim, query_vec=vec)
+
+
+def _build_crowd_intelligence(
+    idea_text: str,
+    idea_hash: str,
+    score: int,
+    matches: tuple[list[dict], str] | None = None,
+) -> dict:
     """Query score_history for similar ideas (semantic, keyword fallback). FACTS only.
 
     Does NOT say 'lower score = entry angles' or any causal claims. Just: N similar
     queries, avg score, depth breakdown, and (semantic mode) a 90-day demand signal.
+
+    `matches` is a precomputed (rows, mode) from _similar_ideas_async; when omitted the
+    lookup runs synchronously here.
     """
-    similar, mode = _similar_ideas(idea_text, idea_hash)
+    similar, mode = matches if matches is not None else _similar_ideas(idea_text, idea_hash)
     total_checks = score_db.get_total_checks()
 
     if not similar:
@@ -341,9 +398,7 @@ async def _generate_search_angles(idea_text: str) -> list[str]:
         return [idea_text]
 
     try:
-        import anthropic
-
-        client = anthropic.AsyncAnthropic(api_key=api_key, timeout=30.0)
+        client = llm.client(api_key)
         message = await client.messages.create(
             model="claude-haiku-4-5",
             max_tokens=300,
@@ -424,6 +479,7 @@ async def _build_competitor_analysis(signal_result: dict) -> list[dict]:
         _headers,
         _is_noise_repo,
     )
+    from idea_reality_mcp.upstream import transport as upstream_transport
 
     # Extract query strings from evidence
     keywords: list[str] = []
@@ -442,7 +498,7 @@ async def _build_competitor_analysis(signal_result: dict) -> list[dict]:
     all_repos: list[dict] = []
     repo_hits: dict[str, int] = {}
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, transport=upstream_transport("github")) as client:
         for query in keywords[:3]:
             try:
                 resp = await client.get(
@@ -512,12 +568,13 @@ async def _build_multi_angle_competitors(
         _headers,
         _is_noise_repo,
     )
+    from idea_reality_mcp.upstream import transport as upstream_transport
 
     all_repos: list[dict] = []
     # Track which angles found each repo
     repo_angles: dict[str, list[str]] = {}
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, transport=upstream_transport("github")) as client:
         for angle in angles:
             try:
                 resp = await client.get(
@@ -685,9 +742,7 @@ async def _generate_strategic_analysis(
     )
 
     try:
-        import anthropic
-
-        client = anthropic.AsyncAnthropic(api_key=api_key, timeout=30.0)
+        client = llm.client(api_key)
         message = await client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=1000,
@@ -769,7 +824,9 @@ async def generate_report(
         competitors = _build_single_competitors(signal_result)
 
     score_breakdown = _build_score_breakdown(signal_result)
-    crowd = _build_crowd_intelligence(idea_text, idea_h, score)
+    crowd = _build_crowd_intelligence(
+        idea_text, idea_h, score, matches=await _similar_ideas_async(idea_text, idea_h)
+    )
     sub_scores = signal_result.get("sub_scores", {})
 
     analysis = await _generate_strategic_analysis(
@@ -0,0 +1,195 @@
+"""Side-effect dispatcher — telemetry I/O off the request path.
+
+Discord webhooks, query-log rows and funnel events are analytics: a user should never
+wait on them. Handlers `submit()` a (kind, payload) pair and return immediately; a small
+worker pool drains a bounded queue in the background.
+
+- Lanes: a kind registered with `lane=` gets its own queue and worker, so a slow external
+  call (a Discord post can take 5s plus a honoured Retry-After) never holds up the DB
+  writes queued behind it. Everything else shares the default lane's pool.
+- Bounded: each lane's queue holds at most `maxsize` items. When it is full the item is
+  dropped and counted (`dropped[kind]`) — overload sheds telemetry, never request
+  latency. Kinds registered `lossless=True` (funnel events, the conversion record) are
+  never dropped for a full queue: the item waits in the background for space instead.
+- Batching: a worker takes one item, then greedily whatever else is already queued (up
+  to `batch_max`), groups it by kind and hands each group to its handler in one call —
+  one DB transaction for N funnel events, one Discord message for up to 10 embeds.
+- Failure isolation: a handler exception is logged + counted; the batch is not retried.
+- Drain: on shutdown `drain()` stops intake, lets the workers flush what's queued (with a
+  timeout), then cancels them.
+
+Workers bind to the running event loop. They start from the app lifespan, or lazily on
+the first submit; if the loop changes (test clients), a fresh queue + pool replaces them.
+
+Env:
+- EFFECTS_QUEUE_MAX  (queued side effects per lane before dropping, default 1000)
+- EFFECTS_WORKERS    (default-lane worker tasks, default 2)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+QUEUE_MAX = int(os.environ.get("EFFECTS_QUEUE_MAX", "1000"))
+WORKERS = int(os.environ.get("EFFECTS_WORKERS", "2"))
+
+BatchHandler = Callable[[list[Any]], Awaitable[None]]
+DEFAULT_LANE = "default"
+
+
+class _Lane:
+    __slots__ = ("queue", "workers")
+
+    def __init__(self, queue: asyncio.Queue, workers: list[asyncio.Task]) -> None:
+        self.queue = queue
+        self.workers = workers
+
+
+class SideEffectDispatcher:
+    def __init__(
+        self, *, maxsize: int = QUEUE_MAX, workers: int = WORKERS, batch_max: int = 50
+    ) -> None:
+        self.maxsize = maxsize
+        self.n_workers = workers
+        self.batch_max = batch_max
+        self._handlers: dict[str, BatchHandler] = {}
+        self._lane_of: dict[str, str] = {}
+        self._lossless: set[str] = set()
+        self._lanes: dict[str, _Lane] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waiting: set[asyncio.Task] = set()  # lossless items waiting for queue space
+        self._closed = False
+        self.submitted: Counter = Counter()
+        self.processed: Counter = Counter()
+        self.failed: Counter = Counter()
+        self.dropped: Counter = Counter()
+        self.batches = 0
+
+    def register(
+        self, kind: str, handler: BatchHandler, *, lane: str = DEFAULT_LANE, lossless: bool = False,
+    ) -> None:
+        """`handler(payloads)` receives every queued payload of `kind` in one batch.
+
+        `lane`: a name other than the default runs `kind` on its own queue + worker.
+        `lossless`: never drop `kind` because its queue is full.
+        """
+        self._handlers[kind] = handler
+        self._lane_of[kind] = lane
+        if lossless:
+            self._lossless.add(kind)
+
+    # -- intake ------------------------------------------------------------------------
+
+    def submit(self, kind: str, payload: Any) -> bool:
+        """Queue a side effect without waiting. False if it was dropped."""
+        if kind not in self._handlers:
+            raise KeyError(f"no side-effect handler registered for {kind!r}")
+        if self._closed:
+            self.dropped[kind] += 1
+            return False
+        try:
+            self._ensure_started()
+            queue = self._lanes[self._lane_of[kind]].queue
+            queue.put_nowait((kind, payload))
+        except asyncio.QueueFull:
+            if kind in self._lossless:
+                task = asyncio.get_running_loop().create_task(queue.put((kind, payload)))
+                self._waiting.add(task)
+                task.add_done_callback(self._waiting.discard)
+                self.submitted[kind] += 1
+                return True
+            self.dropped[kind] += 1
+            if self.dropped[kind] in (1, 100) or self.dropped[kind] % 1000 == 0:
+                logger.warning("[EFFECTS] queue full — dropped %d %s so far", self.dropped[kind], kind)
+            return False
+        except RuntimeError:  # no running loop (sync caller)
+            self.dropped[kind] += 1
+            logger.warning("[EFFECTS] no event loop — dropped %s", kind)
+            return False
+        self.submitted[kind] += 1
+        return True
+
+    @property
+    def pending(self) -> int:
+        return sum(lane.queue.qsize() for lane in self._lanes.values()) + len(self._waiting)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "batches": self.batches,
+            "submitted": dict(self.submitted),
+            "processed": dict(self.processed),
+            "failed": dict(self.failed),
+            "dropped": dict(self.dropped),
+        }
+
+    # -- workers -----------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the worker pool on the running loop (idempotent)."""
+        self._closed = False
+        self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._lanes:
+            return
+        # First start, or the previous loop is gone: anything queued there is unreachable.
+        self._loop = loop
+        self._waiting = set()
+        self._lanes = {}
+        for name in {DEFAULT_LANE, *self._lane_of.values()}:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.maxsize)
+            n = self.n_workers if name == DEFAULT_LANE else 1
+            self._lanes[name] = _Lane(queue, [loop.create_task(self._worker(queue)) for _ in range(n)])
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            items = [await queue.get()]
+            while len(items) < self.batch_max:
+                try:
+                    items.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            groups: dict[str, list[Any]] = {}
+            for kind, payload in items:
+                groups.setdefault(kind, []).append(payload)
+            for kind, payloads in groups.items():
+                self.batches += 1
+                try:
+                    await self._handlers[kind](payloads)
+                    self.processed[kind] += len(payloads)
+                except Exception:
+                    self.failed[kind] += len(payloads)
+                    logger.exception("[EFFECTS] %s handler failed (%d items)", kind, len(payloads))
+            for _ in items:
+                queue.task_done()
+
+    async def drain(self, timeout: float = 5.0) -> None:
+        """Stop intake, flush the queue (up to `timeout`s), then stop the workers."""
+        self._closed = True
+        lanes, self._lanes = self._lanes, {}
+        waiting = list(self._waiting)
+        workers = [t for lane in lanes.values() for t in lane.workers]
+
+        async def _flush() -> None:
+            if waiting:  # lossless items still waiting for space go in first
+                await asyncio.gather(*waiting, return_exceptions=True)
+            await asyncio.gather(*(lane.queue.join() for lane in lanes.values()))
+
+        if lanes:
+            try:
+                await asyncio.wait_for(_flush(), timeout)
+            except asyncio.TimeoutError:
+                lost = sum(lane.queue.qsize() for lane in lanes.values()) + sum(not t.done() for t in waiting)
+                logger.warning("[EFFECTS] drain timed out — %d side effects lost", lost)
+        for task in (*waiting, *workers):
+            task.cancel()
+        if waiting or workers:
+            await asyncio.gather(*waiting, *workers, return_exceptions=True)
@@ -0,0 +1,140 @@
+"""Stats snapshots — background-refreshed aggregates for the public landing-page endpoints.
+
+/api/stats, /api/pulse, /api/social-proof and /api/query-stats are each a handful of
+full-table aggregates (COUNT(*), COUNT(DISTINCT), GROUP BY ... HAVING, weekly strftime
+group-bys) over score_history / query_log. The landing page polls several per visit,
+so computing them per hit turned page views into full scans on Turso.
+
+Instead each aggregate is a named snapshot:
+- computed off the event loop (asyncio.to_thread — the DB layer is sync),
+- refreshed by one background task every STATS_REFRESH_INTERVAL seconds — but only
+  while it is being read: a snapshot not read within STATS_MAX_STALENESS (e.g. the
+  key-gated admin aggregates, or every snapshot on an idle worker) is left to expire
+  and rebuilt on demand by the next read,
+- served from memory with a content ETag (clients revalidate with If-None-Match),
+- never older than STATS_MAX_STALENESS: a read past the bound (background task not
+  running, e.g. tests / a stalled refresh) recomputes inline, single-flight per name.
+A failed refresh keeps serving the previous snapshot rather than erroring.
+
+Env:
+- STATS_REFRESH_INTERVAL  (seconds, default 60)
+- STATS_MAX_STALENESS     (seconds, default 300)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = float(os.environ.get("STATS_REFRESH_INTERVAL", "60"))
+MAX_STALENESS = float(os.environ.get("STATS_MAX_STALENESS", "300"))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One computed aggregate. Immutable — a refresh swaps in a new instance."""
+
+    data: Any
+    etag: str
+    computed_at: float  # time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.computed_at
+
+
+def _etag_for(data: Any) -> str:
+    body = json.dumps(data, sort_keys=True, default=str).encode()
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class StatsSnapshotter:
+    """Registry of named sync compute functions + their latest snapshots."""
+
+    def __init__(
+        self, *, interval: float = REFRESH_INTERVAL, max_staleness: float = MAX_STALENESS
+    ) -> None:
+        self.interval = interval
+        self.max_staleness = max(max_staleness, interval)
+        self._compute: dict[str, Callable[[], Any]] = {}
+        self._snapshots: dict[str, Snapshot] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._last_read: dict[str, float] = {}  # time.monotonic() of the latest get()
+        self._task: asyncio.Task | None = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def register(self, name: str, compute: Callable[[], Any]) -> None:
+        self._compute[name] = compute
+
+    async def refresh(self, name: str) -> Snapshot | None:
+        """Recompute `name` now. Returns the new snapshot, or the previous one on failure."""
+        try:
+            data = await asyncio.to_thread(self._compute[name])
+        except Exception:
+            self.failures += 1
+            logger.exception("[STATS] refresh of %s failed — serving previous snapshot", name)
+            return self._snapshots.get(name)
+        snap = Snapshot(data=data, etag=_etag_for(data), computed_at=time.monotonic())
+        self._snapshots[name] = snap
+        self.refreshes += 1
+        return snap
+
+    async def get(self, name: str) -> Snapshot:
+        """Snapshot for `name`, at most `max_staleness` old. Raises only if it has never
+        been computed successfully."""
+        self._last_read[name] = time.monotonic()
+        snap = self._snapshots.get(name)
+        if snap is not None and snap.age <= self.max_staleness:
+            return snap
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:  # concurrent readers of a stale snapshot share one recompute
+            snap = self._snapshots.get(name)
+            if snap is None or snap.age > self.max_staleness:
+                snap = await self.refresh(name)
+        if snap is None:
+            raise RuntimeError(f"stats snapshot {name!r} unavailable")
+        return snap
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Drop one (or every) snapshot so the next read recomputes."""
+        if name is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(name, None)
+
+    # -- background refresh ------------------------------------------------------------
+
+    def _wanted(self) -> list[str]:
+        """Snapshots read within the staleness window — the only ones kept warm."""
+        now = time.monotonic()
+        return [n for n in self._compute if now - self._last_read.get(n, float("-inf")) <= self.max_staleness]
+
+    async def _run(self) -> None:
+        while True:
+            for name in self._wanted():
+                await self.refresh(name)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the refresh loop on the running event loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("[STATS] snapshotter started (every %.0fs)", self.interval)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -1,15 +1,17 @@
 #!/usr/bin/env python
 """One-time / incremental backfill of semantic embeddings for score_history.
 
-Reads every row that has no embedding yet, embeds its idea_text with
-text-embedding-3-small, and writes the packed float32 BLOB back. Idempotent and
-resumable: it only ever touches rows where embedding IS NULL, so re-running after
-an interruption picks up where it left off, and running it on a cron keeps new
-rows covered.
+Reads every row that has no embedding yet, embeds its idea_text with the active
+provider (EMBED_MODEL; text-embedding-3-small by default), and writes the packed
+float32 BLOB back, tagged with its model + dimension. Idempotent and resumable: it
+only touches rows with no vector *from the active model*, so re-running after an
+interruption picks up where it left off, running it on a cron keeps new rows
+covered, and switching EMBED_MODEL re-embeds the corpus incrementally.
 
 Usage:
     OPENAI_API_KEY=...  TURSO_DATABASE_URL=...  TURSO_AUTH_TOKEN=...  \
         python scripts/backfill_embeddings.py [--batch 256] [--dry-run] [--limit N]
+    EMBED_MODEL=local-ngram  python scripts/backfill_embeddings.py   # offline, no key
 
 Cost: ~$0.02 / 1M tokens. ~10k ideas x ~40 tokens ≈ 400k tokens ≈ $0.01.
 """
@@ -25,7 +27,13 @@ import time
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from api import db  # noqa: E402
-from api.embeddings import EmbeddingError, embed_texts, embeddings_enabled, pack_embedding  # noqa: E402
+from api.embeddings import (  # noqa: E402
+    EmbeddingError,
+    active_model,
+    embed_texts,
+    embeddings_enabled,
+    pack_embedding,
+)
 
 
 def main() -> int:
@@ -39,12 +47,14 @@ def main() -> int:
         print("ERROR: OPENAI_API_KEY not set — cannot compute embeddings.", file=sys.stderr)
         return 2
 
-    db.init_db()  # ensures the embedding column exists on the target DB
+    db.init_db()  # ensures the embedding columns exist on the target DB
+    model = active_model()
+    print(f"[backfill] model: {model}")
 
     if args.dry_run:
         # A real run shrinks the NULL set as it writes; a dry run must NOT loop over
         # rows_missing_embedding (it never advances without writes) — count once instead.
-        n = db.count_missing_embedding()
+        n = db.count_missing_embedding(model=model)
         capped = n if args.limit == 0 else min(n, args.limit)
         est_tokens = capped * 40  # ~40 tokens/idea rough
         print(f"[backfill] dry-run: {n} rows missing embedding; would embed {capped} "
@@ -57,7 +67,7 @@ def main() -> int:
         take = args.batch if args.limit == 0 else min(args.batch, args.limit - total_done)
         if take <= 0:
             break
-        rows = db.rows_missing_embedding(limit=take)
+        rows = db.rows_missing_embedding(limit=take, model=model)
         if not rows:
             break
 
@@ -72,7 +82,7 @@ def main() -> int:
             return 1
 
         for row_id, vec in zip(ids, vectors):
-            db.set_embedding(row_id, pack_embedding(vec))
+            db.set_embedding(row_id, pack_embedding(vec), model=model)
         total_done += len(rows)
 
         if args.limit and total_done >= args.limit:
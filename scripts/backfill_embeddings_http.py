@@ -3,7 +3,8 @@
 
 Same job as backfill_embeddings.py, but talks to Turso via /v2/pipeline instead of
 the libsql sync client (which hangs on Windows). Idempotent/resumable: only touches
-rows where embedding IS NULL.
+rows with no vector from the active EMBED_MODEL (legacy untagged rows count as
+text-embedding-3-small).
 
 Usage:
     TURSO_DATABASE_URL=… TURSO_AUTH_TOKEN=… OPENAI_API_KEY=… \
@@ -19,14 +20,24 @@ import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from api.embeddings import EmbeddingError, embed_texts, embeddings_enabled, pack_embedding  # noqa: E402
+from api.embeddings import (  # noqa: E402
+    EmbeddingError,
+    active_model,
+    embed_texts,
+    embeddings_enabled,
+    pack_embedding,
+)
 from scripts import turso_http as t  # noqa: E402
 
+_MISSING_WHERE = (
+    "(embedding IS NULL OR COALESCE(embedding_model, 'text-embedding-3-small') != ?) "
+    "AND idea_text IS NOT NULL AND length(idea_text) > 0"
+)
+
 
 def _missing_count() -> int:
     return t.execute(
-        "SELECT COUNT(*) AS n FROM score_history "
-        "WHERE embedding IS NULL AND idea_text IS NOT NULL AND length(idea_text) > 0"
+        f"SELECT COUNT(*) AS n FROM score_history WHERE {_MISSING_WHERE}", [active_model()]
     )[0]["n"]
 
 
@@ -54,10 +65,9 @@ def main() -> int:
     while done < cap:
         take = min(args.batch, cap - done)
         rows = t.execute(
-            "SELECT id, idea_text FROM score_history "
-            "WHERE embedding IS NULL AND idea_text IS NOT NULL AND length(idea_text) > 0 "
+            f"SELECT id, idea_text FROM score_history WHERE {_MISSING_WHERE} "
             "ORDER BY id ASC LIMIT ?",
-            [take],
+            [active_model(), take],
         )
         if not rows:
             break
@@ -69,7 +79,11 @@ def main() -> int:
             print(f"ERROR embedding batch (ids {ids[0]}..{ids[-1]}): {e}", file=sys.stderr)
             return 1
         writes = [
-            ("UPDATE score_history SET embedding=? WHERE id=?", [pack_embedding(v), rid])
+            (
+                "UPDATE score_history SET embedding=?, embedding_model=?, embedding_dim=? "
+                "WHERE id=?",
+                [pack_embedding(v), active_model(), len(v), rid],
+            )
             for rid, v in zip(ids, vectors)
         ]
         t.execute_many(writes)
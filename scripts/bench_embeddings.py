@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""Throughput benchmark for the embedding providers (embeddings / second, one core).
+
+Embeds a synthetic corpus of idea-length texts in batches and reports the rate. The
+local provider is pure Python, so this number is the single-core cost of semantic
+search without network; the OpenAI provider is network-bound (only benchmarked with
+--model text-embedding-3-small and a key, and it costs real tokens).
+
+Usage:
+    python scripts/bench_embeddings.py [--model local-ngram] [--n 5000] [--batch 256]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_WORDS = (
+    "ai powered expense tracker for freelancers split bills roommates habit coach "
+    "recipe planner invoice generator meeting notes summarizer pet sitter marketplace "
+    "language tutor chatbot carbon footprint calculator resume builder budgeting app "
+    "real time collaborative whiteboard indie game analytics dashboard for shopify stores"
+).split()
+
+
+def _corpus(n: int, seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(_WORDS, k=rng.randint(6, 16))) for _ in range(n)]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Embedding provider throughput.")
+    ap.add_argument("--model", default="local-ngram", help="EMBED_MODEL value to benchmark")
+    ap.add_argument("--n", type=int, default=5000, help="texts to embed")
+    ap.add_argument("--batch", type=int, default=256, help="texts per embed call")
+    args = ap.parse_args()
+
+    os.environ["EMBED_MODEL"] = args.model
+    from api.embeddings import get_provider  # noqa: E402 — after EMBED_MODEL is set
+
+    prov = get_provider()
+    if not prov.available():
+        print(f"ERROR: provider for {args.model!r} is not available (missing key?)", file=sys.stderr)
+        return 2
+
+    texts = _corpus(args.n)
+    prov.embed(texts[:8])  # warm-up (imports, caches)
+    started = time.perf_counter()
+    for i in range(0, len(texts), args.batch):
+        prov.embed(texts[i : i + args.batch])
+    elapsed = time.perf_counter() - started
+
+    rate = len(texts) / max(elapsed, 1e-9)
+    print(f"[bench] model={prov.model} dim={prov.dim} n={len(texts)} batch={args.batch}")
+    print(f"[bench] {elapsed:.2f}s total, {elapsed / len(texts) * 1000:.3f} ms/text, "
+          f"{rate:,.0f} embeddings/s (one core)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
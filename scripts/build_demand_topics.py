@@ -21,13 +21,16 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import struct
 import sys
 from collections import Counter
 from datetime import datetime, timezone, timedelta
 
 sys.path.insert(0, "scripts")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import turso_http as t  # noqa: E402
+from api.embeddings import get_provider  # noqa: E402
 
 WINDOW_DAYS = 90
 _STOPWORDS = {
@@ -49,15 +52,19 @@ def _unpack(blob: bytes):
     return struct.unpack(f"<{len(blob) // 4}f", blob)
 
 
-def _read_all_embedded(chunk: int = 1500):
-    """Read (idea_hash, idea_text, created_at, embedding) for every embedded row, in rowid chunks.
+def _read_all_embedded(chunk: int = 1500, model: str = "text-embedding-3-small"):
+    """Read (idea_hash, idea_text, created_at, embedding) for every row embedded by `model`,
+    in rowid chunks. Centroids must live in the same space the API embeds queries into, so
+    rows from other providers are skipped (untagged legacy rows = text-embedding-3-small).
     idea_hash is needed to join query_log for distinct-requester heat (anti-poisoning)."""
     rows, last = [], 0
     while True:
         batch = t.execute(
             "SELECT rowid AS rid, idea_hash, idea_text, created_at, embedding FROM score_history "
-            "WHERE embedding IS NOT NULL AND rowid > ? ORDER BY rowid LIMIT ?",
-            [last, chunk],
+            "WHERE embedding IS NOT NULL "
+            "AND COALESCE(embedding_model, 'text-embedding-3-small') = ? "
+            "AND rowid > ? ORDER BY rowid LIMIT ?",
+            [model, last, chunk],
             timeout=90,
         )
         if not batch:
@@ -147,13 +154,16 @@ def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--k", type=int, default=100)
     ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--model", default=get_provider().model,
+                    help="cluster only vectors tagged with this model id "
+                         "(default: the EMBED_MODEL provider's id, e.g. local-ngram-v1 offline)")
     args = ap.parse_args()
 
     import numpy as np
     from sklearn.cluster import MiniBatchKMeans
 
-    print("reading embedded rows...", flush=True)
-    rows = _read_all_embedded()
+    print(f"reading rows embedded by {args.model}...", flush=True)
+    rows = _read_all_embedded(model=args.model)
     n = len(rows)
     print(f"read {n} embedded rows", flush=True)
     if n < args.k:
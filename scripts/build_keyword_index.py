@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""Backfill the derived aggregates (score_fts, keyword_counts, score_histogram) for old rows.
+
+init_db() creates all three on every boot and keeps them current for new rows (FTS
+triggers; save_score for the counts and the histogram), but on Turso it does NOT fold in
+the existing corpus (no big writes at startup — see
+docs/2026-07-06-demand-radar-offline-clustering.md §8). Until this script finishes,
+search_similar_ideas keeps using the LIKE scan, get_top_keywords the full JSON scan and
+get_score_percentile a GROUP BY scan per refresh.
+Idempotent and resumable: progress is committed per chunk in search_index_state.
+
+Usage:
+    TURSO_DATABASE_URL=...  TURSO_AUTH_TOKEN=...  \
+        python scripts/build_keyword_index.py [--batch 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import db  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Backfill the score_history derived aggregates.")
+    ap.add_argument("--batch", type=int, default=2000, help="rows indexed per write")
+    args = ap.parse_args()
+
+    db.init_db()  # ensures every derived table, search_index_state + triggers exist
+    started = time.time()
+    for name, backfill in (
+        ("score_fts", db.backfill_keyword_index),
+        ("keyword_counts", db.backfill_keyword_counts),
+        ("score_histogram", db.backfill_score_histogram),
+    ):
+        while True:
+            remaining = backfill(batch=args.batch, max_batches=1)
+            if remaining < 0:
+                print(f"ERROR: {name} unavailable — see logs.", file=sys.stderr)
+                return 1
+            print(f"[index-backfill] {name}: remaining {remaining}", flush=True)
+            if remaining == 0:
+                break
+
+    print(f"[index-backfill] done in {time.time() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+"""Local stand-ins for every upstream the check pipeline calls — for offline load tests.
+
+One Starlette app serves all of them under path prefixes, with response bodies shaped
+like the real APIs (only the fields the source adapters read, plus a few neighbours):
+
+    /github/search/repositories     GitHub repo search        (403/429 + Retry-After when limited)
+    /hn/api/v1/search               HN Algolia
+    /npm/-/v1/search                npm registry search
+    /pypi/pypi/{package}/json       PyPI JSON (~40% of names exist, 404 otherwise)
+    /so/2.3/search                  Stack Exchange           (400 throttle_violation when limited)
+    /anthropic/v1/messages          Anthropic Messages (keyword JSON array / 3 pivot hints)
+    /openai/v1/embeddings           OpenAI embeddings (deterministic unit vectors)
+    /api/expand-idea, /api/extract-keywords   the hosted API the MCP client calls
+
+Responses are deterministic per query (hash-seeded), so runs are comparable. Each
+upstream has its own behaviour: base latency + jitter, an error rate (HTTP 500) and a
+token-bucket rate limit that answers the way the real service does.
+
+`point_at(base_url)` rewires the source modules, api/embeddings.py and the LLM / MCP
+client env at a running instance; scripts/load_test.py uses both.
+
+Usage (standalone, e.g. for poking with curl):
+    python scripts/fake_upstreams.py [--port 9900] [--latency-ms 80] [--error-rate 0.01]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+UPSTREAMS = ("github", "hn", "npm", "pypi", "so", "anthropic", "openai", "api")
+
+
+@dataclass
+class Behavior:
+    """How one fake upstream responds."""
+
+    latency_ms: float = 80.0
+    jitter_ms: float = 40.0
+    error_rate: float = 0.0
+    rate_limit_rps: float = 0.0  # 0 = unlimited; token bucket with a 1s burst
+
+    # token bucket state
+    _tokens: float = field(default=0.0, repr=False)
+    _refilled: float = field(default=0.0, repr=False)
+
+    def take(self) -> bool:
+        if self.rate_limit_rps <= 0:
+            return True
+        now = time.monotonic()
+        if not self._refilled:
+            self._tokens, self._refilled = self.rate_limit_rps, now
+        self._tokens = min(self.rate_limit_rps, self._tokens + (now - self._refilled) * self.rate_limit_rps)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+
+@dataclass
+class UpstreamConfig:
+    default: Behavior = field(default_factory=Behavior)
+    overrides: dict[str, Behavior] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._per: dict[str, Behavior] = {}
+
+    def behavior(self, upstream: str) -> Behavior:
+        b = self._per.get(upstream)
+        if b is None:
+            b = self._per[upstream] = replace(self.overrides.get(upstream, self.default))
+        return b
+
+
+def _seed(*parts: str) -> random.Random:
+    return random.Random(int(hashlib.sha1("|".join(parts).encode()).hexdigest()[:12], 16))
+
+
+def _words(q: str) -> list[str]:
+    return [w for w in q.replace("-", " ").split() if w and ":" not in w and not w.startswith(">")] or ["idea"]
+
+
+# ---------------------------------------------------------------------------
+# Response bodies (real field names)
+# ---------------------------------------------------------------------------
+
+
+def _github(q: str, per_page: int) -> dict:
+    rng = _seed("gh", q)
+    words = _words(q)
+    total = rng.randint(0, 4000)
+    items = []
+    for i in range(min(per_page, total, 30)):
+        name = f"{rng.choice(['acme', 'oss', 'dev', 'labs'])}{i}/{'-'.join(words[:2])}-{rng.randint(1, 999)}"
+        items.append({
+            "id": rng.randint(1, 10**9),
+            "full_name": name,
+            "name": name.split("/")[1],
+            "html_url": f"https://github.com/{name}",
+            "description": f"A {' '.join(words)} library",
+            "stargazers_count": int(rng.paretovariate(1.2) * 10),
+            "forks_count": rng.randint(0, 300),
+            "language": rng.choice(["Python", "TypeScript", "Go", None]),
+            "updated_at": f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+            "created_at": f"202{rng.randint(0, 5)}-01-01T00:00:00Z",
+        })
+    return {"total_count": total, "incomplete_results": False, "items": items}
+
+
+def _hn(q: str) -> dict:
+    rng = _seed("hn", q)
+    now = int(time.time())
+    hits = [
+        {
+            "objectID": str(rng.randint(1, 10**8)),
+            "title": f"Show HN: {q}",
+            "points": rng.randint(1, 500),
+            "num_comments": rng.randint(0, 200),
+            "created_at_i": now - rng.randint(0, 365 * 86400),
+        }
+        for _ in range(rng.randint(0, 20))
+    ]
+    return {"nbHits": len(hits) * rng.randint(1, 5), "hits": hits, "page": 0, "hitsPerPage": 20}
+
+
+def _npm(q: str, size: int) -> dict:
+    rng = _seed("npm", q)
+    words = _words(q)
+    objects = []
+    for i in range(min(size, rng.randint(0, 10))):
+        name = f"{'-'.join(words[:2])}{'-' + str(i) if i else ''}"
+        objects.append({
+            "package": {
+                "name": name,
+                "version": f"{rng.randint(0, 5)}.{rng.randint(0, 20)}.0",
+                "description": f"{' '.join(words)} for node",
+                "links": {"npm": f"https://www.npmjs.com/package/{name}"},
+                "date": "2026-01-01T00:00:00.000Z",
+            },
+            "score": {"final": rng.random(), "detail": {"quality": 0.5, "popularity": 0.1, "maintenance": 0.5}},
+            "searchScore": rng.random() * 100,
+        })
+    return {"objects": objects, "total": rng.randint(len(objects), 50000), "time": "Mon Jan 01 2026"}
+
+
+def _so(q: str, pagesize: int) -> dict:
+    rng = _seed("so", q)
+    now = int(time.time())
+    items = [
+        {
+            "question_id": rng.randint(1, 10**8),
+            "title": f"How to {q}?",
+            "link": "https://stackoverflow.com/q/1",
+            "score": rng.randint(-2, 100),
+            "answer_count": rng.randint(0, 10),
+            "is_answered": rng.random() < 0.7,
+            "creation_date": now - rng.randint(0, 3 * 365 * 86400),
+            "tags": _words(q)[:3],
+        }
+        for _ in range(min(pagesize, rng.randint(0, 12)))
+    ]
+    return {"items": items, "has_more": len(items) >= pagesize, "quota_max": 10000, "quota_remaining": 9999}
+
+
+def _anthropic(body: dict) -> dict:
+    system = str(body.get("system") or "")
+    prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+    words = _words(prompt.splitlines()[0] if prompt else "idea")[:6]
+    if "pivot" in system.lower():
+        text = json.dumps([f"Focus {w} on a niche vertical" for w in (words * 3)[:3]])
+    else:
+        text = json.dumps([" ".join(words[i : i + 2]) for i in range(0, max(len(words), 4), 2)][:6])
+    return {
+        "id": "msg_fake",
+        "type": "message",
+        "role": "assistant",
+        "model": body.get("model", "claude-haiku-4-5"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+    }
+
+
+def _openai(body: dict) -> dict:
+    inputs = body.get("input") or []
+    inputs = [inputs] if isinstance(inputs, str) else inputs
+    data = []
+    for i, text in enumerate(inputs):
+        rng = _seed("emb", str(text))
+        vec = [rng.gauss(0, 1) for _ in range(1536)]
+        norm = sum(v * v for v in vec) ** 0.5 or 1.0
+        data.append({"object": "embedding", "index": i, "embedding": [v / norm for v in vec]})
+    return {"object": "list", "data": data, "model": body.get("model"), "usage": {"prompt_tokens": 1, "total_tokens": 1}}
+
+
+def _expand(idea: str) -> dict:
+    words = _words(idea)
+    return {
+        "expanded_description": idea,
+        "core_concept": " ".join(words[:3]),
+        "differentiator": "offline first",
+        "target_user": "developers",
+        "category": "developer-tools",
+    }
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+
+def create_app(config: UpstreamConfig | None = None) -> Starlette:
+    cfg = config or UpstreamConfig()
+
+    async def _gate(upstream: str) -> Response | None:
+        cfg.counts[upstream] = cfg.counts.get(upstream, 0) + 1
+        b = cfg.behavior(upstream)
+        delay = b.latency_ms + (random.uniform(-b.jitter_ms, b.jitter_ms) if b.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if not b.take():
+            if upstream == "github":
+                return JSONResponse(
+                    {"message": "API rate limit exceeded"}, status_code=403,
+                    headers={"Retry-After": "1", "X-RateLimit-Remaining": "0"},
+                )
+            if upstream == "so":
+                return JSONResponse(
+                    {"error_id": 502, "error_name": "throttle_violation", "error_message": "too many requests"},
+                    status_code=400,
+                )
+            return JSONResponse({"error": "rate_limited"}, status_code=429, headers={"Retry-After": "1"})
+        if b.error_rate and random.random() < b.error_rate:
+            return JSONResponse({"error": "fake upstream failure"}, status_code=500)
+        return None
+
+    async def github(request: Request):
+        if (r := await _gate("github")) is not None:
+            return r
+        q = request.query_params
+        return JSONResponse(_github(q.get("q", ""), int(q.get("per_page", "30"))))
+
+    async def hn(request: Request):
+        if (r := await _gate("hn")) is not None:
+            return r
+        return JSONResponse(_hn(request.query_params.get("query", "")))
+
+    async def npm(request: Request):
+        if (r := await _gate("npm")) is not None:
+            return r
+        q = request.query_params
+        return JSONResponse(_npm(q.get("text", ""), int(q.get("size", "20"))))
+
+    async def pypi(request: Request):
+        if (r := await _gate("pypi")) is not None:
+            return r
+        name = request.path_params["package"]
+        if _seed("pypi", name).random() > 0.4:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        return JSONResponse({"info": {"name": name, "version": "1.0.0", "summary": f"{name} package"}, "releases": {}})
+
+    async def so(request: Request):
+        if (r := await _gate("so")) is not None:
+            return r
+        q = request.query_params
+        return JSONResponse(_so(q.get("intitle", ""), int(q.get("pagesize", "10"))))
+
+    async def anthropic(request: Request):
+        if (r := await _gate("anthropic")) is not None:
+            return r
+        return JSONResponse(_anthropic(await request.json()))
+
+    async def openai(request: Request):
+        if (r := await _gate("openai")) is not None:
+            return r
+        return JSONResponse(_openai(await request.json()))
+
+    async def expand_idea(request: Request):
+        if (r := await _gate("api")) is not None:
+            return r
+        return JSONResponse(_expand((await request.json()).get("idea_text", "")))
+
+    async def extract_keywords(request: Request):
+        if (r := await _gate("api")) is not None:
+            return r
+        words = _words((await request.json()).get("idea_text", ""))
+        return JSONResponse({"keywords": [" ".join(words[i : i + 2]) for i in range(0, len(words), 2)][:6]})
+
+    app = Starlette(routes=[
+        Route("/github/search/repositories", github),
+        Route("/hn/api/v1/search", hn),
+        Route("/npm/-/v1/search", npm),
+        Route("/pypi/pypi/{package}/json", pypi),
+        Route("/so/2.3/search", so),
+        Route("/anthropic/v1/messages", anthropic, methods=["POST"]),
+        Route("/openai/v1/embeddings", openai, methods=["POST"]),
+        Route("/api/expand-idea", expand_idea, methods=["POST"]),
+        Route("/api/extract-keywords", extract_keywords, methods=["POST"]),
+    ])
+    app.state.config = cfg
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Running + wiring
+# ---------------------------------------------------------------------------
+
+
+class FakeUpstreamServer:
+    """Serve create_app() with uvicorn on a background thread (its own event loop, so
+    upstream latency never lands on the loop under test)."""
+
+    def __init__(self, config: UpstreamConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        import uvicorn
+
+        self.config = config or UpstreamConfig()
+        if not port:
+            with socket.socket() as s:
+                s.bind((host, 0))
+                port = s.getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(
+            create_app(self.config), host=host, port=port, log_level="warning",
+            lifespan="off", backlog=4096, limit_concurrency=None,
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True, name="fake-upstreams")
+
+    def __enter__(self) -> "FakeUpstreamServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("fake upstream server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def point_at(base_url: str, *, llm: bool = True, embeddings: bool = False) -> None:
+    """Rewire the in-process source modules + API helpers at a fake upstream instance.
+
+    Must run before api.main handles traffic. Env vars cover the Anthropic SDK and the
+    MCP client helpers; module constants cover the source adapters.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for p in (root, os.path.join(root, "api"), os.path.join(root, "src")):
+        if p not in sys.path:
+            sys.path.insert(0, p)
+
+    from idea_reality_mcp.sources import github, hn, npm, pypi, stackoverflow
+
+    github.GITHUB_API = f"{base_url}/github/search/repositories"
+    hn.HN_ALGOLIA_API = f"{base_url}/hn/api/v1/search"
+    npm.NPM_SEARCH_API = f"{base_url}/npm/-/v1/search"
+    pypi.PYPI_JSON_URL = base_url + "/pypi/pypi/{package}/json"
+    stackoverflow.SO_API = f"{base_url}/so/2.3/search"
+
+    os.environ["IDEA_REALITY_API_URL"] = base_url  # MCP expand_idea / extract_keywords_llm
+    os.environ.pop("LIBRARIES_IO_KEY", None)
+    os.environ.pop("DISCORD_WEBHOOK_URL", None)
+    if llm:
+        os.environ["ANTHROPIC_API_KEY"] = "fake-key"
+        os.environ["ANTHROPIC_BASE_URL"] = f"{base_url}/anthropic"
+    else:
+        os.environ.pop("ANTHROPIC_API_KEY", None)
+    if embeddings:
+        import embeddings as emb
+
+        os.environ["OPENAI_API_KEY"] = "fake-key"
+        emb._OPENAI_URL = f"{base_url}/openai/v1/embeddings"
+    else:
+        os.environ.pop("OPENAI_API_KEY", None)
+
+
+def parse_override(spec: str, default: Behavior) -> tuple[str, Behavior]:
+    """`github:latency_ms=300,rate_limit_rps=5` -> ("github", Behavior(...))."""
+    name, _, opts = spec.partition(":")
+    if name not in UPSTREAMS:
+        raise argparse.ArgumentTypeError(f"unknown upstream {name!r} (one of {', '.join(UPSTREAMS)})")
+    kwargs = {}
+    for part in filter(None, opts.split(",")):
+        k, _, v = part.partition("=")
+        if k not in ("latency_ms", "jitter_ms", "error_rate", "rate_limit_rps"):
+            raise argparse.ArgumentTypeError(f"unknown behaviour {k!r}")
+        kwargs[k] = float(v)
+    return name, replace(default, **kwargs)
+
+
+def add_behavior_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--latency-ms", type=float, default=80.0, help="base upstream latency")
+    ap.add_argument("--jitter-ms", type=float, default=40.0, help="+/- uniform jitter")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of HTTP 500s")
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="per-upstream req/s (0 = unlimited)")
+    ap.add_argument(
+        "--upstream", action="append", default=[], metavar="NAME:K=V,...",
+        help="per-upstream override, e.g. github:latency_ms=400,rate_limit_rps=10",
+    )
+
+
+def config_from_args(args: argparse.Namespace) -> UpstreamConfig:
+    default = Behavior(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit)
+    return UpstreamConfig(default=default, overrides=dict(parse_override(s, default) for s in args.upstream))
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Serve fake upstream APIs locally.")
+    ap.add_argument("--port", type=int, default=9900)
+    add_behavior_args(ap)
+    args = ap.parse_args()
+    with FakeUpstreamServer(config_from_args(args), port=args.port) as srv:
+        print(f"[fake-upstreams] serving on {srv.base_url} (Ctrl-C to stop)", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
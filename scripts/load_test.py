@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""Offline load test: drive /api/check, /api/scan and the MCP idea_check tool against
+local fake upstreams at controlled concurrency.
+
+Nothing leaves the machine — scripts/fake_upstreams.py stands in for GitHub, Algolia,
+npm, PyPI, Stack Exchange, Anthropic and OpenAI (latency, error rate and rate limits are
+configurable per upstream). The app runs in-process on this event loop behind an ASGI
+transport with its normal lifespan (background workers included), against a throwaway
+SQLite DB; the fake upstreams run on their own thread + loop, so upstream latency is
+real socket I/O but never blocks the loop being measured.
+
+Reports per scenario: throughput, latency p50/p95/p99/max, status counts, and
+event-loop lag (p50/p99/max) sampled while the load ran — plus upstream request counts
+from the /metrics registry. --fail-p95-ms / --fail-lag-ms turn it into a gate
+(exit 1) for pre-deploy checks; --json emits a machine-readable report.
+
+Usage:
+    python scripts/load_test.py [--scenario check|scan|mcp|all] [--depth quick|deep]
+        [--concurrency 20] [--requests 200] [--latency-ms 80] [--error-rate 0.01]
+        [--rate-limit 0] [--upstream github:latency_ms=400,rate_limit_rps=10]
+        [--no-llm] [--embeddings] [--json] [--verbose] [--fail-p95-ms 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+import fake_upstreams  # noqa: E402
+
+_IDEA_PARTS = (
+    "ai expense tracker for freelancers", "split bills with roommates", "habit coach chatbot",
+    "recipe planner from fridge photos", "invoice generator for contractors",
+    "meeting notes summarizer", "pet sitter marketplace", "carbon footprint calculator",
+    "resume builder with ats scoring", "shopify analytics dashboard", "language tutor bot",
+    "real time collaborative whiteboard", "indie game analytics", "llm cost monitor",
+)
+
+
+def _ideas(n: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(_IDEA_PARTS)} {rng.choice(['for teams', 'with offline mode', 'in rust', ''])}".strip()
+            for _ in range(n)]
+
+
+def _pct(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[i]
+
+
+class LagSampler:
+    """Like metrics.LoopLagMonitor, but keeps raw samples for exact percentiles."""
+
+    def __init__(self, interval: float = 0.02) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - t0 - self.interval))
+
+    def __enter__(self) -> "LagSampler":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def _drive(name: str, call, ideas: list[str], concurrency: int) -> dict:
+    """Run `call(idea) -> status` over `ideas` with `concurrency` workers."""
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    it = iter(ideas)
+
+    async def worker() -> None:
+        for idea in it:  # shared iterator: each idea taken once
+            t0 = time.perf_counter()
+            try:
+                status = await call(idea)
+            except Exception as exc:  # harness must survive app bugs; they show up as errors
+                status = type(exc).__name__
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses[str(status)] += 1
+
+    with LagSampler() as lag:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    lags = sorted(s * 1000 for s in lag.samples)
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_pct(latencies, 0.50), 1),
+            "p95": round(_pct(latencies, 0.95), 1),
+            "p99": round(_pct(latencies, 0.99), 1),
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+        },
+        "loop_lag_ms": {
+            "p50": round(_pct(lags, 0.50), 2),
+            "p99": round(_pct(lags, 0.99), 2),
+            "max": round(lags[-1], 2) if lags else 0.0,
+        },
+        "statuses": dict(statuses),
+    }
+
+
+async def run(args: argparse.Namespace, base_url: str, cache_dir: Path) -> list[dict]:
+    fake_upstreams.point_at(base_url, llm=not args.no_llm, embeddings=args.embeddings)
+
+    import httpx
+
+    from api import main
+    from idea_reality_mcp import breaker, metrics, timeouts
+    from idea_reality_mcp.scoring import render_api
+    from idea_reality_mcp.tools import idea_check
+
+    # Repeatable runs: the MCP path's local Render API cache lives in the run's tmp dir
+    # (never the user's ~/.idea-reality), and host breakers / latency windows start fresh.
+    render_api.CACHE_DIR = cache_dir
+    render_api.reset()
+    breaker.reset_hosts()
+    timeouts.reset()
+
+    depth = args.depth
+    scenarios = ["check", "scan", "mcp"] if args.scenario == "all" else [args.scenario]
+    ideas = _ideas(args.requests)
+    n = 0
+
+    def _headers() -> dict:
+        nonlocal n
+        n += 1  # a distinct client IP per request: the per-IP daily limits are not under test
+        return {"x-forwarded-for": f"10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}"}
+
+    reports = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with main._lifespan(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+
+            async def check(idea: str):
+                r = await client.post("/api/check", json={"idea_text": idea, "depth": depth}, headers=_headers())
+                return r.status_code
+
+            async def scan(idea: str):
+                # first paint only — the deep upgrade continues as a background task, as in prod
+                r = await client.post("/api/scan", json={"idea_text": idea}, headers=_headers())
+                return r.status_code
+
+            async def mcp(idea: str):
+                result = await idea_check(idea, depth=depth)
+                return "ok" if isinstance(result, dict) and "reality_signal" in result else "bad"
+
+            calls = {"check": check, "scan": scan, "mcp": mcp}
+            for name in scenarios:
+                before = dict(metrics.UPSTREAM_REQUESTS._values)
+                report = await _drive(name, calls[name], ideas, args.concurrency)
+                report["upstream_requests"] = {
+                    f"{src}:{status}": int(v - before.get((src, status), 0))
+                    for (src, status), v in sorted(metrics.UPSTREAM_REQUESTS._values.items())
+                    if v - before.get((src, status), 0)
+                }
+                reports.append(report)
+                # let /api/scan deep upgrades finish before the next scenario starts
+                if main._scan_tasks:
+                    await asyncio.wait(list(main._scan_tasks), timeout=120)
+    return reports
+
+
+def _print(report: dict) -> None:
+    lat, lag = report["latency_ms"], report["loop_lag_ms"]
+    print(f"[load] {report['scenario']}: {report['requests']} req @ c={report['concurrency']} "
+          f"in {report['elapsed_s']}s -> {report['throughput_rps']} req/s")
+    print(f"[load]   latency ms  p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} max={lat['max']}")
+    print(f"[load]   loop lag ms p50={lag['p50']} p99={lag['p99']} max={lag['max']}")
+    print(f"[load]   statuses {report['statuses']}")
+    if report.get("upstream_requests"):
+        print(f"[load]   upstream {report['upstream_requests']}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Offline load test against fake upstreams.")
+    ap.add_argument("--scenario", choices=("check", "scan", "mcp", "all"), default="all")
+    ap.add_argument("--depth", choices=("quick", "deep"), default="quick")
+    ap.add_argument("--concurrency", type=int, default=20)
+    ap.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    ap.add_argument("--no-llm", action="store_true", help="no ANTHROPIC_API_KEY: dictionary + template paths")
+    ap.add_argument("--embeddings", action="store_true", help="enable OpenAI embeddings (fake) for crowd search")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    ap.add_argument("--verbose", action="store_true", help="keep app logging (fallback tracebacks etc.)")
+    ap.add_argument("--fail-p95-ms", type=float, default=0.0, help="exit 1 if any scenario p95 exceeds this")
+    ap.add_argument("--fail-lag-ms", type=float, default=0.0, help="exit 1 if any scenario loop-lag p99 exceeds this")
+    fake_upstreams.add_behavior_args(ap)
+    args = ap.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.ERROR)  # fallback paths log per request; keep the report readable
+
+    # Isolated state: throwaway SQLite DB and local cache dir, no Turso, no shared
+    # rate-limit store, no local package-name indexes.
+    with tempfile.TemporaryDirectory(prefix="idea-load-") as tmp:
+        os.environ["SCORE_DB_PATH"] = os.path.join(tmp, "load.db")
+        os.environ["IDEA_REALITY_CACHE_DIR"] = os.path.join(tmp, "cache")
+        for var in ("TURSO_DATABASE_URL", "TURSO_AUTH_TOKEN", "RATE_LIMIT_DB",
+                    "IDEA_REALITY_PYPI_INDEX", "IDEA_REALITY_NPM_INDEX"):
+            os.environ.pop(var, None)
+
+        with fake_upstreams.FakeUpstreamServer(fake_upstreams.config_from_args(args)) as srv:
+            reports = asyncio.run(run(args, srv.base_url, Path(tmp) / "cache"))
+
+    if args.json:
+        print(json.dumps({"upstream": srv.base_url, "scenarios": reports}, indent=2))
+    else:
+        for r in reports:
+            _print(r)
+
+    failed = False
+    for r in reports:
+        if args.fail_p95_ms and r["latency_ms"]["p95"] > args.fail_p95_ms:
+            print(f"FAIL: {r['scenario']} p95 {r['latency_ms']['p95']}ms > {args.fail_p95_ms}ms", file=sys.stderr)
+            failed = True
+        if args.fail_lag_ms and r["loop_lag_ms"]["p99"] > args.fail_lag_ms:
+            print(f"FAIL: {r['scenario']} loop lag p99 {r['loop_lag_ms']['p99']}ms > {args.fail_lag_ms}ms",
+                  file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
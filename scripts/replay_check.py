@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""Record a reality check's upstream traffic to a cassette, then replay it offline.
+
+    # once, with network (and tokens, if the live run should use them)
+    python scripts/replay_check.py record cassettes/habit.jsonl.gz "habit tracker for teams" --depth deep
+    # any number of times, no network, identical upstream responses
+    python scripts/replay_check.py replay cassettes/habit.jsonl.gz "habit tracker for teams" --depth deep \
+        [--latency recorded|<ms>] [--repeat 20] [--profile out.pstats]
+
+Runs the MCP `idea_check` pipeline (dictionary keywords + expand_idea + sources +
+compute_signal). A replay reproduces the recorded score exactly as long as the code
+issues the same requests; misses are reported. --profile writes cProfile stats for the
+replayed runs (open with `python -m pstats out.pstats`), so profiling sessions are
+repeatable and free of network noise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from idea_reality_mcp import cassette  # noqa: E402
+from idea_reality_mcp.tools import idea_check  # noqa: E402
+
+
+async def _run(idea: str, depth: str, repeat: int) -> tuple[dict, float]:
+    started = time.perf_counter()
+    result: dict = {}
+    for _ in range(repeat):
+        result = await idea_check(idea, depth=depth)
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Record / replay one reality check.")
+    ap.add_argument("mode", choices=("record", "replay", "auto"))
+    ap.add_argument("cassette", help="cassette path (.jsonl or .jsonl.gz)")
+    ap.add_argument("idea", help="idea text")
+    ap.add_argument("--depth", choices=("quick", "deep"), default="quick")
+    ap.add_argument("--latency", default="0", help="replay latency: 0, 'recorded' or ms per request")
+    ap.add_argument("--repeat", type=int, default=1, help="runs (replay mode) — averaged")
+    ap.add_argument("--profile", help="write cProfile stats for the runs to this path")
+    args = ap.parse_args()
+
+    latency = args.latency if args.latency == "recorded" else float(args.latency)
+    repeat = 1 if args.mode == "record" else max(1, args.repeat)
+    prof = cProfile.Profile() if args.profile else None
+
+    with cassette.use(args.cassette, mode=args.mode, latency=latency) as cas:
+        if prof:
+            prof.enable()
+        result, per_run = asyncio.run(_run(args.idea, args.depth, repeat))
+        if prof:
+            prof.disable()
+            prof.dump_stats(args.profile)
+
+    print(f"[cassette] {args.mode} {args.cassette}: recorded={cas.recorded} hits={cas.hits} misses={cas.misses}")
+    print(f"[cassette] reality_signal={result.get('reality_signal')} "
+          f"duplicate_likelihood={result.get('duplicate_likelihood')} "
+          f"sources={result.get('meta', {}).get('sources_used')}")
+    print(f"[cassette] {per_run * 1000:.1f} ms per run over {repeat} run(s)")
+    if prof:
+        print(f"[cassette] profile written to {args.profile}")
+    return 1 if cas.misses else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
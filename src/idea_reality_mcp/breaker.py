@@ -0,0 +1,201 @@
+"""Circuit breakers — stop calling a dependency that keeps failing.
+
+Each failing call to the Render API costs up to its 5s timeout in dead time; when the
+API is down (cold start gone wrong, daily rate limit hit, outage) every check pays it
+again. The same holds for every upstream host: with Algolia or Stack Exchange down, a
+serial adapter waits the full timeout once per keyword. A breaker counts failures:
+
+- closed     calls go through; `threshold` consecutive failures open it — or, with a
+             `window`, `threshold` failures making up at least `failure_rate` of the
+             last `window` outcomes (catches flapping hosts)
+- open       calls fail fast (allow() is False) for `cooldown_s`
+- half_open  after the cooldown one trial call goes through; success closes the
+             breaker, failure re-opens it for another cooldown
+
+    b = CircuitBreaker("expand_idea", threshold=3, cooldown_s=60)
+    if not b.allow():
+        return None                 # fail fast, no network
+    ok = await call()
+    b.record_success() if ok else b.record_failure()
+
+Upstream hosts: `for_host(host)` is the registry shared by every source adapter, and
+BreakerTransport (in the upstream.transport() stack) consults it per request. While a
+host's breaker is open its requests raise CircuitOpenError — an httpx.ConnectError, so
+adapters degrade as on any connection error, and the ones with per-query evidence
+record it as "skipped" (skipped_evidence()). Failures are transport errors (timeouts,
+refused / reset connections) and 5xx responses; 4xx (404s, rate limits) mean the host
+is up.
+
+Single event-loop state, no locks (like the rate limiter and metrics registry).
+
+Env:
+- IDEA_REALITY_BREAKER_FAILURES  (upstream host: failures that open it, default 3)
+- IDEA_REALITY_BREAKER_COOLDOWN  (upstream host: seconds open before a probe, default 30)
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from typing import Callable
+
+import httpx
+
+from .metrics import counter
+
+BREAKER_TRANSITIONS = counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes", ("name", "state")
+)
+BREAKER_REJECTED = counter(
+    "circuit_breaker_rejected_total", "Calls failed fast by an open circuit breaker", ("name",)
+)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a cooldown and a single half-open trial."""
+
+    def __init__(
+        self, name: str, threshold: int = 3, cooldown_s: float = 60.0, clock: Callable[[], float] = time.monotonic,
+        *, window: int | None = None, failure_rate: float = 0.5,
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.cooldown_s = cooldown_s
+        self.failure_rate = failure_rate
+        self._outcomes: deque[bool] | None = deque(maxlen=window) if window else None
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def _set(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            BREAKER_TRANSITIONS.inc(self.name, state)
+
+    def allow(self) -> bool:
+        """True if a call may go out now (claims the trial slot when half-open)."""
+        if self.state == OPEN and self._clock() - self._opened_at >= self.cooldown_s:
+            self._set(HALF_OPEN)
+            self._trial_running = False
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        BREAKER_REJECTED.inc(self.name)
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial_running = False
+        if self._outcomes is not None:
+            if self.state == HALF_OPEN:
+                self._outcomes.clear()
+            self._outcomes.append(False)
+        self._set(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_running = False
+        tripped = self.failures >= self.threshold
+        if self._outcomes is not None:
+            self._outcomes.append(True)
+            failed = sum(self._outcomes)
+            tripped = tripped or (failed >= self.threshold and failed / len(self._outcomes) >= self.failure_rate)
+        if self.state == HALF_OPEN or tripped:
+            self._opened_at = self._clock()
+            self._set(OPEN)
+
+    def release(self) -> None:
+        """A call that was allowed ended without an outcome (cancelled): free the
+        half-open trial slot so the next call can probe."""
+        self._trial_running = False
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a trial call through (0 otherwise)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.cooldown_s - (self._clock() - self._opened_at))
+
+
+# ---------------------------------------------------------------------------
+# Upstream hosts
+# ---------------------------------------------------------------------------
+
+HOST_FAILURES = int(os.environ.get("IDEA_REALITY_BREAKER_FAILURES", "3"))
+HOST_COOLDOWN_S = float(os.environ.get("IDEA_REALITY_BREAKER_COOLDOWN", "30"))
+HOST_WINDOW = 20
+
+_hosts: dict[str, CircuitBreaker] = {}
+
+
+def for_host(host: str) -> CircuitBreaker:
+    """The shared breaker for one upstream host (created on first use)."""
+    b = _hosts.get(host)
+    if b is None:
+        b = _hosts[host] = CircuitBreaker(
+            host, threshold=HOST_FAILURES, cooldown_s=HOST_COOLDOWN_S, window=HOST_WINDOW,
+        )
+    return b
+
+
+def host_states() -> dict[str, str]:
+    return {host: b.state for host, b in _hosts.items()}
+
+
+def reset_hosts() -> None:
+    _hosts.clear()
+
+
+class CircuitOpenError(httpx.ConnectError):
+    """Request not sent: the host's breaker is open."""
+
+    def __init__(self, host: str, retry_in: float, request: httpx.Request) -> None:
+        super().__init__(f"circuit open for {host} (retry in {retry_in:.0f}s)", request=request)
+        self.host = host
+        self.retry_in = retry_in
+
+
+def skipped_evidence(source: str, query: str, exc: CircuitOpenError) -> dict:
+    """Evidence item for a query not sent because its host's breaker is open."""
+    return {
+        "source": source,
+        "type": "skipped",
+        "query": query,
+        "count": 0,
+        "detail": f"Skipped '{query}': {exc.host} is failing (retry in {exc.retry_in:.0f}s)",
+    }
+
+
+class BreakerTransport(httpx.AsyncBaseTransport):
+    """Fail fast while the request's host breaker is open; feed it every outcome."""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport) -> None:
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        b = for_host(host)
+        if not b.allow():
+            raise CircuitOpenError(host, b.retry_in(), request)
+        try:
+            response = await self.inner.handle_async_request(request)
+        except httpx.TransportError:
+            b.record_failure()
+            raise
+        except BaseException:
+            b.release()
+            raise
+        if response.status_code >= 500:
+            b.record_failure()
+        else:
+            b.record_success()
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -0,0 +1,257 @@
+"""Record / replay of upstream HTTP traffic ("cassettes") at the httpx transport layer.
+
+Every upstream client (source adapters, MCP client helpers, api/report.py) is built on
+`upstream.transport(source)`, which includes a CassetteTransport. With no cassette
+active it is a pass-through. With one active:
+
+- record: requests go to the network; each response (status, content-type, body,
+  elapsed) is appended to the cassette file as one JSON line.
+- replay: responses come from the cassette — no network at all. A request with no
+  recording fails like a connection error (the adapters' normal error path), so a
+  replayed run is deterministic even when it diverges.
+- auto:   replay what is recorded, record what is not.
+
+Requests are keyed by method + URL (query params sorted, credentials dropped, unix
+timestamps in filters masked) + body (canonical JSON when it parses). Headers are not part of the key and are never stored,
+so tokens stay out of cassettes. Repeated requests with one key replay their recorded
+responses in order, then repeat the last (a 403-then-200 retry replays faithfully).
+
+Replay latency: 0 by default (full speed, for benchmarks / CI); "recorded" sleeps the
+originally observed time; a number sleeps that many ms per request (profiling).
+
+Activate with env (read on the first upstream request, not at import — a bad setting
+must not stop the MCP server from starting) or in code:
+
+    with cassette.use("tests/cassettes/habit.jsonl", mode="replay"):
+        await idea_check("habit tracker")
+
+Env:
+- IDEA_REALITY_CASSETTE          (path; .gz is gzip-compressed)
+- IDEA_REALITY_CASSETTE_MODE     (record | replay | auto, default replay)
+- IDEA_REALITY_CASSETTE_LATENCY  (0 | recorded | <ms>, default 0)
+
+A bad env config (missing replay file, unknown mode, malformed latency) is logged and
+every upstream request then fails like a connection error, so a run meant to be offline
+never reaches the network by accident.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import IO, Iterator
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MODES = ("record", "replay", "auto")
+_SECRET_PARAMS = frozenset({"key", "api_key", "apikey", "access_token", "token", "client_secret"})
+# "created_at_i>1760889063": date windows computed from the clock (HN) must not change
+# the key, or a cassette stops replaying the day after it was recorded.
+_EPOCH_RE = re.compile(r"(?<=[<>=])\d{10}\b")
+
+
+def _canonical_url(url: httpx.URL) -> str:
+    parts = urlsplit(str(url))
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in _SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def _key_url(url: httpx.URL) -> str:
+    return _EPOCH_RE.sub("<ts>", unquote(_canonical_url(url)))
+
+
+def _canonical_body(content: bytes) -> str:
+    if not content:
+        return ""
+    try:
+        return json.dumps(json.loads(content), sort_keys=True, separators=(",", ":"))
+    except (ValueError, UnicodeDecodeError):
+        return hashlib.sha256(content).hexdigest()
+
+
+def request_key(request: httpx.Request) -> str:
+    raw = "\n".join((request.method, _key_url(request.url), _canonical_body(request.content)))
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+class Cassette:
+    """One cassette file: key -> recorded responses, appended as JSON lines."""
+
+    def __init__(self, path: str, mode: str = "replay", latency: str | float = 0) -> None:
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._entries: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._fh: IO[str] | None = None
+        if os.path.exists(path):
+            self._load()
+        elif mode == "replay":
+            raise FileNotFoundError(f"cassette {path} does not exist (record it first)")
+
+    def _open(self, mode: str) -> IO[str]:
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self) -> None:
+        with self._open("r") as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._entries.values())
+
+    # -- replay ------------------------------------------------------------------------
+
+    def lookup(self, key: str) -> dict | None:
+        entries = self._entries.get(key)
+        if not entries:
+            return None
+        i = self._cursor.get(key, 0)
+        self._cursor[key] = i + 1
+        return entries[min(i, len(entries) - 1)]
+
+    def replay_delay(self, entry: dict) -> float:
+        if self.latency == "recorded":
+            return entry.get("elapsed_ms", 0) / 1000
+        return float(self.latency or 0) / 1000
+
+    # -- record ------------------------------------------------------------------------
+
+    def record(self, source: str, request: httpx.Request, response: httpx.Response, elapsed_ms: float) -> None:
+        body = response.content
+        try:
+            text, encoding = body.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            text, encoding = base64.b64encode(body).decode(), "base64"
+        entry = {
+            "key": request_key(request),
+            "source": source,
+            "method": request.method,
+            "url": _canonical_url(request.url),
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+            "encoding": encoding,
+            "body": text,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+        self._entries.setdefault(entry["key"], []).append(entry)
+        if self._fh is None:
+            self._fh = self._open("a")
+        self._fh.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+        self._fh.flush()
+        self.recorded += 1
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def _response_from(entry: dict, request: httpx.Request) -> httpx.Response:
+    body = entry["body"]
+    content = base64.b64decode(body) if entry.get("encoding") == "base64" else body.encode("utf-8")
+    headers = {"content-type": entry["content_type"]} if entry.get("content_type") else {}
+    return httpx.Response(entry["status"], headers=headers, content=content, request=request)
+
+
+# ---------------------------------------------------------------------------
+# Active cassette + transport
+# ---------------------------------------------------------------------------
+
+_active: Cassette | None = None
+_env_loaded = False
+_env_error: str | None = None
+
+
+def active() -> Cassette | None:
+    _load_env()
+    return _active
+
+
+@contextlib.contextmanager
+def use(path: str, mode: str = "replay", latency: str | float = 0) -> Iterator[Cassette]:
+    """Activate a cassette for every upstream client in the process."""
+    global _active
+    _load_env()
+    previous, cas = _active, Cassette(path, mode, latency)
+    _active = cas
+    try:
+        yield cas
+    finally:
+        cas.close()
+        _active = previous
+
+
+def _load_env() -> None:
+    """Activate the env-configured cassette (first call only)."""
+    global _active, _env_loaded, _env_error
+    if _env_loaded:
+        return
+    _env_loaded = True
+    path = (os.environ.get("IDEA_REALITY_CASSETTE") or "").strip()
+    if not path:
+        return
+    mode = (os.environ.get("IDEA_REALITY_CASSETTE_MODE") or "replay").strip()
+    latency = (os.environ.get("IDEA_REALITY_CASSETTE_LATENCY") or "0").strip()
+    try:
+        _active = Cassette(path, mode, latency if latency == "recorded" else float(latency))
+    except (OSError, ValueError) as exc:
+        _env_error = f"IDEA_REALITY_CASSETTE={path}: {exc}"
+        logger.error("[CASSETTE] %s — upstream requests will fail", _env_error)
+        return
+    logger.warning("[CASSETTE] %s mode on %s (%d recorded responses)", mode, path, len(_active))
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """Pass-through unless a cassette is active; then record or replay."""
+
+    def __init__(self, source: str, inner: httpx.AsyncBaseTransport) -> None:
+        self.source = source
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cas = active()
+        if cas is None:
+            if _env_error is not None:
+                raise httpx.ConnectError(f"cassette unavailable: {_env_error}", request=request)
+            return await self.inner.handle_async_request(request)
+        if cas.mode != "record":
+            entry = cas.lookup(request_key(request))
+            if entry is not None:
+                cas.hits += 1
+                delay = cas.replay_delay(entry)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                return _response_from(entry, request)
+            if cas.mode == "replay":
+                cas.misses += 1
+                logger.warning("[CASSETTE] miss %s %s", request.method, _canonical_url(request.url))
+                raise httpx.ConnectError(f"cassette miss: {request.method} {request.url}", request=request)
+        started = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        await response.aread()
+        cas.record(self.source, request, response, (time.perf_counter() - started) * 1000)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
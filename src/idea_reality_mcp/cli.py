@@ -24,14 +24,55 @@ def setup(force: bool) -> None:
 
 @cli.command()
 @click.option("--full", is_flag=True, help="Run full checks including external connectivity.")
-def doctor(full: bool) -> None:
+@click.option("--startup", is_flag=True, help="Measure MCP server import time per module against a budget.")
+@click.option("--budget-ms", type=float, default=None, help="Start-up budget in ms (default 2500, env IDEA_REALITY_STARTUP_BUDGET_MS).")
+def doctor(full: bool, startup: bool, budget_ms: float | None) -> None:
     """Health check for idea-reality-mcp installation."""
     from .onboarding.doctor import run_doctor
 
-    ok = run_doctor(full=full)
+    ok = run_doctor(full=full, startup=startup, budget_ms=budget_ms)
     raise SystemExit(0 if ok else 1)
 
 
+@cli.command("pypi-index")
+def pypi_index() -> None:
+    """Download the local PyPI project-name snapshot.
+
+    Checks use it when IDEA_REALITY_PYPI_INDEX=1 (and refresh it daily).
+    """
+    import asyncio
+
+    import httpx
+
+    from .sources import pypi_index as index
+
+    try:
+        names = asyncio.run(index.refresh())
+    except (httpx.HTTPError, OSError, ValueError, KeyError) as exc:
+        click.echo(f"\nDownload failed: {exc}\n")
+        raise SystemExit(1)
+    click.echo(f"\n{len(names)} PyPI project names -> {index.path()}\n")
+
+
+@cli.command("npm-index")
+@click.argument("dump", type=click.File("r", encoding="utf-8"))
+def npm_index(dump) -> None:
+    """Build the local npm name / keyword index from a registry DUMP.
+
+    DUMP is CouchDB _all_docs / _changes output with include_docs=true, or JSON
+    lines of package documents ("-" reads stdin). Checks use the index when
+    IDEA_REALITY_NPM_INDEX=1.
+    """
+    from .sources import npm_index as index
+
+    try:
+        built = index.build_from_dump(dump)
+    except OSError as exc:
+        click.echo(f"\nWrite failed: {exc}\n")
+        raise SystemExit(1)
+    click.echo(f"\n{len(built)} npm packages, {len(built.terms)} terms -> {index.path()}\n")
+
+
 @cli.command()
 @click.argument("platform", required=False, default=None)
 def config(platform: str | None) -> None:
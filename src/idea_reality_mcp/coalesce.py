@@ -0,0 +1,177 @@
+"""Shared upstream scope: request coalescing + one concurrency limit and request budget
+for a group of requests — one idea_check (dictionary and core-concept searches), or a
+whole idea_check_batch.
+
+Brainstorming variants of one idea produce overlapping keyword queries ("habit
+tracker", "habit tracker app", ...), and each adapter issues one upstream GET per
+keyword. Inside a scope, identical GETs are sent once: concurrent duplicates wait on
+the in-flight request, later ones are served from the scope's memo. Every request that
+does reach the network takes a slot from one shared semaphore and one shared budget;
+once the budget is spent, further requests fail like a connection error
+(BudgetExhaustedError) and the adapters record error evidence as usual — so a caller
+that compares results must know which ones were starved: rejections() counts them for
+everything awaited inside it.
+
+    with coalesce.scope(concurrency=8, max_requests=400) as s:
+        results = await asyncio.gather(*(check(idea) for idea in ideas))
+    s.stats()  # {"requests": 31, "coalesced": 87, "rejected": 0, ...}
+
+Outside a scope CoalescingTransport is a pass-through. Keys are cassette.request_key
+(method + canonical URL + body, clock-derived filters masked). Only GET/HEAD are
+coalesced; only 2xx / 404 responses are memoised — rate limits and server errors are
+shared while in flight, then retried normally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+from typing import Iterator
+
+import httpx
+
+from .cassette import request_key
+from .metrics import counter
+
+UPSTREAM_COALESCED = counter(
+    "upstream_coalesced_total", "Upstream requests served from a shared scope (not sent)", ("source",)
+)
+
+_DROP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+_Snapshot = tuple[int, list[tuple[str, str]], bytes]
+
+
+class UpstreamScope:
+    """In-flight table, memo, semaphore and budget shared by one group of checks."""
+
+    def __init__(self, concurrency: int | None = 8, max_requests: int | None = None) -> None:
+        self.concurrency = concurrency
+        self.max_requests = max_requests
+        self._limit = asyncio.Semaphore(concurrency) if concurrency else contextlib.nullcontext()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._memo: dict[str, _Snapshot] = {}
+        self.requests = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "concurrency": self.concurrency,
+            "max_requests": self.max_requests,
+        }
+
+
+class BudgetExhaustedError(httpx.ConnectError):
+    """Request not sent: the scope's request budget is spent."""
+
+
+class Rejections:
+    """Budget rejections seen by one part of a scope (see rejections())."""
+
+    __slots__ = ("count",)
+
+    def __init__(self) -> None:
+        self.count = 0
+
+
+_current: contextvars.ContextVar[UpstreamScope | None] = contextvars.ContextVar("upstream_scope", default=None)
+_rejections: contextvars.ContextVar[Rejections | None] = contextvars.ContextVar("upstream_rejections", default=None)
+
+
+def current() -> UpstreamScope | None:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def scope(concurrency: int | None = 8, max_requests: int | None = None) -> Iterator[UpstreamScope]:
+    """Share coalescing, concurrency and budget across everything awaited inside
+    (tasks created inside inherit the scope). concurrency=None: no limit."""
+    s = UpstreamScope(concurrency, max_requests)
+    token = _current.set(s)
+    try:
+        yield s
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def rejections() -> Iterator[Rejections]:
+    """Count the budget rejections of everything awaited inside (e.g. one idea of a
+    batch) — its results are incomplete when the count is non-zero."""
+    r = Rejections()
+    token = _rejections.set(r)
+    try:
+        yield r
+    finally:
+        _rejections.reset(token)
+
+
+def _snapshot(response: httpx.Response) -> _Snapshot:
+    headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS]
+    return response.status_code, headers, response.content
+
+
+def _response(snap: _Snapshot, request: httpx.Request) -> httpx.Response:
+    status, headers, content = snap
+    return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+class CoalescingTransport(httpx.AsyncBaseTransport):
+    """Pass-through unless an UpstreamScope is active; then dedupe + throttle."""
+
+    def __init__(self, source: str, inner: httpx.AsyncBaseTransport) -> None:
+        self.source = source
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        s = _current.get()
+        if s is None or request.method not in ("GET", "HEAD"):
+            return await self.inner.handle_async_request(request)
+
+        key = request_key(request)
+        snap = s._memo.get(key)
+        if snap is None and key in s._inflight:
+            snap = await asyncio.shield(s._inflight[key])
+        if snap is not None:
+            s.coalesced += 1
+            UPSTREAM_COALESCED.inc(self.source)
+            return _response(snap, request)
+
+        if s.max_requests is not None and s.requests >= s.max_requests:
+            s.rejected += 1
+            tally = _rejections.get()
+            if tally is not None:
+                tally.count += 1
+            raise BudgetExhaustedError(f"upstream budget of {s.max_requests} requests exhausted", request=request)
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        s._inflight[key] = fut
+        s.requests += 1
+        try:
+            async with s._limit:
+                response = await self.inner.handle_async_request(request)
+                await response.aread()
+            snap = _snapshot(response)
+            if 200 <= response.status_code < 300 or response.status_code == 404:
+                s._memo[key] = snap
+            fut.set_result(snap)
+            return _response(snap, request)
+        except BaseException as exc:
+            # waiters see an upstream error, never the originator's cancellation
+            if isinstance(exc, asyncio.CancelledError):
+                exc_for_waiters: BaseException = httpx.ConnectError("coalesced request cancelled", request=request)
+            else:
+                exc_for_waiters = exc
+            fut.set_exception(exc_for_waiters)
+            fut.exception()  # retrieved: no "never retrieved" warning when nobody waited
+            raise
+        finally:
+            s._inflight.pop(key, None)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
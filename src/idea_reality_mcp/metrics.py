@@ -0,0 +1,332 @@
+"""Prometheus-style metrics — zero-dependency registry + text exposition (format 0.0.4).
+
+No prometheus_client: the Render deployment installs only what pyproject lists, and the
+handful of metric types needed here are a few dicts. Everything is single-process,
+event-loop-thread state (like the rate limiter), so there are no locks; an observation
+is a dict lookup + a bisect + a couple of adds.
+
+    REQUESTS = counter("http_requests_total", "HTTP requests", ("method", "route", "status"))
+    REQUESTS.inc("GET", "/api/stats", "200")
+    render()  # -> text for GET /metrics
+
+Wiring points provided here:
+- MetricsMiddleware  — ASGI middleware: request count + latency per route template.
+- MeteredTransport   — httpx transport layer: upstream latency + status per source
+  (see upstream.transport()).
+- LoopLagMonitor     — background task measuring event-loop scheduling lag.
+- register_callback() — values owned elsewhere (cache sizes, limiter counters), read
+  only at scrape time so the hot path pays nothing.
+Per-stage check timings (idea_reality_mcp.timing) are exported as
+`idea_check_stage_duration_seconds`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+import time
+from typing import Any, Callable, Iterable
+
+import httpx
+
+from . import timing
+
+logger = logging.getLogger(__name__)
+
+# Seconds — request / upstream latency (5ms .. 30s).
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+LAG_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ---------------------------------------------------------------------------
+# Metric types
+# ---------------------------------------------------------------------------
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels: Any, n: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + n
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, v in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(v)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, *labels: Any, value: float) -> None:
+        self._values[labels] = value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., +Inf], sum, count
+
+    def observe(self, value: float, *labels: Any) -> None:
+        s = self._series.get(labels)
+        if s is None:
+            s = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        s[0][bisect.bisect_left(self.buckets, value)] += 1
+        s[1] += value
+        s[2] += 1
+
+    def count(self, *labels: Any) -> int:
+        s = self._series.get(labels)
+        return s[2] if s else 0
+
+    def samples(self) -> Iterable[str]:
+        for labels, (counts, total, n) in sorted(self._series.items()):
+            yield from _histogram_lines(self.name, self.labelnames, labels, self.buckets, counts, total, n)
+
+
+def _histogram_lines(name, labelnames, labels, buckets, counts, total, n) -> Iterable[str]:
+    cum = 0
+    for bound, c in zip(buckets + (math.inf,), counts):
+        cum += c
+        le = 'le="' + _fmt(bound) + '"'
+        yield f"{name}_bucket{_labels(labelnames, labels, le)} {cum}"
+    yield f"{name}_sum{_labels(labelnames, labels)} {_fmt(round(total, 6))}"
+    yield f"{name}_count{_labels(labelnames, labels)} {n}"
+
+
+class CallbackMetric:
+    """Counter / gauge whose samples are read from `fn` at scrape time.
+
+    `fn()` returns a number (no labels) or {label_tuple: number}.
+    """
+
+    def __init__(
+        self, name: str, help: str, type: str, fn: Callable[[], Any], labelnames: tuple[str, ...] = ()
+    ) -> None:
+        self.name, self.help, self.type, self.labelnames, self.fn = name, help, type, labelnames, fn
+
+    def samples(self) -> Iterable[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            logger.exception("[METRICS] callback for %s failed", self.name)
+            return
+        if isinstance(value, dict):
+            for labels, v in sorted(value.items()):
+                labels = labels if isinstance(labels, tuple) else (labels,)
+                yield f"{self.name}{_labels(self.labelnames, labels)} {_fmt(v)}"
+        elif value is not None:
+            yield f"{self.name} {_fmt(value)}"
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+_registry: dict[str, Any] = {}
+
+
+def _register(metric):
+    existing = _registry.get(metric.name)
+    if existing is not None and not isinstance(metric, CallbackMetric):
+        return existing  # re-import / repeated definition: share the series
+    _registry[metric.name] = metric
+    return metric
+
+
+def counter(name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, help, labelnames))
+
+
+def gauge(name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+    return _register(Gauge(name, help, labelnames))
+
+
+def histogram(
+    name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+) -> Histogram:
+    return _register(Histogram(name, help, labelnames, buckets))
+
+
+def register_callback(
+    name: str, help: str, fn: Callable[[], Any], *, type: str = "gauge", labelnames: tuple[str, ...] = ()
+) -> CallbackMetric:
+    """(Re)register a scrape-time metric; re-registering a name replaces it."""
+    return _register(CallbackMetric(name, help, type, fn, labelnames))
+
+
+def _stage_samples() -> Iterable[str]:
+    name = "idea_check_stage_duration_seconds"
+    buckets = tuple(b / 1000 for b in timing.BUCKETS_MS)
+    for stage, h in sorted(timing.histograms().items()):
+        yield from _histogram_lines(name, ("stage",), (stage,), buckets, h.counts, h.sum_ms / 1000, h.count)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    """Every registered metric in Prometheus text exposition format."""
+    out: list[str] = []
+    for name in sorted(_registry):
+        m = _registry[name]
+        out.append(f"# HELP {name} {m.help}")
+        out.append(f"# TYPE {name} {m.type}")
+        out.extend(m.samples())
+    out.append("# HELP idea_check_stage_duration_seconds Check pipeline stage duration")
+    out.append("# TYPE idea_check_stage_duration_seconds histogram")
+    out.extend(_stage_samples())
+    return "\n".join(out) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Built-in metrics + wiring helpers
+# ---------------------------------------------------------------------------
+
+HTTP_REQUESTS = counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status")
+)
+HTTP_LATENCY = histogram(
+    "http_request_duration_seconds", "HTTP request latency (until response start)", ("route",)
+)
+UPSTREAM_REQUESTS = counter(
+    "upstream_requests_total", "Requests to upstream sources", ("source", "status")
+)
+UPSTREAM_LATENCY = histogram(
+    "upstream_request_duration_seconds", "Upstream response latency (until headers)", ("source",)
+)
+LOOP_LAG = histogram("event_loop_lag_seconds", "Event-loop scheduling lag", buckets=LAG_BUCKETS)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware buffering). The route label is the
+    matched route template (`/report/{report_id}`), never the raw path, so cardinality
+    stays bounded; unmatched paths are all labelled `other`."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = [500]
+        observed = [False]
+
+        def _observe() -> None:
+            if observed[0]:
+                return
+            observed[0] = True
+            route = scope.get("route")
+            label = getattr(route, "path", None) or "other"
+            HTTP_LATENCY.observe(time.perf_counter() - started, label)
+            HTTP_REQUESTS.inc(scope.get("method", ""), label, str(status[0]))
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                await send(message)
+                _observe()  # latency to first byte — streamed bodies don't inflate it
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _observe()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """httpx transport wrapper recording upstream latency + status for `source`
+    (composed by upstream.transport())."""
+
+    def __init__(self, source: str, inner: httpx.AsyncBaseTransport) -> None:
+        self.source = source
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            resp = await self.inner.handle_async_request(request)
+        except httpx.TimeoutException:
+            UPSTREAM_REQUESTS.inc(self.source, "timeout")
+            raise
+        except Exception:
+            UPSTREAM_REQUESTS.inc(self.source, "error")
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, self.source)
+        UPSTREAM_REQUESTS.inc(self.source, str(resp.status_code))
+        return resp
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` seconds in a loop; the overshoot is how long ready callbacks
+    waited for the loop (blocking sync work on the event-loop thread shows up here)."""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - started - self.interval)
+            LOOP_LAG.observe(self.last_lag)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import os
+import subprocess
 import sys
 
 
@@ -193,6 +194,85 @@ def _check_rest_api() -> bool:
         return False
 
 
+# ---------------------------------------------------------------------------
+# Start-up budget (doctor --startup)
+# ---------------------------------------------------------------------------
+
+# Agents spawn the MCP server per session, so import time is user-visible. Budgets are
+# for `import idea_reality_mcp.server` in a fresh interpreter (what the MCP handshake
+# waits on); the pipeline itself is loaded on the first tool call.
+STARTUP_BUDGET_MS = float(os.environ.get("IDEA_REALITY_STARTUP_BUDGET_MS", "2500"))
+OWN_MODULES_BUDGET_MS = 30.0  # idea_reality_mcp's own modules, excluding dependencies
+
+_SERVER_IMPORT = "import idea_reality_mcp.server"
+_FIRST_CALL_IMPORT = _SERVER_IMPORT + "; from idea_reality_mcp import tools; tools._load()"
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, float]]:
+    """(module, self_ms) for each line of `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        rows.append((parts[2].strip(), int(parts[0]) / 1000))
+    return rows
+
+
+def measure_startup(code: str = _SERVER_IMPORT) -> dict:
+    """Run `code` in a fresh interpreter under -X importtime.
+
+    Returns total_ms (sum of per-module self time), packages (self time grouped by
+    top-level package) and own (self time per idea_reality_mcp module)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, timeout=120,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    rows = _parse_importtime(proc.stderr)
+    packages: dict[str, float] = {}
+    own: dict[str, float] = {}
+    for module, ms in rows:
+        root = module.split(".")[0]
+        packages[root] = packages.get(root, 0.0) + ms
+        if root == "idea_reality_mcp":
+            own[module] = ms
+    return {"total_ms": sum(ms for _, ms in rows), "packages": packages, "own": own}
+
+
+def _check_startup(budget_ms: float | None = None, top: int = 6) -> bool:
+    """Import time of the MCP server against STARTUP_BUDGET_MS / OWN_MODULES_BUDGET_MS."""
+    budget = budget_ms if budget_ms is not None else STARTUP_BUDGET_MS
+    try:
+        startup = measure_startup()
+        first_call = measure_startup(_FIRST_CALL_IMPORT)
+    except Exception as e:
+        _fail("Start-up import", str(e))
+        return False
+
+    total, own_total = startup["total_ms"], sum(startup["own"].values())
+    ok = total <= budget and own_total <= OWN_MODULES_BUDGET_MS
+    (_pass if total <= budget else _fail)("Server import", f"{total:.0f} ms (budget {budget:.0f} ms)")
+    (_pass if own_total <= OWN_MODULES_BUDGET_MS else _fail)(
+        "idea_reality_mcp modules", f"{own_total:.1f} ms (budget {OWN_MODULES_BUDGET_MS:.0f} ms)"
+    )
+
+    print("\n    By package (self time):")
+    for name, ms in sorted(startup["packages"].items(), key=lambda kv: -kv[1])[:top]:
+        print(f"      {name:<32} {ms:8.1f} ms")
+    print("    idea_reality_mcp modules:")
+    for name, ms in sorted(startup["own"].items(), key=lambda kv: -kv[1]):
+        print(f"      {name:<32} {ms:8.1f} ms")
+
+    deferred = {m: ms for m, ms in first_call["own"].items() if m not in startup["own"]}
+    print(f"    Deferred to first tool call: {first_call['total_ms'] - total:.0f} ms "
+          f"({len(deferred)} idea_reality_mcp modules + their dependencies)")
+    return ok
+
+
 # ---------------------------------------------------------------------------
 # Source URLs
 # ---------------------------------------------------------------------------
@@ -211,8 +291,9 @@ SOURCE_URLS = {
 # Public API
 # ---------------------------------------------------------------------------
 
-def run_doctor(full: bool = False) -> bool:
-    """Run health checks. Returns True if all core checks pass."""
+def run_doctor(full: bool = False, startup: bool = False, budget_ms: float | None = None) -> bool:
+    """Run health checks. Returns True if all core checks (and, with startup=True, the
+    start-up budget) pass."""
     print("\n  idea-reality-mcp doctor\n")
 
     print("  Core checks:")
@@ -232,6 +313,10 @@ def run_doctor(full: bool = False) -> bool:
         _check_anthropic_key()
         _check_rest_api()
 
+    if startup:
+        print("\n  Start-up checks:")
+        core_ok = _check_startup(budget_ms) and core_ok
+
     print()
     if core_ok:
         print(f"  {_green('All core checks passed.')}")
@@ -228,6 +228,15 @@ CHINESE_TECH_MAP: dict[str, str] = {
     "元素": "element",
 }
 
+# Lookup structures derived once at import instead of on every extract_keywords call.
+# Longest-first so compound terms (客戶關係, "natural language processing") win over
+# their substrings; sorted() is stable, so equal-length keys keep their table order.
+_CHINESE_TERMS_LONGEST_FIRST: tuple[tuple[str, str], ...] = tuple(
+    sorted(CHINESE_TECH_MAP.items(), key=lambda x: len(x[0]), reverse=True)
+)
+_COMPOUNDS_LONGEST_FIRST: tuple[str, ...] = tuple(sorted(COMPOUND_TERMS, key=len, reverse=True))
+_NON_ALNUM_RE = re.compile(r"[^a-zA-Z0-9\s]")
+
 
 def extract_keywords(idea_text: str) -> list[str]:
     """Extract search query variants — Stage A/B/C pipeline (v0.3).
@@ -244,9 +253,10 @@ def extract_keywords(idea_text: str) -> list[str]:
     # --- Stage A: Chinese/mixed-language mapping -----------------------------
     # Sort by key length (longest first) so compound Chinese terms like
     # 客戶關係 are matched before shorter substrings like 客戶.
-    for zh, en in sorted(CHINESE_TECH_MAP.items(), key=lambda x: len(x[0]), reverse=True):
-        if zh in text:
-            text = text.replace(zh, f" {en} ")
+    if not text.isascii():
+        for zh, en in _CHINESE_TERMS_LONGEST_FIRST:
+            if zh in text:
+                text = text.replace(zh, f" {en} ")
 
     lowered = text.lower()
 
@@ -257,13 +267,13 @@ def extract_keywords(idea_text: str) -> list[str]:
     # Extract compound terms before stripping punctuation
     found_compounds: list[str] = []
     remaining = lowered
-    for compound in sorted(COMPOUND_TERMS, key=len, reverse=True):
+    for compound in _COMPOUNDS_LONGEST_FIRST:
         if compound in remaining:
             found_compounds.append(compound)
             remaining = remaining.replace(compound, " ")
 
     # Tokenise: strip non-alphanumeric, minimum 2 chars
-    cleaned = re.sub(r"[^a-zA-Z0-9\s]", " ", remaining)
+    cleaned = _NON_ALNUM_RE.sub(" ", remaining)
     tokens = [w for w in cleaned.split() if len(w) > 1]
 
     # Stage A hard filter: STOP_WORDS + GENERIC_WORDS
@@ -284,7 +294,7 @@ def extract_keywords(idea_text: str) -> list[str]:
     if not all_tokens:
         # Fallback: strip any remaining non-ASCII chars and use whatever survives.
         # Avoids returning raw Chinese text as queries (would fail on English search engines).
-        ascii_fallback = re.sub(r"[^a-zA-Z0-9\s]", " ", idea_text.lower()).strip()
+        ascii_fallback = _NON_ALNUM_RE.sub(" ", idea_text.lower()).strip()
         ascii_tokens = [w for w in ascii_fallback.split() if len(w) > 1 and w not in STOP_WORDS]
         if ascii_tokens:
             return [" ".join(ascii_tokens[:5])] * 3
@@ -452,6 +462,19 @@ def _so_score(count: int) -> int:
     return _log_score(count, _K_SO)
 
 
+# Words too generic to count as a relevance match between an idea and a similar project.
+_SIMILAR_GENERIC_WORDS = frozenset({
+    "the", "and", "for", "with", "that", "this", "from", "your", "tool",
+    "app", "based", "using", "open", "source", "project", "system",
+    "new", "use", "can", "get", "all", "how", "what", "build",
+    "code", "data", "test", "file", "user", "list", "type", "node",
+    "free", "just", "like", "help", "need", "work", "make", "auto",
+    "best", "easy", "fast", "good", "high", "self", "real", "time",
+    "management", "service", "platform", "framework", "library",
+    "server", "client", "plugin", "module", "package",
+})
+
+
 def _filter_relevant_similars(
     similars: list[dict], idea_text: str, keywords: list[str]
 ) -> list[dict]:
@@ -479,17 +502,7 @@ def _filter_relevant_similars(
                 idea_words.add(word)
 
     # Remove generic words that match everything (tech + common)
-    generic = {
-        "the", "and", "for", "with", "that", "this", "from", "your", "tool",
-        "app", "based", "using", "open", "source", "project", "system",
-        "new", "use", "can", "get", "all", "how", "what", "build",
-        "code", "data", "test", "file", "user", "list", "type", "node",
-        "free", "just", "like", "help", "need", "work", "make", "auto",
-        "best", "easy", "fast", "good", "high", "self", "real", "time",
-        "management", "service", "platform", "framework", "library",
-        "server", "client", "plugin", "module", "package",
-    }
-    idea_words -= generic
+    idea_words -= _SIMILAR_GENERIC_WORDS
 
     if not idea_words:
         return similars
@@ -646,6 +659,44 @@ _DEEP_WEIGHTS = {
 }
 
 
+def provisional_signal(
+    depth: str,
+    *,
+    github_results: GitHubResults | None = None,
+    hn_results: HNResults | None = None,
+    npm_results: NpmResults | None = None,
+    pypi_results: PyPIResults | None = None,
+    ph_results: ProductHuntResults | None = None,
+    so_results: StackOverflowResults | None = None,
+) -> int | None:
+    """Reality signal from the sources that have answered so far (progress updates).
+
+    Same per-source scores and weights as compute_signal, renormalised over the
+    sources present (skipped ones excluded), without the temporal boost. Converges on
+    compute_signal's base score once every source is in. None until a source arrives.
+    """
+    weights = _QUICK_WEIGHTS if depth == "quick" else _DEEP_WEIGHTS
+    parts: list[tuple[int, float]] = []
+    if github_results is not None:
+        parts.append((_github_repo_score(github_results.total_repo_count), weights["github_repo"]))
+        parts.append((_github_star_score(github_results.max_stars), weights["github_star"]))
+    if hn_results is not None:
+        parts.append((_hn_score(hn_results.total_mentions), weights["hn"]))
+    if depth != "quick":
+        if npm_results is not None:
+            parts.append((_npm_score(npm_results.total_count), weights["npm"]))
+        if pypi_results is not None and not pypi_results.skipped:
+            parts.append((_pypi_score(pypi_results.total_count), weights["pypi"]))
+        if ph_results is not None and not ph_results.skipped:
+            parts.append((_ph_score(ph_results.total_count), weights["ph"]))
+        if so_results is not None and not getattr(so_results, "skipped", False):
+            parts.append((_so_score(so_results.total_count), weights["so"]))
+    total_w = sum(w for _, w in parts)
+    if not total_w:
+        return None
+    return int(sum(score * w for score, w in parts) / total_w)
+
+
 def compute_signal(
     idea_text: str,
     keywords: list[str],
@@ -8,13 +8,7 @@ JSON, missing keys) so the caller can proceed without expansion data.
 
 from __future__ import annotations
 
-import json
-import os
-
-import httpx
-
-_DEFAULT_API_URL = "https://idea-reality-mcp.onrender.com"
-_TIMEOUT_SECONDS = 5.0
+from . import render_api
 
 _REQUIRED_KEYS = frozenset({
     "expanded_description",
@@ -25,36 +19,24 @@ _REQUIRED_KEYS = frozenset({
 })
 
 
+def _parse(data) -> dict | None:
+    if not isinstance(data, dict) or not _REQUIRED_KEYS.issubset(data.keys()):
+        return None
+    return data
+
+
 async def expand_idea(idea_text: str) -> dict | None:
     """Ask the Render API to expand an idea into structured fields.
 
+    Results are cached locally and the call is skipped while the API keeps failing
+    (see render_api).
+
     Returns:
         A dict with keys: expanded_description, core_concept, differentiator,
         target_user, category.  Or *None* if the request fails for any reason
         (timeout, 429, 5xx, invalid response, missing keys, etc.).
     """
-    api_url = os.environ.get("IDEA_REALITY_API_URL", _DEFAULT_API_URL)
-    url = f"{api_url}/api/expand-idea"
-
-    try:
-        async with httpx.AsyncClient(timeout=_TIMEOUT_SECONDS) as client:
-            resp = await client.post(url, json={"idea_text": idea_text})
-
-        if resp.status_code != 200:
-            return None
-
-        data = resp.json()
-
-        if not isinstance(data, dict):
-            return None
-
-        if not _REQUIRED_KEYS.issubset(data.keys()):
-            return None
-
-        return data
-
-    except (httpx.HTTPError, json.JSONDecodeError, KeyError, TypeError, ValueError):
-        return None
+    return await render_api.post_idea("expand_idea", "/api/expand-idea", idea_text, _parse)
 
 
 def generate_platform_queries(
@@ -8,46 +8,33 @@ dictionary-based ``extract_keywords()`` pipeline.
 
 from __future__ import annotations
 
-import json
-import os
+from . import render_api
 
-import httpx
 
-_DEFAULT_API_URL = "https://idea-reality-mcp.onrender.com"
-_TIMEOUT_SECONDS = 5.0
+def _parse(data) -> list[str] | None:
+    keywords = data.get("keywords")
+
+    if not isinstance(keywords, list) or len(keywords) < 2:
+        return None
+
+    # Ensure every element is a non-empty string
+    cleaned = [str(k).strip() for k in keywords if str(k).strip()]
+    # Normalize: replace hyphens with spaces for better search API compatibility
+    cleaned = [k.replace("-", " ") for k in cleaned]
+    if len(cleaned) < 2:
+        return None
+
+    return cleaned[:8]
 
 
 async def extract_keywords_llm(idea_text: str) -> list[str] | None:
     """Ask the Render API to generate search keywords via Claude Haiku 4.5.
 
+    Results are cached locally and the call is skipped while the API keeps failing
+    (see render_api).
+
     Returns:
         A list of 3-8 keyword query strings, or *None* if the request fails
         for any reason (timeout, 429, 5xx, invalid response, etc.).
     """
-    api_url = os.environ.get("IDEA_REALITY_API_URL", _DEFAULT_API_URL)
-    url = f"{api_url}/api/extract-keywords"
-
-    try:
-        async with httpx.AsyncClient(timeout=_TIMEOUT_SECONDS) as client:
-            resp = await client.post(url, json={"idea_text": idea_text})
-
-        if resp.status_code != 200:
-            return None
-
-        data = resp.json()
-        keywords = data.get("keywords")
-
-        if not isinstance(keywords, list) or len(keywords) < 2:
-            return None
-
-        # Ensure every element is a non-empty string
-        cleaned = [str(k).strip() for k in keywords if str(k).strip()]
-        # Normalize: replace hyphens with spaces for better search API compatibility
-        cleaned = [k.replace("-", " ") for k in cleaned]
-        if len(cleaned) < 2:
-            return None
-
-        return cleaned[:8]
-
-    except (httpx.HTTPError, json.JSONDecodeError, KeyError, TypeError, ValueError):
-        return None
+    return await render_api.post_idea("extract_keywords_llm", "/api/extract-keywords", idea_text, _parse)
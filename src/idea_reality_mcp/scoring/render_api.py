@@ -0,0 +1,197 @@
+"""Shared plumbing for the MCP client's calls to the Render API (expand_idea,
+extract_keywords_llm).
+
+Each call used to open a fresh httpx.AsyncClient (new TLS handshake), throw the result
+away, and keep calling an API that was down — up to 5s of dead time per check. Now:
+
+- One reused client per call name and event loop, on the shared upstream transport.
+- A local persistent cache of successful results (SQLite under ~/.idea-reality/),
+  keyed by the idea hash (normalized text) and the API URL, with a TTL. Re-checking an
+  idea skips the hop entirely; only validated results are stored.
+- A circuit breaker per call (idea_reality_mcp.breaker): after repeated failures
+  (transport errors, timeouts, 429, 5xx) the call returns None at once for a cooldown.
+
+Cache errors (read-only home, corrupt file) fail open: the call simply goes out.
+
+Env:
+- IDEA_REALITY_API_URL            (default https://idea-reality-mcp.onrender.com)
+- IDEA_REALITY_CACHE_DIR          (default ~/.idea-reality)
+- IDEA_REALITY_CACHE_TTL          (seconds, default 604800 = 7 days; 0 disables the cache)
+- IDEA_REALITY_API_FAILURES       (consecutive failures that open the breaker, default 3)
+- IDEA_REALITY_API_COOLDOWN       (seconds the breaker stays open, default 60)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+
+from ..breaker import CircuitBreaker
+from ..upstream import transport as upstream_transport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://idea-reality-mcp.onrender.com"
+TIMEOUT_SECONDS = 5.0
+
+CACHE_DIR = Path(os.environ.get("IDEA_REALITY_CACHE_DIR", str(Path.home() / ".idea-reality")))
+CACHE_TTL = float(os.environ.get("IDEA_REALITY_CACHE_TTL", str(7 * 86400)))
+CACHE_MAX_ROWS = 5000
+FAILURE_THRESHOLD = int(os.environ.get("IDEA_REALITY_API_FAILURES", "3"))
+COOLDOWN_S = float(os.environ.get("IDEA_REALITY_API_COOLDOWN", "60"))
+
+_clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def api_url() -> str:
+    return os.environ.get("IDEA_REALITY_API_URL", DEFAULT_API_URL)
+
+
+def breaker(call: str) -> CircuitBreaker:
+    if call not in _breakers:
+        _breakers[call] = CircuitBreaker(call, threshold=FAILURE_THRESHOLD, cooldown_s=COOLDOWN_S)
+    return _breakers[call]
+
+
+def reset() -> None:
+    """Forget breakers and clients (tests; a changed API URL)."""
+    _breakers.clear()
+    _clients.clear()
+
+
+def _client(call: str) -> httpx.AsyncClient:
+    # httpx pools are bound to the loop they were opened on
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(call)
+    if entry is None or entry[0] is not loop or entry[1].is_closed is True:
+        entry = (loop, httpx.AsyncClient(timeout=TIMEOUT_SECONDS, transport=upstream_transport(call)))
+        _clients[call] = entry
+    return entry[1]
+
+
+# ---------------------------------------------------------------------------
+# Local cache
+# ---------------------------------------------------------------------------
+
+
+def idea_hash(idea_text: str) -> str:
+    return hashlib.sha256(" ".join(idea_text.split()).casefold().encode()).hexdigest()
+
+
+def _db() -> sqlite3.Connection:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_DIR / "cache.db", timeout=1.0)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS api_cache ("
+        "call TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, created_at REAL NOT NULL, "
+        "PRIMARY KEY (call, key))"
+    )
+    return conn
+
+
+def _cache_key(idea_text: str) -> str:
+    return f"{api_url()}|{idea_hash(idea_text)}"
+
+
+def _read(call: str, idea_text: str) -> Any | None:
+    try:
+        conn = _db()
+        try:
+            row = conn.execute(
+                "SELECT value FROM api_cache WHERE call = ? AND key = ? AND created_at >= ?",
+                (call, _cache_key(idea_text), time.time() - CACHE_TTL),
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+    except (OSError, sqlite3.Error, ValueError):  # ValueError: corrupt / truncated row
+        logger.debug("[CACHE] read failed", exc_info=True)
+        return None
+
+
+def _write(call: str, idea_text: str, value: Any) -> None:
+    try:
+        conn = _db()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO api_cache (call, key, value, created_at) VALUES (?, ?, ?, ?)",
+                    (call, _cache_key(idea_text), json.dumps(value, ensure_ascii=False), time.time()),
+                )
+                conn.execute("DELETE FROM api_cache WHERE created_at < ?", (time.time() - CACHE_TTL,))
+                conn.execute(
+                    "DELETE FROM api_cache WHERE rowid IN "
+                    "(SELECT rowid FROM api_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (CACHE_MAX_ROWS,),
+                )
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error):
+        logger.debug("[CACHE] write failed", exc_info=True)
+
+
+async def cache_get(call: str, idea_text: str) -> Any | None:
+    """Cached result (None: miss, expired, disabled or unreadable). SQLite runs off the
+    event loop."""
+    if CACHE_TTL <= 0:
+        return None
+    return await asyncio.to_thread(_read, call, idea_text)
+
+
+async def cache_put(call: str, idea_text: str, value: Any) -> None:
+    if CACHE_TTL <= 0:
+        return
+    await asyncio.to_thread(_write, call, idea_text, value)
+
+
+# ---------------------------------------------------------------------------
+# Call
+# ---------------------------------------------------------------------------
+
+
+async def post_idea(call: str, path: str, idea_text: str, parse: Callable[[Any], Any | None]) -> Any | None:
+    """POST {"idea_text"} to `path`; return `parse(json)` or None on any failure.
+
+    Served from the local cache when possible; skipped while the call's breaker is open.
+    `parse` validates the body and returns the value to cache (None = invalid).
+    """
+    cached = await cache_get(call, idea_text)
+    if cached is not None:
+        return cached
+
+    b = breaker(call)
+    if not b.allow():
+        return None
+
+    try:
+        resp = await _client(call).post(f"{api_url()}{path}", json={"idea_text": idea_text})
+    except httpx.HTTPError:
+        b.record_failure()
+        return None
+    except BaseException:
+        b.release()
+        raise
+    if resp.status_code == 429 or resp.status_code >= 500:
+        b.record_failure()
+        return None
+    b.record_success()
+    if resp.status_code != 200:
+        return None
+
+    try:
+        result = parse(resp.json())
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+        return None
+    if result is not None:
+        await cache_put(call, idea_text, result)
+    return result
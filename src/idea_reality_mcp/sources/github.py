@@ -10,13 +10,9 @@ from datetime import datetime, timedelta, timezone
 
 import httpx
 
-logger = logging.getLogger(__name__)
+from ..upstream import transport as upstream_transport
 
-# Log whether GITHUB_TOKEN is configured (at import time)
-if os.environ.get("GITHUB_TOKEN"):
-    logger.info("GITHUB_TOKEN is set — authenticated GitHub API requests enabled")
-else:
-    logger.warning("GITHUB_TOKEN is NOT set — GitHub API requests will be unauthenticated (60 req/hr limit)")
+logger = logging.getLogger(__name__)
 
 GITHUB_API = "https://api.github.com/search/repositories"
 
@@ -104,9 +100,26 @@ class GitHubResults:
     recently_updated_ratio: float = 0.0
 
 
+_token_status_logged = False
+
+
+def _log_token_status(token: str | None) -> None:
+    """Log whether GITHUB_TOKEN is configured — once, on first use (not at import, which
+    would slow and clutter MCP server start-up)."""
+    global _token_status_logged
+    if _token_status_logged:
+        return
+    _token_status_logged = True
+    if token:
+        logger.info("GITHUB_TOKEN is set — authenticated GitHub API requests enabled")
+    else:
+        logger.warning("GITHUB_TOKEN is NOT set — GitHub API requests will be unauthenticated (60 req/hr limit)")
+
+
 def _headers() -> dict[str, str]:
     headers = {"Accept": "application/vnd.github+json"}
     token = os.environ.get("GITHUB_TOKEN")
+    _log_token_status(token)
     if token:
         headers["Authorization"] = f"Bearer {token}"
     return headers
@@ -182,7 +195,7 @@ async def search_github_repos(keywords: list[str]) -> GitHubResults:
     # Track how many queries each repo matched (relevance signal)
     repo_query_hits: dict[str, int] = {}
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, transport=upstream_transport("github")) as client:
         # Fire the per-keyword requests CONCURRENTLY instead of sequentially — this loop was the
         # dominant latency in quick mode (2 requests × N keywords, serial, ~1s each). Bounded by a
         # semaphore to stay under GitHub's secondary rate limit on bursts.
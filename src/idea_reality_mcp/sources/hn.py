@@ -7,6 +7,9 @@ from datetime import datetime, timedelta, timezone
 
 import httpx
 
+from ..breaker import CircuitOpenError, skipped_evidence
+from ..upstream import transport as upstream_transport
+
 HN_ALGOLIA_API = "https://hn.algolia.com/api/v1/search"
 
 
@@ -53,7 +56,7 @@ async def search_hn(keywords: list[str]) -> HNResults:
     best_ratio: float | None = None
     evidence: list[dict] = []
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, transport=upstream_transport("hn")) as client:
         for query in normalized_keywords:
             try:
                 resp = await client.get(
@@ -83,6 +86,8 @@ async def search_hn(keywords: list[str]) -> HNResults:
                     "count": count,
                     "detail": f"{count} HN posts in last 12 months for '{query}'",
                 })
+            except CircuitOpenError as exc:
+                evidence.append(skipped_evidence("hackernews", query, exc))
             except httpx.HTTPError:
                 evidence.append({
                     "source": "hackernews",
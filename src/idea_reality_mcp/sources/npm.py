@@ -1,12 +1,25 @@
-"""npm Registry search source."""
+"""npm Registry search source.
+
+With the local name / keyword index enabled (npm_index), queries it can judge are
+counted from it instead of estimated from the search API. The two counts mean
+different things — local: packages whose name / keywords contain every query word;
+API: any-word matches in the first page × _RELEVANCE_MULTIPLIER — so the local count
+is capped at the same _MAX_RAW_TOTAL_CAP to keep _npm_score on one scale. Below the
+cap the local count is usually smaller (stricter AND match, no extrapolation).
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
 
 import httpx
 
+from ..breaker import CircuitOpenError, skipped_evidence
+from ..upstream import transport as upstream_transport
+from . import npm_index
+
 logger = logging.getLogger(__name__)
 
 NPM_SEARCH_API = "https://registry.npmjs.org/-/v1/search"
@@ -27,6 +40,40 @@ class NpmResults:
     evidence: list[dict] = field(default_factory=list)
 
 
+def _search_local(index: npm_index.NpmIndex, query: str) -> tuple[int, list[dict], dict] | None:
+    """Count / packages / evidence for `query` from the local index (None: ask the API).
+
+    CPU-bound on a full-registry index (a common 4-letter prefix spans hundreds of
+    thousands of ids): search_npm runs it in a worker thread.
+    """
+    ids = index.match(query)
+    if ids is None:
+        return None
+    exact = len(ids)
+    count = min(exact, _MAX_RAW_TOTAL_CAP)
+    names = index.top(ids)
+    packages = [
+        {
+            "name": name,
+            "url": f"https://www.npmjs.com/package/{name}",
+            "version": "",
+            "description": "",
+            # rank-derived, on the API's 0..1 "final" scale, so the score-sorted dedupe
+            # interleaves local and API packages instead of sinking the local ones
+            "score": round(1.0 - rank / len(names), 3),
+        }
+        for rank, name in enumerate(names)
+    ]
+    evidence = {
+        "source": "npm",
+        "type": "package_count",
+        "query": query,
+        "count": count,
+        "detail": f"{count} npm packages named or tagged '{query}' (local index, exact: {exact})",
+    }
+    return count, packages, evidence
+
+
 async def search_npm(keywords: list[str]) -> NpmResults:
     """Search the npm registry for packages matching keyword variants.
 
@@ -39,9 +86,18 @@ async def search_npm(keywords: list[str]) -> NpmResults:
     max_total_count = 0
     all_packages: list[dict] = []
     evidence: list[dict] = []
+    index = npm_index.lookup()
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, transport=upstream_transport("npm")) as client:
         for query in keywords:
+            local = await asyncio.to_thread(_search_local, index, query) if index is not None else None
+            if local is not None:
+                npm_index.QUERIES_ANSWERED.inc()
+                count, packages, item = local
+                max_total_count = max(max_total_count, count)
+                all_packages.extend(packages)
+                evidence.append(item)
+                continue
             try:
                 resp = await client.get(
                     NPM_SEARCH_API,
@@ -108,6 +164,8 @@ async def search_npm(keywords: list[str]) -> NpmResults:
                     "count": count,
                     "detail": f"{count} relevant npm packages for '{query}' (raw: {raw_total})",
                 })
+            except CircuitOpenError as exc:
+                evidence.append(skipped_evidence("npm", query, exc))
             except httpx.HTTPError as exc:
                 logger.warning("[npm] query=%r failed: %s", query, exc)
                 evidence.append({
@@ -0,0 +1,248 @@
+"""Local npm name / keyword index — package counts without the search API.
+
+The registry search endpoint returns full-text totals inflated into the hundreds of
+thousands, which search_npm has to cap and extrapolate (_MAX_RAW_TOTAL_CAP,
+_RELEVANCE_MULTIPLIER). With this index a query is answered locally: the count is the
+number of packages whose name or `keywords` contain every meaningful query word (4+
+chars, the relevance filter's threshold; a word also matches longer terms it prefixes,
+so "habit" finds "habits"). search_npm caps it at the API path's _MAX_RAW_TOTAL_CAP so
+both kinds of count feed the npm score on one scale.
+
+Built offline from a registry dump — CouchDB `_all_docs?include_docs=true` or
+`_changes?include_docs=true` output from a registry replica, or JSON lines of package
+documents ({"name": ..., "keywords": [...]}); later rows for a package replace earlier
+ones and deleted rows drop it:
+
+    idea-reality npm-index registry-dump.json   # writes ~/.idea-reality/npm-index.bin
+    export IDEA_REALITY_NPM_INDEX=1             # use it in checks
+
+On disk and in memory it is four flat sections: package names and index terms as
+SortedNames tables (the term table is a flattened trie — a word's prefix matches are
+one id range), and a posting list of package ids per term (uint32 arrays). The index
+is loaded in the background on first use; until then, and for queries without a 4+
+char word, search_npm uses the network as before. It is not refreshed automatically —
+rebuild it from a fresh dump (e.g. nightly).
+
+Env:
+- IDEA_REALITY_NPM_INDEX  (1 enables the index, default off)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import re
+import struct
+import time
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from ..metrics import counter
+from ..scoring import render_api
+from .sorted_names import SortedNames
+
+logger = logging.getLogger(__name__)
+
+MIN_WORD = 4  # same threshold as search_npm's relevance filter
+RETRY_S = 600.0
+_MAGIC = b"IRNPMIX1"
+
+QUERIES_ANSWERED = counter(
+    "npm_index_answered_queries_total", "npm searches answered from the local name / keyword index"
+)
+
+
+def enabled() -> bool:
+    return os.environ.get("IDEA_REALITY_NPM_INDEX", "") == "1"
+
+
+def path() -> Path:
+    return render_api.CACHE_DIR / "npm-index.bin"
+
+
+def tokens(text: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if len(t) >= 2]
+
+
+class NpmIndex:
+    """Package names, terms, and per-term posting lists of package ids."""
+
+    __slots__ = ("names", "terms", "_term_starts", "_postings", "created_at")
+
+    def __init__(
+        self, names: SortedNames, terms: SortedNames, term_starts: array, postings: array, created_at: float,
+    ) -> None:
+        self.names = names
+        self.terms = terms
+        self._term_starts = term_starts  # postings of term i: [starts[i], starts[i + 1])
+        self._postings = postings
+        self.created_at = created_at
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def build(cls, packages: dict[str, Iterable[str]]) -> NpmIndex:
+        """Index {package name: keywords}."""
+        names = SortedNames.build(packages)
+        by_term: dict[str, list[int]] = {}
+        for pid in range(len(names)):
+            name = names[pid]
+            terms = set(tokens(name))
+            for keyword in packages[name]:
+                terms.update(tokens(keyword))
+            for term in terms:
+                by_term.setdefault(term, []).append(pid)  # ids ascend with pid
+        terms = SortedNames.build(by_term)
+        starts, postings = array("I", [0]), array("I")
+        for tid in range(len(terms)):
+            postings.extend(by_term[terms[tid]])
+            starts.append(len(postings))
+        return cls(names, terms, starts, postings, time.time())
+
+    # -- queries ----------------------------------------------------------
+
+    def _ids_with_prefix(self, word: str) -> set[int]:
+        ids: set[int] = set()
+        for tid in self.terms.prefix_range(word):
+            ids.update(self._postings[self._term_starts[tid]:self._term_starts[tid + 1]])
+        return ids
+
+    def match(self, query: str) -> set[int] | None:
+        """Ids of packages matching every meaningful word of `query`; None when the
+        query has no word of MIN_WORD+ chars (the index can't judge it)."""
+        words = sorted({w for w in tokens(query) if len(w) >= MIN_WORD}, key=len, reverse=True)
+        if not words:
+            return None
+        result: set[int] | None = None
+        for word in words:  # longest (rarest) first keeps the intersection small
+            ids = self._ids_with_prefix(word)
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+    def top(self, ids: Iterable[int], limit: int = 10) -> list[str]:
+        """Names of up to `limit` of `ids`, shortest (most canonical) first."""
+        return [self.names[i] for i in heapq.nsmallest(limit, ids, key=lambda i: (len(self.names.raw(i)), i))]
+
+    # -- storage ----------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        sections = (self.names.blob, self.terms.blob, self._term_starts.tobytes(), self._postings.tobytes())
+        return _MAGIC + b"".join(struct.pack("<Q", len(s)) + s for s in sections)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, created_at: float) -> NpmIndex:
+        if not data.startswith(_MAGIC):
+            raise ValueError("not an npm index file")
+        sections, pos = [], len(_MAGIC)
+        for _ in range(4):
+            (size,) = struct.unpack_from("<Q", data, pos)
+            sections.append(data[pos + 8:pos + 8 + size])
+            pos += 8 + size
+        term_starts, postings = array("I"), array("I")
+        term_starts.frombytes(sections[2])
+        postings.frombytes(sections[3])
+        return cls(SortedNames(sections[0]), SortedNames(sections[1]), term_starts, postings, created_at)
+
+
+# ---------------------------------------------------------------------------
+# Dump parsing / build
+# ---------------------------------------------------------------------------
+
+
+def _keywords(doc: dict) -> list[str]:
+    kws = doc.get("keywords")
+    if not kws:  # full registry documents keep them per version
+        latest = (doc.get("dist-tags") or {}).get("latest")
+        kws = ((doc.get("versions") or {}).get(latest) or {}).get("keywords")
+    if isinstance(kws, str):
+        kws = kws.split(",")
+    return [k for k in kws if isinstance(k, str)] if isinstance(kws, list) else []
+
+
+def parse_dump(lines: Iterable[str]) -> Iterator[tuple[str, list[str] | None]]:
+    """(name, keywords) per row of a registry dump; keywords None for a deletion.
+    Rows are one JSON object per line; other lines (the `_all_docs` header / footer)
+    are skipped."""
+    for line in lines:
+        line = line.strip().rstrip(",")
+        if not line.startswith("{"):
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            continue
+        doc = row.get("doc", row)
+        if not isinstance(doc, dict):
+            continue
+        name = doc.get("name") or row.get("id")
+        if not isinstance(name, str) or not name or name.startswith("_design/"):
+            continue
+        yield name, None if (row.get("deleted") or doc.get("_deleted")) else _keywords(doc)
+
+
+def build_from_dump(lines: Iterable[str]) -> NpmIndex:
+    """Build the index from a dump and write it to path()."""
+    packages: dict[str, list[str]] = {}
+    for name, keywords in parse_dump(lines):
+        if keywords is None:
+            packages.pop(name, None)
+        else:
+            packages[name] = keywords
+    index = NpmIndex.build(packages)
+    p = path()
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_bytes(index.to_bytes())
+    os.replace(tmp, p)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+_index: NpmIndex | None = None
+_task: asyncio.Task | None = None
+_failed_at: float | None = None
+
+
+def reset() -> None:
+    """Forget the loaded index and any pending load (tests)."""
+    global _index, _task, _failed_at
+    _index = _task = _failed_at = None
+
+
+def load() -> NpmIndex | None:
+    """The index on disk, or None if there is none (or it is unreadable)."""
+    p = path()
+    try:
+        return NpmIndex.from_bytes(p.read_bytes(), p.stat().st_mtime)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+async def _ensure() -> None:
+    global _index, _failed_at
+    _index = await asyncio.to_thread(load)
+    if _index is None:
+        _failed_at = time.monotonic()
+        logger.warning("[npm] IDEA_REALITY_NPM_INDEX=1 but no usable index at %s", path())
+
+
+def lookup() -> NpmIndex | None:
+    """The loaded index when enabled, else None. Schedules a background load the first
+    time (and again RETRY_S after a failed one)."""
+    global _task
+    if not enabled():
+        return None
+    backoff = _failed_at is not None and time.monotonic() - _failed_at < RETRY_S
+    if _index is None and not backoff and (_task is None or _task.done()):
+        _task = asyncio.get_running_loop().create_task(_ensure())
+    return _index
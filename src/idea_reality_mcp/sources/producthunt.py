@@ -43,6 +43,8 @@ from datetime import datetime, timedelta, timezone
 
 import httpx
 
+from ..upstream import transport as upstream_transport
+
 PH_GRAPHQL_API = "https://api.producthunt.com/v2/api/graphql"
 
 
@@ -110,7 +112,7 @@ async def _search_producthunt_broken(keywords: list[str]) -> ProductHuntResults:
         "Content-Type": "application/json",
     }
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, transport=upstream_transport("producthunt")) as client:
         for query in keywords:
             graphql_query = """
             query SearchPosts($query: String!) {
@@ -1,6 +1,7 @@
 """PyPI search source — two-tier approach.
 
-Tier 1 (keyless): PyPI JSON API — exact package name lookup.
+Tier 1 (keyless): PyPI JSON API — exact package name lookup (names missing from the
+                  local snapshot, when enabled, are skipped — see pypi_index).
 Tier 2 (with key): libraries.io API — fuzzy search across PyPI packages.
 
 Falls back gracefully: Tier 2 → Tier 1 → skipped.
@@ -14,6 +15,10 @@ from dataclasses import dataclass, field
 
 import httpx
 
+from ..breaker import CircuitOpenError, skipped_evidence
+from ..upstream import transport as upstream_transport
+from . import pypi_index
+
 PYPI_JSON_URL = "https://pypi.org/pypi/{package}/json"
 LIBRARIES_IO_URL = "https://libraries.io/api/search"
 
@@ -53,15 +58,22 @@ async def _search_pypi_json(keywords: list[str]) -> PyPIResults:
     all_packages: list[dict] = []
     evidence: list[dict] = []
     seen: set[str] = set()
+    names = pypi_index.lookup()
 
-    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
+    async with httpx.AsyncClient(
+        timeout=10.0, follow_redirects=True, transport=upstream_transport("pypi")
+    ) as client:
         for keyword in keywords:
             keyword_count = 0
+            circuit_open: CircuitOpenError | None = None
             candidates = _keyword_to_package_names(keyword)
             for pkg_name in candidates:
                 if pkg_name in seen:
                     continue
                 seen.add(pkg_name)
+                if names is not None and pkg_name not in names:
+                    pypi_index.PROBES_SKIPPED.inc()
+                    continue  # not on PyPI: the 404 without the request
                 try:
                     url = PYPI_JSON_URL.format(package=pkg_name)
                     resp = await client.get(url)
@@ -77,9 +89,14 @@ async def _search_pypi_json(keywords: list[str]) -> PyPIResults:
                             "description": (info.get("summary") or "")[:200],
                         })
                     # 404 = package doesn't exist, that's fine
+                except CircuitOpenError as exc:
+                    circuit_open = exc
                 except (httpx.HTTPError, Exception):
                     pass  # graceful degradation
 
+            if circuit_open is not None and keyword_count == 0:
+                evidence.append(skipped_evidence("pypi", keyword, circuit_open))
+                continue
             evidence.append({
                 "source": "pypi",
                 "type": "package_count",
@@ -100,7 +117,8 @@ async def _search_pypi_json(keywords: list[str]) -> PyPIResults:
         total_count=found_count,
         top_packages=deduped[:5],
         evidence=evidence,
-        skipped=False,
+        # nothing was asked (host circuit open): let the engine redistribute the weight
+        skipped=bool(evidence) and all(e["type"] == "skipped" for e in evidence),
     )
 
 
@@ -114,7 +132,7 @@ async def _search_libraries_io(keywords: list[str], api_key: str) -> PyPIResults
     evidence: list[dict] = []
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, transport=upstream_transport("libraries_io")) as client:
             for keyword in keywords:
                 try:
                     resp = await client.get(
@@ -151,6 +169,8 @@ async def _search_libraries_io(keywords: list[str], api_key: str) -> PyPIResults
                         "count": count,
                         "detail": f"{count} PyPI packages found for '{keyword}'",
                     })
+                except CircuitOpenError as exc:
+                    evidence.append(skipped_evidence("pypi", keyword, exc))
                 except httpx.HTTPError:
                     evidence.append({
                         "source": "pypi",
@@ -0,0 +1,168 @@
+"""Local snapshot of PyPI project names (Simple API) for existence checks.
+
+Tier 1 of the PyPI source probes candidate names one `GET /pypi/{name}/json` at a time —
+dozens of requests per deep check, most of them 404s. With the snapshot loaded, a
+candidate missing from it is answered locally (the 404 without the request); only names
+that exist are fetched, for their version and summary.
+
+- Download: `GET https://pypi.org/simple/` as PEP 691 JSON (~600k projects), names
+  normalised per PEP 503, stored sorted one per line in ~/.idea-reality/pypi-names.txt.
+- Memory: a SortedNames table (~10 MB for all of PyPI, a set of str would be ~60 MB).
+  Membership and prefix lookups are binary searches.
+- Refresh: when the snapshot is missing or older than the TTL a background task loads /
+  re-downloads it; until one is loaded lookups fall back to the network. Failures are
+  logged and retried after RETRY_S — the index is an optimisation, never an outage.
+
+Off by default (the download is ~30 MB):
+
+    idea-reality pypi-index             # download now
+    export IDEA_REALITY_PYPI_INDEX=1    # use it (and keep it fresh) in checks
+
+Env:
+- IDEA_REALITY_PYPI_INDEX      (1 enables the snapshot, default off)
+- IDEA_REALITY_PYPI_INDEX_TTL  (seconds before a refresh, default 86400)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+import httpx
+
+from ..metrics import counter
+from ..scoring import render_api
+from ..upstream import transport as upstream_transport
+from .sorted_names import SortedNames
+
+logger = logging.getLogger(__name__)
+
+SIMPLE_URL = "https://pypi.org/simple/"
+SIMPLE_JSON = "application/vnd.pypi.simple.v1+json"
+TTL_S = float(os.environ.get("IDEA_REALITY_PYPI_INDEX_TTL", "86400"))
+RETRY_S = 600.0
+DOWNLOAD_TIMEOUT_S = 60.0
+
+PROBES_SKIPPED = counter(
+    "pypi_index_skipped_probes_total", "PyPI JSON lookups answered from the local name snapshot"
+)
+
+
+def enabled() -> bool:
+    return os.environ.get("IDEA_REALITY_PYPI_INDEX", "") == "1"
+
+
+def path() -> Path:
+    return render_api.CACHE_DIR / "pypi-names.txt"
+
+
+def normalize(name: str) -> str:
+    """PEP 503 name normalisation."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class NameIndex(SortedNames):
+    """The snapshot: PEP 503-normalised project names, queried by any spelling."""
+
+    __slots__ = ("created_at",)
+
+    def __init__(self, blob: bytes, created_at: float) -> None:
+        super().__init__(blob)
+        self.created_at = created_at
+
+    @classmethod
+    def from_names(cls, names, created_at: float | None = None) -> NameIndex:
+        blob = SortedNames.build(normalize(n) for n in names if n).blob
+        return cls(blob, time.time() if created_at is None else created_at)
+
+    def __contains__(self, name: str) -> bool:
+        return self.id_of(normalize(name)) is not None
+
+    def with_prefix(self, prefix: str, limit: int = 20) -> list[str]:
+        """Up to `limit` names starting with `prefix`, in sorted order."""
+        ids = self.prefix_range(normalize(prefix))
+        return [self[i] for i in ids[:limit]]
+
+    def stale(self) -> bool:
+        return time.time() - self.created_at >= TTL_S
+
+
+# ---------------------------------------------------------------------------
+# Snapshot lifecycle
+# ---------------------------------------------------------------------------
+
+_index: NameIndex | None = None
+_task: asyncio.Task | None = None
+_failed_at: float | None = None
+
+
+def reset() -> None:
+    """Forget the loaded snapshot and any pending refresh (tests)."""
+    global _index, _task, _failed_at
+    _index = _task = _failed_at = None
+
+
+def load() -> NameIndex | None:
+    """The snapshot on disk, or None if there is none (or it is unreadable)."""
+    p = path()
+    try:
+        return NameIndex(p.read_bytes(), p.stat().st_mtime)
+    except OSError:
+        return None
+
+
+async def refresh() -> NameIndex:
+    """Download the Simple index, write the snapshot, and use it. Raises on failure."""
+    global _index
+    async with httpx.AsyncClient(
+        timeout=DOWNLOAD_TIMEOUT_S, follow_redirects=True, transport=upstream_transport("pypi_index"),
+    ) as client:
+        resp = await client.get(SIMPLE_URL, headers={"Accept": SIMPLE_JSON})
+        resp.raise_for_status()
+
+    def build() -> NameIndex:
+        projects = json.loads(resp.content)["projects"]
+        index = NameIndex.from_names(p["name"] for p in projects)
+        p = path()
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(".tmp")
+        tmp.write_bytes(index.blob)
+        os.replace(tmp, p)
+        return index
+
+    _index = await asyncio.to_thread(build)
+    logger.info("[PYPI] name snapshot refreshed: %d projects", len(_index))
+    return _index
+
+
+async def _ensure() -> None:
+    global _index, _failed_at
+    try:
+        if _index is None:
+            _index = await asyncio.to_thread(load)
+        if _index is None or _index.stale():
+            await refresh()
+    except Exception:  # noqa: BLE001 — fall back to per-name requests
+        _failed_at = time.monotonic()
+        logger.warning("[PYPI] name snapshot refresh failed", exc_info=True)
+
+
+def lookup() -> NameIndex | None:
+    """The loaded snapshot when enabled, else None. Schedules a background load /
+    refresh when the snapshot is missing or stale (the current one stays in use)."""
+    global _task
+    if not enabled():
+        return None
+    wanted = _index is None or _index.stale()
+    backoff = _failed_at is not None and time.monotonic() - _failed_at < RETRY_S
+    if wanted and not backoff and (_task is None or _task.done()):
+        # a clean context: not the caller's coalesce scope (its budget, semaphore and
+        # memo) or timeout overrides — the download belongs to no single check
+        _task = asyncio.get_running_loop().create_task(_ensure(), context=contextvars.Context())
+    return _index
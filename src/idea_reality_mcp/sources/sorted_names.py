@@ -0,0 +1,54 @@
+"""Compact sorted string table for the local name indexes (pypi_index, npm_index).
+
+Hundreds of thousands of short strings as Python str objects (or a set of them) cost
+~60-100 bytes each; here they are one newline-separated bytes blob plus a uint32 offset
+array, ~1.1 bytes per character. Lookups are binary searches. Being sorted, the table is
+a flattened trie: every prefix is one contiguous range of ids.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+from array import array
+from typing import Iterable
+
+
+class SortedNames:
+    """Sorted, newline-separated strings in one bytes blob, with line offsets.
+    A string's id is its rank."""
+
+    __slots__ = ("blob", "_starts")
+
+    def __init__(self, blob: bytes) -> None:
+        self.blob = blob
+        lines = blob.split(b"\n") if blob else []
+        # starts[i] .. starts[i + 1] - 1 is string i
+        self._starts = array("I", itertools.accumulate((len(line) + 1 for line in lines), initial=0))
+
+    @classmethod
+    def build(cls, strings: Iterable[str]) -> SortedNames:
+        return cls("\n".join(sorted({s for s in strings if s})).encode())
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def raw(self, i: int) -> bytes:
+        return self.blob[self._starts[i]:self._starts[i + 1] - 1]
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode()
+
+    def _bisect(self, target: bytes) -> int:
+        return bisect.bisect_left(range(len(self)), target, key=self.raw)
+
+    def id_of(self, s: str) -> int | None:
+        target = s.encode()
+        i = self._bisect(target)
+        return i if i < len(self) and self.raw(i) == target else None
+
+    def prefix_range(self, prefix: str) -> range:
+        """Ids of every string starting with `prefix`."""
+        target = prefix.encode()
+        # 0xff never occurs in UTF-8, so it sorts after every continuation of the prefix
+        return range(self._bisect(target), self._bisect(target + b"\xff"))
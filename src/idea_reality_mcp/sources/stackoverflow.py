@@ -8,6 +8,9 @@ from datetime import datetime, timedelta, timezone
 
 import httpx
 
+from ..breaker import CircuitOpenError, skipped_evidence
+from ..upstream import transport as upstream_transport
+
 SO_API = "https://api.stackexchange.com/2.3/search"
 
 
@@ -65,7 +68,7 @@ async def search_stackoverflow(keywords: list[str]) -> StackOverflowResults:
 
     backoff_hit = False
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with httpx.AsyncClient(timeout=15.0, transport=upstream_transport("stackoverflow")) as client:
         for query in keywords:
             if backoff_hit:
                 evidence.append({
@@ -143,6 +146,8 @@ async def search_stackoverflow(keywords: list[str]) -> StackOverflowResults:
                     "count": count,
                     "detail": f"{count} Stack Overflow questions found for '{query}'",
                 })
+            except CircuitOpenError as exc:
+                evidence.append(skipped_evidence("stackoverflow", query, exc))
             except httpx.HTTPError:
                 evidence.append({
                     "source": "stackoverflow",
@@ -169,4 +174,6 @@ async def search_stackoverflow(keywords: list[str]) -> StackOverflowResults:
         top_questions=top_questions,
         evidence=evidence,
         recent_question_ratio=best_ratio,
+        # nothing was asked (host circuit open): let the engine redistribute the weight
+        skipped=bool(evidence) and all(e["type"] == "skipped" for e in evidence),
     )
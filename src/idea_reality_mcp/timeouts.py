@@ -0,0 +1,170 @@
+"""Adaptive per-source upstream timeouts.
+
+Adapters build their clients with a fixed `timeout=15.0` (10.0 for PyPI), far above the
+latency the upstreams actually show, so one hung connection holds a check for 15s. The
+AdaptiveTimeoutTransport layer (innermost in upstream.transport()) rewrites each
+request's timeout from what the source has recently done:
+
+- read     p99 of the source's last 200 response times × FACTOR, clamped to
+           [MIN_READ_S, the adapter's configured timeout]. Until MIN_SAMPLES responses
+           have been seen the adapter's value is used unchanged.
+- connect  its own, shorter cap (CONNECT_S): a TCP/TLS handshake that takes seconds
+           is a dead host, whatever the read latency.
+- write / pool  as configured by the adapter.
+
+LLM sources (FIXED_SOURCES) are exempt from the adaptive read timeout: their response
+time is set by the model and max_tokens of each call, not by the host, so a window of
+fast Haiku calls would time out every long Sonnet generation. They keep the client's
+configured timeout (and the connect cap).
+
+A read timeout is recorded as a (censored) sample of its own duration, so a source that
+genuinely slows down pulls its p99 — and its timeout — up instead of timing out forever.
+
+Per-request overrides for the orchestrator (the API's flash first layer uses a tighter
+one; a patient batch could loosen them):
+
+    with timeouts.override(read=4.0, connect=1.0, sources={"github", "hn"}):
+        await search_github_repos(keywords)   # read 4s, connect 1s for github / hn only
+
+Overrides apply to everything awaited inside (ContextVar — tasks inherit them) and win
+over both the adaptive value and the adapter's ceiling.
+
+Env:
+- IDEA_REALITY_TIMEOUT_FACTOR  (p99 multiplier, default 3)
+- IDEA_REALITY_TIMEOUT_MIN     (floor for the adaptive read timeout in seconds, default 2)
+- IDEA_REALITY_CONNECT_TIMEOUT (connect timeout cap in seconds, default 3)
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+import time
+from collections import deque
+from typing import Iterable, Iterator
+
+import httpx
+
+from . import metrics
+
+FACTOR = float(os.environ.get("IDEA_REALITY_TIMEOUT_FACTOR", "3"))
+MIN_READ_S = float(os.environ.get("IDEA_REALITY_TIMEOUT_MIN", "2"))
+CONNECT_S = float(os.environ.get("IDEA_REALITY_CONNECT_TIMEOUT", "3"))
+WINDOW = 200
+MIN_SAMPLES = 20
+_RECOMPUTE_EVERY = 10  # new samples between p99 recomputations
+FIXED_SOURCES = frozenset({"anthropic"})  # LLM calls: latency depends on the request
+
+
+class LatencyWindow:
+    """Last WINDOW response times of one source, with a lazily refreshed p99."""
+
+    __slots__ = ("samples", "_p99", "_stale")
+
+    def __init__(self) -> None:
+        self.samples: deque[float] = deque(maxlen=WINDOW)
+        self._p99: float | None = None
+        self._stale = 0
+
+    def add(self, seconds: float, *, refresh: bool = False) -> None:
+        """Record one response time; `refresh` forces the next p99() to recompute."""
+        self.samples.append(seconds)
+        self._stale = _RECOMPUTE_EVERY if refresh else self._stale + 1
+
+    def p99(self) -> float | None:
+        n = len(self.samples)
+        if n < MIN_SAMPLES:
+            return None
+        if self._p99 is None or self._stale >= _RECOMPUTE_EVERY:
+            self._p99 = sorted(self.samples)[min(n - 1, int(n * 0.99))]
+            self._stale = 0
+        return self._p99
+
+
+_windows: dict[str, LatencyWindow] = {}
+_override: contextvars.ContextVar[dict | None] = contextvars.ContextVar("timeout_override", default=None)
+
+
+def window(source: str) -> LatencyWindow:
+    w = _windows.get(source)
+    if w is None:
+        w = _windows[source] = LatencyWindow()
+    return w
+
+
+def reset() -> None:
+    _windows.clear()
+
+
+def read_timeout(source: str, ceiling: float) -> float:
+    """Adaptive read timeout for `source`, never above the adapter's `ceiling`."""
+    if source in FIXED_SOURCES:
+        return ceiling
+    p99 = window(source).p99()
+    if p99 is None:
+        return ceiling
+    return min(ceiling, max(MIN_READ_S, p99 * FACTOR))
+
+
+@contextlib.contextmanager
+def override(
+    *, read: float | None = None, connect: float | None = None, sources: Iterable[str] | None = None,
+) -> Iterator[None]:
+    """Fixed read / connect timeouts for upstream requests made inside (all sources, or
+    only `sources`)."""
+    token = _override.set({"read": read, "connect": connect, "sources": None if sources is None else set(sources)})
+    try:
+        yield
+    finally:
+        _override.reset(token)
+
+
+def timeouts_for(source: str, configured: dict) -> dict:
+    """httpx timeout extension for one request; `configured` is the client's."""
+    out = dict(configured)
+    if out.get("read") is not None:
+        out["read"] = read_timeout(source, out["read"])
+    if out.get("connect") is not None:
+        out["connect"] = min(out["connect"], CONNECT_S)
+    ov = _override.get()
+    if ov is not None and (ov["sources"] is None or source in ov["sources"]):
+        for phase in ("read", "connect"):
+            if ov[phase] is not None:
+                out[phase] = ov[phase]
+    return out
+
+
+class AdaptiveTimeoutTransport(httpx.AsyncBaseTransport):
+    """Sets each request's timeouts from timeouts_for(); feeds the source's window."""
+
+    def __init__(self, source: str, inner: httpx.AsyncBaseTransport) -> None:
+        self.source = source
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        applied = timeouts_for(self.source, request.extensions.get("timeout", {}))
+        request.extensions["timeout"] = applied
+        started = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except httpx.ReadTimeout:
+            # at least this slow; let the next request see it
+            elapsed = max(time.perf_counter() - started, applied.get("read") or 0.0)
+            window(self.source).add(elapsed, refresh=True)
+            raise
+        window(self.source).add(time.perf_counter() - started)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def _p99_samples() -> dict:
+    return {(source,): w.p99() for source, w in _windows.items() if w.p99() is not None}
+
+
+metrics.register_callback(
+    "upstream_latency_p99_seconds", "Rolling p99 upstream response time per source (adaptive timeouts)",
+    _p99_samples, labelnames=("source",),
+)
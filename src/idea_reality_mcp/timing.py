@@ -0,0 +1,180 @@
+"""Per-stage latency spans for the check pipeline (API `_compute_report` + MCP `idea_check`).
+
+    trace = timing.start_trace()            # per check; enabled by flag
+    with timing.span("keywords"):
+        ...
+    gh, hn = await asyncio.gather(
+        timing.timed("source.github", search_github_repos(kw)),
+        timing.timed("source.hn", search_hn(kw)),
+    )
+    if trace.enabled:
+        result["meta"]["timings"] = trace.as_meta()
+
+Every span always feeds an in-process histogram per stage (fixed buckets, a few integer
+adds — cheap enough to leave on), read with `histograms()`. The per-check breakdown in
+`meta.timings` is only attached when tracing is enabled, so response shape is unchanged
+by default.
+
+The current trace lives in a ContextVar. asyncio.gather copies the context into each
+child task, and the children record into the *same* Trace object, so spans inside
+concurrent source calls land on the right check. Concurrent stages overlap: their
+durations are wall time each and do not sum to `total_ms`.
+
+Env:
+- IDEA_REALITY_TIMINGS  ("1" attaches meta.timings to every check; default off)
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import contextvars
+import os
+import time
+from typing import Any, Awaitable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Upper bounds in ms — 1ms .. 60s, roughly x2-x2.5 apart (Prometheus-style `le` buckets).
+BUCKETS_MS: tuple[float, ...] = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 60000,
+)
+
+
+def timings_enabled() -> bool:
+    return os.environ.get("IDEA_REALITY_TIMINGS", "").strip().lower() in ("1", "true", "yes")
+
+
+# ---------------------------------------------------------------------------
+# Histograms (process-wide)
+# ---------------------------------------------------------------------------
+
+
+class StageHistogram:
+    """Fixed-bucket latency histogram for one stage."""
+
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # last slot = +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing the q-quantile (max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.sum_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+_histograms: dict[str, StageHistogram] = {}
+
+
+def observe(stage: str, ms: float) -> None:
+    hist = _histograms.get(stage)
+    if hist is None:
+        hist = _histograms[stage] = StageHistogram()
+    hist.observe(ms)
+
+
+def histograms() -> dict[str, StageHistogram]:
+    """Live per-stage histograms (do not mutate)."""
+    return _histograms
+
+
+def summary() -> dict[str, dict[str, Any]]:
+    """{stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}} for every stage seen."""
+    return {stage: h.summary() for stage, h in sorted(_histograms.items())}
+
+
+def reset() -> None:
+    _histograms.clear()
+
+
+# ---------------------------------------------------------------------------
+# Traces (per check)
+# ---------------------------------------------------------------------------
+
+
+class Trace:
+    """Stage durations for one check. Repeated stages accumulate."""
+
+    __slots__ = ("enabled", "started", "stages")
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def record(self, stage: str, ms: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + ms
+
+    def as_meta(self) -> dict[str, float]:
+        out = {stage: round(ms, 1) for stage, ms in self.stages.items()}
+        out["total_ms"] = round((time.perf_counter() - self.started) * 1000, 1)
+        return out
+
+
+_current: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("idea_trace", default=None)
+
+
+def start_trace(enabled: bool | None = None) -> Trace:
+    """Begin a trace for the current check (enabled defaults to IDEA_REALITY_TIMINGS)."""
+    trace = Trace(timings_enabled() if enabled is None else enabled)
+    _current.set(trace)
+    return trace
+
+
+def current_trace() -> Trace | None:
+    return _current.get()
+
+
+def _record(stage: str, started: float) -> None:
+    ms = (time.perf_counter() - started) * 1000
+    observe(stage, ms)
+    trace = _current.get()
+    if trace is not None:
+        trace.record(stage, ms)
+
+
+@contextlib.contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage` (recorded even if it raises)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(stage, started)
+
+
+async def timed(stage: str, aw: Awaitable[T]) -> T:
+    """Await `aw`, timing it as `stage` — for wrapping coroutines passed to gather()."""
+    started = time.perf_counter()
+    try:
+        return await aw
+    finally:
+        _record(stage, started)
@@ -3,18 +3,135 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Literal
+import contextlib
+import importlib
+import logging
+import os
+from typing import TYPE_CHECKING, Literal
 
 from .server import mcp
-from .sources.github import search_github_repos
-from .sources.hn import search_hn
-from .sources.npm import search_npm
-from .sources.pypi import search_pypi
-from .sources.producthunt import search_producthunt
-from .sources.stackoverflow import search_stackoverflow
-from .scoring.engine import compute_signal, extract_keywords
-from .scoring.expansion import expand_idea, generate_platform_queries
 from .cta import angelrun_next_step
+from . import timing
+
+if TYPE_CHECKING:
+    from .scoring.engine import compute_signal, extract_keywords, provisional_signal
+    from .scoring.expansion import expand_idea, generate_platform_queries
+    from .sources.github import search_github_repos
+    from .sources.hn import search_hn
+    from .sources.npm import search_npm
+    from .sources.producthunt import search_producthunt
+    from .sources.pypi import search_pypi
+    from .sources.stackoverflow import search_stackoverflow
+
+# The pipeline (six source adapters, the scoring engine and its dictionary tables) is
+# bound on the first tool call, not at import: agents spawn the MCP server per session
+# and the handshake should not wait for code the session may never run.
+_LAZY: dict[str, str] = {
+    "search_github_repos": ".sources.github",
+    "search_hn": ".sources.hn",
+    "search_npm": ".sources.npm",
+    "search_pypi": ".sources.pypi",
+    "search_producthunt": ".sources.producthunt",
+    "search_stackoverflow": ".sources.stackoverflow",
+    "compute_signal": ".scoring.engine",
+    "extract_keywords": ".scoring.engine",
+    "provisional_signal": ".scoring.engine",
+    "expand_idea": ".scoring.expansion",
+    "generate_platform_queries": ".scoring.expansion",
+}
+
+
+def _load() -> None:
+    """Bind the lazy pipeline names into this module (names already set — e.g. patched
+    in tests — are left alone)."""
+    g = globals()
+    for name, module in _LAZY.items():
+        if name not in g:
+            g[name] = getattr(importlib.import_module(module, __package__), name)
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        _load()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ---------------------------------------------------------------------------
+# Progress notifications
+# ---------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# progress label -> provisional_signal / compute_signal keyword
+_RESULT_ARG = {
+    "github": "github_results",
+    "hackernews": "hn_results",
+    "npm": "npm_results",
+    "pypi": "pypi_results",
+    "producthunt": "ph_results",
+    "stackoverflow": "so_results",
+}
+
+
+def _current_context():
+    """The FastMCP request context, or None outside an MCP request (direct calls, tests)."""
+    try:
+        from fastmcp.server.dependencies import get_context
+
+        return get_context()
+    except Exception:  # RuntimeError outside a request; ImportError on older FastMCP
+        return None
+
+
+def _result_count(results) -> int | None:
+    """Headline count for a source's results; None when the source was skipped."""
+    if getattr(results, "skipped", False):
+        return None
+    for attr in ("total_repo_count", "total_mentions", "total_count"):
+        if hasattr(results, attr):
+            return getattr(results, attr)
+    return None
+
+
+class _Progress:
+    """MCP progress notifications. For one idea_check: a step once keywords are ready,
+    one per source as it answers (result count + provisional reality_signal), and one
+    for the final score; idea_check_batch reports one step per idea. A no-op outside an
+    MCP request; FastMCP drops the notifications when the client sent no progress token."""
+
+    def __init__(self, total: int, depth: str = "quick", n_sources: int = 0, *, enabled: bool = True) -> None:
+        self.ctx = _current_context() if enabled else None
+        self.depth = depth
+        self.total = total
+        self.n_sources = n_sources
+        self.done = 0
+        self.results: dict[str, object] = {}
+
+    async def step(self, message: str | None = None) -> None:
+        self.done += 1
+        if self.ctx is None:
+            return
+        try:
+            await self.ctx.report_progress(self.done, self.total, message)
+        except Exception as exc:  # a notification must never fail the check
+            logger.debug("[PROGRESS] report_progress failed: %s", exc)
+
+    async def source(self, name: str, aw):
+        """Await one source, then report it."""
+        result = await aw
+        self.results[_RESULT_ARG[name]] = result
+        message = None
+        if self.ctx is not None:
+            count = _result_count(result)
+            signal = provisional_signal(self.depth, **self.results)
+            found = "skipped" if count is None else f"{count} results"
+            message = (
+                f"{name}: {found} — provisional reality_signal {signal} "
+                f"({len(self.results)}/{self.n_sources} sources)"
+            )
+        await self.step(message)
+        return result
 
 
 @mcp.tool()
@@ -39,75 +156,199 @@ async def idea_check(
     Returns:
         Reality check report with signal score, evidence, similar projects, and pivot hints.
     """
+    return await _check(idea_text, depth, lang)
+
+
+async def _check(idea_text: str, depth: str, lang: str, *, report_progress: bool = True) -> dict:
+    """The idea_check pipeline (also run per idea by idea_check_batch).
+
+    Source searches on the dictionary keywords start at once; the LLM expansion runs
+    alongside. If it contributes a new core_concept, the searches are re-issued with the
+    final keyword list inside the same coalesce scope, so only the core-concept queries
+    reach the network — everything else is served from the dictionary round (in flight
+    or done). The result is what the sequential expand-then-search order produced.
+    """
+    from . import coalesce  # with the rest of the pipeline: not needed at server start-up
+
     # Dictionary keywords are the primary search queries (short, precise, synonym-expanded).
     # LLM expansion supplements with core_concept but does NOT replace dictionary queries.
+    _load()
+    trace = timing.start_trace()  # meta.timings when IDEA_REALITY_TIMINGS=1
     keyword_source = "dictionary"
     expansion = None
     platform_queries: dict = {}
 
     # Dictionary extraction with synonym expansion (instant, always available)
-    keywords = extract_keywords(idea_text)
-
-    # Try LLM expansion — enrich keywords with core_concept, not replace
-    expansion = await expand_idea(idea_text)
-    if expansion is not None:
-        core = expansion.get("core_concept", "")
-        if core and core not in keywords:
-            # Insert core_concept early for search priority, keep dict keywords
-            keywords.insert(0, core)
-            keywords = keywords[:8]  # respect cap
-        keyword_source = "expanded"
-        # Generate platform-specific queries from expansion, but merge with dict keywords
-        platform_queries = generate_platform_queries(expansion, keywords)
+    with timing.span("keywords"):
+        keywords = extract_keywords(idea_text)
 
-    if depth == "deep":
-        # Deep mode: query all sources in parallel
-        # Use dictionary keywords for all sources (short, precise, synonym-expanded)
-        github_task = search_github_repos(keywords)
-        hn_task = search_hn(keywords)
-        npm_task = search_npm(keywords)
-        pypi_task = search_pypi(keywords)
-        ph_task = search_producthunt(keywords)
-        so_task = search_stackoverflow(keywords)
-
-        github_results, hn_results, npm_results, pypi_results, ph_results, so_results = (
-            await asyncio.gather(
-                github_task, hn_task, npm_task, pypi_task, ph_task, so_task,
-            )
-        )
+    n_sources = 6 if depth == "deep" else 2
+    progress = _Progress(n_sources + 2, depth, n_sources, enabled=report_progress)
+    await progress.step(f"keywords ready (dictionary): {', '.join(keywords[:3])}")
 
-        result = compute_signal(
-            idea_text=idea_text,
-            keywords=keywords,
-            github_results=github_results,
-            hn_results=hn_results,
-            depth=depth,
-            npm_results=npm_results,
-            pypi_results=pypi_results,
-            ph_results=ph_results,
-            so_results=so_results,
-            expansion=expansion,
-            lang=lang,
-        )
-    else:
-        # Quick mode: GitHub + HN in parallel
-        github_results, hn_results = await asyncio.gather(
-            search_github_repos(keywords),
-            search_hn(keywords),
-        )
+    def searches(kws: list[str], *, first_round: bool):
+        # Quick mode: GitHub + HN. Deep mode: all sources. All in parallel.
+        calls = [
+            ("github", "source.github", search_github_repos),
+            ("hackernews", "source.hn", search_hn),
+        ]
+        if depth == "deep":
+            calls += [
+                ("npm", "source.npm", search_npm),
+                ("pypi", "source.pypi", search_pypi),
+                ("producthunt", "source.producthunt", search_producthunt),
+                ("stackoverflow", "source.stackoverflow", search_stackoverflow),
+            ]
+        if first_round:
+            return asyncio.gather(*(progress.source(name, timing.timed(stage, fn(kws))) for name, stage, fn in calls))
+        return asyncio.gather(*(fn(kws) for _, _, fn in calls))
+
+    # Inside idea_check_batch the batch's scope (shared budget) is already active.
+    owned_scope = coalesce.scope(concurrency=None) if coalesce.current() is None else contextlib.nullcontext()
+    with owned_scope:
+        dictionary_round = searches(keywords, first_round=True)  # starts now
+        try:
+            # Try LLM expansion — enrich keywords with core_concept, not replace
+            expansion = await timing.timed("expand_idea", expand_idea(idea_text))
+            final_keywords = keywords
+            if expansion is not None:
+                core = expansion.get("core_concept", "")
+                if core and core not in keywords:
+                    # Insert core_concept early for search priority, keep dict keywords
+                    final_keywords = ([core] + keywords)[:8]  # respect cap
+                keyword_source = "expanded"
+                # Generate platform-specific queries from expansion, but merge with dict keywords
+                platform_queries = generate_platform_queries(expansion, final_keywords)
+
+            if final_keywords is keywords:
+                results = await dictionary_round
+            else:
+                with timing.span("core_concept"):
+                    results = await searches(final_keywords, first_round=False)
+                await dictionary_round
+                keywords = final_keywords
+        except BaseException:
+            dictionary_round.cancel()
+            raise
 
+    github_results, hn_results = results[0], results[1]
+    extra = {}
+    if depth == "deep":
+        extra = dict(zip(("npm_results", "pypi_results", "ph_results", "so_results"), results[2:]))
+
+    with timing.span("compute_signal"):
         result = compute_signal(
             idea_text=idea_text,
             keywords=keywords,
             github_results=github_results,
             hn_results=hn_results,
             depth=depth,
+            **extra,
             expansion=expansion,
             lang=lang,
         )
 
     result["meta"]["keyword_source"] = keyword_source
+    await progress.step(f"done: reality_signal {result.get('reality_signal')}")
     # AngelRun cross-sell — after checking the idea, point the agent's user at building
     # it in public. Structured so the agent can surface it; ignorable if it doesn't.
     result["next_step"] = angelrun_next_step(idea_text, "mcp")
+    if trace.enabled:
+        result["meta"]["timings"] = trace.as_meta()
     return result
+
+
+# ---------------------------------------------------------------------------
+# Batch
+# ---------------------------------------------------------------------------
+
+BATCH_MAX_IDEAS = 20
+BATCH_CONCURRENCY = int(os.environ.get("IDEA_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_UPSTREAM = int(os.environ.get("IDEA_BATCH_MAX_UPSTREAM", "400"))
+
+
+@mcp.tool()
+async def idea_check_batch(
+    ideas: list[str],
+    depth: Literal["quick", "deep"] = "quick",
+    lang: Literal["en", "zh"] = "en",
+) -> dict:
+    """Check several product ideas in one call and rank them — e.g. brainstormed variants.
+
+    Prefer this over calling idea_check repeatedly when comparing alternatives:
+    identical upstream queries across the ideas are sent once, under one shared
+    concurrency limit and request budget.
+
+    Args:
+        ideas: 1-20 natural-language idea descriptions.
+        depth: "quick" (GitHub + HN, fast) or "deep" (all sources in parallel).
+
+    Returns:
+        results: one idea_check report per idea (input order, with an "idea" field).
+            Reports checked with part of their upstream queries refused by the request
+            budget carry "incomplete": true.
+        ranking: complete ideas ordered least crowded first (lowest reality_signal).
+            Incomplete ones are left out — their missing evidence would read as "empty".
+        meta: idea counts, incomplete ideas, and upstream request / coalescing stats.
+    """
+    _load()
+    from . import coalesce  # with the rest of the pipeline: not needed at server start-up
+
+    cleaned = [idea.strip() for idea in ideas if idea and idea.strip()]
+    if not cleaned:
+        raise ValueError("ideas must contain at least one non-empty idea")
+    if len(cleaned) > BATCH_MAX_IDEAS:
+        raise ValueError(f"at most {BATCH_MAX_IDEAS} ideas per call (got {len(cleaned)})")
+
+    # Identical ideas (case/whitespace) are checked once.
+    unique: dict[str, str] = {}
+    for idea in cleaned:
+        unique.setdefault(" ".join(idea.lower().split()), idea)
+    progress = _Progress(len(unique))
+
+    async def one(idea: str) -> dict:
+        with coalesce.rejections() as rejected:
+            report = await _check(idea, depth, lang, report_progress=False)
+        if rejected.count:
+            report["incomplete"] = True
+            report["meta"]["upstream_rejected"] = rejected.count
+        await progress.step(f"{idea[:60]}: reality_signal {report.get('reality_signal')}")
+        return report
+
+    with coalesce.scope(BATCH_CONCURRENCY, BATCH_MAX_UPSTREAM) as upstream:
+        outcomes = await asyncio.gather(*(one(idea) for idea in unique.values()), return_exceptions=True)
+
+    by_key: dict[str, dict] = {}
+    for key, idea, outcome in zip(unique, unique.values(), outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning("[BATCH] check failed for %r: %s", idea, outcome)
+            by_key[key] = {"idea": idea, "error": str(outcome) or type(outcome).__name__}
+        else:
+            by_key[key] = {"idea": idea, **outcome}
+    results = [{**by_key[" ".join(idea.lower().split())], "idea": idea} for idea in cleaned]
+
+    scored = [r for r in by_key.values() if "reality_signal" in r and not r.get("incomplete")]
+    incomplete = [r["idea"] for r in by_key.values() if r.get("incomplete")]
+    if incomplete:
+        logger.warning("[BATCH] upstream budget exhausted: %d ideas unranked", len(incomplete))
+    ranking = [
+        {
+            "rank": i + 1,
+            "idea": r["idea"],
+            "reality_signal": r["reality_signal"],
+            "duplicate_likelihood": r.get("duplicate_likelihood"),
+            "trend": r.get("trend"),
+        }
+        for i, r in enumerate(sorted(scored, key=lambda r: r["reality_signal"]))
+    ]
+    return {
+        "results": results,
+        "ranking": ranking,
+        "meta": {
+            "ideas": len(cleaned),
+            "unique_ideas": len(unique),
+            "depth": depth,
+            "incomplete": incomplete,
+            "upstream": upstream.stats(),
+        },
+    }
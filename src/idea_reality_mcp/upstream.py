@@ -0,0 +1,78 @@
+"""The HTTP transport stack shared by every upstream client.
+
+    httpx.AsyncClient(timeout=15.0, transport=upstream.transport("github"))
+
+Layers, outermost first:
+- coalesce.CoalescingTransport — dedupe + shared budget inside a coalesce.scope() (batches)
+- metrics.MeteredTransport   — upstream latency + status per source (/metrics)
+- cassette.CassetteTransport — record / replay when a cassette is active
+- breaker.BreakerTransport   — per-host circuit breaker: fail fast while a host is down
+  (below the cassette, so replays never touch it)
+- timeouts.AdaptiveTimeoutTransport — per-source connect / read timeouts from observed
+  latency (the client's timeout is the ceiling)
+- EnvProxyTransport          — the network: httpx.AsyncHTTPTransport, through
+  HTTP(S)_PROXY / ALL_PROXY unless NO_PROXY exempts the host
+
+New cross-cutting upstream behaviour belongs here, so the source adapters keep a
+single `transport=` argument.
+
+Passing `transport=` turns off httpx's own environment proxy handling (trust_env only
+applies to the transports a client builds itself), hence EnvProxyTransport: without it
+MCP users behind a corporate proxy would lose every upstream.
+"""
+
+from __future__ import annotations
+
+import logging
+import urllib.request
+from typing import Any
+
+import httpx
+
+from .breaker import BreakerTransport
+from .cassette import CassetteTransport
+from .coalesce import CoalescingTransport
+from .metrics import MeteredTransport
+from .timeouts import AdaptiveTimeoutTransport
+
+logger = logging.getLogger(__name__)
+
+
+class EnvProxyTransport(httpx.AsyncBaseTransport):
+    """Routes each request like an AsyncClient without `transport=` would: through the
+    scheme's proxy from the environment, or direct (`inner`) when there is none or
+    NO_PROXY matches the host."""
+
+    def __init__(self, **transport_kwargs: Any) -> None:
+        self.inner = httpx.AsyncHTTPTransport(**transport_kwargs)
+        env = urllib.request.getproxies()
+        self.proxied: dict[str, httpx.AsyncHTTPTransport] = {}
+        for scheme in ("http", "https"):
+            url = env.get(scheme) or env.get("all")
+            if not url:
+                continue
+            try:
+                self.proxied[scheme] = httpx.AsyncHTTPTransport(proxy=url, **transport_kwargs)
+            except (ImportError, ValueError, httpx.InvalidURL):
+                logger.warning("[UPSTREAM] ignoring unusable %s proxy %r", scheme, url, exc_info=True)
+
+    def route(self, request: httpx.Request) -> httpx.AsyncHTTPTransport:
+        proxied = self.proxied.get(request.url.scheme)
+        if proxied is None or urllib.request.proxy_bypass(request.url.host):
+            return self.inner
+        return proxied
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.route(request).handle_async_request(request)
+
+    async def aclose(self) -> None:
+        for t in (self.inner, *self.proxied.values()):
+            await t.aclose()
+
+
+def transport(source: str, **transport_kwargs: Any) -> httpx.AsyncBaseTransport:
+    """Transport for one upstream `source` (label used in metrics and cassettes)."""
+    network = AdaptiveTimeoutTransport(source, EnvProxyTransport(**transport_kwargs))
+    return CoalescingTransport(
+        source, MeteredTransport(source, CassetteTransport(source, BreakerTransport(network)))
+    )
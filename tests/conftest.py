@@ -0,0 +1,27 @@
+"""Shared fixtures."""
+
+from __future__ import annotations
+
+import pytest
+
+from idea_reality_mcp import breaker, timeouts
+from idea_reality_mcp.scoring import render_api
+from idea_reality_mcp.sources import npm_index, pypi_index
+
+
+@pytest.fixture(autouse=True)
+def _isolated_upstream_state(monkeypatch, tmp_path):
+    """Never read or write the real ~/.idea-reality cache; fresh breakers, latency
+    windows and name indexes per test."""
+    monkeypatch.setattr(render_api, "CACHE_DIR", tmp_path / "idea-reality")
+    render_api.reset()
+    breaker.reset_hosts()
+    timeouts.reset()
+    pypi_index.reset()
+    npm_index.reset()
+    yield
+    render_api.reset()
+    breaker.reset_hosts()
+    timeouts.reset()
+    pypi_index.reset()
+    npm_index.reset()
@@ -153,8 +153,7 @@ class TestExtractKeywordsEndpoint:
                 return_value=mock_keywords,
             ):
                 # Simulate yesterday's exhausted quota
-                _rate_limits["testclient"]["count"] = 999
-                _rate_limits["testclient"]["reset_date"] = "2020-01-01"
+                _rate_limits.hit("testclient", 999, day="2020-01-01")
 
                 # Should succeed because date has changed
                 resp = client.post(
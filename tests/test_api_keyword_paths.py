@@ -0,0 +1,113 @@
+"""Keyword paths in api/main.py::_compute_report — exactly one keyword list (Haiku's, else
+the dictionary's) is searched, so no upstream request is spent on a discarded round."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+import db as score_db  # noqa: E402
+import main  # noqa: E402
+
+from idea_reality_mcp.sources import github, hn  # noqa: E402
+
+DICTIONARY = ["habit", "tracker"]
+HAIKU = ["habit tracker", "habit", "streak app"]
+
+
+@pytest.fixture(autouse=True)
+def _db(monkeypatch, tmp_path):
+    monkeypatch.setattr(score_db, "DB_PATH", str(tmp_path / "keyword_paths.db"))
+    score_db.init_db()
+    monkeypatch.setattr(main, "extract_keywords", MagicMock(return_value=DICTIONARY))
+    monkeypatch.setattr(main, "_generate_pivot_hints_llm", AsyncMock(return_value=None))
+
+
+def _haiku(keywords, delay=0.05):
+    async def extract(_idea):
+        await asyncio.sleep(delay)
+        return keywords
+    return extract
+
+
+async def test_only_haiku_keywords_are_searched(monkeypatch):
+    search = AsyncMock(return_value={})
+    signal = MagicMock(return_value={"meta": {}, "reality_signal": 42})
+    monkeypatch.setattr(main, "_extract_keywords_via_haiku", _haiku(HAIKU))
+    monkeypatch.setattr(main, "search_github_repos", search)
+    monkeypatch.setattr(main, "search_hn", AsyncMock(return_value={}))
+    monkeypatch.setattr(main, "compute_signal", signal)
+
+    result, keywords, keyword_source, _ = await main._compute_report("habit tracker", "quick", "en", [])
+
+    assert [c.args[0] for c in search.await_args_list] == [HAIKU]
+    assert keywords == HAIKU and keyword_source == "llm"
+    assert signal.call_args.kwargs["keywords"] == HAIKU
+    assert result["meta"]["keyword_paths"] == {
+        "dictionary": DICTIONARY, "llm": HAIKU, "llm_only": ["habit tracker", "streak app"],
+    }
+
+
+async def test_haiku_failure_uses_the_dictionary_keywords(monkeypatch):
+    search = AsyncMock(return_value={})
+    monkeypatch.setattr(main, "_extract_keywords_via_haiku", _haiku(None))
+    monkeypatch.setattr(main, "search_github_repos", search)
+    monkeypatch.setattr(main, "search_hn", AsyncMock(return_value={}))
+    monkeypatch.setattr(main, "compute_signal", MagicMock(return_value={"meta": {}, "reality_signal": 42}))
+
+    result, keywords, keyword_source, _ = await main._compute_report("habit tracker", "quick", "en", [])
+
+    assert [c.args[0] for c in search.await_args_list] == [DICTIONARY]
+    assert keywords == DICTIONARY and keyword_source == "dictionary"
+    assert result["meta"]["keyword_paths"] == {"dictionary": DICTIONARY, "llm": None, "llm_only": []}
+
+
+async def test_disjoint_keyword_lists_cost_one_round_of_upstream_requests(monkeypatch):
+    sent: list[str] = []
+
+    def handler(request):
+        sent.append(request.url.host)
+        if request.url.host == "api.github.com":
+            return httpx.Response(200, json={"total_count": 0, "items": []})
+        return httpx.Response(200, json={"nbHits": 0, "hits": []})
+
+    for module in (github, hn):
+        monkeypatch.setattr(module, "upstream_transport", lambda _source: httpx.MockTransport(handler))
+
+    haiku = ["streak app", "daily goals", "routine builder"]  # shares nothing with DICTIONARY
+    monkeypatch.setattr(main, "_extract_keywords_via_haiku", _haiku(haiku, delay=0))
+    await main._compute_report("habit tracker", "quick", "en", [])
+
+    assert sent.count("api.github.com") == 2 * len(haiku)  # main + recent search per keyword
+
+
+async def test_flash_layer_runs_under_tight_source_timeouts(monkeypatch):
+    from idea_reality_mcp import timeouts
+
+    seen: list[dict] = []
+
+    def handler(request):
+        seen.append(dict(request.extensions["timeout"]))
+        if request.url.host == "api.github.com":
+            return httpx.Response(200, json={"total_count": 0, "items": []})
+        return httpx.Response(200, json={"nbHits": 0, "hits": []})
+
+    for module, source in ((github, "github"), (hn, "hn")):
+        monkeypatch.setattr(
+            module, "upstream_transport",
+            lambda _source, source=source: timeouts.AdaptiveTimeoutTransport(source, httpx.MockTransport(handler)),
+        )
+
+    await main._compute_report("habit tracker", "quick", "en", [], flash=True)
+
+    assert seen and all(
+        t["read"] == main._FLASH_READ_TIMEOUT_S and t["connect"] == main._FLASH_CONNECT_TIMEOUT_S for t in seen
+    )
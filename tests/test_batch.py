@@ -0,0 +1,158 @@
+"""idea_check_batch and the shared upstream scope (idea_reality_mcp.coalesce)."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from idea_reality_mcp import coalesce, tools
+from idea_reality_mcp.sources import github, hn
+
+
+def _counting(handler):
+    calls: list[str] = []
+
+    async def wrapped(request):
+        calls.append(str(request.url))
+        result = handler(request)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    return calls, wrapped
+
+
+async def _get(transport, url):
+    async with httpx.AsyncClient(transport=transport) as client:
+        return await client.get(url)
+
+
+# ---------------------------------------------------------------------------
+# coalesce
+# ---------------------------------------------------------------------------
+
+
+async def test_scope_sends_identical_gets_once():
+    async def slow(request):
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"q": request.url.params["q"]})
+
+    calls, handler = _counting(slow)
+    t = coalesce.CoalescingTransport("test_src", httpx.MockTransport(handler))
+    with coalesce.scope() as s:
+        concurrent = await asyncio.gather(*(_get(t, "https://api.test/s?q=a") for _ in range(3)))
+        later = await _get(t, "https://api.test/s?q=a")
+        other = await _get(t, "https://api.test/s?q=b")
+    assert [r.json() for r in concurrent] == [{"q": "a"}] * 3
+    assert later.json() == {"q": "a"} and other.json() == {"q": "b"}
+    assert len(calls) == 2
+    assert s.stats()["requests"] == 2 and s.coalesced == 3
+
+
+async def test_errors_are_not_memoised_and_budget_is_enforced():
+    statuses = iter([503, 200])
+    calls, handler = _counting(lambda r: httpx.Response(next(statuses)))
+    t = coalesce.CoalescingTransport("test_src", httpx.MockTransport(handler))
+    with coalesce.scope(max_requests=2) as s:
+        assert (await _get(t, "https://api.test/x")).status_code == 503
+        assert (await _get(t, "https://api.test/x")).status_code == 200  # retried, not replayed
+        with pytest.raises(httpx.ConnectError):
+            await _get(t, "https://api.test/y")
+    assert len(calls) == 2 and s.rejected == 1
+
+
+async def test_pass_through_outside_scope_and_for_posts():
+    calls, handler = _counting(lambda r: httpx.Response(200))
+    t = coalesce.CoalescingTransport("test_src", httpx.MockTransport(handler))
+    await _get(t, "https://api.test/x")
+    await _get(t, "https://api.test/x")
+    with coalesce.scope():
+        async with httpx.AsyncClient(transport=t) as client:
+            await client.post("https://api.test/x", json={"a": 1})
+            await client.post("https://api.test/x", json={"a": 1})
+    assert len(calls) == 4
+
+
+# ---------------------------------------------------------------------------
+# idea_check_batch
+# ---------------------------------------------------------------------------
+
+
+def _upstream(request):
+    if request.url.host == "api.github.com":
+        q = request.url.params["q"]
+        n = 40 if "habit" in q else 5
+        return httpx.Response(200, json={"total_count": n, "items": [{
+            "full_name": f"u/{q.split()[0]}-app", "html_url": "https://github.com/u/x", "stargazers_count": n * 10,
+            "updated_at": "2026-01-01T00:00:00Z", "created_at": "2025-01-01T00:00:00Z",
+            "description": q, "language": "Python",
+        }]})
+    return httpx.Response(200, json={"nbHits": 3, "hits": []})
+
+
+@pytest.fixture
+def mock_upstream(monkeypatch):
+    calls, handler = _counting(_upstream)
+    for module, source in ((github, "github"), (hn, "hn")):
+        monkeypatch.setattr(
+            module, "upstream_transport",
+            lambda _source, source=source: coalesce.CoalescingTransport(source, httpx.MockTransport(handler)),
+        )
+    with patch("idea_reality_mcp.tools.expand_idea", new_callable=AsyncMock, return_value=None):
+        tools._load()
+        yield calls
+
+
+IDEAS = ["habit tracker app", "habit tracker for teams", "Habit tracker app", "invoice generator"]
+
+
+async def test_batch_dedupes_queries_and_ranks(mock_upstream):
+    for idea in dict.fromkeys(i.lower() for i in IDEAS):
+        await tools.idea_check(idea)
+    individual = len(mock_upstream)
+    mock_upstream.clear()
+
+    out = await tools.idea_check_batch(IDEAS)
+    assert len(mock_upstream) < individual, (len(mock_upstream), individual)
+    assert out["meta"]["ideas"] == 4 and out["meta"]["unique_ideas"] == 3
+    assert out["meta"]["upstream"]["coalesced"] > 0
+    assert out["meta"]["upstream"]["requests"] == len(mock_upstream)
+
+    assert [r["idea"] for r in out["results"]] == IDEAS
+    assert out["results"][0]["reality_signal"] == out["results"][2]["reality_signal"]
+    signals = [r["reality_signal"] for r in out["ranking"]]
+    assert signals == sorted(signals) and out["ranking"][0]["idea"] == "invoice generator"
+    assert [r["rank"] for r in out["ranking"]] == [1, 2, 3]
+    assert out["meta"]["incomplete"] == [] and "incomplete" not in out["results"][0]
+
+
+async def test_budget_starved_ideas_are_not_ranked(mock_upstream, monkeypatch):
+    monkeypatch.setattr(tools, "BATCH_MAX_UPSTREAM", 4)
+    out = await tools.idea_check_batch(["habit tracker", "invoice generator", "photo editor"])
+
+    incomplete = out["meta"]["incomplete"]
+    assert incomplete and out["meta"]["upstream"]["rejected"] > 0
+    assert not {r["idea"] for r in out["ranking"]} & set(incomplete)
+    for r in out["results"]:
+        assert r.get("incomplete", False) == (r["idea"] in incomplete)
+        if r["idea"] in incomplete:
+            assert r["meta"]["upstream_rejected"] > 0
+
+
+async def test_batch_validates_input():
+    with pytest.raises(ValueError):
+        await tools.idea_check_batch(["  ", ""])
+    with pytest.raises(ValueError):
+        await tools.idea_check_batch([f"idea {i}" for i in range(tools.BATCH_MAX_IDEAS + 1)])
+
+
+async def test_batch_tool_is_registered():
+    fastmcp = pytest.importorskip("fastmcp")
+    from idea_reality_mcp.server import mcp
+
+    async with fastmcp.Client(mcp) as client:
+        names = {t.name for t in await client.list_tools()}
+    assert {"idea_check", "idea_check_batch"} <= names
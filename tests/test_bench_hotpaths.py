@@ -0,0 +1,59 @@
+"""Hot-path benchmark suite (scripts/bench_hotpaths.py).
+
+The scaling guards always run: they are ratios measured in-process, so they hold on any
+machine and catch an accidental O(n²). The absolute baseline gate is timing-sensitive and
+runs only with IDEA_REALITY_BENCH=1 (e.g. a dedicated CI job):
+
+    IDEA_REALITY_BENCH=1 python -m pytest tests/test_bench_hotpaths.py
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import bench_hotpaths as bench  # noqa: E402
+
+# 4x the input: linear ≈ 4, n·log n ≈ 5, quadratic ≈ 16.
+MAX_SCALING_RATIO = 10.0
+
+
+@pytest.mark.parametrize("name", list(bench.BENCHMARKS))
+def test_hot_path_scales_subquadratically(name):
+    ratio = min(bench.scaling(name) for _ in range(2))  # second try absorbs a noisy sample
+    assert ratio < MAX_SCALING_RATIO, f"{name}: 4x input took {ratio:.1f}x longer"
+
+
+def test_corpus_includes_golden_and_tw_sets():
+    corpus = bench.load_corpus()
+    assert "LLM monitoring and observability platform" in corpus
+    assert "記帳工具" in corpus  # test_tw_chinese.py
+    assert "太空軌道模擬器" in corpus  # test_tw_niche.py
+
+
+def test_baseline_covers_every_benchmark():
+    baseline = bench.load_baseline()
+    assert set(baseline["benchmarks"]) == set(bench.BENCHMARKS)
+    assert all(b["rel"] > 0 for b in baseline["benchmarks"].values())
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"benchmarks": {"a": {"rel": 1.0, "us": 10}, "b": {"rel": 1.0, "us": 10}}}
+    results = {"a": {"rel": 1.2, "us": 12}, "b": {"rel": 1.5, "us": 15}, "new": {"rel": 9.0, "us": 90}}
+    failures = bench.compare(results, baseline, threshold=0.3)
+    assert len(failures) == 1 and failures[0].startswith("b:")
+
+
+@pytest.mark.skipif(os.environ.get("IDEA_REALITY_BENCH") != "1", reason="set IDEA_REALITY_BENCH=1 to gate on the baseline")
+def test_no_regression_against_stored_baseline():
+    baseline = bench.load_baseline()
+    results = bench.run()
+    failures = bench.compare(results, baseline)
+    if failures:  # re-time offenders once before failing, as the CLI does
+        again = bench.run([f.split(":")[0] for f in failures])
+        results.update({k: v for k, v in again.items() if v["rel"] < results[k]["rel"]})
+        failures = bench.compare(results, baseline)
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,148 @@
+"""Circuit breakers (idea_reality_mcp.breaker): the state machine and the per-host
+registry every source adapter goes through."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from idea_reality_mcp import breaker
+from idea_reality_mcp.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from idea_reality_mcp.sources import hn, stackoverflow
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_opens_after_consecutive_failures_only():
+    b = CircuitBreaker("t", threshold=3, cooldown_s=10, clock=_Clock())
+    b.record_failure()
+    b.record_failure()
+    b.record_success()  # resets the streak
+    b.record_failure()
+    b.record_failure()
+    assert b.state == CLOSED and b.allow()
+    b.record_failure()
+    assert b.state == OPEN and not b.allow()
+
+
+def test_half_open_allows_one_trial_then_closes_or_reopens():
+    clock = _Clock()
+    b = CircuitBreaker("t", threshold=1, cooldown_s=10, clock=clock)
+    b.record_failure()
+    clock.t = 9.9
+    assert not b.allow() and b.retry_in() > 0
+    clock.t = 10.0
+    assert b.allow() and b.state == HALF_OPEN
+    assert not b.allow()  # only one trial in flight
+    b.record_failure()
+    assert b.state == OPEN and b.retry_in() == 10.0
+
+    clock.t = 20.0
+    assert b.allow()
+    b.record_success()
+    assert b.state == CLOSED and b.allow() and b.allow()
+
+
+def test_flapping_host_opens_on_failure_rate():
+    b = CircuitBreaker("t", threshold=3, cooldown_s=10, clock=_Clock(), window=6)
+    for ok in (False, True, False, True, False):  # never 3 in a row
+        b.record_success() if ok else b.record_failure()
+    assert b.state == OPEN
+
+
+# ---------------------------------------------------------------------------
+# Upstream hosts (BreakerTransport in the upstream.transport() stack)
+# ---------------------------------------------------------------------------
+
+def _down(calls):
+    def handler(request):
+        calls.append(request.url.host)
+        raise httpx.ConnectTimeout("timed out", request=request)
+    return handler
+
+
+@pytest.fixture
+def network(monkeypatch):
+    """Route every adapter's network layer through `network.handler`."""
+
+    class Net:
+        calls: list[str] = []
+        handler = None
+
+    def transport(source):
+        return breaker.BreakerTransport(httpx.MockTransport(lambda r: Net.handler(r)))
+
+    for module in (hn, stackoverflow):
+        monkeypatch.setattr(module, "upstream_transport", transport)
+    return Net
+
+
+async def test_open_host_fails_fast_with_skipped_evidence(network):
+    network.handler = _down(network.calls)
+    keywords = [f"query {i}" for i in range(8)]
+    result = await hn.search_hn(keywords)
+
+    assert len(network.calls) == breaker.HOST_FAILURES  # the rest never left the process
+    types = [e["type"] for e in result.evidence]
+    assert types == ["error"] * breaker.HOST_FAILURES + ["skipped"] * (8 - breaker.HOST_FAILURES)
+    assert "hn.algolia.com is failing" in result.evidence[-1]["detail"]
+    assert breaker.host_states() == {"hn.algolia.com": "open"}
+
+    so = await stackoverflow.search_stackoverflow(["a", "b"])  # a different host is unaffected
+    assert [e["type"] for e in so.evidence] == ["error", "error"] and not so.skipped
+
+
+async def test_source_with_every_query_skipped_is_marked_skipped(network):
+    network.handler = _down(network.calls)
+    await stackoverflow.search_stackoverflow(["a", "b", "c"])
+    so = await stackoverflow.search_stackoverflow(["d", "e"])
+    assert so.skipped and {e["type"] for e in so.evidence} == {"skipped"}
+
+
+async def test_half_open_sends_one_probe_and_recovers(network, monkeypatch):
+    network.handler = _down(network.calls)
+    await hn.search_hn(["a", "b", "c"])
+    b = breaker.for_host("hn.algolia.com")
+    monkeypatch.setattr(b, "_opened_at", b._opened_at - breaker.HOST_COOLDOWN_S)
+
+    gate = asyncio.Event()
+
+    async def slow_ok(request):
+        network.calls.append(request.url.host)
+        await gate.wait()
+        return httpx.Response(200, json={"nbHits": 1, "hits": []})
+
+    network.handler = slow_ok
+    probe = asyncio.create_task(hn.search_hn(["probe"]))
+    await asyncio.sleep(0.01)
+    blocked = await hn.search_hn(["other"])  # while the probe is in flight
+    assert blocked.evidence[0]["type"] == "skipped"
+    gate.set()
+    assert (await probe).total_mentions == 1
+    assert b.state == "closed"
+
+
+async def test_client_errors_and_cancellation_do_not_trip(network):
+    network.handler = lambda r: httpx.Response(404)
+    await hn.search_hn(["a", "b", "c", "d"])
+    assert breaker.host_states() == {"hn.algolia.com": "closed"}
+
+    async def hang(request):
+        await asyncio.sleep(10)
+
+    network.handler = hang
+    for _ in range(breaker.HOST_FAILURES + 1):
+        task = asyncio.create_task(hn.search_hn(["a"]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert breaker.host_states() == {"hn.algolia.com": "closed"}
@@ -0,0 +1,196 @@
+"""Tests for record / replay cassettes (idea_reality_mcp.cassette) at the upstream
+transport boundary."""
+
+from __future__ import annotations
+
+import time
+
+import httpx
+import pytest
+
+from idea_reality_mcp import cassette
+from idea_reality_mcp.upstream import transport as upstream_transport
+
+
+def _live(handler):
+    return cassette.CassetteTransport("test_src", httpx.MockTransport(handler))
+
+
+def _offline():
+    def handler(request):
+        raise AssertionError(f"network used during replay: {request.url}")
+
+    return _live(handler)
+
+
+async def test_record_then_replay_without_network(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+
+    def handler(request):
+        return httpx.Response(200, json={"q": request.url.params.get("q"), "items": [1, 2]})
+
+    with cassette.use(path, mode="record") as cas:
+        async with httpx.AsyncClient(transport=_live(handler)) as client:
+            recorded = (await client.get("https://api.test/search", params={"q": "habit", "per_page": 5})).json()
+    assert cas.recorded == 1
+
+    with cassette.use(path, mode="replay") as cas:
+        async with httpx.AsyncClient(transport=_offline()) as client:
+            # query order does not matter
+            resp = await client.get("https://api.test/search", params={"per_page": 5, "q": "habit"})
+    assert resp.json() == recorded
+    assert resp.headers["content-type"] == "application/json"
+    assert cas.hits == 1 and cas.misses == 0
+
+
+async def test_secrets_never_stored_and_not_part_of_key(tmp_path):
+    path = tmp_path / "c.jsonl"
+    with cassette.use(str(path), mode="record"):
+        async with httpx.AsyncClient(transport=_live(lambda r: httpx.Response(200, text="ok"))) as client:
+            await client.get("https://libraries.test/search?q=x&api_key=SECRET",
+                             headers={"Authorization": "Bearer TOKEN"})
+    stored = path.read_text()
+    assert "SECRET" not in stored and "TOKEN" not in stored
+
+    with cassette.use(str(path), mode="replay") as cas:
+        async with httpx.AsyncClient(transport=_offline()) as client:
+            assert (await client.get("https://libraries.test/search?q=x&api_key=OTHER")).text == "ok"
+    assert cas.hits == 1
+
+
+async def test_repeated_requests_replay_in_order(tmp_path):
+    path = str(tmp_path / "c.jsonl.gz")
+    statuses = iter([403, 200])
+    with cassette.use(path, mode="record"):
+        async with httpx.AsyncClient(transport=_live(lambda r: httpx.Response(next(statuses)))) as client:
+            await client.get("https://api.test/x")
+            await client.get("https://api.test/x")
+
+    with cassette.use(path, mode="replay"):
+        async with httpx.AsyncClient(transport=_offline()) as client:
+            codes = [(await client.get("https://api.test/x")).status_code for _ in range(3)]
+    assert codes == [403, 200, 200]  # then the last response repeats
+
+
+async def test_replay_miss_is_a_connect_error(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    with cassette.use(path, mode="record"):
+        async with httpx.AsyncClient(transport=_live(lambda r: httpx.Response(200))) as client:
+            await client.get("https://api.test/known")
+
+    with cassette.use(path, mode="replay") as cas:
+        async with httpx.AsyncClient(transport=_offline()) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://api.test/unknown")
+    assert cas.misses == 1
+
+
+async def test_auto_mode_records_only_misses(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, text=request.url.path)
+
+    for _ in range(2):
+        with cassette.use(path, mode="auto"):
+            async with httpx.AsyncClient(transport=_live(handler)) as client:
+                await client.get("https://api.test/a")
+    assert calls == ["/a"]
+
+
+def test_clock_derived_filters_do_not_change_the_key():
+    a = httpx.Request("GET", "https://hn.test/search?query=x&numericFilters=created_at_i>1760889063")
+    b = httpx.Request("GET", "https://hn.test/search?query=x&numericFilters=created_at_i>1760975463")
+    c = httpx.Request("GET", "https://hn.test/search?query=y&numericFilters=created_at_i>1760889063")
+    assert cassette.request_key(a) == cassette.request_key(b) != cassette.request_key(c)
+
+
+def test_json_body_key_is_canonical():
+    a = httpx.Request("POST", "https://llm.test/v1", json={"a": 1, "b": [1, 2]})
+    b = httpx.Request("POST", "https://llm.test/v1", content=b'{"b": [1, 2], "a": 1}')
+    assert cassette.request_key(a) == cassette.request_key(b)
+
+
+async def test_recorded_latency_is_replayed(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+
+    async def slow(request):
+        import asyncio
+
+        await asyncio.sleep(0.05)
+        return httpx.Response(200)
+
+    with cassette.use(path, mode="record"):
+        async with httpx.AsyncClient(transport=_live(slow)) as client:
+            await client.get("https://api.test/slow")
+
+    with cassette.use(path, mode="replay", latency="recorded"):
+        async with httpx.AsyncClient(transport=_offline()) as client:
+            t0 = time.perf_counter()
+            await client.get("https://api.test/slow")
+    assert time.perf_counter() - t0 >= 0.04
+
+
+def test_replay_requires_an_existing_cassette(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        cassette.Cassette(str(tmp_path / "missing.jsonl"), mode="replay")
+    with pytest.raises(ValueError):
+        cassette.Cassette(str(tmp_path / "x.jsonl"), mode="rewind")
+
+
+async def test_source_adapter_replays_through_upstream_transport(tmp_path, monkeypatch):
+    """A real adapter (GitHub) recorded against a mock, replayed with the network gone."""
+    from idea_reality_mcp.sources import github
+
+    path = str(tmp_path / "gh.jsonl")
+    payload = {"total_count": 42, "items": [{
+        "full_name": "a/habit", "html_url": "https://github.com/a/habit", "stargazers_count": 10,
+        "updated_at": "2026-01-01T00:00:00Z", "description": "habit tracker", "language": "Python",
+    }]}
+    real_client = httpx.AsyncClient
+
+    def client_on(handler):
+        def factory(*args, **kwargs):
+            kwargs["transport"] = cassette.CassetteTransport("github", httpx.MockTransport(handler))
+            return real_client(*args, **kwargs)
+        return factory
+
+    monkeypatch.setattr(github.httpx, "AsyncClient", client_on(lambda r: httpx.Response(200, json=payload)))
+    with cassette.use(path, mode="record"):
+        live = await github.search_github_repos(["habit tracker"])
+
+    monkeypatch.setattr(github.httpx, "AsyncClient", client_on(lambda r: httpx.Response(500)))
+    with cassette.use(path, mode="replay") as cas:
+        replayed = await github.search_github_repos(["habit tracker"])
+    assert cas.misses == 0 and cas.hits >= 1
+    assert replayed.total_repo_count == live.total_repo_count == 42
+    assert [r["name"] for r in replayed.top_repos] == [r["name"] for r in live.top_repos]
+
+
+def test_upstream_transport_is_pass_through_without_cassette():
+    t = upstream_transport("github")
+    while not isinstance(t, cassette.CassetteTransport):
+        t = t.inner
+    while not isinstance(t, httpx.AsyncHTTPTransport):  # network layers below the cassette
+        t = t.inner
+    assert cassette.active() is None
+
+
+@pytest.mark.parametrize("env", [
+    {"IDEA_REALITY_CASSETTE": "missing.jsonl"},
+    {"IDEA_REALITY_CASSETTE": "c.jsonl", "IDEA_REALITY_CASSETTE_MODE": "record",
+     "IDEA_REALITY_CASSETTE_LATENCY": "fast"},
+])
+async def test_bad_env_config_fails_requests_not_startup(tmp_path, monkeypatch, env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, str(tmp_path / value) if name == "IDEA_REALITY_CASSETTE" else value)
+    monkeypatch.setattr(cassette, "_env_loaded", False)
+    monkeypatch.setattr(cassette, "_env_error", None)
+    monkeypatch.setattr(cassette, "_active", None)
+
+    assert cassette.active() is None  # logged, not raised
+    async with httpx.AsyncClient(transport=_offline()) as client:
+        with pytest.raises(httpx.ConnectError, match="cassette unavailable"):
+            await client.get("https://api.test/x")
@@ -0,0 +1,190 @@
+"""Tests for the async micro-batching embedding client (api/embeddings.py)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from api import embeddings  # noqa: E402
+from api.embeddings import (  # noqa: E402
+    EMBED_DIM,
+    EmbeddingBatcher,
+    EmbeddingError,
+    embed_texts_async,
+    fake_embed_texts,
+    fake_embed_texts_async,
+)
+
+
+class _CountingProvider:
+    """Wraps the fake provider and records every batch it receives."""
+
+    def __init__(self, fail: bool = False):
+        self.calls: list[list[str]] = []
+        self.fail = fail
+
+    async def __call__(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("provider down")
+        return fake_embed_texts(texts, dim=8)
+
+
+# ---------------------------------------------------------------------------
+# Deterministic stand-in provider
+# ---------------------------------------------------------------------------
+
+
+def test_fake_provider_is_deterministic_and_unit_norm():
+    a1, a2, b = fake_embed_texts(["split bills", "split bills", "photo editor"])
+    assert a1 == a2
+    assert a1 != b
+    assert len(a1) == EMBED_DIM
+    assert sum(x * x for x in a1) == pytest.approx(1.0, abs=1e-9)
+
+
+async def test_fake_provider_async_matches_sync():
+    assert await fake_embed_texts_async(["x"]) == fake_embed_texts(["x"])
+
+
+# ---------------------------------------------------------------------------
+# Batcher
+# ---------------------------------------------------------------------------
+
+
+async def test_concurrent_requests_share_one_provider_call():
+    provider = _CountingProvider()
+    batcher = EmbeddingBatcher(provider, max_wait=0.01)
+
+    texts = [f"idea {i}" for i in range(10)]
+    vecs = await asyncio.gather(*(batcher.embed(t) for t in texts))
+
+    assert len(provider.calls) == 1
+    assert provider.calls[0] == texts
+    # Fan-out preserves caller <-> vector pairing
+    assert list(vecs) == fake_embed_texts(texts, dim=8)
+
+
+async def test_max_batch_splits_into_multiple_calls():
+    provider = _CountingProvider()
+    batcher = EmbeddingBatcher(provider, max_batch=4, max_wait=0.01)
+
+    vecs = await batcher.embed_many([f"t{i}" for i in range(10)])
+
+    assert [len(c) for c in provider.calls] == [4, 4, 2]
+    assert len(vecs) == 10
+    assert batcher.batches_sent == 3
+    assert batcher.texts_sent == 10
+
+
+async def test_separate_windows_send_separate_batches():
+    provider = _CountingProvider()
+    batcher = EmbeddingBatcher(provider, max_wait=0.001)
+
+    await batcher.embed("first")
+    await batcher.embed("second")
+
+    assert provider.calls == [["first"], ["second"]]
+
+
+async def test_provider_failure_reaches_every_waiter():
+    provider = _CountingProvider(fail=True)
+    batcher = EmbeddingBatcher(provider, max_wait=0.001)
+
+    results = await asyncio.gather(
+        batcher.embed("a"), batcher.embed("b"), return_exceptions=True
+    )
+
+    assert len(provider.calls) == 1
+    assert all(isinstance(r, EmbeddingError) for r in results)
+
+
+async def test_wrong_vector_count_is_an_error():
+    async def short(texts):
+        return fake_embed_texts(texts[:-1], dim=4)
+
+    batcher = EmbeddingBatcher(short, max_wait=0.001)
+    with pytest.raises(EmbeddingError):
+        await asyncio.gather(batcher.embed("a"), batcher.embed("b"))
+
+
+async def test_get_batcher_keeps_provider_across_loops():
+    embeddings.set_batcher(EmbeddingBatcher(fake_embed_texts_async, max_wait=0.001))
+    try:
+        first = embeddings.get_batcher()
+        assert await embeddings.embed_one_async("hello") == fake_embed_texts(["hello"])[0]
+        # Same loop -> same instance
+        assert embeddings.get_batcher() is first
+    finally:
+        embeddings.set_batcher(None)
+
+
+# ---------------------------------------------------------------------------
+# Async HTTP provider — retry / backoff
+# ---------------------------------------------------------------------------
+
+
+def _resp(status: int, data=None) -> MagicMock:
+    r = MagicMock(spec=httpx.Response)
+    r.status_code = status
+    r.text = "err"
+    r.json.return_value = {"data": data}
+    return r
+
+
+def _ok(n: int):
+    return _resp(200, [{"index": i, "embedding": [0.0] * EMBED_DIM} for i in range(n)])
+
+
+def _client(*responses):
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.side_effect = list(responses)
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=False)
+    return client
+
+
+async def test_embed_texts_async_retries_transient_errors(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(embeddings, "_RETRY_DELAYS", (0.0, 0.0))
+    client = _client(_resp(429), httpx.ConnectError("boom"), _ok(2))
+
+    with patch("api.embeddings.httpx.AsyncClient", return_value=client):
+        vecs = await embed_texts_async(["a", "b"])
+
+    assert len(vecs) == 2
+    assert client.post.await_count == 3
+
+
+async def test_embed_texts_async_does_not_retry_client_errors(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(embeddings, "_RETRY_DELAYS", (0.0, 0.0))
+    client = _client(_resp(401), _ok(1))
+
+    with patch("api.embeddings.httpx.AsyncClient", return_value=client):
+        with pytest.raises(EmbeddingError, match="401"):
+            await embed_texts_async(["a"])
+
+    assert client.post.await_count == 1
+
+
+async def test_embed_texts_async_gives_up_after_retries(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(embeddings, "_RETRY_DELAYS", (0.0,))
+    client = _client(_resp(503), _resp(503))
+
+    with patch("api.embeddings.httpx.AsyncClient", return_value=client):
+        with pytest.raises(EmbeddingError, match="503"):
+            await embed_texts_async(["a"])
+
+
+async def test_embed_texts_async_requires_key(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with pytest.raises(EmbeddingError):
+        await embed_texts_async(["a"])
@@ -0,0 +1,101 @@
+"""Tests for the pluggable embedding providers (api/embeddings.py)."""
+
+from __future__ import annotations
+
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from api import embeddings  # noqa: E402
+from api.embeddings import (  # noqa: E402
+    LOCAL_DIM,
+    LOCAL_MODEL,
+    HashedNgramProvider,
+    OpenAIProvider,
+    embed_texts,
+    embed_texts_async,
+)
+
+
+def _cos(a, b):
+    return sum(x * y for x, y in zip(a, b))
+
+
+@pytest.fixture
+def local(monkeypatch):
+    monkeypatch.setenv("EMBED_MODEL", "local-ngram")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+
+# ---------------------------------------------------------------------------
+# Provider selection
+# ---------------------------------------------------------------------------
+
+
+def test_default_provider_is_openai(monkeypatch):
+    monkeypatch.delenv("EMBED_MODEL", raising=False)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    prov = embeddings.get_provider()
+    assert isinstance(prov, OpenAIProvider)
+    assert embeddings.active_model() == "text-embedding-3-small"
+    assert embeddings.active_dim() == 1536
+    assert not embeddings.embeddings_enabled()
+
+
+@pytest.mark.parametrize("name", ["local", "local-ngram", "local-ngram-v1"])
+def test_local_aliases_select_hashed_provider(monkeypatch, name):
+    monkeypatch.setenv("EMBED_MODEL", name)
+    assert isinstance(embeddings.get_provider(), HashedNgramProvider)
+    assert embeddings.active_model() == LOCAL_MODEL
+    assert embeddings.active_dim() == LOCAL_DIM
+
+
+def test_local_provider_needs_no_key(local):
+    assert embeddings.embeddings_enabled()
+
+
+def test_openai_models_are_pinned_to_the_stored_dimension(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("EMBED_MODEL", "text-embedding-3-large")
+    assert embeddings.embeddings_enabled() and embeddings.active_dim() == 1536
+    assert embeddings._openai_payload("text-embedding-3-large", ["x"])["dimensions"] == 1536
+    assert "dimensions" not in embeddings._openai_payload("text-embedding-ada-002", ["x"])
+
+    monkeypatch.setenv("EMBED_MODEL", "some-other-model")
+    assert not embeddings.embeddings_enabled()
+    with pytest.raises(embeddings.EmbeddingError):
+        embed_texts(["x"])
+
+
+# ---------------------------------------------------------------------------
+# Local backend
+# ---------------------------------------------------------------------------
+
+
+def test_local_vectors_are_deterministic_and_unit_norm(local):
+    a1, a2, b = embed_texts(["split bills", "split bills", "photo editor"])
+    assert a1 == a2
+    assert len(a1) == LOCAL_DIM
+    assert math.isclose(sum(x * x for x in a1), 1.0, abs_tol=1e-9)
+    assert a1 != b
+
+
+def test_local_vectors_rank_related_ideas_higher(local):
+    q, near, far = embed_texts(
+        ["split bills with roommates", "bill splitter for roommates", "AI photo editing tool"]
+    )
+    assert _cos(q, near) > 0.45  # clears report._similar_ideas' semantic threshold
+    assert _cos(q, near) > _cos(q, far)
+
+
+def test_local_handles_empty_and_cjk_text(local):
+    empty, cjk = embed_texts(["", "記帳 應用"])
+    assert empty == [0.0] * LOCAL_DIM
+    assert any(cjk)
+
+
+async def test_local_async_matches_sync(local):
+    assert await embed_texts_async(["habit tracker"]) == embed_texts(["habit tracker"])
@@ -50,7 +50,7 @@ class TestExpandIdeaSuccess:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("idea_reality_mcp.scoring.expansion.httpx.AsyncClient", return_value=mock_client):
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient", return_value=mock_client):
             result = await expand_idea("monitor LLM costs")
 
         assert result is not None
@@ -70,7 +70,7 @@ class TestExpandIdeaApiFailure:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("idea_reality_mcp.scoring.expansion.httpx.AsyncClient", return_value=mock_client):
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient", return_value=mock_client):
             result = await expand_idea("monitor LLM costs")
 
         assert result is None
@@ -85,7 +85,7 @@ class TestExpandIdeaTimeout:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("idea_reality_mcp.scoring.expansion.httpx.AsyncClient", return_value=mock_client):
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient", return_value=mock_client):
             result = await expand_idea("monitor LLM costs")
 
         assert result is None
@@ -100,7 +100,7 @@ class TestExpandIdeaInvalidJson:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("idea_reality_mcp.scoring.expansion.httpx.AsyncClient", return_value=mock_client):
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient", return_value=mock_client):
             result = await expand_idea("monitor LLM costs")
 
         assert result is None
@@ -120,7 +120,7 @@ class TestExpandIdeaMissingKeys:
         mock_client.__aenter__ = AsyncMock(return_value=mock_client)
         mock_client.__aexit__ = AsyncMock(return_value=False)
 
-        with patch("idea_reality_mcp.scoring.expansion.httpx.AsyncClient", return_value=mock_client):
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient", return_value=mock_client):
             result = await expand_idea("monitor LLM costs")
 
         assert result is None
@@ -220,3 +220,73 @@ class TestIdeaCheckFallbackOnExpansionFailure:
         # extract_keywords called only once — with the original idea_text
         assert mock_extract.call_count == 1
         assert mock_extract.call_args[0][0] == short_idea
+
+
+class TestIdeaCheckExpandsAlongsideSearches:
+    @pytest.mark.asyncio
+    async def test_dictionary_searches_start_before_expansion_returns(self):
+        """Searches on dictionary keywords are in flight while expand_idea is still running;
+        the core_concept then leads the final keyword list."""
+        import asyncio
+
+        from idea_reality_mcp.tools import idea_check
+
+        searched: list[list[str]] = []
+        expansion_done = asyncio.Event()
+
+        async def slow_expand(_idea):
+            await asyncio.sleep(0.05)
+            expansion_done.set()
+            return _VALID_EXPANSION
+
+        async def github(keywords):
+            searched.append((list(keywords), expansion_done.is_set()))
+
+        mock_signal = MagicMock(return_value={"meta": {}, "reality_signal": 50})
+        with (
+            patch("idea_reality_mcp.tools.expand_idea", slow_expand),
+            patch("idea_reality_mcp.tools.extract_keywords", MagicMock(return_value=["llm", "monitor"])),
+            patch("idea_reality_mcp.tools.search_github_repos", github),
+            patch("idea_reality_mcp.tools.search_hn", AsyncMock()),
+            patch("idea_reality_mcp.tools.compute_signal", mock_signal),
+        ):
+            result = await idea_check("monitor LLM costs", depth="quick")
+
+        assert searched[0] == (["llm", "monitor"], False)
+        assert searched[-1] == (["LLM API monitor", "llm", "monitor"], True)
+        assert mock_signal.call_args.kwargs["keywords"] == ["LLM API monitor", "llm", "monitor"]
+        assert result["meta"]["keyword_source"] == "expanded"
+
+    @pytest.mark.asyncio
+    async def test_only_core_concept_queries_are_added_upstream(self, monkeypatch):
+        """At the HTTP boundary nothing is sent twice: the re-issued searches share the
+        dictionary round's requests and add only the core-concept ones."""
+        from idea_reality_mcp import coalesce, tools
+        from idea_reality_mcp.sources import github, hn
+
+        sent: list[str] = []
+
+        def handler(request):
+            sent.append(str(request.url))
+            if request.url.host == "api.github.com":
+                return httpx.Response(200, json={"total_count": 0, "items": []})
+            return httpx.Response(200, json={"nbHits": 0, "hits": []})
+
+        for module, source in ((github, "github"), (hn, "hn")):
+            monkeypatch.setattr(
+                module, "upstream_transport",
+                lambda _source, source=source: coalesce.CoalescingTransport(source, httpx.MockTransport(handler)),
+            )
+        tools._load()
+
+        with patch("idea_reality_mcp.tools.expand_idea", new_callable=AsyncMock, return_value=None):
+            await tools.idea_check("monitor LLM costs")
+        dictionary_only = set(sent)
+        sent.clear()
+
+        with patch("idea_reality_mcp.tools.expand_idea", new_callable=AsyncMock, return_value=_VALID_EXPANSION):
+            await tools.idea_check("monitor LLM costs")
+
+        assert len(sent) == len(set(sent))
+        added = set(sent) - dictionary_only
+        assert added and all("LLM+API+monitor" in url for url in added)
@@ -0,0 +1,144 @@
+"""Tests for the streaming /api/export endpoint and db.iter_scores."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+fastapi = pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+import db as score_db  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _use_tmp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(score_db, "DB_PATH", str(tmp_path / "test_export.db"))
+    monkeypatch.setenv("EXPORT_KEY", "secret")
+    score_db.init_db()
+
+
+@pytest.fixture
+def client():
+    from api.main import app  # noqa: E402
+    return TestClient(app)
+
+
+def _seed(n: int) -> list[int]:
+    return [
+        score_db.save_score(f"idea {i}, with comma", 40 + i, "{}", json.dumps(["kw"]))
+        for i in range(n)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# db.iter_scores
+# ---------------------------------------------------------------------------
+
+
+def test_iter_scores_keyset_pages():
+    ids = _seed(5)
+    pages = list(score_db.iter_scores(batch=2))
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [r["id"] for p in pages for r in p] == ids
+    assert "breakdown" not in pages[0][0]
+
+
+def test_iter_scores_since_and_until():
+    ids = _seed(5)
+    rows = [r for p in score_db.iter_scores(since_id=ids[1], until_id=ids[3], batch=10) for r in p]
+    assert [r["id"] for r in rows] == ids[2:4]
+    assert score_db.get_max_score_id() == ids[-1]
+
+
+# ---------------------------------------------------------------------------
+# /api/export
+# ---------------------------------------------------------------------------
+
+
+def test_export_requires_key(client):
+    assert client.get("/api/export?key=wrong").status_code == 403
+
+
+def test_export_json_default_shape(client):
+    ids = _seed(3)
+    resp = client.get("/api/export?key=secret")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 3
+    assert [r["id"] for r in body["records"]] == ids
+    assert body["next_since"] == ids[-1]
+    assert resp.headers["x-export-next-since"] == str(ids[-1])
+
+
+def test_export_json_empty(client):
+    assert client.get("/api/export?key=secret").json() == {
+        "records": [], "count": 0, "next_since": 0,
+    }
+
+
+def test_export_ndjson_incremental_since(client):
+    ids = _seed(4)
+    resp = client.get(f"/api/export?key=secret&format=ndjson&since={ids[1]}")
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["id"] for r in lines] == ids[2:]
+    # Nothing new since the returned cursor
+    nxt = resp.headers["x-export-next-since"]
+    assert client.get(f"/api/export?key=secret&format=ndjson&since={nxt}").text == ""
+
+
+def test_export_csv(client):
+    _seed(2)
+    resp = client.get("/api/export?key=secret&format=csv")
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [r["idea_text"] for r in rows] == ["idea 0, with comma", "idea 1, with comma"]
+    assert rows[1]["score"] == "41"
+
+
+def test_export_gzip(client):
+    _seed(3)
+    with client.stream("GET", "/api/export?key=secret&format=ndjson&gzip=1") as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        raw = b"".join(resp.iter_raw())
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[0])["idea_text"] == "idea 0, with comma"
+
+
+def test_gzip_stream_is_decodable_per_chunk():
+    import zlib
+
+    from api.main import _gzip_chunks
+
+    stream = _gzip_chunks(iter(['{"id": 1}\n', '{"id": 2}\n']))
+    d = zlib.decompressobj(31)
+    assert d.decompress(next(stream)) == b'{"id": 1}\n'  # no waiting for later pages
+    assert d.decompress(next(stream)) == b'{"id": 2}\n'
+
+
+@pytest.mark.parametrize("params", ["format=ndjson", "format=csv", "format=ndjson&gzip=1"])
+def test_export_failure_mid_stream_fails_the_response(client, monkeypatch, params):
+    _seed(3)
+
+    def failing_pages(**_kwargs):
+        yield [{"id": 1, "idea_text": "first page"}]
+        raise RuntimeError("db went away")
+
+    monkeypatch.setattr(score_db, "iter_scores", failing_pages)
+    with pytest.raises(RuntimeError, match="db went away"):  # not a clean, short 200
+        with client.stream("GET", f"/api/export?key=secret&{params}") as resp:
+            b"".join(resp.iter_raw())
@@ -0,0 +1,68 @@
+"""The load-test fake upstreams (scripts/fake_upstreams.py) must stay parseable by the
+real source adapters — otherwise the load test measures fallback paths."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("starlette", reason="starlette not installed (API server deps)")
+pytest.importorskip("uvicorn", reason="uvicorn not installed (API server deps)")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+import fake_upstreams  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+from idea_reality_mcp.sources import github, hn, npm, pypi, stackoverflow  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def server():
+    cfg = fake_upstreams.UpstreamConfig(default=fake_upstreams.Behavior(latency_ms=0, jitter_ms=0))
+    with fake_upstreams.FakeUpstreamServer(cfg) as srv:
+        yield srv
+
+
+async def test_source_adapters_parse_fake_responses(server, monkeypatch):
+    base = server.base_url
+    monkeypatch.setattr(github, "GITHUB_API", f"{base}/github/search/repositories")
+    monkeypatch.setattr(hn, "HN_ALGOLIA_API", f"{base}/hn/api/v1/search")
+    monkeypatch.setattr(npm, "NPM_SEARCH_API", f"{base}/npm/-/v1/search")
+    monkeypatch.setattr(pypi, "PYPI_JSON_URL", base + "/pypi/pypi/{package}/json")
+    monkeypatch.setattr(stackoverflow, "SO_API", f"{base}/so/2.3/search")
+    monkeypatch.delenv("LIBRARIES_IO_KEY", raising=False)
+
+    kws = ["expense tracker", "budget app", "invoice generator"]
+    gh = await github.search_github_repos(kws)
+    assert gh.total_repo_count > 0 and gh.top_repos
+    assert (await hn.search_hn(kws)).total_mentions >= 0
+    assert (await npm.search_npm(kws)).top_packages
+    assert (await stackoverflow.search_stackoverflow(kws)).evidence
+    assert (await pypi.search_pypi(kws)).evidence
+    assert server.config.counts["github"] >= len(kws)
+
+
+def test_rate_limit_and_errors_mimic_real_services():
+    cfg = fake_upstreams.UpstreamConfig(
+        default=fake_upstreams.Behavior(latency_ms=0, jitter_ms=0),
+        overrides={
+            "github": fake_upstreams.Behavior(latency_ms=0, jitter_ms=0, rate_limit_rps=2),
+            "so": fake_upstreams.Behavior(latency_ms=0, jitter_ms=0, rate_limit_rps=1),
+            "npm": fake_upstreams.Behavior(latency_ms=0, jitter_ms=0, error_rate=1.0),
+        },
+    )
+    client = TestClient(fake_upstreams.create_app(cfg))
+    codes = [client.get("/github/search/repositories", params={"q": "x"}).status_code for _ in range(4)]
+    assert codes[:2] == [200, 200] and 403 in codes[2:]
+    client.get("/so/2.3/search", params={"intitle": "x"})
+    throttled = client.get("/so/2.3/search", params={"intitle": "x"})
+    assert throttled.status_code == 400 and throttled.json()["error_name"] == "throttle_violation"
+    assert client.get("/npm/-/v1/search", params={"text": "x"}).status_code == 500
+
+
+def test_parse_override():
+    default = fake_upstreams.Behavior()
+    name, b = fake_upstreams.parse_override("github:latency_ms=400,rate_limit_rps=10", default)
+    assert name == "github" and b.latency_ms == 400 and b.rate_limit_rps == 10 and b.jitter_ms == default.jitter_ms
@@ -38,7 +38,7 @@ class TestExtractKeywordsLlm:
         keywords = ["mcp monitoring llm", "llm observability", "llm api tracing"]
         mock_resp = _mock_response(200, {"keywords": keywords})
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=mock_resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -54,7 +54,7 @@ class TestExtractKeywordsLlm:
         """429 → returns None (caller should fall back to dictionary)."""
         mock_resp = _mock_response(429)
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=mock_resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -70,7 +70,7 @@ class TestExtractKeywordsLlm:
         """500 → returns None."""
         mock_resp = _mock_response(500)
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=mock_resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -84,7 +84,7 @@ class TestExtractKeywordsLlm:
     @pytest.mark.asyncio
     async def test_timeout_returns_none(self):
         """Connection timeout → returns None."""
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(side_effect=httpx.TimeoutException("timeout"))
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -98,7 +98,7 @@ class TestExtractKeywordsLlm:
     @pytest.mark.asyncio
     async def test_connection_error_returns_none(self):
         """Connection refused → returns None."""
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(
                 side_effect=httpx.ConnectError("Connection refused")
@@ -116,7 +116,7 @@ class TestExtractKeywordsLlm:
         """200 but non-JSON body → returns None."""
         resp = httpx.Response(200, content=b"not json at all")
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -132,7 +132,7 @@ class TestExtractKeywordsLlm:
         """200 but only 1 keyword → returns None (minimum 2 required)."""
         mock_resp = _mock_response(200, {"keywords": ["only one"]})
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=mock_resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -149,7 +149,7 @@ class TestExtractKeywordsLlm:
         many = [f"keyword{i}" for i in range(12)]
         mock_resp = _mock_response(200, {"keywords": many})
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=mock_resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -167,7 +167,7 @@ class TestExtractKeywordsLlm:
         keywords = ["custom url test", "second query"]
         mock_resp = _mock_response(200, {"keywords": keywords})
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=mock_resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
@@ -191,7 +191,7 @@ class TestExtractKeywordsLlm:
         """Empty strings in keyword list are filtered out."""
         mock_resp = _mock_response(200, {"keywords": ["valid", "", "  ", "also valid"]})
 
-        with patch("idea_reality_mcp.scoring.llm.httpx.AsyncClient") as MockClient:
+        with patch("idea_reality_mcp.scoring.render_api.httpx.AsyncClient") as MockClient:
             instance = AsyncMock()
             instance.post = AsyncMock(return_value=mock_resp)
             instance.__aenter__ = AsyncMock(return_value=instance)
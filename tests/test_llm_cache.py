@@ -0,0 +1,113 @@
+"""Shared Anthropic client and persistent LLM response cache (api/llm.py)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+from types import ModuleType
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+import db as score_db  # noqa: E402
+import llm  # noqa: E402
+import main  # noqa: E402
+
+
+@pytest.fixture
+def cache_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(score_db, "DB_PATH", str(tmp_path / "llm_cache.db"))
+    score_db.init_db()
+    monkeypatch.setattr(llm, "LLM_CACHE_TTL", 3600.0)
+
+
+def _fake_anthropic(reply: str):
+    message = MagicMock()
+    message.content = [MagicMock(text=reply)]
+    client = AsyncMock()
+    client.messages.create = AsyncMock(return_value=message)
+    mod = ModuleType("anthropic")
+    mod.AsyncAnthropic = MagicMock(return_value=client)
+    return mod, client
+
+
+def test_key_normalizes_input_and_tracks_prompt_model_and_evidence():
+    base = llm.cache_key("pivot_hints", "prompt v1", "haiku", "Habit  Tracker", evidence=[1, "en"])
+    assert base == llm.cache_key("pivot_hints", "prompt v1", "haiku", " habit tracker ", evidence=[1, "en"])
+    assert base != llm.cache_key("pivot_hints", "prompt v2", "haiku", "habit tracker", evidence=[1, "en"])
+    assert base != llm.cache_key("pivot_hints", "prompt v1", "sonnet", "habit tracker", evidence=[1, "en"])
+    assert base != llm.cache_key("pivot_hints", "prompt v1", "haiku", "habit tracker", evidence=[2, "en"])
+    assert base != llm.cache_key("expand_idea", "prompt v1", "haiku", "habit tracker", evidence=[1, "en"])
+
+
+def test_store_honours_ttl_and_size_bound(cache_db):
+    score_db.put_llm_cache("a", "t", json.dumps(["x"]))
+    assert score_db.get_llm_cache("a", 60) == '["x"]'
+    conn = score_db._get_conn()
+    conn.execute("UPDATE llm_cache SET created_at = datetime('now', '-2 hours') WHERE cache_key = 'a'")
+    conn.commit()
+    conn.close()
+    assert score_db.get_llm_cache("a", 3600) is None
+
+    for k in "bcd":
+        score_db.put_llm_cache(k, "t", "1")
+    score_db.put_llm_cache("e", "t", "1", max_rows=2, max_age_s=3600)
+    conn = score_db._get_conn()
+    left = {r[0] for r in conn.execute("SELECT cache_key FROM llm_cache").fetchall()}
+    conn.close()
+    assert len(left) == 2 and "a" not in left and "e" in left
+
+
+async def test_repeat_extraction_is_served_from_cache(cache_db, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    mod, client = _fake_anthropic(json.dumps(["habit tracker", "streak app", "daily goals"]))
+    with patch.dict("sys.modules", {"anthropic": mod}):
+        first = await main._extract_keywords_via_haiku("Habit tracker")
+        again = await main._extract_keywords_via_haiku("habit  tracker")
+    assert first == again == ["habit tracker", "streak app", "daily goals"]
+    assert client.messages.create.await_count == 1
+    assert mod.AsyncAnthropic.call_count == 1  # one shared client
+
+
+async def test_failures_are_not_cached(cache_db, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    mod, client = _fake_anthropic("not json")
+    with patch.dict("sys.modules", {"anthropic": mod}):
+        assert await main._extract_keywords_via_haiku("habit tracker") is None
+        assert await main._extract_keywords_via_haiku("habit tracker") is None
+    assert client.messages.create.await_count == 2
+
+
+async def test_cache_errors_fail_open(monkeypatch):
+    monkeypatch.setattr(llm, "LLM_CACHE_TTL", 3600.0)
+    monkeypatch.setattr(score_db, "get_llm_cache", MagicMock(side_effect=RuntimeError("db down")))
+    monkeypatch.setattr(score_db, "put_llm_cache", MagicMock(side_effect=RuntimeError("db down")))
+    assert await llm.cache_get("k") is None
+    await llm.cache_put("k", "t", ["x"])
+
+
+async def test_client_is_rebuilt_when_the_key_changes():
+    mod, _ = _fake_anthropic("[]")
+    with patch.dict("sys.modules", {"anthropic": mod}):
+        a = llm.client("key-1")
+        assert llm.client("key-1") is a
+        llm.client("key-2")
+        await llm.aclose()
+    assert mod.AsyncAnthropic.call_count == 2
+
+
+def test_client_is_not_reused_across_event_loops():
+    mod, _ = _fake_anthropic("[]")
+
+    async def get():
+        return llm.client("key-1")
+
+    with patch.dict("sys.modules", {"anthropic": mod}):
+        asyncio.run(get())
+        asyncio.run(get())  # e.g. the next load-test scenario
+    assert mod.AsyncAnthropic.call_count == 2  # rebuilt for the second loop
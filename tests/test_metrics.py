@@ -0,0 +1,158 @@
+"""Tests for the zero-dependency Prometheus metrics (idea_reality_mcp.metrics) and
+GET /metrics."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+from idea_reality_mcp import metrics, timing
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+import db as score_db  # noqa: E402
+
+
+# ---------------------------------------------------------------------------
+# Registry + exposition
+# ---------------------------------------------------------------------------
+
+
+def test_counter_and_histogram_exposition():
+    c = metrics.counter("test_things_total", "Things", ("kind",))
+    c.inc("a")
+    c.inc("a", n=2)
+    c.inc('q"uote')
+    h = metrics.histogram("test_latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    h.observe(0.05, "/x")
+    h.observe(0.5, "/x")
+    h.observe(5, "/x")
+
+    text = metrics.render()
+    assert "# TYPE test_things_total counter" in text
+    assert 'test_things_total{kind="a"} 3' in text
+    assert 'test_things_total{kind="q\\"uote"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/x",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="/x"} 3' in text
+
+
+def test_repeated_definition_shares_series():
+    a = metrics.counter("test_shared_total", "Shared")
+    b = metrics.counter("test_shared_total", "Shared")
+    a.inc()
+    assert b is a and b.value() == 1
+
+
+def test_callback_metric_read_at_scrape_and_isolated_on_error():
+    state = {"n": 1}
+    metrics.register_callback("test_cb", "Callback", lambda: state["n"])
+    metrics.register_callback("test_cb_broken", "Broken", lambda: 1 / 0)
+    state["n"] = 7
+    text = metrics.render()
+    assert "test_cb 7" in text
+    assert "# TYPE test_cb_broken gauge" in text  # header kept, samples skipped
+
+
+def test_stage_timings_exported_in_seconds():
+    timing.reset()
+    timing.observe("source.github", 30)
+    text = metrics.render()
+    assert 'idea_check_stage_duration_seconds_bucket{stage="source.github",le="0.05"} 1' in text
+    assert 'idea_check_stage_duration_seconds_count{stage="source.github"} 1' in text
+    timing.reset()
+
+
+# ---------------------------------------------------------------------------
+# Upstream transport + loop lag
+# ---------------------------------------------------------------------------
+
+
+async def test_metered_transport_records_status_and_errors():
+    def handler(request):
+        if request.url.path == "/boom":
+            raise httpx.ConnectError("down", request=request)
+        return httpx.Response(404)
+
+    transport = metrics.MeteredTransport("test_src", httpx.MockTransport(handler))
+    before_404 = metrics.UPSTREAM_REQUESTS.value("test_src", "404")
+    before_err = metrics.UPSTREAM_REQUESTS.value("test_src", "error")
+    async with httpx.AsyncClient(transport=transport) as client:
+        assert (await client.get("https://upstream.test/x")).status_code == 404
+        with pytest.raises(httpx.ConnectError):
+            await client.get("https://upstream.test/boom")
+    assert metrics.UPSTREAM_REQUESTS.value("test_src", "404") == before_404 + 1
+    assert metrics.UPSTREAM_REQUESTS.value("test_src", "error") == before_err + 1
+    assert metrics.UPSTREAM_LATENCY.count("test_src") >= 2
+
+
+async def test_loop_lag_monitor_sees_blocking_work():
+    import time
+
+    mon = metrics.LoopLagMonitor(interval=0.01)
+    mon.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.05)  # block the loop
+    await asyncio.sleep(0.03)
+    await mon.stop()
+    assert metrics.LOOP_LAG.count() >= 1
+    assert mon.last_lag >= 0
+
+
+# ---------------------------------------------------------------------------
+# GET /metrics
+# ---------------------------------------------------------------------------
+
+fastapi = pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(score_db, "DB_PATH", str(tmp_path / "test_metrics.db"))
+    score_db.init_db()
+    from api import main  # noqa: E402
+
+    return main
+
+
+def test_metrics_endpoint_reports_routes_and_callbacks(api, monkeypatch):
+    monkeypatch.setenv("METRICS_KEY", "s3cret")
+    client = TestClient(api.app)
+    client.get("/health")
+    client.get("/no-such-page-12345")
+
+    resp = client.get("/metrics?key=s3cret")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert 'route="/no-such-page-12345"' not in text  # unmatched paths collapse to "other"
+    assert 'rate_limit_hits_total{scope="check",outcome="allowed"}' in text
+    assert 'cache_entries{cache="scan"}' in text
+    assert "# TYPE event_loop_lag_seconds histogram" in text
+
+
+def test_metrics_endpoint_key(api, monkeypatch):
+    monkeypatch.setenv("METRICS_KEY", "s3cret")
+    client = TestClient(api.app)
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics?key=s3cret").status_code == 200
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_metrics_endpoint_closed_without_key(api, monkeypatch):
+    monkeypatch.delenv("METRICS_KEY", raising=False)
+    client = TestClient(api.app)
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics?key=").status_code == 403
@@ -0,0 +1,131 @@
+"""Local npm name / keyword index (idea_reality_mcp.sources.npm_index)."""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+from click.testing import CliRunner
+
+from idea_reality_mcp.cli import cli
+from idea_reality_mcp.sources import npm, npm_index
+
+PACKAGES = {
+    "habit-tracker": [],
+    "habits": ["tracker"],
+    "@acme/streak": ["habit", "tracking"],
+    "react": ["ui", "framework"],
+}
+
+ALL_DOCS = [
+    '{"total_rows":4,"offset":0,"rows":[',
+    json.dumps({"id": "habit-tracker", "doc": {"name": "habit-tracker"}}) + ",",
+    json.dumps({"id": "habits", "doc": {
+        "name": "habits", "dist-tags": {"latest": "2.0.0"},
+        "versions": {"1.0.0": {"keywords": ["old"]}, "2.0.0": {"keywords": ["tracker"]}},
+    }}) + ",",
+    json.dumps({"id": "left-pad", "doc": {"name": "left-pad", "keywords": "pad, string"}}) + ",",
+    json.dumps({"id": "_design/app", "doc": {"views": {}}}),
+    "]}",
+    # a later _changes row removing a package
+    json.dumps({"seq": 9, "id": "left-pad", "deleted": True, "doc": {"_id": "left-pad", "_deleted": True}}),
+]
+
+
+def test_match_counts_packages_with_every_word_in_name_or_keywords():
+    index = npm_index.NpmIndex.build(PACKAGES)
+
+    ids = index.match("habit tracker")
+    assert sorted(index.names[i] for i in ids) == ["habit-tracker", "habits"]  # "habits" via prefix
+    assert len(index.match("habit")) == 3
+    assert index.match("react native") == set()
+    assert index.match("an ui") is None  # no 4+ char word: not judged locally
+    assert index.top(index.match("habit"), limit=2) == ["habits", "@acme/streak"]
+
+
+def test_index_round_trips_through_bytes():
+    index = npm_index.NpmIndex.build(PACKAGES)
+    loaded = npm_index.NpmIndex.from_bytes(index.to_bytes(), 0.0)
+    assert len(loaded) == 4 and len(loaded.terms) == len(index.terms)
+    assert loaded.match("habit tracker") == index.match("habit tracker")
+
+
+def test_build_from_all_docs_and_changes_dump():
+    index = npm_index.build_from_dump(ALL_DOCS)
+
+    assert [index.names[i] for i in range(len(index))] == ["habit-tracker", "habits"]
+    assert len(index.match("tracker")) == 2  # latest version's keywords
+    assert index.match("old") is None and index.match("string") == set()
+    assert len(npm_index.load()) == 2
+
+
+def test_cli_builds_the_index(tmp_path):
+    dump = tmp_path / "dump.json"
+    dump.write_text("\n".join(ALL_DOCS), encoding="utf-8")
+
+    result = CliRunner().invoke(cli, ["npm-index", str(dump)])
+
+    assert result.exit_code == 0, result.output
+    assert "2 npm packages" in result.output
+    assert npm_index.path().exists()
+
+
+async def test_search_uses_the_index_and_the_api_only_for_unjudged_queries(monkeypatch):
+    sent: list[str] = []
+
+    def handler(request):
+        sent.append(request.url.params["text"])
+        return httpx.Response(200, json={"total": 900, "objects": []})
+
+    monkeypatch.setattr(npm, "upstream_transport", lambda _source: httpx.MockTransport(handler))
+    monkeypatch.setenv("IDEA_REALITY_NPM_INDEX", "1")
+    monkeypatch.setattr(npm_index, "_index", npm_index.NpmIndex.build(PACKAGES))
+
+    result = await npm.search_npm(["habit tracker", "habit", "ai"])
+
+    assert sent == ["ai"]
+    assert [e["count"] for e in result.evidence] == [2, 3, npm._MAX_RAW_TOTAL_CAP]  # exact vs capped
+    assert result.total_count == npm._MAX_RAW_TOTAL_CAP
+    assert {p["name"] for p in result.top_packages} == {"habit-tracker", "habits", "@acme/streak"}
+    assert result.top_packages[0]["score"] == 1.0  # rank-derived, not sunk below API packages
+
+
+async def test_local_counts_are_capped_like_api_estimates(monkeypatch):
+    monkeypatch.setattr(npm, "_MAX_RAW_TOTAL_CAP", 2)
+    monkeypatch.setenv("IDEA_REALITY_NPM_INDEX", "1")
+    monkeypatch.setattr(npm_index, "_index", npm_index.NpmIndex.build(PACKAGES))
+
+    result = await npm.search_npm(["habit"])
+
+    assert result.total_count == 2 and result.evidence[0]["count"] == 2
+    assert "exact: 3" in result.evidence[0]["detail"]
+    assert [p["score"] for p in result.top_packages] == sorted((p["score"] for p in result.top_packages), reverse=True)
+
+
+async def test_lookup_loads_in_the_background_only_when_enabled(monkeypatch):
+    npm_index.build_from_dump(ALL_DOCS)
+    assert npm_index.lookup() is None and npm_index._task is None  # off by default
+
+    monkeypatch.setenv("IDEA_REALITY_NPM_INDEX", "1")
+    assert npm_index.lookup() is None
+    await npm_index._task
+    assert len(npm_index.lookup()) == 2
+
+
+async def test_local_lookup_runs_off_the_event_loop(monkeypatch):
+    import threading
+
+    threads = []
+    match = npm_index.NpmIndex.match
+
+    def recording_match(self, query):
+        threads.append(threading.current_thread())
+        return match(self, query)
+
+    monkeypatch.setattr(npm_index.NpmIndex, "match", recording_match)
+    monkeypatch.setenv("IDEA_REALITY_NPM_INDEX", "1")
+    monkeypatch.setattr(npm_index, "_index", npm_index.NpmIndex.build(PACKAGES))
+
+    await npm.search_npm(["habit"])
+
+    assert threads and threads[0] is not threading.main_thread()
@@ -14,9 +14,16 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
 # Import the function under test
 pytest.importorskip("fastapi")
 
+import llm  # noqa: E402
 from main import _generate_pivot_hints_llm  # noqa: E402
 
 
+@pytest.fixture(autouse=True)
+def _no_llm_cache(monkeypatch):
+    """Each test mocks a different Haiku reply for the same prompt."""
+    monkeypatch.setattr(llm, "LLM_CACHE_TTL", 0)
+
+
 # ---------------------------------------------------------------------------
 # Fixtures & helpers
 # ---------------------------------------------------------------------------
@@ -0,0 +1,106 @@
+"""MCP progress notifications from idea_check and the provisional reality signal."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from idea_reality_mcp.scoring.engine import compute_signal, provisional_signal
+from idea_reality_mcp.sources.github import GitHubResults
+from idea_reality_mcp.sources.hn import HNResults
+from idea_reality_mcp.sources.npm import NpmResults
+from idea_reality_mcp.sources.producthunt import ProductHuntResults
+from idea_reality_mcp.sources.pypi import PyPIResults
+from idea_reality_mcp.sources.stackoverflow import StackOverflowResults
+
+GH = GitHubResults(total_repo_count=300, max_stars=4000, top_repos=[], recent_ratio=0.5)
+HN = HNResults(total_mentions=12, evidence=[])
+NPM = NpmResults(total_count=80)
+PYPI = PyPIResults(total_count=25)
+PH = ProductHuntResults(skipped=True)
+SO = StackOverflowResults(total_count=40)
+
+
+def test_provisional_signal_converges_on_final_base_score():
+    assert provisional_signal("deep") is None
+    partial = provisional_signal("deep", github_results=GH)
+    assert partial is not None
+    full = provisional_signal("deep", github_results=GH, hn_results=HN, npm_results=NPM,
+                              pypi_results=PYPI, ph_results=PH, so_results=SO)
+    # momentum 0.5 (GitHub recent_ratio only) -> no temporal boost, so the scores match
+    final = compute_signal("idea", ["idea"], GH, HN, "deep", npm_results=NPM, pypi_results=PYPI,
+                           ph_results=PH, so_results=SO)
+    assert full == final["reality_signal"]
+    quick = compute_signal("idea", ["idea"], GH, HN, "quick")
+    assert provisional_signal("quick", github_results=GH, hn_results=HN) == quick["reality_signal"]
+
+
+def _delayed(value, delay):
+    async def source(_keywords):
+        await asyncio.sleep(delay)
+        return value
+    return source
+
+
+def _patched_sources():
+    return (
+        patch("idea_reality_mcp.tools.expand_idea", new_callable=AsyncMock, return_value=None),
+        patch("idea_reality_mcp.tools.search_github_repos", _delayed(GH, 0.06)),
+        patch("idea_reality_mcp.tools.search_hn", _delayed(HN, 0.0)),
+        patch("idea_reality_mcp.tools.search_npm", _delayed(NPM, 0.01)),
+        patch("idea_reality_mcp.tools.search_pypi", _delayed(PYPI, 0.02)),
+        patch("idea_reality_mcp.tools.search_producthunt", _delayed(PH, 0.0)),
+        patch("idea_reality_mcp.tools.search_stackoverflow", _delayed(SO, 0.1)),
+    )
+
+
+async def test_deep_check_reports_each_source_as_it_completes():
+    fastmcp = pytest.importorskip("fastmcp")
+    from idea_reality_mcp import tools
+    from idea_reality_mcp.server import mcp
+
+    events: list[tuple[float, float | None, str | None]] = []
+
+    async def on_progress(progress, total, message):
+        events.append((progress, total, message))
+
+    patches = _patched_sources()
+    for p in patches:
+        p.start()
+    try:
+        tools._load()
+        async with fastmcp.Client(mcp) as client:
+            result = await client.call_tool(
+                "idea_check", {"idea_text": "habit tracker", "depth": "deep"}, progress_handler=on_progress
+            )
+    finally:
+        for p in patches:
+            p.stop()
+
+    assert [e[0] for e in events] == list(range(1, 9))
+    assert all(e[1] == 8 for e in events)
+    messages = [e[2] for e in events]
+    assert messages[0].startswith("keywords ready (dictionary)")
+    # sources in completion order, slowest (stackoverflow) last
+    order = [m.split(":")[0] for m in messages[1:7]]
+    assert order[-2:] == ["github", "stackoverflow"]
+    assert set(order) == {"github", "hackernews", "npm", "pypi", "producthunt", "stackoverflow"}
+    assert "producthunt: skipped — provisional" in " ".join(messages)
+    assert "(6/6 sources)" in messages[6]
+    assert messages[-1] == f"done: reality_signal {result.structured_content['reality_signal']}"
+
+
+async def test_direct_call_without_mcp_context_is_unaffected():
+    from idea_reality_mcp import tools
+
+    patches = _patched_sources()
+    for p in patches:
+        p.start()
+    try:
+        result = await tools.idea_check("habit tracker", depth="deep")
+    finally:
+        for p in patches:
+            p.stop()
+    assert "reality_signal" in result
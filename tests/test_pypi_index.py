@@ -0,0 +1,98 @@
+"""Local PyPI project-name snapshot (idea_reality_mcp.sources.pypi_index)."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from idea_reality_mcp import coalesce
+from idea_reality_mcp.sources import pypi, pypi_index
+
+
+def test_membership_is_pep503_normalised_and_prefixes_are_sorted():
+    index = pypi_index.NameIndex.from_names(["Flask", "flask_login", "Flask.Cors", "django", ""])
+    assert len(index) == 4
+    assert "flask" in index and "Flask-Login" in index and "flask_cors" in index
+    assert "fla" not in index and "zzz" not in index
+    assert index.with_prefix("flask") == ["flask", "flask-cors", "flask-login"]
+    assert index.with_prefix("flask", limit=1) == ["flask"]
+    assert index.with_prefix("rails") == []
+    assert len(pypi_index.NameIndex(b"", 0.0)) == 0
+
+
+async def test_refresh_downloads_and_persists_the_snapshot(monkeypatch):
+    def handler(request):
+        assert request.headers["accept"] == pypi_index.SIMPLE_JSON
+        return httpx.Response(200, json={"meta": {}, "projects": [{"name": "Requests"}, {"name": "attrs"}]})
+
+    monkeypatch.setattr(pypi_index, "upstream_transport", lambda _source: httpx.MockTransport(handler))
+    index = await pypi_index.refresh()
+
+    assert len(index) == 2 and "requests" in index
+    assert pypi_index.path().read_bytes() == b"attrs\nrequests"
+    assert "attrs" in pypi_index.load()
+
+
+async def test_lookup_loads_in_the_background_only_when_enabled(monkeypatch):
+    pypi_index.path().parent.mkdir(parents=True, exist_ok=True)
+    pypi_index.path().write_bytes(b"attrs\nrequests")
+
+    assert pypi_index.lookup() is None and pypi_index._task is None  # off by default
+
+    monkeypatch.setenv("IDEA_REALITY_PYPI_INDEX", "1")
+    assert pypi_index.lookup() is None  # not loaded yet: callers use the network
+    await pypi_index._task
+    assert "requests" in pypi_index.lookup()
+
+
+async def test_only_names_in_the_snapshot_are_probed(monkeypatch):
+    probed: list[str] = []
+
+    def handler(request):
+        probed.append(request.url.path)
+        name = request.url.path.split("/")[2]
+        return httpx.Response(200, json={"info": {"name": name, "version": "1.0", "summary": ""}})
+
+    monkeypatch.setattr(pypi, "upstream_transport", lambda _source: httpx.MockTransport(handler))
+    monkeypatch.setenv("IDEA_REALITY_PYPI_INDEX", "1")
+    monkeypatch.setattr(pypi_index, "_index", pypi_index.NameIndex.from_names(["todo-app", "todo"]))
+
+    result = await pypi.search_pypi(["todo app"])
+
+    assert probed == ["/pypi/todo-app/json", "/pypi/todo/json"]  # not todoapp / app
+    assert result.total_count == 2
+    assert result.evidence[0]["count"] == 2
+
+
+@pytest.mark.parametrize("status", [500, 200])
+async def test_failed_refresh_falls_back_and_backs_off(monkeypatch, status):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(status, json={"unexpected": True})
+
+    monkeypatch.setattr(pypi_index, "upstream_transport", lambda _source: httpx.MockTransport(handler))
+    monkeypatch.setenv("IDEA_REALITY_PYPI_INDEX", "1")
+
+    assert pypi_index.lookup() is None
+    await pypi_index._task
+    assert pypi_index.lookup() is None and pypi_index._task.done()  # no retry before RETRY_S
+    assert len(calls) == 1
+
+
+async def test_background_refresh_runs_outside_the_callers_scope(monkeypatch):
+    def handler(request):
+        return httpx.Response(200, json={"meta": {}, "projects": [{"name": "attrs"}]})
+
+    monkeypatch.setattr(
+        pypi_index, "upstream_transport",
+        lambda source: coalesce.CoalescingTransport(source, httpx.MockTransport(handler)),
+    )
+    monkeypatch.setenv("IDEA_REALITY_PYPI_INDEX", "1")
+
+    with coalesce.scope(max_requests=0) as s:  # a batch whose budget is spent
+        assert pypi_index.lookup() is None
+        await pypi_index._task
+    assert s.rejected == 0 and not s._memo
+    assert "attrs" in pypi_index.lookup()
@@ -0,0 +1,141 @@
+"""Tests for the day-bucketed rate limiter (api/rate_limit.py)."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+import rate_limit  # noqa: E402
+from rate_limit import DailyLimiter, MemoryBackend, SQLiteBackend  # noqa: E402
+
+
+def test_limit_is_inclusive_and_counts_past_the_cap():
+    lim = DailyLimiter("t", 3, backend=MemoryBackend())
+    assert [lim.hit("ip", day="2026-01-01") for _ in range(4)] == [True, True, True, False]
+    assert lim.hit("other", day="2026-01-01")
+
+
+def test_weighted_hits():
+    lim = DailyLimiter("t", 10, backend=MemoryBackend())
+    assert lim.hit("ip", 10, day="2026-01-01")
+    assert not lim.hit("ip", 1, day="2026-01-01")
+
+
+def test_rollover_drops_whole_bucket():
+    backend = MemoryBackend()
+    lim = DailyLimiter("t", 1, backend=backend)
+    for i in range(100):
+        lim.hit(f"ip{i}", 5, day="2026-01-01")
+    assert backend.size() == 100
+
+    assert lim.hit("ip0", day="2026-01-02")
+    assert backend.size() == 1
+    # A straggler stamped with the previous day doesn't resurrect it
+    assert lim.hit("ip1", day="2026-01-01")
+    assert backend.size() == 1
+
+
+def test_memory_is_bounded_by_evicting_idle_keys():
+    backend = MemoryBackend(max_keys=3)
+    lim = DailyLimiter("t", 1, backend=backend)
+    assert lim.hit("abuser", day="2026-01-01")
+    for i in range(10):
+        assert lim.hit(f"spoofed{i}", day="2026-01-01")  # each new key is still counted
+        assert not lim.hit("abuser", day="2026-01-01")  # recently seen: never evicted
+    assert backend.size() == 3
+    assert backend.evicted == 8
+    assert not lim.hit("spoofed9", day="2026-01-01")  # limiting never switches off
+
+
+def test_sqlite_backend_trims_to_the_key_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRIM_EVERY", 2)
+    backend = SQLiteBackend(str(tmp_path / "rl.db"), max_keys=3)
+    lim = DailyLimiter("t", 1, backend=backend)
+    assert lim.hit("abuser", day="2026-01-01")
+    for i in range(9):
+        lim.hit(f"spoofed{i}", day="2026-01-01")
+        assert not lim.hit("abuser", day="2026-01-01")
+    assert backend.size() <= 3 + 1  # trimmed every TRIM_EVERY new keys
+    assert backend.count("t", "2026-01-01", "abuser") == 10
+
+
+def test_count_and_clear():
+    lim = DailyLimiter("t", 5, backend=MemoryBackend())
+    lim.hit("ip", 2)
+    assert lim.count("ip") == 2
+    lim.clear()
+    assert lim.count("ip") == 0
+
+
+def test_sqlite_backend_shares_limits_between_limiters(tmp_path):
+    path = str(tmp_path / "rl.db")
+    a = DailyLimiter("check", 2, backend=SQLiteBackend(path))
+    b = DailyLimiter("check", 2, backend=SQLiteBackend(path))  # e.g. a second worker
+    other_scope = DailyLimiter("view", 2, backend=SQLiteBackend(path))
+
+    assert a.hit("ip", day="2026-01-01")
+    assert b.hit("ip", day="2026-01-01")
+    assert not a.hit("ip", day="2026-01-01")
+    assert other_scope.hit("ip", day="2026-01-01")
+
+    # The first hit of a new day sweeps old rows
+    assert b.hit("ip", day="2026-01-02")
+    assert b.backend.size() == 1
+
+
+def test_env_selects_shared_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_DB", str(tmp_path / "shared.db"))
+    monkeypatch.setattr(rate_limit, "_shared_backends", {})
+    a = DailyLimiter("x", 1)
+    b = DailyLimiter("y", 1)
+    assert isinstance(a.backend, SQLiteBackend)
+    assert a.backend is b.backend
+
+    monkeypatch.delenv("RATE_LIMIT_DB")
+    assert isinstance(DailyLimiter("z", 1).backend, MemoryBackend)
+
+
+def test_backend_error_fails_open():
+    class _Broken:
+        def incr(self, *a):
+            raise RuntimeError("disk full")
+
+    assert DailyLimiter("t", 0, backend=_Broken()).hit("ip")
+
+
+def test_locked_shared_backend_fails_open_quickly(tmp_path):
+    path = str(tmp_path / "rl.db")
+    lim = DailyLimiter("check", 1, backend=SQLiteBackend(path))
+    assert lim.hit("ip", day="2026-01-01")
+
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")  # holds the write lock
+    try:
+        started = time.perf_counter()
+        assert lim.hit("ip", day="2026-01-01")  # over the limit, but the backend is busy
+        assert time.perf_counter() - started < 0.5
+    finally:
+        other_worker.execute("ROLLBACK")
+        other_worker.close()
+    assert not lim.hit("ip", day="2026-01-01")
+
+
+def test_client_ip_is_the_entry_added_by_the_trusted_proxy(monkeypatch):
+    pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+    import main
+
+    def request(xff=None):
+        return SimpleNamespace(headers={"x-forwarded-for": xff} if xff else {}, client=SimpleNamespace(host="10.0.0.9"))
+
+    assert main._get_client_ip(request("1.2.3.4, 203.0.113.7")) == "203.0.113.7"  # spoofed left part ignored
+    assert main._get_client_ip(request("203.0.113.7")) == "203.0.113.7"
+    assert main._get_client_ip(request()) == "10.0.0.9"
+    monkeypatch.setattr(main, "TRUSTED_PROXY_HOPS", 2)  # e.g. a CDN in front of Render
+    assert main._get_client_ip(request("1.2.3.4, 198.51.100.1, 203.0.113.7")) == "198.51.100.1"
+    assert main._get_client_ip(request("203.0.113.7")) == "10.0.0.9"
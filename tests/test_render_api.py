@@ -0,0 +1,117 @@
+"""Local cache, reused client and circuit breaker for the Render API calls
+(idea_reality_mcp.scoring.render_api)."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from idea_reality_mcp.scoring import render_api
+from idea_reality_mcp.scoring.expansion import expand_idea
+from idea_reality_mcp.scoring.llm import extract_keywords_llm
+
+_EXPANSION = {
+    "expanded_description": "A CLI that tracks LLM API spend",
+    "core_concept": "LLM cost tracker",
+    "differentiator": "per-request costs",
+    "target_user": "AI developers",
+    "category": "developer tools",
+}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Mock Render API; `api.calls` lists request paths, `api.status` sets the reply."""
+
+    class Api:
+        calls: list[str] = []
+        status = 200
+        clients = 0
+
+    def handler(request):
+        Api.calls.append(request.url.path)
+        if Api.status != 200:
+            return httpx.Response(Api.status)
+        if request.url.path == "/api/expand-idea":
+            return httpx.Response(200, json=_EXPANSION)
+        return httpx.Response(200, json={"keywords": ["llm cost", "token usage"]})
+
+    def transport(_source):
+        Api.clients += 1
+        return httpx.MockTransport(handler)
+
+    monkeypatch.setattr(render_api, "upstream_transport", transport)
+    return Api
+
+
+async def test_repeat_calls_are_served_from_the_local_cache(api):
+    assert await expand_idea("LLM cost tracker") == _EXPANSION
+    assert await expand_idea("  llm COST tracker ") == _EXPANSION
+    assert await extract_keywords_llm("LLM cost tracker") == ["llm cost", "token usage"]
+    assert await extract_keywords_llm("LLM cost tracker") == ["llm cost", "token usage"]
+    assert api.calls == ["/api/expand-idea", "/api/extract-keywords"]
+    assert (render_api.CACHE_DIR / "cache.db").exists()
+
+
+async def test_failures_are_not_cached_and_ttl_expires(api, monkeypatch):
+    api.status = 500
+    assert await expand_idea("habit tracker") is None
+    api.status = 200
+    assert await expand_idea("habit tracker") == _EXPANSION
+    assert len(api.calls) == 2
+
+    monkeypatch.setattr(render_api, "CACHE_TTL", 0)
+    await expand_idea("habit tracker")
+    assert len(api.calls) == 3
+
+
+async def test_client_is_reused_across_calls(api):
+    await expand_idea("idea one")
+    await expand_idea("idea two")
+    assert api.clients == 1 and len(api.calls) == 2
+
+
+async def test_breaker_stops_calling_a_failing_api(api, monkeypatch):
+    api.status = 503
+    for i in range(render_api.FAILURE_THRESHOLD):
+        assert await expand_idea(f"idea {i}") is None
+    assert len(api.calls) == render_api.FAILURE_THRESHOLD
+
+    assert await expand_idea("another idea") is None  # fails fast
+    assert len(api.calls) == render_api.FAILURE_THRESHOLD
+    assert render_api.breaker("expand_idea").retry_in() > 0
+    assert await extract_keywords_llm("another idea") is None  # separate breaker: still called
+    assert api.calls[-1] == "/api/extract-keywords"
+
+    b = render_api.breaker("expand_idea")
+    monkeypatch.setattr(b, "_opened_at", b._opened_at - render_api.COOLDOWN_S)
+    api.status = 200
+    assert await expand_idea("another idea") == _EXPANSION  # half-open trial succeeds
+    assert b.state == "closed"
+
+
+async def test_client_errors_do_not_trip_the_breaker(api):
+    api.status = 422
+    for i in range(render_api.FAILURE_THRESHOLD + 1):
+        assert await expand_idea(f"idea {i}") is None
+    assert render_api.breaker("expand_idea").state == "closed"
+
+
+async def test_unwritable_cache_dir_fails_open(api, monkeypatch, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setattr(render_api, "CACHE_DIR", blocker / "sub")
+    assert await expand_idea("habit tracker") == _EXPANSION
+    assert await expand_idea("habit tracker") == _EXPANSION
+    assert len(api.calls) == 2
+
+
+async def test_corrupt_cache_row_is_a_miss(api):
+    assert await expand_idea("habit tracker") == _EXPANSION
+    conn = render_api._db()
+    with conn:
+        conn.execute("UPDATE api_cache SET value = ?", ('{"core_concept": "trunc',))
+    conn.close()
+
+    assert await expand_idea("habit tracker") == _EXPANSION  # re-fetched, not raised
+    assert len(api.calls) == 2
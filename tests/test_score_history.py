@@ -111,6 +111,287 @@ def test_save_score_returns_incrementing_ids():
     assert ids[0] < ids[1] < ids[2]
 
 
+# ---------------------------------------------------------------------------
+# Keyword index (FTS5)
+# ---------------------------------------------------------------------------
+
+
+def _save(idea, score=50):
+    return score_db.save_score(idea_text=idea, score=score, breakdown="{}", keywords="[]")
+
+
+def test_keyword_search_ranks_by_bm25(monkeypatch):
+    def _no_scan(*a, **k):
+        raise AssertionError("LIKE scan used although the index is complete")
+
+    monkeypatch.setattr(score_db, "_search_similar_ideas_like", _no_scan)
+    _save("invoice generator for freelancers")
+    _save("bill splitting app for roommates")
+    _save("roommate chore tracker")
+
+    res = score_db.search_similar_ideas(["bill", "splitting", "roommates"])
+    texts = [r["idea_text"] for r in res]
+    assert texts[0] == "bill splitting app for roommates"  # matches every term
+    assert "roommate chore tracker" in texts
+    assert "invoice generator for freelancers" not in texts
+
+
+def test_keyword_search_matches_prefixes_and_excludes_hash():
+    _save("bills splitter")
+    _save("billing dashboard")
+
+    texts = {r["idea_text"] for r in score_db.search_similar_ideas(["bill"])}
+    assert texts == {"bills splitter", "billing dashboard"}
+
+    res = score_db.search_similar_ideas(
+        ["bill"], exclude_hash=score_db.idea_hash("bills splitter")
+    )
+    assert [r["idea_text"] for r in res] == ["billing dashboard"]
+
+
+def test_keyword_search_ignores_fts_syntax_in_input():
+    _save("notes app")
+    assert score_db.search_similar_ideas(['"notes', "app*)", "NEAR("]) != []
+
+
+def test_keyword_index_backfills_preexisting_rows(tmp_path, monkeypatch):
+    """Rows written before the index existed are indexed by init_db's backfill."""
+    import sqlite3
+
+    db_path = str(tmp_path / "pre_fts.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE score_history (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "idea_hash TEXT, idea_text TEXT, score INT, breakdown TEXT, keywords TEXT, "
+        "depth TEXT, lang TEXT, keyword_source TEXT, created_at TEXT)"
+    )
+    for i in range(5):
+        conn.execute(
+            "INSERT INTO score_history (idea_hash, idea_text, score) VALUES (?, ?, 50)",
+            (f"h{i}", f"legacy podcast idea {i}"),
+        )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(score_db, "DB_PATH", db_path)
+
+    score_db.init_db()
+    _save("new podcast idea")
+
+    state = sqlite3.connect(db_path).execute(
+        "SELECT backfilled_to, cutoff FROM search_index_state"
+    ).fetchone()
+    assert state == (5, 5)
+    assert len(score_db.search_similar_ideas(["podcast"])) == 6
+    # Re-running init is a no-op: nothing is indexed twice
+    score_db.init_db()
+    assert len(score_db.search_similar_ideas(["podcast"])) == 6
+
+
+def test_keyword_search_uses_like_until_backfill_completes(monkeypatch):
+    _save("weather widget")
+    # Simulate a large Turso corpus where the chunked backfill hasn't finished yet
+    import sqlite3
+
+    conn = sqlite3.connect(score_db.DB_PATH)
+    conn.execute("UPDATE search_index_state SET backfilled_to = 0, cutoff = 100")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(score_db, "_index_ready", {})
+
+    assert score_db.backfill_keyword_index(batch=10, max_batches=0) == 1
+    assert [r["idea_text"] for r in score_db.search_similar_ideas(["weather"])] == ["weather widget"]
+
+
+def test_keyword_search_finds_cjk_terms_anywhere_in_the_idea():
+    _save("記帳應用程式給家庭")  # unspaced: one unicode61 token
+    _save("家庭記帳應用程式")
+    texts = {r["idea_text"] for r in score_db.search_similar_ideas(["記帳應用"])}
+    assert texts == {"記帳應用程式給家庭", "家庭記帳應用程式"}
+
+
+def test_triggers_and_cutoff_are_registered_atomically():
+    import sqlite3
+
+    conn = score_db._get_conn()
+    with pytest.raises(sqlite3.OperationalError):
+        score_db._register_derived_index(conn, "broken", (
+            "CREATE TRIGGER IF NOT EXISTS broken_ai AFTER INSERT ON score_history BEGIN SELECT 1; END",
+            "CREATE TRIGGER not valid sql",
+        ))
+    assert conn.execute("SELECT 1 FROM search_index_state WHERE name = 'broken'").fetchone() is None
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'broken_ai'").fetchone() is None
+    conn.close()
+
+
+# ---------------------------------------------------------------------------
+# keyword_counts aggregate
+# ---------------------------------------------------------------------------
+
+
+def _save_kw(keywords):
+    return score_db.save_score(
+        idea_text="idea", score=50, breakdown="{}", keywords=json.dumps(keywords)
+    )
+
+
+def test_keyword_counts_maintained_on_save(monkeypatch):
+    def _no_scan(*a, **k):
+        raise AssertionError("full scan used although keyword_counts is complete")
+
+    monkeypatch.setattr(score_db, "_keyword_frequencies_scan", _no_scan)
+    _save_kw(["DNS", "monitoring"])
+    _save_kw([" dns ", "uptime", "dns"])
+    _save_kw(["", 3, None])
+
+    assert score_db.get_top_keywords(limit=2) == [
+        {"keyword": "dns", "count": 3},
+        {"keyword": "monitoring", "count": 1},
+    ]
+    assert score_db.get_category_distribution(limit=5) == score_db.get_top_keywords(limit=5)
+
+
+def test_keyword_counts_follow_deletes():
+    import sqlite3
+
+    _save_kw(["DNS", "monitoring"])
+    gone = _save_kw([" dns ", "uptime", "dns"])
+    score_db.save_score("idea", 50, "{}", "not json")
+
+    conn = sqlite3.connect(score_db.DB_PATH)
+    conn.execute("DELETE FROM score_history WHERE id = ? OR keywords = 'not json'", (gone,))
+    conn.commit()
+    conn.close()
+
+    assert score_db.get_top_keywords(limit=5) == score_db._keyword_frequencies_scan(5) == [
+        {"keyword": "dns", "count": 1},
+        {"keyword": "monitoring", "count": 1},
+    ]
+
+
+def test_keyword_counts_ignore_malformed_json():
+    score_db.save_score("idea", 50, "{}", "not json")
+    score_db.save_score("idea", 50, "{}", json.dumps({"a": 1}))
+    assert score_db.get_top_keywords() == []
+
+
+def test_keyword_counts_backfill_matches_full_scan(tmp_path, monkeypatch):
+    import sqlite3
+
+    db_path = str(tmp_path / "pre_counts.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE score_history (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "idea_hash TEXT, idea_text TEXT, score INT, breakdown TEXT, keywords TEXT, "
+        "depth TEXT, lang TEXT, keyword_source TEXT, created_at TEXT)"
+    )
+    for kws in (["saas", "crm"], ["crm"], ["Invoice", "crm"]):
+        conn.execute(
+            "INSERT INTO score_history (idea_hash, idea_text, score, keywords) "
+            "VALUES ('h', 'x', 50, ?)",
+            (json.dumps(kws),),
+        )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(score_db, "DB_PATH", db_path)
+
+    score_db.init_db()
+    _save_kw(["crm"])
+
+    expected = score_db._keyword_frequencies_scan(10)
+    assert expected[0] == {"keyword": "crm", "count": 4}
+    assert score_db.get_top_keywords(limit=10) == expected
+    score_db.init_db()  # idempotent: pre-existing rows are not counted twice
+    assert score_db.get_top_keywords(limit=10) == expected
+
+
+def test_keyword_counts_scan_until_backfill_completes(monkeypatch):
+    _save_kw(["voice"])
+    import sqlite3
+
+    conn = sqlite3.connect(score_db.DB_PATH)
+    conn.execute(
+        "UPDATE search_index_state SET backfilled_to = 0, cutoff = 100 WHERE name = 'keyword_counts'"
+    )
+    conn.execute("DELETE FROM keyword_counts")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(score_db, "_index_ready", {})
+
+    assert score_db.get_top_keywords() == [{"keyword": "voice", "count": 1}]
+
+
+# ---------------------------------------------------------------------------
+# Score percentile histogram
+# ---------------------------------------------------------------------------
+
+
+def _count_percentile(score):
+    """Reference implementation: the original two COUNT(*) queries."""
+    import sqlite3
+
+    conn = sqlite3.connect(score_db.DB_PATH)
+    total = conn.execute("SELECT COUNT(*) FROM score_history").fetchone()[0]
+    lte = conn.execute("SELECT COUNT(*) FROM score_history WHERE score <= ?", (score,)).fetchone()[0]
+    conn.close()
+    return round(lte / total * 100, 1) if total else 0.0
+
+
+def test_percentile_empty_db():
+    assert score_db.get_score_percentile(50) == 0.0
+
+
+def test_percentile_matches_count_queries():
+    for sc in (10, 20, 20, 55, 70, 100, 0):
+        _save(f"idea {sc}", score=sc)
+    for q in (-5, 0, 10, 19, 20, 54, 55, 99, 100, 150):
+        assert score_db.get_score_percentile(q) == _count_percentile(q), q
+
+
+def test_percentile_served_from_memory_and_sees_own_writes(monkeypatch):
+    _save("a", score=40)
+    assert score_db.get_score_percentile(40) == 100.0  # loads the histogram
+
+    def _no_db():
+        raise AssertionError("percentile lookup hit the DB")
+
+    with monkeypatch.context() as m:
+        m.setattr(score_db, "_get_conn", _no_db)
+        assert score_db.get_score_percentile(39) == 0.0
+
+    _save("b", score=80)  # applied to the in-memory prefix sums immediately
+    with monkeypatch.context() as m:
+        m.setattr(score_db, "_get_conn", _no_db)
+        assert score_db.get_score_percentile(40) == 50.0
+
+
+def test_failed_histogram_write_leaves_memory_unchanged(monkeypatch):
+    _save("a", score=40)
+    assert score_db.get_score_percentile(40) == 100.0  # loads the histogram
+
+    def _fail(*a, **k):
+        raise RuntimeError("aggregate write failed")
+
+    monkeypatch.setattr(score_db, "_bump_score_histogram", _fail)
+    _save("b", score=80)
+    assert score_db._score_hist["prefix"][100] == 1  # matches the DB aggregate
+
+
+def test_percentile_reload_picks_up_external_writes():
+    import sqlite3
+
+    _save("a", score=30)
+    assert score_db.get_score_percentile(30) == 100.0
+    conn = sqlite3.connect(score_db.DB_PATH)  # another instance's write
+    conn.execute("UPDATE score_histogram SET count = count + 1 WHERE score = 30")
+    conn.execute("INSERT INTO score_histogram (score, count) VALUES (90, 2)")
+    conn.commit()
+    conn.close()
+
+    assert score_db.get_score_percentile(30) == 100.0  # still cached
+    score_db.invalidate_score_histogram()
+    assert score_db.get_score_percentile(30) == 50.0
+
+
 # ---------------------------------------------------------------------------
 # Semantic embeddings (P1)
 # ---------------------------------------------------------------------------
@@ -150,6 +431,7 @@ def test_embedding_column_added_to_legacy_table(tmp_path, monkeypatch):
     score_db.init_db()
     cols = {r[1] for r in sqlite3.connect(db_path).execute("PRAGMA table_info(score_history)").fetchall()}
     assert "embedding" in cols
+    assert {"embedding_model", "embedding_dim"} <= cols
 
 
 def test_semantic_search_ranks_paraphrase_first():
@@ -179,3 +461,65 @@ def test_semantic_search_empty_corpus_and_zero_vector():
     assert score_db.search_similar_by_embedding(_unit(1)) == []  # nothing embedded yet
     score_db.save_score("something", 50, "{}", "[]", embedding=pack_embedding(_unit(3)))
     assert score_db.search_similar_by_embedding([0.0] * 1536) == []  # zero query -> []
+
+
+# ---------------------------------------------------------------------------
+# Mixed corpora — rows from several embedding models
+# ---------------------------------------------------------------------------
+
+
+def _unit_dim(seed, dim):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(dim).astype(np.float32)
+    return (x / np.linalg.norm(x)).tolist()
+
+
+def test_save_score_tags_model_and_dim():
+    import sqlite3
+
+    score_db.save_score("legacy vector", 50, "{}", "[]", embedding=pack_embedding(_unit(1)))
+    score_db.save_score(
+        "local vector", 50, "{}", "[]",
+        embedding=pack_embedding(_unit_dim(1, 384)), embedding_model="local-ngram-v1",
+    )
+    score_db.save_score("no vector", 50, "{}", "[]")
+    rows = sqlite3.connect(score_db.DB_PATH).execute(
+        "SELECT idea_text, embedding_model, embedding_dim FROM score_history ORDER BY id"
+    ).fetchall()
+    assert rows == [
+        ("legacy vector", "text-embedding-3-small", 1536),
+        ("local vector", "local-ngram-v1", 384),
+        ("no vector", None, None),
+    ]
+
+
+def test_semantic_search_only_compares_same_model_and_dim():
+    q384 = _unit_dim(5, 384)
+    score_db.save_score("openai row", 60, "{}", "[]", embedding=pack_embedding(_unit(5)))
+    score_db.save_score(
+        "local row", 60, "{}", "[]", embedding=pack_embedding(q384), embedding_model="local-ngram-v1"
+    )
+    score_db.save_score(
+        "other 384-d model", 60, "{}", "[]",
+        embedding=pack_embedding(q384), embedding_model="some-other-384",
+    )
+
+    res = score_db.search_similar_by_embedding(q384, model="local-ngram-v1")
+    assert [r["idea_text"] for r in res] == ["local row"]
+    # Without a model only the dimension guards the comparison
+    res = score_db.search_similar_by_embedding(q384)
+    assert {r["idea_text"] for r in res} == {"local row", "other 384-d model"}
+    # The 1536-d query still finds the legacy (untagged == text-embedding-3-small) row
+    res = score_db.search_similar_by_embedding(_unit(5), model="text-embedding-3-small")
+    assert [r["idea_text"] for r in res] == ["openai row"]
+
+
+def test_switching_model_marks_rows_for_reembedding():
+    rid = score_db.save_score("old vector", 60, "{}", "[]", embedding=pack_embedding(_unit(2)))
+    assert rid not in [r["id"] for r in score_db.rows_missing_embedding()]
+    assert rid not in [r["id"] for r in score_db.rows_missing_embedding(model="text-embedding-3-small")]
+    assert rid in [r["id"] for r in score_db.rows_missing_embedding(model="local-ngram-v1")]
+    assert score_db.count_missing_embedding(model="local-ngram-v1") == 1
+
+    score_db.set_embedding(rid, pack_embedding(_unit_dim(2, 384)), model="local-ngram-v1")
+    assert score_db.count_missing_embedding(model="local-ngram-v1") == 0
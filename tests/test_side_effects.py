@@ -0,0 +1,229 @@
+"""Tests for the fire-and-forget side-effect dispatcher (api/side_effects.py) and its
+wiring in main.py (Discord batching, funnel events)."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+import db as score_db  # noqa: E402
+from side_effects import SideEffectDispatcher  # noqa: E402
+
+
+class _Recorder:
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.batches: list[list] = []
+        self.fail = fail
+        self.delay = delay
+
+    async def __call__(self, payloads):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.batches.append(list(payloads))
+        if self.fail:
+            raise RuntimeError("webhook down")
+
+
+# ---------------------------------------------------------------------------
+# SideEffectDispatcher
+# ---------------------------------------------------------------------------
+
+
+async def test_submit_does_not_wait_and_drain_flushes():
+    rec = _Recorder(delay=0.01)
+    d = SideEffectDispatcher(workers=1)
+    d.register("x", rec)
+    assert d.submit("x", 1) is True
+    assert rec.batches == []  # nothing ran yet: submit never awaits the handler
+    await d.drain(timeout=1)
+    assert rec.batches == [[1]]
+    assert d.processed["x"] == 1
+
+
+async def test_queued_items_are_batched_per_kind():
+    a, b = _Recorder(), _Recorder()
+    d = SideEffectDispatcher(workers=1, batch_max=50)
+    d.register("a", a)
+    d.register("b", b)
+    for i in range(5):
+        d.submit("a", i)
+        d.submit("b", -i)
+    await d.drain(timeout=1)
+    assert a.batches == [[0, 1, 2, 3, 4]]
+    assert b.batches == [[0, -1, -2, -3, -4]]
+    assert d.batches == 2
+
+
+async def test_batch_max_caps_batch_size():
+    rec = _Recorder()
+    d = SideEffectDispatcher(workers=1, batch_max=3)
+    d.register("x", rec)
+    for i in range(7):
+        d.submit("x", i)
+    await d.drain(timeout=1)
+    assert [len(b) for b in rec.batches] == [3, 3, 1]
+
+
+async def test_overload_drops_and_counts():
+    rec = _Recorder(delay=0.05)
+    d = SideEffectDispatcher(maxsize=3, workers=1)
+    d.register("x", rec)
+    results = [d.submit("x", i) for i in range(10)]
+    assert results.count(True) == 3
+    assert d.dropped["x"] == 7
+    await d.drain(timeout=1)
+    assert d.processed["x"] == 3
+
+
+async def test_lossless_kinds_wait_for_space_instead_of_dropping():
+    rec = _Recorder(delay=0.01)
+    d = SideEffectDispatcher(maxsize=3, workers=1)
+    d.register("x", rec, lossless=True)
+    assert all(d.submit("x", i) for i in range(10))
+    assert d.dropped["x"] == 0
+    await d.drain(timeout=1)
+    assert sorted(p for b in rec.batches for p in b) == list(range(10))
+
+
+async def test_slow_lane_does_not_hold_up_other_kinds():
+    slow, fast = _Recorder(delay=0.5), _Recorder()
+    d = SideEffectDispatcher(workers=1)
+    d.register("slow", slow, lane="slow")
+    d.register("fast", fast)
+    d.submit("slow", 1)
+    d.submit("fast", 2)
+    await asyncio.sleep(0.05)
+    assert fast.batches == [[2]] and slow.batches == []
+    await d.drain(timeout=1)
+    assert slow.batches == [[1]]
+
+
+async def test_handler_failure_is_isolated():
+    bad, good = _Recorder(fail=True), _Recorder()
+    d = SideEffectDispatcher(workers=1)
+    d.register("bad", bad)
+    d.register("good", good)
+    d.submit("bad", 1)
+    d.submit("good", 2)
+    await d.drain(timeout=1)
+    assert d.failed["bad"] == 1
+    assert good.batches == [[2]]
+
+
+async def test_submit_after_drain_is_dropped():
+    d = SideEffectDispatcher()
+    d.register("x", _Recorder())
+    d.start()
+    await d.drain(timeout=1)
+    assert d.submit("x", 1) is False
+    assert d.dropped["x"] == 1
+
+
+async def test_drain_timeout_cancels_workers():
+    d = SideEffectDispatcher(workers=1)
+    d.register("x", _Recorder(delay=10))
+    d.submit("x", 1)
+    await asyncio.sleep(0)
+    await asyncio.wait_for(d.drain(timeout=0.05), 1)
+    assert d.processed["x"] == 0
+
+
+def test_unknown_kind_raises():
+    d = SideEffectDispatcher()
+    with pytest.raises(KeyError):
+        d.submit("nope", 1)
+
+
+# ---------------------------------------------------------------------------
+# main.py wiring
+# ---------------------------------------------------------------------------
+
+fastapi = pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(score_db, "DB_PATH", str(tmp_path / "test_effects.db"))
+    score_db.init_db()
+    from api import main  # noqa: E402
+
+    return main
+
+
+def _fake_discord(api, monkeypatch, statuses=()):
+    """Replace httpx.AsyncClient in main.py; returns the posted payloads. Responses use
+    `statuses` in order, then 204."""
+    posts = []
+    pending = list(statuses)
+
+    class _FakeClient:
+        def __init__(self, *a, **kw):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def post(self, url, json):
+            posts.append(json)
+            status = pending.pop(0) if pending else 204
+            return api.httpx.Response(status, headers={"Retry-After": "0"}, text="")
+
+    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.test/hook")
+    monkeypatch.setattr(api.httpx, "AsyncClient", _FakeClient)
+    return posts
+
+
+async def test_discord_embeds_chunked_to_ten_per_message(api, monkeypatch):
+    posts = _fake_discord(api, monkeypatch)
+    await api._send_discord_embeds([{"title": str(i)} for i in range(23)])
+    assert [len(p["embeds"]) for p in posts] == [10, 10, 3]
+
+
+async def test_discord_batches_respect_the_total_character_limit(api, monkeypatch):
+    posts = _fake_discord(api, monkeypatch)
+    long = [{"title": "t", "fields": [{"name": "Idea", "value": "x" * 2500}]} for _ in range(5)]
+    await api._send_discord_embeds(long)
+    assert [len(p["embeds"]) for p in posts] == [2, 2, 1]
+    assert all(sum(api._embed_chars(e) for e in p["embeds"]) <= api.DISCORD_MAX_CHARS for p in posts)
+
+
+async def test_discord_429_is_retried_once_and_4xx_logged(api, monkeypatch, caplog):
+    posts = _fake_discord(api, monkeypatch, statuses=[429, 204, 400])
+    await api._send_discord_embeds([{"title": str(i)} for i in range(11)])
+    assert [len(p["embeds"]) for p in posts] == [10, 10, 1]  # first batch retried, second rejected
+    assert "status 400" in caplog.text
+
+
+def test_claim_notification_is_sent_before_responding(api, monkeypatch, caplog):
+    posts = _fake_discord(api, monkeypatch, statuses=[500])
+    with TestClient(api.app) as client:
+        resp = client.post("/api/claim-report", json={"email": "a@b.test", "idea_hash": "h" * 32})
+        assert resp.json()["ok"] is True
+        assert posts and posts[0]["embeds"][0]["title"] == "💰 PAID REPORT CLAIM"  # not queued
+    assert any(r.levelname == "ERROR" and "[CLAIM]" in r.message for r in caplog.records)
+
+
+def test_funnel_events_written_in_background(api):
+    sid = "s" * 24
+    with TestClient(api.app) as client:  # lifespan: starts workers, drains on exit
+        resp = client.post("/api/event", json={
+            "session_id": sid,
+            "events": [{"event_name": "page_load"}, {"event_name": "scan_start"}],
+        })
+        assert resp.json() == {"ok": True}
+    stats = score_db.get_funnel_stats(1)
+    assert stats["unique_sessions"] == 1
@@ -0,0 +1,51 @@
+"""Start-up cost of the MCP server: the pipeline is loaded lazily on the first tool
+call, and `idea-reality doctor --startup` measures the import budget."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from unittest.mock import AsyncMock, patch
+
+from idea_reality_mcp import tools
+from idea_reality_mcp.onboarding import doctor
+
+
+def test_server_import_defers_pipeline_modules():
+    code = (
+        "import json, sys, idea_reality_mcp.server; "
+        "print(json.dumps(sorted(m for m in sys.modules if m.startswith('idea_reality_mcp'))))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    loaded = json.loads(out)
+    assert "idea_reality_mcp.server" in loaded
+    assert not [m for m in loaded if m.startswith(("idea_reality_mcp.sources", "idea_reality_mcp.scoring"))]
+
+
+def test_lazy_names_resolve_and_respect_patches():
+    from idea_reality_mcp.scoring.engine import compute_signal
+
+    assert tools.compute_signal is compute_signal
+    sentinel = AsyncMock()
+    with patch("idea_reality_mcp.tools.search_hn", sentinel):
+        tools._load()  # must not overwrite the patch
+        assert tools.search_hn is sentinel
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       311 |        311 |   idea_reality_mcp\n"
+        "First time? Run: idea-reality setup\n"
+        "import time:      2640 |    1157146 | idea_reality_mcp.server\n"
+    )
+    assert doctor._parse_importtime(stderr) == [("idea_reality_mcp", 0.311), ("idea_reality_mcp.server", 2.64)]
+
+
+def test_measure_startup_groups_by_package():
+    startup = doctor.measure_startup()
+    assert "fastmcp" in startup["packages"]
+    assert "idea_reality_mcp.server" in startup["own"]
+    assert "idea_reality_mcp.scoring.engine" not in startup["own"]
+    assert startup["total_ms"] >= sum(startup["own"].values())
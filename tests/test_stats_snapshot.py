@@ -0,0 +1,175 @@
+"""Tests for the background stats snapshots (api/stats_snapshot.py) and the endpoints
+served from them."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+import db as score_db  # noqa: E402
+from stats_snapshot import StatsSnapshotter  # noqa: E402
+
+
+class _Counter:
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("db down")
+        return {"n": self.calls}
+
+
+# ---------------------------------------------------------------------------
+# StatsSnapshotter
+# ---------------------------------------------------------------------------
+
+
+async def test_get_serves_from_memory_within_staleness_bound():
+    compute = _Counter()
+    snaps = StatsSnapshotter(interval=60, max_staleness=300)
+    snaps.register("x", compute)
+
+    first = await snaps.get("x")
+    second = await snaps.get("x")
+    assert first is second
+    assert compute.calls == 1
+    assert first.etag.startswith('"')
+
+
+async def test_stale_snapshot_is_recomputed_single_flight():
+    compute = _Counter()
+    snaps = StatsSnapshotter(interval=0, max_staleness=0.05)
+    snaps.register("x", compute)
+    await snaps.get("x")
+
+    await asyncio.sleep(0.06)  # now older than the staleness bound
+    results = await asyncio.gather(*(snaps.get("x") for _ in range(5)))
+    assert compute.calls == 2
+    assert all(r.data == {"n": 2} for r in results)
+
+
+async def test_etag_tracks_content():
+    values = iter([{"a": 1}, {"a": 1}, {"a": 2}])
+    snaps = StatsSnapshotter()
+    snaps.register("x", lambda: next(values))
+    e1 = (await snaps.refresh("x")).etag
+    e2 = (await snaps.refresh("x")).etag
+    e3 = (await snaps.refresh("x")).etag
+    assert e1 == e2 != e3
+
+
+async def test_failed_refresh_keeps_previous_snapshot():
+    compute = _Counter()
+    snaps = StatsSnapshotter()
+    snaps.register("x", compute)
+    good = await snaps.get("x")
+
+    compute.fail = True
+    assert await snaps.refresh("x") is good
+    assert snaps.failures == 1
+
+
+async def test_never_computed_raises():
+    snaps = StatsSnapshotter()
+    snaps.register("x", _Counter(fail=True))
+    with pytest.raises(RuntimeError):
+        await snaps.get("x")
+
+
+async def test_background_loop_refreshes_and_stops():
+    compute = _Counter()
+    snaps = StatsSnapshotter(interval=0.01, max_staleness=60)
+    snaps.register("x", compute)
+    await snaps.get("x")
+    snaps.start()
+    await asyncio.sleep(0.05)
+    await snaps.stop()
+    calls = compute.calls
+    assert calls >= 2
+    await asyncio.sleep(0.03)
+    assert compute.calls == calls
+
+
+async def test_background_loop_skips_snapshots_nobody_reads():
+    read, unread = _Counter(), _Counter()
+    snaps = StatsSnapshotter(interval=0.01, max_staleness=0.2)
+    snaps.register("read", read)
+    snaps.register("unread", unread)
+    await snaps.get("read")
+    snaps.start()
+    await asyncio.sleep(0.1)
+    assert read.calls >= 2 and unread.calls == 0
+    await asyncio.sleep(0.25)  # "read" has not been read within max_staleness either
+    calls = read.calls
+    await asyncio.sleep(0.05)
+    await snaps.stop()
+    assert read.calls == calls
+
+    assert (await snaps.get("unread")).data == {"n": 1}  # built on demand
+
+
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
+
+fastapi = pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(score_db, "DB_PATH", str(tmp_path / "test_stats.db"))
+    score_db.init_db()
+    from api import main  # noqa: E402
+
+    main.stats_snapshots.invalidate()
+    yield main
+    main.stats_snapshots.invalidate()
+
+
+def test_stats_endpoint_uses_snapshot_and_etag(api, monkeypatch):
+    score_db.save_score("idea", 50, "{}", "[]")
+    client = TestClient(api.app)
+
+    resp = client.get("/api/stats")
+    assert resp.status_code == 200
+    assert resp.json()["total_ideas_scanned"] == 1
+    etag = resp.headers["etag"]
+
+    # Served from memory: new rows don't appear until the next refresh
+    score_db.save_score("idea 2", 50, "{}", "[]")
+    calls = []
+    monkeypatch.setattr(score_db, "get_total_checks", lambda: calls.append(1) or 99)
+    assert client.get("/api/stats").json()["total_ideas_scanned"] == 1
+    assert calls == []
+
+    assert client.get("/api/stats", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_pulse_and_social_proof_share_snapshots(api, monkeypatch):
+    score_db.save_score("idea", 50, "{}", '["crm"]')
+    client = TestClient(api.app)
+
+    async def _stars():
+        return 1
+
+    monkeypatch.setattr(api, "_get_github_stars", _stars)
+    pulse = client.get("/api/pulse").json()
+    assert pulse["total_ideas"] == 1
+    assert pulse["top_keywords"] == [{"keyword": "crm", "count": 1}]
+    proof = client.get("/api/social-proof").json()
+    assert proof["total_checks"] == 1
+    assert proof["last_check_ago"].endswith("ago")
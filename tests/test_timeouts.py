@@ -0,0 +1,101 @@
+"""Adaptive per-source upstream timeouts (idea_reality_mcp.timeouts)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from idea_reality_mcp import timeouts
+from idea_reality_mcp.upstream import EnvProxyTransport
+from idea_reality_mcp.upstream import transport as upstream_transport
+
+
+def _seen_timeouts():
+    seen: list[dict] = []
+
+    def handler(request):
+        seen.append(dict(request.extensions["timeout"]))
+        return httpx.Response(200)
+
+    return seen, handler
+
+
+async def _get(source, handler, n=1, timeout=15.0):
+    t = timeouts.AdaptiveTimeoutTransport(source, httpx.MockTransport(handler))
+    async with httpx.AsyncClient(timeout=timeout, transport=t) as client:
+        for _ in range(n):
+            await client.get("https://up.test/x")
+
+
+def _fill(source, seconds, n=timeouts.MIN_SAMPLES):
+    for _ in range(n):
+        timeouts.window(source).add(seconds)
+
+
+async def test_configured_timeout_until_enough_samples_then_adaptive():
+    seen, handler = _seen_timeouts()
+    await _get("hn", handler)
+    assert seen[-1]["read"] == 15.0
+    assert seen[-1]["connect"] == timeouts.CONNECT_S  # separate, shorter connect cap
+    assert seen[-1]["write"] == 15.0
+
+    _fill("hn", 0.1)
+    await _get("hn", handler)
+    assert seen[-1]["read"] == timeouts.MIN_READ_S  # 0.3s would be too tight: floored
+
+    _fill("npm", 1.5)
+    assert timeouts.read_timeout("npm", 15.0) == pytest.approx(1.5 * timeouts.FACTOR)
+    _fill("so", 8.0)
+    assert timeouts.read_timeout("so", 15.0) == 15.0  # never above the adapter's value
+
+
+def test_p99_ignores_rare_outliers_but_tracks_the_tail():
+    w = timeouts.window("github")
+    for i in range(200):
+        w.add(5.0 if i == 0 else 0.2)  # one straggler in 200
+    assert w.p99() == 0.2
+    for _ in range(10):
+        w.add(5.0)  # now 5% of the window
+    assert w.p99() == 5.0
+
+
+async def test_read_timeouts_raise_the_timeout_of_a_slowing_source():
+    _fill("pypi", 0.1, n=50)
+    before = timeouts.read_timeout("pypi", 10.0)
+
+    def slow(request):
+        raise httpx.ReadTimeout("slow", request=request)
+
+    for _ in range(5):
+        with pytest.raises(httpx.ReadTimeout):
+            await _get("pypi", slow)
+    assert timeouts.read_timeout("pypi", 10.0) > before
+
+
+async def test_override_applies_to_listed_sources_and_nested_tasks():
+    seen, handler = _seen_timeouts()
+    _fill("github", 0.1)
+    with timeouts.override(read=20.0, connect=0.5, sources={"github"}):
+        await asyncio.create_task(_get("github", handler))
+        await _get("hn", handler)
+    await _get("github", handler)
+    assert (seen[0]["read"], seen[0]["connect"]) == (20.0, 0.5)  # wins over the ceiling
+    assert (seen[1]["read"], seen[1]["connect"]) == (15.0, timeouts.CONNECT_S)
+    assert seen[2]["read"] == timeouts.MIN_READ_S
+
+
+async def test_llm_sources_keep_the_configured_read_timeout():
+    seen, handler = _seen_timeouts()
+    _fill("anthropic", 1.0, n=100)  # mostly fast Haiku calls
+    await _get("anthropic", handler, timeout=30.0)
+    assert seen[-1]["read"] == 30.0  # a long Sonnet generation must not time out at ~3s
+    assert seen[-1]["connect"] == timeouts.CONNECT_S
+
+
+def test_upstream_stack_includes_adaptive_timeouts():
+    t = upstream_transport("hn")
+    while not isinstance(t, timeouts.AdaptiveTimeoutTransport):
+        t = t.inner
+    assert t.source == "hn" and isinstance(t.inner, EnvProxyTransport)
@@ -0,0 +1,144 @@
+"""Tests for per-stage latency spans (idea_reality_mcp.timing) in the check pipelines."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from idea_reality_mcp import timing
+
+
+@pytest.fixture(autouse=True)
+def _fresh_histograms():
+    timing.reset()
+    yield
+    timing.reset()
+
+
+# ---------------------------------------------------------------------------
+# Spans, traces, histograms
+# ---------------------------------------------------------------------------
+
+
+def test_span_records_into_trace_and_histogram():
+    trace = timing.start_trace(enabled=True)
+    with timing.span("a"):
+        pass
+    with timing.span("a"):
+        pass
+    meta = trace.as_meta()
+    assert set(meta) == {"a", "total_ms"}
+    assert timing.histograms()["a"].count == 2
+
+
+def test_span_records_on_exception():
+    timing.start_trace(enabled=False)
+    with pytest.raises(ValueError):
+        with timing.span("boom"):
+            raise ValueError
+    assert timing.histograms()["boom"].count == 1
+
+
+async def test_timed_inside_gather_lands_on_callers_trace():
+    async def work(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    async def one_check(delay):
+        trace = timing.start_trace(enabled=True)
+        await asyncio.gather(timing.timed("src", work(delay)), timing.timed("other", work(0)))
+        return trace
+
+    fast, slow = await asyncio.gather(one_check(0.0), one_check(0.05))
+    assert fast.stages["src"] < 40 <= slow.stages["src"]
+    assert set(fast.stages) == set(slow.stages) == {"src", "other"}
+    assert timing.histograms()["src"].count == 2
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    h = timing.StageHistogram()
+    for ms in [3] * 90 + [700] * 9 + [90000]:
+        h.observe(ms)
+    assert h.quantile(0.5) == 5
+    assert h.quantile(0.95) == 1000
+    assert h.quantile(1.0) == 90000  # +Inf bucket reports the observed max
+    s = h.summary()
+    assert s["count"] == 100 and s["max_ms"] == 90000
+
+
+def test_enabled_flag_from_env(monkeypatch):
+    monkeypatch.delenv("IDEA_REALITY_TIMINGS", raising=False)
+    assert timing.start_trace().enabled is False
+    monkeypatch.setenv("IDEA_REALITY_TIMINGS", "1")
+    assert timing.start_trace().enabled is True
+    assert timing.start_trace(enabled=False).enabled is False
+
+
+# ---------------------------------------------------------------------------
+# MCP idea_check
+# ---------------------------------------------------------------------------
+
+
+async def test_idea_check_attaches_timings_when_enabled(monkeypatch):
+    from idea_reality_mcp.tools import idea_check
+
+    monkeypatch.setenv("IDEA_REALITY_TIMINGS", "1")
+    with (
+        patch("idea_reality_mcp.tools.expand_idea", new_callable=AsyncMock, return_value=None),
+        patch("idea_reality_mcp.tools.search_github_repos", AsyncMock()),
+        patch("idea_reality_mcp.tools.search_hn", AsyncMock()),
+        patch("idea_reality_mcp.tools.compute_signal", MagicMock(return_value={"meta": {}})),
+    ):
+        result = await idea_check("monitor LLM costs", depth="quick")
+
+    stages = result["meta"]["timings"]
+    assert {"keywords", "expand_idea", "source.github", "source.hn", "compute_signal", "total_ms"} <= set(stages)
+
+
+async def test_idea_check_omits_timings_by_default(monkeypatch):
+    from idea_reality_mcp.tools import idea_check
+
+    monkeypatch.delenv("IDEA_REALITY_TIMINGS", raising=False)
+    with (
+        patch("idea_reality_mcp.tools.expand_idea", new_callable=AsyncMock, return_value=None),
+        patch("idea_reality_mcp.tools.search_github_repos", AsyncMock()),
+        patch("idea_reality_mcp.tools.search_hn", AsyncMock()),
+        patch("idea_reality_mcp.tools.compute_signal", MagicMock(return_value={"meta": {}})),
+    ):
+        result = await idea_check("monitor LLM costs", depth="quick")
+
+    assert "timings" not in result["meta"]
+    assert timing.histograms()["compute_signal"].count == 1
+
+
+# ---------------------------------------------------------------------------
+# API _compute_report
+# ---------------------------------------------------------------------------
+
+
+async def test_compute_report_timings_not_persisted(monkeypatch, tmp_path):
+    pytest.importorskip("fastapi", reason="fastapi not installed (API server tests)")
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
+    import db as score_db
+    import main
+
+    monkeypatch.setattr(score_db, "DB_PATH", str(tmp_path / "timing.db"))
+    score_db.init_db()
+    monkeypatch.setattr(main, "search_github_repos", AsyncMock(return_value={}))
+    monkeypatch.setattr(main, "search_hn", AsyncMock(return_value={}))
+    monkeypatch.setattr(main, "compute_signal", MagicMock(return_value={"meta": {}, "reality_signal": 10}))
+
+    result, *_ = await main._compute_report("habit tracker", "quick", "en", [], flash=True, timings=True)
+
+    assert {"keywords", "source.github", "source.hn", "compute_signal", "save_score"} <= set(
+        result["meta"]["timings"]
+    )
+    conn = score_db._get_conn()
+    breakdown = conn.execute("SELECT breakdown FROM score_history").fetchone()[0]
+    conn.close()
+    assert "timings" not in breakdown
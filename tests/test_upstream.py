@@ -0,0 +1,50 @@
+"""The shared upstream transport stack (idea_reality_mcp.upstream)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from idea_reality_mcp import upstream
+
+
+@pytest.fixture
+def proxy_env(monkeypatch):
+    for name in ("http_proxy", "https_proxy", "all_proxy", "no_proxy", "HTTP_PROXY", "ALL_PROXY", "NO_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+async def test_upstream_clients_go_through_the_environment_proxy(proxy_env):
+    seen: list[bytes] = []
+
+    async def fake_proxy(reader, writer):
+        seen.append(await reader.readline())
+        writer.write(b"HTTP/1.1 502 Bad Gateway\r\ncontent-length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(fake_proxy, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    proxy_env.setenv("HTTPS_PROXY", f"http://127.0.0.1:{port}")
+    try:
+        async with httpx.AsyncClient(timeout=5.0, transport=upstream.transport("github")) as client:
+            with pytest.raises(httpx.ProxyError):
+                await client.get("https://api.github.com/search/repositories?q=x")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert seen == [b"CONNECT api.github.com:443 HTTP/1.1\r\n"]
+
+
+def test_no_proxy_and_unset_schemes_go_direct(proxy_env):
+    proxy_env.setenv("HTTPS_PROXY", "http://proxy.test:3128")
+    proxy_env.setenv("NO_PROXY", "internal.test")
+    t = upstream.EnvProxyTransport()
+
+    assert t.route(httpx.Request("GET", "https://hn.algolia.com/api")) is t.proxied["https"]
+    assert t.route(httpx.Request("GET", "https://internal.test/api")) is t.inner
+    assert t.route(httpx.Request("GET", "http://hn.algolia.com/api")) is t.inner  # no HTTP_PROXY